@@ -89,13 +89,14 @@ def get_domains_by_category(category: str, json_path: Path = DEFAULT_JSON_PATH)
     Get all domains with a specific category.
     
     Args:
-        category: Category to filter by
+        category: Category to filter by (case-insensitive)
         
     Returns:
         List of domain names
     """
     categories = _load_categories(json_path)
-    return [domain for domain, cat in categories.items() if cat == category]
+    category = category.lower()
+    return [domain for domain, cat in categories.items() if cat.lower() == category]
 
 
 def get_uncategorized_domains(known_domains: List[str], json_path: Path = DEFAULT_JSON_PATH) -> List[str]:
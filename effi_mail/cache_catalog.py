@@ -0,0 +1,236 @@
+"""Catalog of auto-filed cache files.
+
+``list_cache_files`` used to ``json.load`` every file under the cache
+directory just to read its metadata block. CacheCatalog keeps that
+metadata (plus size and mtime) in one small JSON index next to the files,
+updated whenever effi-mail writes or rewrites a cache file, so listing is
+one directory scan. Files the index does not know, or that changed on
+disk since they were recorded (older versions, edits by hand), are read
+once and recorded.
+
+It also implements the eviction policy used by ``prune_cache``: files
+older than a maximum age, files whose items have all been processed, and
+then the oldest files until the directory fits a total size budget.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+CATALOG_NAME = "_catalog.json"
+
+# Metadata fields copied from a cache file into its catalog entry
+METADATA_FIELDS = ("created", "source_tool", "total_items", "retrieved_count", "processed_count")
+
+
+class CacheCatalog:
+    """Thread-safe metadata index of the files in a cache directory.
+
+    Args:
+        directory: Cache directory; the index is stored in it as _catalog.json
+        is_cache_file: Predicate selecting cache files among directory entries
+        read_metadata: Reads the metadata block of a file not yet indexed
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        is_cache_file: Callable[[Path], bool],
+        read_metadata: Callable[[Path], dict],
+    ):
+        self.directory = Path(directory)
+        self.is_cache_file = is_cache_file
+        self.read_metadata = read_metadata
+        # file name -> metadata fields + size + mtime
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+        self.parsed = 0
+        self.pruned = 0
+        self.freed_bytes = 0
+
+    @property
+    def path(self) -> Path:
+        return self.directory / CATALOG_NAME
+
+    def _load(self) -> None:
+        """Read the index file once (caller holds the lock)."""
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        if isinstance(data, dict):
+            self._entries = {k: v for k, v in data.get("files", {}).items() if isinstance(v, dict)}
+
+    def _save(self) -> None:
+        """Write the index atomically (caller holds the lock)."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"files": self._entries}, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _entry(metadata: dict, stat: os.stat_result) -> dict:
+        entry = {field: metadata.get(field) for field in METADATA_FIELDS}
+        entry["size"] = stat.st_size
+        entry["mtime"] = stat.st_mtime
+        return entry
+
+    def record(self, path: Union[str, Path], metadata: dict) -> None:
+        """Index a cache file just written or rewritten by effi-mail."""
+        path = Path(path)
+        if path.parent != self.directory:
+            return
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        with self._lock:
+            self._load()
+            self._entries[path.name] = self._entry(metadata, stat)
+            self._save()
+
+    def forget(self, names: Iterable[str]) -> None:
+        """Drop index entries for deleted files."""
+        with self._lock:
+            self._load()
+            for name in names:
+                self._entries.pop(name, None)
+            self._save()
+
+    def entries(self) -> List[dict]:
+        """Return an entry per cache file (with path and name), newest first.
+
+        Only files missing from the index or changed since they were
+        recorded are parsed; entries of deleted files are dropped.
+        """
+        if not self.directory.exists():
+            return []
+        found = {}
+        with self._lock:
+            self._load()
+            changed = False
+            for dir_entry in os.scandir(self.directory):
+                path = Path(dir_entry.path)
+                if not dir_entry.is_file() or not self.is_cache_file(path):
+                    continue
+                stat = dir_entry.stat()
+                entry = self._entries.get(dir_entry.name)
+                if entry is None or entry.get("size") != stat.st_size or entry.get("mtime") != stat.st_mtime:
+                    try:
+                        metadata = self.read_metadata(path)
+                    except Exception:
+                        metadata = {}
+                    self.parsed += 1
+                    entry = self._entry(metadata, stat)
+                    if not metadata:
+                        entry["format"] = "legacy"
+                    self._entries[dir_entry.name] = entry
+                    changed = True
+                found[dir_entry.name] = entry
+            if set(self._entries) != set(found):
+                self._entries = {name: self._entries[name] for name in found}
+                changed = True
+            if changed:
+                self._save()
+        listing = [dict(entry, name=name, path=str(self.directory / name)) for name, entry in found.items()]
+        listing.sort(key=lambda e: e.get("created") or "", reverse=True)
+        return listing
+
+    def prune(
+        self,
+        max_age_days: Optional[float] = None,
+        max_total_bytes: Optional[int] = None,
+        remove_processed: bool = True,
+        keep: Iterable[str] = (),
+        dry_run: bool = False,
+    ) -> dict:
+        """Delete cache files by age, processed status and total size.
+
+        Args:
+            max_age_days: Remove files modified longer ago than this
+            max_total_bytes: Then remove the oldest files until the rest fit
+            remove_processed: Remove files whose items are all processed
+            keep: File paths never removed (e.g. still being written)
+            dry_run: Report what would be removed without deleting
+
+        Returns:
+            Dict with removed files (name, reason, size), freed bytes and
+            the remaining file count and size
+        """
+        keep = {Path(p).name for p in keep}
+        now = time.time()
+        entries = self.entries()
+        kept = [e for e in entries if e["name"] in keep]
+        candidates = sorted((e for e in entries if e["name"] not in keep), key=lambda e: e["mtime"])
+        removed = []
+
+        def reason_for(entry):
+            if max_age_days is not None and now - entry["mtime"] > max_age_days * 86400:
+                return "expired"
+            total = entry.get("total_items")
+            if remove_processed and total and entry.get("processed_count") == total:
+                return "processed"
+            return None
+
+        remaining = []
+        for entry in candidates:
+            reason = reason_for(entry)
+            if reason:
+                removed.append((entry, reason))
+            else:
+                remaining.append(entry)
+        total_size = sum(e["size"] for e in kept + remaining)
+        if max_total_bytes is not None:
+            while remaining and total_size > max_total_bytes:
+                entry = remaining.pop(0)
+                total_size -= entry["size"]
+                removed.append((entry, "size"))
+
+        if not dry_run:
+            deleted = []
+            for entry, reason in removed:
+                try:
+                    os.remove(entry["path"])
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    remaining.append(entry)
+                    total_size += entry["size"]
+                    continue
+                deleted.append((entry, reason))
+            removed = deleted
+            self.forget(entry["name"] for entry, _ in removed)
+            with self._lock:
+                self.pruned += len(removed)
+                self.freed_bytes += sum(entry["size"] for entry, _ in removed)
+
+        return {
+            "removed": [
+                {"name": entry["name"], "reason": reason, "size_kb": round(entry["size"] / 1024, 1)}
+                for entry, reason in removed
+            ],
+            "freed_kb": round(sum(entry["size"] for entry, _ in removed) / 1024, 1),
+            "remaining_files": len(kept) + len(remaining),
+            "remaining_kb": round(total_size / 1024, 1),
+        }
+
+    def stats(self) -> dict:
+        """Return catalog counters for the metrics surface."""
+        with self._lock:
+            self._load()
+            return {
+                "files": len(self._entries),
+                "bytes": sum(e.get("size") or 0 for e in self._entries.values()),
+                "parsed": self.parsed,
+                "pruned": self.pruned,
+                "freed_bytes": self.freed_bytes,
+            }
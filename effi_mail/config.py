@@ -10,3 +10,170 @@ def get_transport_config() -> dict:
         'host': os.getenv('MCP_HOST', '0.0.0.0'),
         'port': int(os.getenv('MCP_PORT', '8000')),
     }
+
+
+def get_read_pool_config() -> dict:
+    """Get read worker pool configuration from environment.
+    
+    EFFI_READ_WORKERS sets how many folder scans may run concurrently.
+    A value of 1 or less disables the pool (sequential scans).
+    """
+    return {
+        'workers': int(os.getenv('EFFI_READ_WORKERS', '4')),
+    }
+
+
+def get_connection_config() -> dict:
+    """Get Outlook connection broker configuration from environment.
+    
+    EFFI_LIVENESS_TTL is how many seconds a connection is trusted before
+    the broker probes it again.
+    """
+    return {
+        'liveness_ttl': float(os.getenv('EFFI_LIVENESS_TTL', '60')),
+    }
+
+
+def get_address_cache_config() -> dict:
+    """Get SMTP address cache configuration from environment.
+    
+    EFFI_ADDRESS_CACHE_SIZE caps the number of cached addresses.
+    EFFI_ADDRESS_CACHE_FILE, if set, persists the cache to that JSON file
+    across restarts; empty keeps it in memory only.
+    """
+    path = os.getenv('EFFI_ADDRESS_CACHE_FILE', '')
+    return {
+        'max_entries': int(os.getenv('EFFI_ADDRESS_CACHE_SIZE', '10000')),
+        'path': os.path.expanduser(path) if path else None,
+    }
+
+
+def get_stamping_config() -> dict:
+    """Get background RecipientDomain stamping configuration from environment.
+    
+    EFFI_STAMP_ENABLED turns the background job on or off.
+    EFFI_STAMP_INTERVAL is the seconds between runs once the Sent history
+    has been backfilled; EFFI_STAMP_CHUNK caps items stamped per run.
+    EFFI_STAMP_STATE_FILE holds the watermark across restarts.
+    """
+    return {
+        'enabled': os.getenv('EFFI_STAMP_ENABLED', '1') not in ('0', 'false', 'no'),
+        'interval': float(os.getenv('EFFI_STAMP_INTERVAL', '300')),
+        'chunk_size': int(os.getenv('EFFI_STAMP_CHUNK', '200')),
+        'path': os.path.expanduser(
+            os.getenv('EFFI_STAMP_STATE_FILE', '~/.effi/recipient_domain_stamp.json')
+        ),
+    }
+
+
+def get_domain_stats_config() -> dict:
+    """Get materialized domain statistics configuration from environment.
+    
+    EFFI_DOMAIN_STATS_FILE is the JSON file holding the per-domain
+    aggregates and their watermark; empty keeps them in memory only.
+    """
+    path = os.getenv('EFFI_DOMAIN_STATS_FILE', '~/.effi/domain_stats.json')
+    return {
+        'path': os.path.expanduser(path) if path else None,
+    }
+
+
+def get_category_queue_config() -> dict:
+    """Get write-behind category queue configuration from environment.
+    
+    EFFI_CATEGORY_JOURNAL is the JSONL file that keeps queued category
+    changes across a crash; empty disables the journal.
+    EFFI_CATEGORY_BATCH caps messages saved per COM job.
+    EFFI_CATEGORY_SYNC_LIMIT is the largest batch the batch triage tools
+    apply synchronously; larger batches are queued and return a handle.
+    """
+    path = os.getenv('EFFI_CATEGORY_JOURNAL', '~/.effi/category_journal.jsonl')
+    return {
+        'path': os.path.expanduser(path) if path else None,
+        'batch_size': int(os.getenv('EFFI_CATEGORY_BATCH', '100')),
+        'sync_limit': int(os.getenv('EFFI_CATEGORY_SYNC_LIMIT', '50')),
+    }
+
+
+def get_rules_config() -> dict:
+    """Get mailbox rules engine configuration from environment.
+    
+    EFFI_RULES_PROGRESS_FILE holds the progress of an unfinished rules run
+    so the next run resumes it; empty disables resuming.
+    EFFI_RULES_BATCH is the number of messages processed between saves.
+    """
+    path = os.getenv('EFFI_RULES_PROGRESS_FILE', '~/.effi/rules_progress.json')
+    return {
+        'path': os.path.expanduser(path) if path else None,
+        'batch_size': int(os.getenv('EFFI_RULES_BATCH', '100')),
+    }
+
+
+def get_response_config() -> dict:
+    """Get tool response encoding configuration from environment.
+    
+    EFFI_RESPONSE_MODE is 'pretty' (indented, every field) or 'compact'
+    (no whitespace, empty and default-valued fields omitted).
+    EFFI_RESPONSE_ALIASES=1 also shortens common keys in compact mode and
+    adds a '_keys' legend to each response.
+    EFFI_JSON_BACKEND is 'auto' (orjson when installed), 'orjson' or 'json'.
+    """
+    return {
+        'mode': os.getenv('EFFI_RESPONSE_MODE', 'pretty').lower(),
+        'aliases': os.getenv('EFFI_RESPONSE_ALIASES', '0').lower() in ('1', 'true', 'yes'),
+        'backend': os.getenv('EFFI_JSON_BACKEND', 'auto').lower(),
+    }
+
+
+def get_cache_config() -> dict:
+    """Get auto-filed cache file configuration from environment.
+    
+    EFFI_CACHE_COMPRESSION is 'none', 'gzip' or 'zstd' (needs the
+    zstandard package; falls back to gzip without it).
+    EFFI_CACHE_BACKGROUND=0 makes tools wait for cache files to be written
+    before returning their preview.
+    EFFI_CACHE_MAX_AGE_DAYS and EFFI_CACHE_MAX_MB bound the cache
+    directory; EFFI_CACHE_PRUNE_PROCESSED=0 keeps fully processed files.
+    The policy is applied by prune_cache and at most every
+    EFFI_CACHE_PRUNE_INTERVAL seconds after a cache write (0 disables).
+    """
+    return {
+        'compression': os.getenv('EFFI_CACHE_COMPRESSION', 'none').lower(),
+        'background': os.getenv('EFFI_CACHE_BACKGROUND', '1') not in ('0', 'false', 'no'),
+        'max_age_days': float(os.getenv('EFFI_CACHE_MAX_AGE_DAYS', '14')),
+        'max_mb': float(os.getenv('EFFI_CACHE_MAX_MB', '500')),
+        'prune_processed': os.getenv('EFFI_CACHE_PRUNE_PROCESSED', '1') not in ('0', 'false', 'no'),
+        'prune_interval': float(os.getenv('EFFI_CACHE_PRUNE_INTERVAL', '600')),
+    }
+
+
+def get_query_cache_config() -> dict:
+    """Get search result cache configuration from environment.
+    
+    EFFI_QUERY_CACHE_TTL is how many seconds a search or DMS listing is
+    served from memory before Outlook is queried again; the server's own
+    triage, move and filing operations invalidate affected results sooner.
+    EFFI_QUERY_CACHE_SIZE bounds the number of cached results (0 disables).
+    """
+    return {
+        'ttl': float(os.getenv('EFFI_QUERY_CACHE_TTL', '60')),
+        'max_entries': int(os.getenv('EFFI_QUERY_CACHE_SIZE', '256')),
+    }
+
+
+def get_item_events_config() -> dict:
+    """Get Outlook item event subscription configuration from environment.
+    
+    EFFI_ITEM_EVENTS=1 subscribes to ItemAdd/ItemChange/ItemRemove on the
+    Inbox, Sent Items and the DMS matters listed in EFFI_ITEM_EVENTS_DMS
+    ("Client/Matter; Client/Other Matter"), so cached results are dropped
+    as soon as Outlook reports a change.
+    EFFI_ITEM_EVENTS_RESYNC is the number of seconds between checks for
+    missed events. EFFI_CHANGE_FEED_SIZE bounds the buffered events.
+    """
+    return {
+        'enabled': os.getenv('EFFI_ITEM_EVENTS', '0').lower() in ('1', 'true', 'yes'),
+        'dms_folders': os.getenv('EFFI_ITEM_EVENTS_DMS', ''),
+        'resync_interval': float(os.getenv('EFFI_ITEM_EVENTS_RESYNC', '300')),
+        'feed_size': int(os.getenv('EFFI_CHANGE_FEED_SIZE', '1000')),
+    }
@@ -1,34 +1,634 @@
 """Helper functions for effi-mail MCP server."""
 
+import atexit
+import base64
+import functools
+import gzip
+import hashlib
+import io
 import json
 import os
-from datetime import datetime
+import re
+import threading
+import time
+import uuid
+from collections.abc import Sized
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import date, datetime
+from itertools import chain, islice
 from pathlib import Path
-from typing import Any, Optional
-
-from outlook_client import (
-    DMSClient,
-    TriageClient,
-    RetrievalClient,
-    SearchClient,
-    FoldersClient,
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from effi_mail.cache_catalog import CATALOG_NAME, CacheCatalog
+from effi_mail.config import (
+    get_address_cache_config,
+    get_cache_config,
+    get_category_queue_config,
+    get_connection_config,
+    get_domain_stats_config,
+    get_item_events_config,
+    get_query_cache_config,
+    get_read_pool_config,
+    get_response_config,
+    get_rules_config,
+    get_stamping_config,
 )
 
+try:
+    import orjson
+except ImportError:  # optional faster JSON backend
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:  # optional zstd cache compression
+    zstandard = None
+
+
+_UNBUILT = object()
+
+
+class LazySingleton:
+    """Stand-in for a module-level singleton that is built on first use.
+    
+    Tool modules import the shared clients from here by name, so building
+    them eagerly would import outlook_client (and pywin32) and construct
+    every client before the server can answer list_tools. A LazySingleton
+    forwards attribute reads, writes and deletes to the object returned by
+    its factory, calling the factory (once, thread-safely) the first time
+    any of them happens.
+    """
+    
+    __slots__ = ("_name", "_factory", "_instance", "_lock")
+    
+    def __init__(self, name: str, factory: Callable[[], Any]):
+        object.__setattr__(self, "_name", name)
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_instance", _UNBUILT)
+        object.__setattr__(self, "_lock", threading.Lock())
+    
+    def _get(self):
+        instance = object.__getattribute__(self, "_instance")
+        if instance is _UNBUILT:
+            with object.__getattribute__(self, "_lock"):
+                instance = object.__getattribute__(self, "_instance")
+                if instance is _UNBUILT:
+                    instance = object.__getattribute__(self, "_factory")()
+                    object.__setattr__(self, "_instance", instance)
+        return instance
+    
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+    
+    def __delattr__(self, name):
+        delattr(self._get(), name)
+    
+    def __repr__(self):
+        instance = object.__getattribute__(self, "_instance")
+        if instance is _UNBUILT:
+            return f"<lazy {object.__getattribute__(self, '_name')} (not built)>"
+        return repr(instance)
+
+
+def resolve(value):
+    """Return the object behind a LazySingleton (building it), or value itself."""
+    return value._get() if isinstance(value, LazySingleton) else value
+
+
+def is_built(value) -> bool:
+    """True unless value is a LazySingleton whose factory has not run yet."""
+    if not isinstance(value, LazySingleton):
+        return True
+    return object.__getattribute__(value, "_instance") is not _UNBUILT
+
+
+def lazy(name: str) -> Callable[[Callable[[], Any]], LazySingleton]:
+    """Decorator turning a factory function into a LazySingleton."""
+    def decorate(factory):
+        return LazySingleton(name, factory)
+    return decorate
+
+
+# Single connection broker shared by all clients (including read-pool
+# workers). It holds one Outlook connection per thread and probes
+# liveness at most once per TTL.
+@lazy("connection")
+def connection():
+    from outlook_client import shared_connection
+    shared_connection.liveness_ttl = get_connection_config()['liveness_ttl']
+    return shared_connection
+
+
+# SMTP address resolution cache shared by all clients. Persisted to disk
+# on exit when EFFI_ADDRESS_CACHE_FILE is set.
+@lazy("address_cache")
+def address_cache():
+    from outlook_client import shared_address_cache
+    config = get_address_cache_config()
+    shared_address_cache.max_entries = config['max_entries']
+    if config['path']:
+        shared_address_cache.path = Path(config['path'])
+        shared_address_cache.load()
+        atexit.register(shared_address_cache.save)
+    return shared_address_cache
+
+
+# Worker pool for scanning independent folders concurrently.
+# Disabled (sequential scans) when EFFI_READ_WORKERS <= 1.
+_read_workers = get_read_pool_config()['workers']
+
+
+@lazy("read_pool")
+def read_pool():
+    from outlook_client import ReadWorkerPool
+    return ReadWorkerPool(workers=_read_workers) if _read_workers > 1 else None
+
+
+# Recent search and DMS results, served until a triage, move or filing
+# operation touches their folder or the TTL expires. Shared by every
+# client that reads or writes those folders.
+@lazy("query_cache")
+def query_cache():
+    from outlook_client import QueryCache
+    config = get_query_cache_config()
+    return QueryCache(ttl=config['ttl'], max_entries=config['max_entries'])
+
+
+def _outlook_client(class_name: str, scans_folders: bool = False, caches_queries: bool = True):
+    """Factory for one of the shared Outlook clients."""
+    def build():
+        import outlook_client
+        resolve(address_cache)
+        client = getattr(outlook_client, class_name)(resolve(connection))
+        if scans_folders:
+            client.read_pool = resolve(read_pool)
+        if caches_queries:
+            client.query_cache = resolve(query_cache)
+        return client
+    return build
+
 
 # Shared Outlook client instances (one per concern)
-# Each client manages its own COM connection
-triage = TriageClient()
-retrieval = RetrievalClient()
-search = SearchClient()
-dms = DMSClient()
-folders = FoldersClient()
+triage = LazySingleton("triage", _outlook_client("TriageClient"))
+retrieval = LazySingleton("retrieval", _outlook_client("RetrievalClient", scans_folders=True,
+                                                       caches_queries=False))
+search = LazySingleton("search", _outlook_client("SearchClient", scans_folders=True))
+dms = LazySingleton("dms", _outlook_client("DMSClient", scans_folders=True))
+folders = LazySingleton("folders", _outlook_client("FoldersClient"))
 
 # Legacy alias for backwards compatibility during transition
 outlook = retrieval
 
+
+# Single STA worker thread that owns the Outlook connection.
+# All COM work from the server is queued through it.
+@lazy("com")
+def com():
+    from outlook_client import ComExecutor
+    return ComExecutor()
+
+
+# Background job that keeps RecipientDomain stamped on Sent Items so
+# get_sent_emails_by_domain only has to run the DASL query. Started by
+# main.run_server(); runs on its own thread and Outlook connection so a
+# long backfill never queues tool calls behind it on the COM thread.
+_stamping_config = get_stamping_config()
+
+
+@lazy("stamper")
+def stamper():
+    from outlook_client import RecipientDomainStamper
+    return RecipientDomainStamper(
+        resolve(retrieval),
+        path=_stamping_config['path'],
+        chunk_size=_stamping_config['chunk_size'],
+        interval=_stamping_config['interval'],
+    )
+
+
+def start_stamper():
+    """Start background RecipientDomain stamping if enabled.
+    
+    Loads the persisted watermark, subscribes to Sent Items ItemAdd on the
+    COM thread (which then pumps messages while idle) and starts the
+    scheduler. Stamping runs on the scheduler thread, which gets its own
+    connection from the shared broker.
+    """
+    if not _stamping_config['enabled']:
+        return
+    stamper.load()
+    com.pump_interval = 0.5
+    com.call(stamper.watch_sent_items)
+    stamper.start()
+
+
+# Optional Outlook item event subscriptions. Events land in change_feed,
+# which drops the affected query cache results; the listener publishes
+# resync events for folders whose events were missed. Started by
+# main.run_server() when EFFI_ITEM_EVENTS=1.
+_item_events_config = get_item_events_config()
+
+
+@lazy("change_feed")
+def change_feed():
+    from outlook_client import ChangeFeed
+    feed = ChangeFeed(max_events=_item_events_config['feed_size'])
+    feed.subscribe(lambda event: query_cache.invalidate(*event["tags"]))
+    return feed
+
+
+@lazy("item_events")
+def item_events():
+    from outlook_client import ItemEventListener, parse_dms_folders
+    return ItemEventListener(
+        resolve(dms),
+        resolve(change_feed),
+        dms_folders=parse_dms_folders(_item_events_config['dms_folders']),
+        resync_interval=_item_events_config['resync_interval'],
+    )
+
+
+def start_item_events():
+    """Subscribe to item events on the COM thread and start resync checks.
+    
+    The COM thread pumps messages while idle so the sinks are called.
+    """
+    if not _item_events_config['enabled']:
+        return
+    com.pump_interval = 0.5
+    com.call(item_events.subscribe)
+    item_events.start(run=com.call)
+
+
+# Write-behind queue for triage/scanned category updates. Large batches
+# are queued and flushed on the COM thread; changes survive a crash via
+# the journal, which start_category_queue() replays.
+_category_queue_config = get_category_queue_config()
+CATEGORY_SYNC_LIMIT = _category_queue_config['sync_limit']
+
+
+@lazy("category_queue")
+def category_queue():
+    from outlook_client import CategoryWriteQueue
+    return CategoryWriteQueue(
+        resolve(triage).apply_category_changes,
+        journal_path=_category_queue_config['path'],
+        batch_size=_category_queue_config['batch_size'],
+    )
+
+
+def queue_category_writes(count: int, background: Optional[bool] = None) -> bool:
+    """Decide whether a batch category update goes through the queue.
+    
+    Args:
+        count: Number of emails in the batch
+        background: Explicit choice; None queues batches over
+            CATEGORY_SYNC_LIMIT
+    """
+    if background is None:
+        return count > CATEGORY_SYNC_LIMIT
+    return background
+
+
+def start_category_queue():
+    """Replay journaled category changes and start the flusher."""
+    category_queue.replay()
+    category_queue.start(run=com.call)
+
+
+def com_tool(func: Callable) -> Callable:
+    """Wrap a synchronous tool so it runs on the COM thread.
+    
+    The returned coroutine function keeps the original name, signature and
+    docstring, so FastMCP derives the same schema as for the sync tool.
+    
+    Args:
+        func: Synchronous tool function that calls outlook_client
+        
+    Returns:
+        Async wrapper that awaits func on the shared ComExecutor
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await com.run(func, *args, **kwargs)
+    return wrapper
+
+
+# Declarative mailbox maintenance rules (run_mailbox_rules). Progress of
+# an unfinished run is kept on disk so the next call resumes it.
+@lazy("rules_engine")
+def rules_engine():
+    from outlook_client import RulesEngine
+    config = get_rules_config()
+    return RulesEngine(resolve(folders), progress_path=config['path'], batch_size=config['batch_size'])
+
+
+# Materialized per-domain Inbox statistics (get_uncategorized_domains).
+# Loaded from disk on the first refresh and refreshed incrementally.
+@lazy("domain_stats")
+def domain_stats():
+    from outlook_client import DomainStatsStore
+    return DomainStatsStore(path=get_domain_stats_config()['path'])
+
+
+# Metrics sources reported by the get_server_metrics tool.
+# Each source is a zero-argument callable returning a dict.
+METRICS_SOURCES: Dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, source: Callable[[], dict]):
+    """Register a metrics source under name (replacing any existing one)."""
+    METRICS_SOURCES[name] = source
+
+
+def collect_metrics() -> dict:
+    """Collect a snapshot from every registered metrics source."""
+    snapshot = {}
+    for name, source in METRICS_SOURCES.items():
+        try:
+            snapshot[name] = source()
+        except Exception as e:
+            snapshot[name] = {"error": str(e)}
+    return snapshot
+
+
+# Sources of lazy singletons are looked up when collected, so registering
+# them does not build anything.
+register_metrics("address_cache", lambda: address_cache.stats())
+register_metrics("recipient_domain_stamper", lambda: stamper.status())
+register_metrics("domain_stats", lambda: domain_stats.stats())
+register_metrics("category_queue", lambda: category_queue.status())
+register_metrics("folder_cache", lambda: folders.folder_cache.stats())
+register_metrics("query_cache", lambda: query_cache.stats())
+register_metrics("item_events", lambda: item_events.status())
+register_metrics("connection", lambda: {
+    "connects": connection.connects,
+    "probes": connection.probes,
+    "liveness_ttl": connection.liveness_ttl,
+})
+
+# Tool response encoding. Every tool returns encode_response(...), so the
+# output format is chosen once for the whole server: 'pretty' (indented,
+# the historical format) or 'compact' (no whitespace, empty and default
+# fields dropped, optionally short key aliases).
+_response_config = get_response_config()
+RESPONSE_MODE = _response_config['mode']
+RESPONSE_ALIASES = _response_config['aliases']
+JSON_BACKEND = (
+    "orjson" if orjson is not None and _response_config['backend'] in ("auto", "orjson") else "json"
+)
+
+# Long keys repeated in every item of large results -> short aliases.
+# Only applied in compact mode with EFFI_RESPONSE_ALIASES=1; responses
+# then carry a '_keys' legend mapping each alias used back to its key.
+RESPONSE_KEY_ALIASES = {
+    "subject": "sub",
+    "sender": "frm",
+    "domain": "dom",
+    "received": "rcv",
+    "has_attachments": "att",
+    "direction": "dir",
+    "triage_status": "tri",
+    "preview": "pre",
+    "recipients_to": "to",
+    "recipients_cc": "cc",
+    "conversation_id": "cid",
+    "internet_message_id": "mid",
+    "folder": "fld",
+    "email_count": "n",
+    "sample_subjects": "smp",
+}
+
+# Fields dropped in compact mode when they hold their default value
+# (None, "", [] and {} are always dropped).
+RESPONSE_DEFAULTS = {
+    "has_attachments": False,
+    "results_truncated": False,
+    "auto_filed": False,
+}
+
+_response_stats_lock = threading.Lock()
+_response_stats = {"responses": 0, "bytes": 0, "encode_seconds": 0.0, "fallbacks": 0}
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values json cannot: datetimes first (the common case), then str()."""
+    if type(value) is datetime or isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return str(value)
+
+
+def _compact_value(value: Any, aliases: Optional[Dict[str, str]], used: Dict[str, str]) -> Any:
+    """Copy value without empty/default fields, renaming keys via aliases."""
+    kind = type(value)
+    if kind is list or kind is tuple:
+        return [_compact_value(item, aliases, used) for item in value]
+    if kind is not dict:
+        return value
+    compacted = {}
+    for key, item in value.items():
+        kind = type(item)
+        if kind is str:
+            if not item:
+                continue
+        elif kind is dict or kind is list or kind is tuple:
+            if not item:
+                continue
+            item = _compact_value(item, aliases, used)
+        elif item is None:
+            continue
+        elif kind is bool and key in RESPONSE_DEFAULTS and item is RESPONSE_DEFAULTS[key]:
+            continue
+        if aliases is not None and key in aliases and aliases[key] not in value:
+            used[aliases[key]] = key
+            key = aliases[key]
+        compacted[key] = item
+    return compacted
+
+
+def _dumps(data: Any, compact: bool) -> str:
+    """Serialize with orjson when available, falling back to json."""
+    if JSON_BACKEND == "orjson":
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=_json_default, option=option).decode("utf-8")
+        except TypeError:
+            # e.g. integers beyond 64 bits; json handles everything
+            with _response_stats_lock:
+                _response_stats["fallbacks"] += 1
+    if compact:
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False, default=_json_default)
+    return json.dumps(data, indent=2, default=_json_default)
+
+
+def encode_response(data: Any, compact: Optional[bool] = None, aliases: Optional[bool] = None) -> str:
+    """Encode a tool response as JSON in the server's response mode.
+    
+    Args:
+        data: Response (normally a dict)
+        compact: Override EFFI_RESPONSE_MODE for this call
+        aliases: Override EFFI_RESPONSE_ALIASES for this call (compact only)
+        
+    Returns:
+        JSON string
+    """
+    started = time.perf_counter()
+    if compact is None:
+        compact = RESPONSE_MODE == "compact"
+    if compact:
+        if aliases is None:
+            aliases = RESPONSE_ALIASES
+        used: Dict[str, str] = {}
+        data = _compact_value(data, RESPONSE_KEY_ALIASES if aliases else None, used)
+        if used and isinstance(data, dict):
+            data["_keys"] = used
+    encoded = _dumps(data, compact)
+    elapsed = time.perf_counter() - started
+    with _response_stats_lock:
+        _response_stats["responses"] += 1
+        _response_stats["bytes"] += len(encoded)
+        _response_stats["encode_seconds"] += elapsed
+    return encoded
+
+
+def response_stats() -> dict:
+    """Return response encoding counters for the metrics surface."""
+    with _response_stats_lock:
+        stats = dict(_response_stats)
+    stats["encode_seconds"] = round(stats["encode_seconds"], 4)
+    stats["mode"] = RESPONSE_MODE
+    stats["aliases"] = RESPONSE_ALIASES
+    stats["backend"] = JSON_BACKEND
+    return stats
+
+
+register_metrics("responses", response_stats)
+
 # Cache directory for large responses
 CACHE_DIR = Path.home() / ".effi" / "cache"
 
+# Auto-filed results are streamed to disk one item per line, optionally
+# compressed, on a background thread so tools can return their preview
+# first. Each file is written to a temporary name and renamed when
+# complete; readers of a file still being written wait for it.
+_cache_config = get_cache_config()
+CACHE_COMPRESSION = _cache_config['compression']
+if CACHE_COMPRESSION == "zstd" and zstandard is None:
+    CACHE_COMPRESSION = "gzip"
+CACHE_BACKGROUND = _cache_config['background']
+CACHE_SUFFIXES = {"none": ".json", "gzip": ".json.gz", "zstd": ".json.zst"}
+CACHE_MAX_AGE_DAYS = _cache_config['max_age_days']
+CACHE_MAX_MB = _cache_config['max_mb']
+CACHE_PRUNE_PROCESSED = _cache_config['prune_processed']
+CACHE_PRUNE_INTERVAL = _cache_config['prune_interval']
+_last_prune = 0.0
+
+_cache_writer = ThreadPoolExecutor(max_workers=2, thread_name_prefix="effi-cache-writer")
+_cache_writes: Dict[str, Future] = {}
+_cache_writes_lock = threading.Lock()
+_cache_write_stats = {"written": 0, "failed": 0, "items": 0, "bytes": 0, "write_seconds": 0.0}
+
+
+def is_cache_file(path: Path) -> bool:
+    """Whether path names a (possibly compressed) cache file."""
+    return path.name != CATALOG_NAME and path.name.endswith(tuple(CACHE_SUFFIXES.values()))
+
+
+def _cache_codec(path) -> str:
+    """Compression of a cache file, from its name."""
+    name = str(path)
+    if name.endswith(".gz"):
+        return "gzip"
+    if name.endswith(".zst"):
+        return "zstd"
+    return "none"
+
+
+def open_cache_file(path, mode: str = "r", codec: Optional[str] = None):
+    """Open a cache file as text, (de)compressing by its suffix (or codec)."""
+    codec = codec or _cache_codec(path)
+    if codec == "gzip":
+        return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=6)
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError(f"zstandard is not installed; cannot open {path}")
+        raw = open(path, mode + "b")
+        if mode == "r":
+            stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(raw, closefd=True)
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def wait_for_cache_file(path, timeout: Optional[float] = None) -> None:
+    """Block until a background write of path (if any) has finished.
+    
+    A failed write leaves no file behind (it is counted in the
+    cache_writes metrics), so callers just see a missing file.
+    """
+    with _cache_writes_lock:
+        future = _cache_writes.get(str(path))
+    if future is not None:
+        try:
+            future.result(timeout=timeout)
+        except Exception:
+            pass
+
+
+def wait_for_cache_writes(timeout: Optional[float] = None) -> None:
+    """Block until every pending background cache write has finished."""
+    with _cache_writes_lock:
+        futures = list(_cache_writes.values())
+    for future in futures:
+        try:
+            future.result(timeout=timeout)
+        except Exception:
+            pass
+
+
+atexit.register(wait_for_cache_writes)
+
+
+def load_cache_data(path) -> Any:
+    """Read a whole cache file, waiting for it if it is still being written."""
+    wait_for_cache_file(path)
+    with open_cache_file(path) as f:
+        return json.load(f)
+
+
+def read_cache_metadata(path) -> dict:
+    """Read only the metadata block of a cache file.
+    
+    Files written by write_cache_file start with the metadata on their
+    first line, so only that line is parsed; other layouts (older
+    indented files, metadata written last) are loaded whole.
+    """
+    head, tail = '{"metadata":', ',"items":['
+    with open_cache_file(path) as f:
+        first = f.readline().rstrip("\n")
+    if first.startswith(head) and first.endswith(tail):
+        return json.loads(first[len(head):-len(tail)])
+    data = load_cache_data(path)
+    return data.get("metadata", {}) if isinstance(data, dict) else {}
+
+
+def save_cache_data(path, cache_data: dict) -> None:
+    """Rewrite a cache file atomically, keeping its compression."""
+    tmp_path = f"{path}.tmp"
+    metadata = cache_data.get("metadata", {})
+    with open_cache_file(tmp_path, "w", codec=_cache_codec(path)) as f:
+        _write_cache_stream(f, cache_data.get("items", []), metadata, tracked=True)
+    os.replace(tmp_path, path)
+    cache_catalog.record(path, metadata)
+
 
 def get_cache_path(prefix: str) -> Path:
     """Generate a timestamped cache file path.
@@ -37,53 +637,173 @@ def get_cache_path(prefix: str) -> Path:
         prefix: Prefix for the cache file name (e.g., 'emails', 'search')
         
     Returns:
-        Path to the cache file
+        Unique path to the cache file (suffixed for EFFI_CACHE_COMPRESSION)
     """
     CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    prefix = re.sub(r"[^\w.-]", "_", prefix)
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    return CACHE_DIR / f"{prefix}_{timestamp}.json"
+    suffix = CACHE_SUFFIXES.get(CACHE_COMPRESSION, ".json")
+    # A random tag keeps names unique within the same second
+    return CACHE_DIR / f"{prefix}_{timestamp}_{uuid.uuid4().hex[:8]}{suffix}"
+
+
+def _write_cache_stream(f, items: Iterable, metadata: dict, tracked: bool = False) -> int:
+    """Stream {"metadata", "items"} to f one item per line; returns the item count.
+    
+    Untracked items get _retrieved/_processed flags spliced into their
+    encoding, so nothing is copied. When metadata has no total_items
+    (items is an iterator) the metadata block is written last.
+    """
+    flags = '"_retrieved":false,"_processed":false'
+    known = "total_items" in metadata
+    f.write('{"metadata":' + _dumps(metadata, True) + ',"items":[\n' if known else '{"items":[\n')
+    count = 0
+    for item in items:
+        if not isinstance(item, dict):
+            item = {"value": item}
+        encoded = _dumps(item, True)
+        if not tracked:
+            encoded = encoded[:-1] + ("," if len(item) else "") + flags + "}"
+        f.write((",\n" if count else "") + encoded)
+        count += 1
+    if known:
+        f.write("\n]}\n")
+    else:
+        metadata["total_items"] = count
+        f.write('\n],"metadata":' + _dumps(metadata, True) + "}\n")
+    return count
 
 
-def write_cache_file(items: list, prefix: str, source_tool: str = "") -> str:
+def _write_cache_items(cache_path: str, items: Iterable, metadata: dict) -> int:
+    """Stream items to cache_path via a temporary file and rename it into place."""
+    started = time.perf_counter()
+    tmp_path = cache_path + ".tmp"
+    try:
+        with open_cache_file(tmp_path, "w", codec=_cache_codec(cache_path)) as f:
+            count = _write_cache_stream(f, items, metadata)
+        os.replace(tmp_path, cache_path)
+    except Exception:
+        with _cache_writes_lock:
+            _cache_write_stats["failed"] += 1
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    with _cache_writes_lock:
+        _cache_write_stats["written"] += 1
+        _cache_write_stats["items"] += count
+        _cache_write_stats["bytes"] += os.path.getsize(cache_path)
+        _cache_write_stats["write_seconds"] += time.perf_counter() - started
+    cache_catalog.record(cache_path, metadata)
+    maybe_prune_cache()
+    return count
+
+
+def write_cache_file(
+    items: Iterable,
+    prefix: str,
+    source_tool: str = "",
+    background: Optional[bool] = None
+) -> str:
     """Write items to a cache file with metadata and tracking flags.
     
     Creates a structured cache file with:
     - metadata: created timestamp, source tool, counts
-    - items: list with _retrieved and _processed flags added
+    - items: one per line, with _retrieved and _processed flags added
+    
+    Items are streamed to disk as they are produced (a list or any
+    iterable) and compressed per EFFI_CACHE_COMPRESSION.
     
     Args:
-        items: List of items to cache
+        items: Items to cache
         prefix: Prefix for the cache file name
         source_tool: Name of the tool that generated this data
+        background: Write on the cache writer thread and return at once
+            (default EFFI_CACHE_BACKGROUND); readers wait for the write
         
     Returns:
         Absolute path to the cache file as string
     """
-    cache_path = get_cache_path(prefix)
-    
-    # Add tracking flags to each item
-    tracked_items = []
-    for item in items:
-        tracked_item = item.copy() if isinstance(item, dict) else {"value": item}
-        tracked_item["_retrieved"] = False
-        tracked_item["_processed"] = False
-        tracked_items.append(tracked_item)
-    
-    # Build cache structure
-    cache_data = {
-        "metadata": {
-            "created": datetime.now().isoformat(),
-            "source_tool": source_tool or prefix,
-            "total_items": len(tracked_items),
-            "retrieved_count": 0,
-            "processed_count": 0
-        },
-        "items": tracked_items
+    cache_path = str(get_cache_path(prefix))
+    metadata = {
+        "created": datetime.now().isoformat(),
+        "source_tool": source_tool or prefix,
+        "retrieved_count": 0,
+        "processed_count": 0,
     }
+    if isinstance(items, Sized):
+        metadata["total_items"] = len(items)
     
-    with open(cache_path, "w", encoding="utf-8") as f:
-        json.dump(cache_data, f, indent=2, default=str)
-    return str(cache_path)
+    if background is None:
+        background = CACHE_BACKGROUND
+    if not background:
+        _write_cache_items(cache_path, items, metadata)
+        return cache_path
+    
+    with _cache_writes_lock:
+        future = _cache_writer.submit(_write_cache_items, cache_path, items, metadata)
+        _cache_writes[cache_path] = future
+    
+    def _done(_):
+        with _cache_writes_lock:
+            if _cache_writes.get(cache_path) is future:
+                del _cache_writes[cache_path]
+    future.add_done_callback(_done)
+    return cache_path
+
+
+def cache_write_stats() -> dict:
+    """Return cache writer counters for the metrics surface."""
+    with _cache_writes_lock:
+        stats = dict(_cache_write_stats)
+        stats["pending"] = len(_cache_writes)
+    stats["write_seconds"] = round(stats["write_seconds"], 4)
+    stats["compression"] = CACHE_COMPRESSION
+    stats["background"] = CACHE_BACKGROUND
+    return stats
+
+
+register_metrics("cache_writes", cache_write_stats)
+
+# Metadata index of CACHE_DIR, so listing and pruning never parse payloads
+cache_catalog = CacheCatalog(CACHE_DIR, is_cache_file, read_cache_metadata)
+register_metrics("cache_catalog", cache_catalog.stats)
+
+
+def prune_cache_files(
+    max_age_days: Optional[float] = None,
+    max_mb: Optional[float] = None,
+    remove_processed: Optional[bool] = None,
+    dry_run: bool = False
+) -> dict:
+    """Apply the cache eviction policy (defaults from EFFI_CACHE_*).
+    
+    Files still being written are never removed.
+    """
+    global _last_prune
+    _last_prune = time.monotonic()
+    with _cache_writes_lock:
+        pending = list(_cache_writes)
+    if max_age_days is None:
+        max_age_days = CACHE_MAX_AGE_DAYS
+    if max_mb is None:
+        max_mb = CACHE_MAX_MB
+    return cache_catalog.prune(
+        max_age_days=max_age_days,
+        max_total_bytes=int(max_mb * 1024 * 1024),
+        remove_processed=CACHE_PRUNE_PROCESSED if remove_processed is None else remove_processed,
+        keep=pending,
+        dry_run=dry_run,
+    )
+
+
+def maybe_prune_cache() -> None:
+    """Prune the cache if EFFI_CACHE_PRUNE_INTERVAL has passed since the last prune."""
+    if CACHE_PRUNE_INTERVAL <= 0 or time.monotonic() - _last_prune < CACHE_PRUNE_INTERVAL:
+        return
+    try:
+        prune_cache_files()
+    except OSError:
+        pass
 
 
 def build_response_with_auto_file(
@@ -97,12 +817,18 @@ def build_response_with_auto_file(
     force_inline: bool = False,
     auto_file_threshold: int = 20,
     preview_count: int = 5,
-    cache_prefix: str = "results"
+    cache_prefix: str = "results",
+    next_cursor: Optional[str] = None
 ) -> str:
     """Build a JSON response with optional auto-filing for large results.
     
+    Auto-filed results are streamed to the cache file in the background
+    (see write_cache_file); the response carries the preview as soon as
+    the first preview_count items are available.
+    
     Args:
-        data: Full response dict including items
+        data: Full response dict including items (a list, or an iterator
+            of items still being produced)
         items_key: Key in data dict containing the large list (e.g., 'emails', 'domains')
         count: Number of items
         limit: Limit that was applied
@@ -113,6 +839,7 @@ def build_response_with_auto_file(
         auto_file_threshold: Item count above which to auto-file
         preview_count: Number of items to include as preview when auto-filing
         cache_prefix: Prefix for auto-generated cache file names
+        next_cursor: Continuation cursor for the next page, if any
         
     Returns:
         JSON string response
@@ -127,12 +854,32 @@ def build_response_with_auto_file(
     }
     if was_truncated and total_available:
         response["total_available"] = total_available
+    if next_cursor:
+        response["next_cursor"] = next_cursor
     
     # Copy any additional metadata from data (except the items)
     for key, value in data.items():
         if key != items_key and key not in response:
             response[key] = value
     
+    # Auto-file for large results
+    if count > auto_file_threshold and not output_file and not force_inline:
+        if isinstance(items, list):
+            preview = items[:preview_count]
+        else:
+            items = iter(items)
+            preview = list(islice(items, preview_count))
+            items = chain(preview, items)
+        cache_path = write_cache_file(items, cache_prefix, source_tool=cache_prefix)
+        response["preview"] = preview
+        response["full_data_file"] = cache_path
+        response["auto_filed"] = True
+        response["auto_file_note"] = f"Results ({count}) exceeded threshold ({auto_file_threshold}). Full data saved to file. Use read_cache_file to paginate through results."
+        return encode_response(response)
+    
+    if not isinstance(items, list):
+        items = list(items)
+    
     # Explicit file path takes priority
     if output_file:
         file_path = os.path.expanduser(output_file)
@@ -140,25 +887,85 @@ def build_response_with_auto_file(
             json.dump(items, f, indent=2, default=str)
         response["written_to"] = file_path
         response["items_saved"] = count
-        return json.dumps(response, indent=2, default=str)
+        return encode_response(response)
     
     # Agent override - return everything inline
     if force_inline:
         response[items_key] = items
-        return json.dumps(response, indent=2, default=str)
-    
-    # Auto-file for large results
-    if count > auto_file_threshold:
-        cache_path = write_cache_file(items, cache_prefix, source_tool=cache_prefix)
-        response["preview"] = items[:preview_count]
-        response["full_data_file"] = cache_path
-        response["auto_filed"] = True
-        response["auto_file_note"] = f"Results ({count}) exceeded threshold ({auto_file_threshold}). Full data saved to file. Use read_cache_file to paginate through results."
-        return json.dumps(response, indent=2, default=str)
+        return encode_response(response)
     
     # Small result - inline
     response[items_key] = items
-    return json.dumps(response, indent=2, default=str)
+    return encode_response(response)
+
+
+def _filter_hash(filters: dict) -> str:
+    """Stable short hash of the filters that define a paged search."""
+    encoded = json.dumps(filters, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+def encode_cursor(folder: str, emails: list, filters: dict, previous: Optional[dict] = None) -> str:
+    """Build an opaque continuation cursor positioned after a page of emails.
+    
+    The cursor records the folder, the ReceivedTime of the last email, the
+    EntryIDs returned at exactly that time (so ties are skipped, not
+    repeated) and a hash of the search filters.
+    
+    Args:
+        folder: Folder (or folder set) the search covers
+        emails: Email objects (or dicts with id and received_time) of the
+            page just returned, newest first
+        filters: Search parameters; the next call must use the same ones
+        previous: Decoded cursor this page started from (keeps tie IDs
+            when a page ends on the same timestamp it started on)
+        
+    Returns:
+        URL-safe cursor string
+    """
+    positions = [
+        (e["id"], e["received_time"]) if isinstance(e, dict) else (e.id, e.received_time)
+        for e in emails
+    ]
+    last = positions[-1][1]
+    ids = [entry_id for entry_id, received in positions if received == last]
+    if previous and previous["received_before"] == last:
+        ids = list(previous["skip_ids"]) + ids
+    payload = {
+        "folder": folder,
+        "received": last.isoformat(),
+        "ids": ids,
+        "filter": _filter_hash(filters),
+    }
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, folder: str, filters: dict) -> dict:
+    """Decode a continuation cursor and check it belongs to this search.
+    
+    Args:
+        cursor: Cursor from a previous response's next_cursor
+        folder: Folder (or folder set) of the current search
+        filters: Search parameters of the current call
+        
+    Returns:
+        Dict with received_before (datetime) and skip_ids (set of EntryIDs)
+        
+    Raises:
+        ValueError: If the cursor is malformed or was issued for a
+            different folder or different filters
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        received_before = datetime.fromisoformat(payload["received"])
+        skip_ids = set(payload["ids"])
+    except (ValueError, KeyError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if payload.get("folder") != folder or payload.get("filter") != _filter_hash(filters):
+        raise ValueError("Cursor was issued for a different search; repeat the original filters or omit the cursor")
+    return {"received_before": received_before, "skip_ids": skip_ids}
 
 
 def truncate_text(text: str, max_length: int = 500) -> str:
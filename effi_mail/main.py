@@ -3,6 +3,7 @@
 from fastmcp import FastMCP
 
 from effi_mail.config import get_transport_config
+from effi_mail.helpers import com_tool, start_category_queue, start_item_events, start_stamper
 from effi_mail.tools import (
     # Email retrieval
     get_pending_emails,
@@ -10,10 +11,12 @@ from effi_mail.tools import (
     get_sent_emails_by_domain,
     get_email_by_id,
     download_attachment,
+    list_attachments_many,
     search_inbox_by_subject,
     # Triage
     triage_email,
     batch_triage,
+    get_category_write_status,
     batch_archive_domain,
     archive_email,
     batch_archive_emails,
@@ -50,61 +53,72 @@ from effi_mail.tools import (
     get_cache_status,
     reset_cache_flags,
     list_cache_files,
+    prune_cache,
     # Inbox frontmatter
     add_email_frontmatter,
+    # Metrics
+    get_server_metrics,
+    # Mailbox rules
+    run_mailbox_rules,
 )
 
 
 # Create FastMCP server
 mcp = FastMCP("effi-mail")
 
+# Tools that touch Outlook are registered through com_tool, which runs them
+# on the shared COM thread so the event loop is never blocked by COM calls.
+# get_emails_by_client is already async and dispatches its own COM work.
+
 # Register email retrieval tools
-mcp.tool()(get_pending_emails)
-mcp.tool()(get_inbox_emails_by_domain)
-mcp.tool()(get_sent_emails_by_domain)
-mcp.tool()(get_email_by_id)
-mcp.tool()(download_attachment)
-mcp.tool()(search_inbox_by_subject)
+mcp.tool()(com_tool(get_pending_emails))
+mcp.tool()(com_tool(get_inbox_emails_by_domain))
+mcp.tool()(com_tool(get_sent_emails_by_domain))
+mcp.tool()(com_tool(get_email_by_id))
+mcp.tool()(com_tool(download_attachment))
+mcp.tool()(com_tool(list_attachments_many))
+mcp.tool()(com_tool(search_inbox_by_subject))
 
 # Register triage tools
-mcp.tool()(triage_email)
-mcp.tool()(batch_triage)
-mcp.tool()(batch_archive_domain)
-mcp.tool()(archive_email)
-mcp.tool()(batch_archive_emails)
-mcp.tool()(list_subfolders)
+mcp.tool()(com_tool(triage_email))
+mcp.tool()(com_tool(batch_triage))
+mcp.tool()(get_category_write_status)
+mcp.tool()(com_tool(batch_archive_domain))
+mcp.tool()(com_tool(archive_email))
+mcp.tool()(com_tool(batch_archive_emails))
+mcp.tool()(com_tool(list_subfolders))
 
 # Register domain categorization tools
-mcp.tool()(get_uncategorized_domains)
+mcp.tool()(com_tool(get_uncategorized_domains))
 mcp.tool()(categorize_domain)
 mcp.tool()(get_domain_summary)
 
 # Register client search tools
 mcp.tool()(get_emails_by_client)
-mcp.tool()(search_outlook_direct)
+mcp.tool()(com_tool(search_outlook_direct))
 
 # Register commitment scanning tools
-mcp.tool()(scan_for_commitments)
-mcp.tool()(mark_scanned)
-mcp.tool()(batch_mark_scanned)
+mcp.tool()(com_tool(scan_for_commitments))
+mcp.tool()(com_tool(mark_scanned))
+mcp.tool()(com_tool(batch_mark_scanned))
 
 # Register DMS tools
-mcp.tool()(list_dms_clients)
-mcp.tool()(list_dms_matters)
-mcp.tool()(get_dms_emails)
-mcp.tool()(get_dms_admin_emails)
-mcp.tool()(search_dms)
-mcp.tool()(file_email_to_dms)
-mcp.tool()(file_admin_email_to_dms)
-mcp.tool()(batch_file_emails_to_dms)
+mcp.tool()(com_tool(list_dms_clients))
+mcp.tool()(com_tool(list_dms_matters))
+mcp.tool()(com_tool(get_dms_emails))
+mcp.tool()(com_tool(get_dms_admin_emails))
+mcp.tool()(com_tool(search_dms))
+mcp.tool()(com_tool(file_email_to_dms))
+mcp.tool()(com_tool(file_admin_email_to_dms))
+mcp.tool()(com_tool(batch_file_emails_to_dms))
 
 # Register workspace filing tools
-mcp.tool()(file_email_to_workspace)
-mcp.tool()(file_thread_to_workspace)
+mcp.tool()(com_tool(file_email_to_workspace))
+mcp.tool()(com_tool(file_thread_to_workspace))
 
 # Register thread tracking tools
-mcp.tool()(get_email_thread)
-mcp.tool()(get_thread_locations)
+mcp.tool()(com_tool(get_email_thread))
+mcp.tool()(com_tool(get_thread_locations))
 
 # Register cache tools
 mcp.tool()(read_cache_file)
@@ -112,14 +126,24 @@ mcp.tool()(mark_cache_processed)
 mcp.tool()(get_cache_status)
 mcp.tool()(reset_cache_flags)
 mcp.tool()(list_cache_files)
+mcp.tool()(prune_cache)
 
 # Register inbox frontmatter tools
 mcp.tool()(add_email_frontmatter)
 
+# Register metrics tools
+mcp.tool()(get_server_metrics)
+
+# Register mailbox rules tools
+mcp.tool()(com_tool(run_mailbox_rules))
+
 
 def run_server():
     """Run the MCP server with configured transport."""
     config = get_transport_config()
+    start_stamper()
+    start_category_queue()
+    start_item_events()
     
     if config['transport'] == 'stdio':
         mcp.run(transport='stdio')
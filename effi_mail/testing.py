@@ -193,7 +193,9 @@ async def list_tools() -> List[Tool]:
                 "type": "object",
                 "properties": {
                     "days": {"type": "integer", "default": 14},
-                    "limit": {"type": "integer", "default": 100}
+                    "limit": {"type": "integer", "default": 100},
+                    "force_inline": {"type": "boolean", "default": False},
+                    "cursor": {"type": "string"}
                 }
             }
         ),
@@ -395,7 +397,9 @@ async def call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
         elif name == "scan_for_commitments":
             result = _scan_for_commitments(
                 days=arguments.get("days", 14),
-                limit=arguments.get("limit", 100)
+                limit=arguments.get("limit", 100),
+                force_inline=arguments.get("force_inline", False),
+                cursor=arguments.get("cursor") or ""
             )
             return [TextContent(type="text", text=result)]
         
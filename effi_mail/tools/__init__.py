@@ -9,11 +9,13 @@ from effi_mail.tools.email_retrieval import (
     get_sent_emails_by_domain,
     get_email_by_id,
     download_attachment,
+    list_attachments_many,
     search_inbox_by_subject,
 )
 from effi_mail.tools.triage import (
     triage_email,
     batch_triage,
+    get_category_write_status,
     batch_archive_domain,
     archive_email,
     batch_archive_emails,
@@ -55,10 +57,17 @@ from effi_mail.tools.cache import (
     get_cache_status,
     reset_cache_flags,
     list_cache_files,
+    prune_cache,
 )
 from effi_mail.tools.inbox_frontmatter import (
     add_email_frontmatter,
 )
+from effi_mail.tools.metrics import (
+    get_server_metrics,
+)
+from effi_mail.tools.rules import (
+    run_mailbox_rules,
+)
 
 __all__ = [
     # Email retrieval
@@ -67,10 +76,12 @@ __all__ = [
     "get_sent_emails_by_domain",
     "get_email_by_id",
     "download_attachment",
+    "list_attachments_many",
     "search_inbox_by_subject",
     # Triage
     "triage_email",
     "batch_triage",
+    "get_category_write_status",
     "batch_archive_domain",
     "archive_email",
     "batch_archive_emails",
@@ -107,6 +118,11 @@ __all__ = [
     "get_cache_status",
     "reset_cache_flags",
     "list_cache_files",
+    "prune_cache",
     # Inbox frontmatter
     "add_email_frontmatter",
+    # Metrics
+    "get_server_metrics",
+    # Mailbox rules
+    "run_mailbox_rules",
 ]
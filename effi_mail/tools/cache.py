@@ -7,7 +7,15 @@ import json
 import os
 from typing import Optional, List
 
-from effi_mail.helpers import CACHE_DIR
+from effi_mail.helpers import (
+    CACHE_DIR,
+    cache_catalog,
+    encode_response,
+    load_cache_data,
+    prune_cache_files,
+    save_cache_data,
+    wait_for_cache_file,
+)
 
 
 def read_cache_file(
@@ -39,19 +47,21 @@ def read_cache_file(
         JSON with items and updated status counts
     """
     file_path = os.path.expanduser(file_path)
+    wait_for_cache_file(file_path)
     
     if not os.path.exists(file_path):
-        return json.dumps({"error": f"Cache file not found: {file_path}"})
+        return encode_response({"error": f"Cache file not found: {file_path}"})
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            cache_data = json.load(f)
+        cache_data = load_cache_data(file_path)
     except json.JSONDecodeError as e:
-        return json.dumps({"error": f"Invalid JSON in cache file: {e}"})
+        return encode_response({"error": f"Invalid JSON in cache file: {e}"})
+    except (OSError, ValueError) as e:
+        return encode_response({"error": f"Cannot read cache file: {e}"})
     
     # Handle legacy cache files (just a list)
     if isinstance(cache_data, list):
-        return json.dumps({
+        return encode_response({
             "error": "Legacy cache file format. Re-run the original query to create a tracked cache file."
         })
     
@@ -96,8 +106,7 @@ def read_cache_file(
     # Save updated cache file
     cache_data["metadata"] = metadata
     cache_data["items"] = items
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(cache_data, f, indent=2, default=str)
+    save_cache_data(file_path, cache_data)
     
     # Prepare response items (optionally filter fields, remove tracking flags)
     response_items = []
@@ -108,7 +117,7 @@ def read_cache_file(
             response_item = {k: v for k, v in item.items() if not k.startswith("_")}
         response_items.append(response_item)
     
-    return json.dumps({
+    return encode_response({
         "count": len(response_items),
         "total_in_file": metadata.get("total_items", len(items)),
         "retrieved_count": metadata["retrieved_count"],
@@ -116,7 +125,7 @@ def read_cache_file(
         "remaining_unretrieved": metadata.get("total_items", len(items)) - metadata["retrieved_count"],
         "filter_applied": f"{filter_field}={filter_value}" if filter_field else None,
         "items": response_items
-    }, indent=2)
+    })
 
 
 def mark_cache_processed(
@@ -135,18 +144,20 @@ def mark_cache_processed(
         JSON with updated counts
     """
     file_path = os.path.expanduser(file_path)
+    wait_for_cache_file(file_path)
     
     if not os.path.exists(file_path):
-        return json.dumps({"error": f"Cache file not found: {file_path}"})
+        return encode_response({"error": f"Cache file not found: {file_path}"})
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            cache_data = json.load(f)
+        cache_data = load_cache_data(file_path)
     except json.JSONDecodeError as e:
-        return json.dumps({"error": f"Invalid JSON in cache file: {e}"})
+        return encode_response({"error": f"Invalid JSON in cache file: {e}"})
+    except (OSError, ValueError) as e:
+        return encode_response({"error": f"Cannot read cache file: {e}"})
     
     if isinstance(cache_data, list):
-        return json.dumps({"error": "Legacy cache file format. Cannot track processing."})
+        return encode_response({"error": "Legacy cache file format. Cannot track processing."})
     
     metadata = cache_data.get("metadata", {})
     items = cache_data.get("items", [])
@@ -167,17 +178,16 @@ def mark_cache_processed(
     # Save updated cache file
     cache_data["metadata"] = metadata
     cache_data["items"] = items
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(cache_data, f, indent=2, default=str)
+    save_cache_data(file_path, cache_data)
     
-    return json.dumps({
+    return encode_response({
         "marked_count": marked_count,
         "ids_provided": len(ids),
         "total_in_file": metadata.get("total_items", len(items)),
         "retrieved_count": metadata["retrieved_count"],
         "processed_count": metadata["processed_count"],
         "remaining_unprocessed": metadata.get("total_items", len(items)) - metadata["processed_count"]
-    }, indent=2)
+    })
 
 
 def get_cache_status(file_path: str) -> str:
@@ -192,18 +202,20 @@ def get_cache_status(file_path: str) -> str:
         JSON with metadata and counts
     """
     file_path = os.path.expanduser(file_path)
+    wait_for_cache_file(file_path)
     
     if not os.path.exists(file_path):
-        return json.dumps({"error": f"Cache file not found: {file_path}"})
+        return encode_response({"error": f"Cache file not found: {file_path}"})
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            cache_data = json.load(f)
+        cache_data = load_cache_data(file_path)
     except json.JSONDecodeError as e:
-        return json.dumps({"error": f"Invalid JSON in cache file: {e}"})
+        return encode_response({"error": f"Invalid JSON in cache file: {e}"})
+    except (OSError, ValueError) as e:
+        return encode_response({"error": f"Cannot read cache file: {e}"})
     
     if isinstance(cache_data, list):
-        return json.dumps({
+        return encode_response({
             "format": "legacy",
             "total_items": len(cache_data),
             "note": "Legacy format without tracking. Re-run query to create tracked cache."
@@ -217,7 +229,7 @@ def get_cache_status(file_path: str) -> str:
     processed_count = sum(1 for item in items if item.get("_processed"))
     total = len(items)
     
-    return json.dumps({
+    return encode_response({
         "file_path": file_path,
         "created": metadata.get("created"),
         "source_tool": metadata.get("source_tool"),
@@ -228,7 +240,7 @@ def get_cache_status(file_path: str) -> str:
         "remaining_unprocessed": total - processed_count,
         "percent_retrieved": round(100 * retrieved_count / total, 1) if total else 0,
         "percent_processed": round(100 * processed_count / total, 1) if total else 0
-    }, indent=2)
+    })
 
 
 def reset_cache_flags(
@@ -249,18 +261,20 @@ def reset_cache_flags(
         JSON with confirmation and updated counts
     """
     file_path = os.path.expanduser(file_path)
+    wait_for_cache_file(file_path)
     
     if not os.path.exists(file_path):
-        return json.dumps({"error": f"Cache file not found: {file_path}"})
+        return encode_response({"error": f"Cache file not found: {file_path}"})
     
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            cache_data = json.load(f)
+        cache_data = load_cache_data(file_path)
     except json.JSONDecodeError as e:
-        return json.dumps({"error": f"Invalid JSON in cache file: {e}"})
+        return encode_response({"error": f"Invalid JSON in cache file: {e}"})
+    except (OSError, ValueError) as e:
+        return encode_response({"error": f"Cannot read cache file: {e}"})
     
     if isinstance(cache_data, list):
-        return json.dumps({"error": "Legacy cache file format. Cannot reset flags."})
+        return encode_response({"error": "Legacy cache file format. Cannot reset flags."})
     
     metadata = cache_data.get("metadata", {})
     items = cache_data.get("items", [])
@@ -283,22 +297,23 @@ def reset_cache_flags(
     # Save updated cache file
     cache_data["metadata"] = metadata
     cache_data["items"] = items
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(cache_data, f, indent=2, default=str)
+    save_cache_data(file_path, cache_data)
     
-    return json.dumps({
+    return encode_response({
         "success": True,
         "retrieved_flags_reset": retrieved_reset,
         "processed_flags_reset": processed_reset,
         "total_items": len(items),
         "retrieved_count": metadata["retrieved_count"],
         "processed_count": metadata["processed_count"]
-    }, indent=2)
+    })
 
 
 def list_cache_files(days: int = 7) -> str:
     """List cache files created in the last N days.
     
+    Metadata comes from the cache catalog, so file payloads are not read.
+    
     Args:
         days: Look back period (default 7 days)
         
@@ -307,55 +322,70 @@ def list_cache_files(days: int = 7) -> str:
     """
     from datetime import datetime, timedelta
     
-    if not CACHE_DIR.exists():
-        return json.dumps({"count": 0, "files": []})
-    
-    cutoff = datetime.now() - timedelta(days=days)
+    cutoff = (datetime.now() - timedelta(days=days)).timestamp()
     files = []
-    
-    for file_path in CACHE_DIR.glob("*.json"):
-        try:
-            stat = file_path.stat()
-            modified = datetime.fromtimestamp(stat.st_mtime)
-            
-            if modified < cutoff:
-                continue
-            
-            # Try to read metadata
-            with open(file_path, "r", encoding="utf-8") as f:
-                cache_data = json.load(f)
-            
-            if isinstance(cache_data, dict) and "metadata" in cache_data:
-                metadata = cache_data["metadata"]
-                files.append({
-                    "path": str(file_path),
-                    "name": file_path.name,
-                    "created": metadata.get("created"),
-                    "source_tool": metadata.get("source_tool"),
-                    "total_items": metadata.get("total_items"),
-                    "retrieved_count": metadata.get("retrieved_count"),
-                    "processed_count": metadata.get("processed_count"),
-                    "size_kb": round(stat.st_size / 1024, 1)
-                })
-            else:
-                # Legacy format
-                files.append({
-                    "path": str(file_path),
-                    "name": file_path.name,
-                    "format": "legacy",
-                    "total_items": len(cache_data) if isinstance(cache_data, list) else None,
-                    "modified": modified.isoformat(),
-                    "size_kb": round(stat.st_size / 1024, 1)
-                })
-        except Exception:
+    for entry in cache_catalog.entries():
+        if entry["mtime"] < cutoff:
+            continue
+        if entry.get("format") == "legacy":
+            files.append({
+                "path": entry["path"],
+                "name": entry["name"],
+                "format": "legacy",
+                "modified": datetime.fromtimestamp(entry["mtime"]).isoformat(),
+                "size_kb": round(entry["size"] / 1024, 1)
+            })
             continue
+        files.append({
+            "path": entry["path"],
+            "name": entry["name"],
+            "created": entry.get("created"),
+            "source_tool": entry.get("source_tool"),
+            "total_items": entry.get("total_items"),
+            "retrieved_count": entry.get("retrieved_count"),
+            "processed_count": entry.get("processed_count"),
+            "size_kb": round(entry["size"] / 1024, 1)
+        })
     
     # Sort by creation time, newest first
     files.sort(key=lambda x: x.get("created") or x.get("modified") or "", reverse=True)
     
-    return json.dumps({
+    return encode_response({
         "count": len(files),
         "cache_dir": str(CACHE_DIR),
         "days_scanned": days,
         "files": files
-    }, indent=2)
+    })
+
+
+def prune_cache(
+    max_age_days: Optional[float] = None,
+    max_total_mb: Optional[float] = None,
+    remove_processed: Optional[bool] = None,
+    dry_run: bool = False
+) -> str:
+    """Delete old, fully processed or excess cache files.
+    
+    Files are removed if older than max_age_days or if every item has been
+    marked processed; then the oldest files go until the cache fits
+    max_total_mb. Files still being written are kept. The same policy runs
+    automatically after cache writes.
+    
+    Args:
+        max_age_days: Maximum file age (default EFFI_CACHE_MAX_AGE_DAYS, 14)
+        max_total_mb: Size budget for the cache directory (default EFFI_CACHE_MAX_MB, 500)
+        remove_processed: Remove fully processed files (default EFFI_CACHE_PRUNE_PROCESSED, on)
+        dry_run: Only report what would be removed
+        
+    Returns:
+        JSON with removed files and reasons, freed and remaining size
+    """
+    result = prune_cache_files(
+        max_age_days=max_age_days,
+        max_mb=max_total_mb,
+        remove_processed=remove_processed,
+        dry_run=dry_run,
+    )
+    result["dry_run"] = dry_run
+    result["cache_dir"] = str(CACHE_DIR)
+    return encode_response(result)
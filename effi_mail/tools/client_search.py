@@ -1,11 +1,57 @@
 """Client search tools for effi-mail MCP server."""
 
-import json
 from datetime import datetime, time
+from itertools import islice
 from typing import Optional
 
-from effi_mail.helpers import search, retrieval, folders, format_email_summary, build_response_with_auto_file
-from effi_work_client import get_client_identifiers_from_effi_work
+from effi_mail.helpers import (
+    com,
+    search,
+    retrieval,
+    folders,
+    category_queue,
+    queue_category_writes,
+    format_email_summary,
+    build_response_with_auto_file,
+    encode_cursor,
+    decode_cursor,
+    encode_response,
+)
+
+
+async def get_client_identifiers_from_effi_work(client_id: str) -> dict:
+    """Look up a client's domains and contact emails in effi-core.
+    
+    effi_work_client (and with it the MCP client stack) is imported on the
+    first lookup rather than at server start-up.
+    """
+    from effi_work_client import get_client_identifiers_from_effi_work as lookup
+    return await lookup(client_id)
+
+
+# Cursor folder for get_emails_by_client, which merges both folders
+CLIENT_FOLDERS = "Inbox+Sent Items"
+
+
+def _search_client_emails(identifiers: dict, days: int, date_from_dt, date_to_dt, limit: int,
+                          filters: dict, position: Optional[dict] = None):
+    """Run the Outlook side of get_emails_by_client (called on the COM thread)."""
+    # Search Outlook with limit+1 to detect truncation
+    emails = search.search_outlook_by_identifiers(
+        domains=identifiers["domains"],
+        contact_emails=identifiers.get("contact_emails", []),
+        days=days,
+        date_from=date_from_dt,
+        date_to=date_to_dt,
+        limit=limit + 1,
+        **(position or {}),
+    )
+    was_truncated = len(emails) > limit
+    emails = emails[:limit]
+    next_cursor = encode_cursor(CLIENT_FOLDERS, emails, filters, position) if was_truncated else None
+    
+    formatted = [format_email_summary(e, include_preview=True, include_recipients=True) for e in emails]
+    return formatted, was_truncated, next_cursor
 
 
 async def get_emails_by_client(
@@ -16,7 +62,8 @@ async def get_emails_by_client(
     limit: int = 100,
     output_file: str = "",
     force_inline: bool = False,
-    auto_file_threshold: int = 20
+    auto_file_threshold: int = 20,
+    cursor: str = ""
 ) -> str:
     """Get client correspondence. client_id is case-insensitive.
     
@@ -25,7 +72,20 @@ async def get_emails_by_client(
     Use output_file to save results to a specific path.
     
     ⚠️ Results are LIMITED. Check 'results_truncated' in response to determine if more records exist.
+    Pass 'next_cursor' from a truncated response as cursor to get the next page.
     """
+    filters = {
+        "tool": "get_emails_by_client",
+        "client_id": client_id.lower(),
+        "days": days,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+    try:
+        position = decode_cursor(cursor, CLIENT_FOLDERS, filters) if cursor else None
+    except ValueError as e:
+        return encode_response({"error": str(e)})
+    
     # Parse dates
     # date_from: start of day (00:00:00)
     # date_to: end of day (23:59:59) to include all emails on that date
@@ -37,25 +97,16 @@ async def get_emails_by_client(
     # Get client identifiers from effi-core (fresh data)
     identifiers = await get_client_identifiers_from_effi_work(client_id)
     if not identifiers.get("domains"):
-        return json.dumps({
+        return encode_response({
             "error": f"Client not found: {client_id}",
             "source": identifiers.get("source"),
             "hint": "Use list_dms_clients to find the exact client name. Client names often include 'Ltd', 'Limited', etc."
         })
     
-    # Search Outlook with limit+1 to detect truncation
-    emails = search.search_outlook_by_identifiers(
-        domains=identifiers["domains"],
-        contact_emails=identifiers.get("contact_emails", []),
-        days=days,
-        date_from=date_from_dt,
-        date_to=date_to_dt,
-        limit=limit + 1,
+    # Outlook work runs on the COM thread so the event loop stays responsive
+    formatted, was_truncated, next_cursor = await com.run(
+        _search_client_emails, identifiers, days, date_from_dt, date_to_dt, limit, filters, position
     )
-    was_truncated = len(emails) > limit
-    emails = emails[:limit]
-    
-    formatted = [format_email_summary(e, include_preview=True, include_recipients=True) for e in emails]
     return build_response_with_auto_file(
         data={
             "client_id": client_id,
@@ -70,7 +121,8 @@ async def get_emails_by_client(
         output_file=output_file,
         force_inline=force_inline,
         auto_file_threshold=auto_file_threshold,
-        cache_prefix=f"client_{client_id}"
+        cache_prefix=f"client_{client_id}",
+        next_cursor=next_cursor
     )
 
 
@@ -88,7 +140,8 @@ def search_outlook_direct(
     limit: int = 50,
     output_file: str = "",
     force_inline: bool = False,
-    auto_file_threshold: int = 20
+    auto_file_threshold: int = 20,
+    cursor: str = ""
 ) -> str:
     """Search Outlook with filters. folder: 'Inbox' or 'Sent Items'. Dates: YYYY-MM-DD.
     
@@ -97,7 +150,25 @@ def search_outlook_direct(
     Use output_file to save results to a specific path.
     
     ⚠️ Results are LIMITED. Check 'results_truncated' in response to determine if more records exist.
+    Pass 'next_cursor' from a truncated response as cursor to get the next page.
     """
+    filters = {
+        "tool": "search_outlook_direct",
+        "sender_domain": sender_domain,
+        "sender_email": sender_email,
+        "recipient_domain": recipient_domain,
+        "recipient_email": recipient_email,
+        "subject_contains": subject_contains,
+        "body_contains": body_contains,
+        "date_from": date_from,
+        "date_to": date_to,
+        "days": days,
+    }
+    try:
+        position = decode_cursor(cursor, folder, filters) if cursor else None
+    except ValueError as e:
+        return encode_response({"error": str(e)})
+    
     # Parse dates
     # date_from: start of day (00:00:00)
     # date_to: end of day (23:59:59) to include all emails on that date
@@ -119,9 +190,11 @@ def search_outlook_direct(
         days=days,
         folder=folder,
         limit=limit + 1,
+        **(position or {}),
     )
     was_truncated = len(emails) > limit
     emails = emails[:limit]
+    next_cursor = encode_cursor(folder, emails, filters, position) if was_truncated else None
     
     formatted = [format_email_summary(e, include_preview=True, include_recipients=True) for e in emails]
     # Sanitize folder name for cache prefix (remove path separators)
@@ -139,7 +212,8 @@ def search_outlook_direct(
         output_file=output_file,
         force_inline=force_inline,
         auto_file_threshold=auto_file_threshold,
-        cache_prefix=f"search_{safe_folder}"
+        cache_prefix=f"search_{safe_folder}",
+        next_cursor=next_cursor
     )
 
 
@@ -155,18 +229,23 @@ def scan_for_commitments(
     limit: int = 100,
     output_file: str = "",
     force_inline: bool = False,
-    auto_file_threshold: int = 20
+    auto_file_threshold: int = 20,
+    cursor: str = ""
 ) -> str:
     """Scan sent emails for commitment detection. Returns unscanned emails with full body.
     
     Fetches emails from Sent Items that don't have the effi:scanned category,
     returning full email body and recipient information for commitment parsing.
+    The category is filtered in the Outlook query, so a page is filled with up
+    to `limit` unscanned emails however many in the window are already scanned.
     
     Large results (>{auto_file_threshold} emails) are auto-saved to a cache file.
     Use force_inline=True to return full payload inline regardless of size.
     Use output_file to save results to a specific path.
     
     ⚠️ Results are LIMITED. Check 'results_truncated' in response to determine if more records exist.
+    For long look-back windows, pass 'next_cursor' from a truncated response as
+    cursor to get the next page.
     
     Args:
         days: Number of days to look back (default 14)
@@ -174,48 +253,37 @@ def scan_for_commitments(
         output_file: Path to save results to (optional)
         force_inline: Return full payload inline regardless of size (default False)
         auto_file_threshold: Auto-file results above this count (default 20)
+        cursor: Continuation cursor from a previous response (optional)
     
     Returns:
         JSON with emails including full body content for commitment scanning
     """
-    # Get sent emails - fetch more to account for filtering
-    emails = search.search_outlook(
-        folder="Sent Items",
-        days=days,
-        limit=limit * 2,  # Fetch extra since we filter out scanned
-    )
-    
-    # Filter out already scanned emails
-    unscanned = [e for e in emails if SCANNED_CATEGORY not in (e.categories or "")]
+    filters = {"tool": "scan_for_commitments", "days": days}
+    try:
+        position = decode_cursor(cursor, "Sent Items", filters) if cursor else None
+    except ValueError as e:
+        return encode_response({"error": str(e)})
     
-    # Get full email details for each unscanned email
-    result_emails = []
-    for email in unscanned:
-        try:
-            full_email = retrieval.get_email_full(email.id)
-            result_emails.append({
-                "id": email.id,
-                "subject": full_email.get("subject", email.subject),
-                "sent_time": full_email.get("received_time", email.received_time.isoformat() if email.received_time else None),
-                "body": full_email.get("body", ""),
-                "recipients_to": full_email.get("recipients_to", []),
-                "recipients_cc": full_email.get("recipients_cc", []),
-            })
-        except Exception:
-            # Fallback to basic info if full email fetch fails
-            result_emails.append({
-                "id": email.id,
-                "subject": email.subject,
-                "sent_time": email.received_time.isoformat() if email.received_time else None,
-                "body": email.body_preview or "",
-                "recipients_to": [],
-                "recipients_cc": [],
-            })
+    # Read limit+1 unscanned emails to detect truncation
+    emails = list(islice(
+        search.iter_unscanned_sent(SCANNED_CATEGORY, days=days, **(position or {})),
+        limit + 1,
+    ))
+    was_truncated = len(emails) > limit
+    emails = emails[:limit]
+    next_cursor = encode_cursor("Sent Items", emails, filters, position) if was_truncated else None
     
-    # Track truncation
-    total_unscanned = len(unscanned)
-    was_truncated = total_unscanned > limit
-    result_emails = result_emails[:limit]
+    result_emails = [
+        {
+            "id": email["id"],
+            "subject": email["subject"],
+            "sent_time": email["received_time"].isoformat(),
+            "body": email["body"],
+            "recipients_to": email["recipients_to"],
+            "recipients_cc": email["recipients_cc"],
+        }
+        for email in emails
+    ]
     
     return build_response_with_auto_file(
         data={"emails": result_emails},
@@ -223,11 +291,12 @@ def scan_for_commitments(
         count=len(result_emails),
         limit=limit,
         was_truncated=was_truncated,
-        total_available=total_unscanned if was_truncated else None,
+        total_available=None,
         output_file=output_file,
         force_inline=force_inline,
         auto_file_threshold=auto_file_threshold,
-        cache_prefix="commitments"
+        cache_prefix="commitments",
+        next_cursor=next_cursor
     )
 
 
@@ -242,31 +311,48 @@ def mark_scanned(email_id: str) -> str:
     Returns:
         JSON with success status
     """
+    category_queue.flush([email_id])
     success = folders.set_category(email_id, SCANNED_CATEGORY)
     
     if success:
-        return json.dumps({
+        return encode_response({
             "success": True,
             "email_id": email_id,
             "category": SCANNED_CATEGORY,
         })
     else:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "email_id": email_id,
             "error": "Failed to set category on email",
         })
 
 
-def batch_mark_scanned(email_ids: list[str]) -> str:
+def batch_mark_scanned(email_ids: list[str], background: Optional[bool] = None) -> str:
     """Mark multiple emails as scanned for commitments.
     
+    Large batches (over EFFI_CATEGORY_SYNC_LIMIT) or background=True are
+    queued and return immediately with a handle for
+    get_category_write_status.
+    
     Args:
         email_ids: List of Outlook EntryIDs to mark
+        background: Queue the writes instead of applying them now
+            (default: only for large batches)
     
     Returns:
-        JSON with counts of successful and failed markings
+        JSON with counts of successful and failed markings, or the queue
+        handle
     """
+    if queue_category_writes(len(email_ids), background):
+        handle = category_queue.submit_categories(email_ids, SCANNED_CATEGORY)
+        return encode_response({
+            "queued": True,
+            "handle": handle.id,
+            "queued_count": len(handle.email_ids),
+        })
+    
+    category_queue.flush(email_ids)
     marked_count = 0
     failed_count = 0
     failed_ids = []
@@ -279,7 +365,7 @@ def batch_mark_scanned(email_ids: list[str]) -> str:
             failed_count += 1
             failed_ids.append(email_id)
     
-    return json.dumps({
+    return encode_response({
         "marked_count": marked_count,
         "failed_count": failed_count,
         "failed_ids": failed_ids,
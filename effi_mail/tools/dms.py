@@ -1,32 +1,31 @@
 """DMS (DMSforLegal) tools for effi-mail MCP server."""
 
-import json
 from datetime import datetime, time
 from typing import Optional
 
-from effi_mail.helpers import dms, format_email_summary, build_response_with_auto_file
+from effi_mail.helpers import dms, format_email_summary, build_response_with_auto_file, encode_response
 
 
 def list_dms_clients() -> str:
     """List all client folders in DMSforLegal."""
     clients = dms.list_dms_clients()
-    return json.dumps({
+    return encode_response({
         "count": len(clients),
         "clients": clients
-    }, indent=2)
+    })
 
 
 def list_dms_matters(client: str) -> str:
     """List matter folders for a client in DMSforLegal."""
     if not client:
-        return json.dumps({"error": "client parameter is required"})
+        return encode_response({"error": "client parameter is required"})
     
     matters = dms.list_dms_matters(client)
-    return json.dumps({
+    return encode_response({
         "client": client,
         "count": len(matters),
         "matters": matters
-    }, indent=2)
+    })
 
 
 def get_dms_emails(
@@ -46,7 +45,7 @@ def get_dms_emails(
     ⚠️ Results are LIMITED. Check 'results_truncated' in response to determine if more records exist.
     """
     if not client or not matter:
-        return json.dumps({"error": "client and matter parameters are required"})
+        return encode_response({"error": "client and matter parameters are required"})
     
     # Fetch limit+1 to detect truncation
     emails = dms.get_dms_emails(client, matter, limit=limit + 1)
@@ -89,7 +88,7 @@ def get_dms_admin_emails(
     ⚠️ Results are LIMITED. Check 'results_truncated' in response to determine if more records exist.
     """
     if not client or not matter:
-        return json.dumps({"error": "client and matter parameters are required"})
+        return encode_response({"error": "client and matter parameters are required"})
     
     # Fetch limit+1 to detect truncation
     emails = dms.get_dms_admin_emails(client, matter, limit=limit + 1)
@@ -193,16 +192,16 @@ def file_email_to_dms(
         JSON with success status, filed email details, or error message.
     """
     if not email_id:
-        return json.dumps({"success": False, "error": "email_id parameter is required"})
+        return encode_response({"success": False, "error": "email_id parameter is required"})
     if not client:
-        return json.dumps({"success": False, "error": "client parameter is required"})
+        return encode_response({"success": False, "error": "client parameter is required"})
     if not matter:
-        return json.dumps({"success": False, "error": "matter parameter is required"})
+        return encode_response({"success": False, "error": "matter parameter is required"})
     
     # Validate client exists
     clients = dms.list_dms_clients()
     if client not in clients:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": f"Client '{client}' not found in DMS. Available clients: {clients}"
         })
@@ -210,7 +209,7 @@ def file_email_to_dms(
     # Validate matter exists
     matters = dms.list_dms_matters(client)
     if matter not in matters:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": f"Matter '{matter}' not found for client '{client}'. Available matters: {matters}"
         })
@@ -221,7 +220,7 @@ def file_email_to_dms(
         matter_name=matter,
     )
     
-    return json.dumps(result, indent=2)
+    return encode_response(result)
 
 
 def file_admin_email_to_dms(
@@ -243,16 +242,16 @@ def file_admin_email_to_dms(
         JSON with success status, filed email details, or error message.
     """
     if not email_id:
-        return json.dumps({"success": False, "error": "email_id parameter is required"})
+        return encode_response({"success": False, "error": "email_id parameter is required"})
     if not client:
-        return json.dumps({"success": False, "error": "client parameter is required"})
+        return encode_response({"success": False, "error": "client parameter is required"})
     if not matter:
-        return json.dumps({"success": False, "error": "matter parameter is required"})
+        return encode_response({"success": False, "error": "matter parameter is required"})
     
     # Validate client exists
     clients = dms.list_dms_clients()
     if client not in clients:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": f"Client '{client}' not found in DMS. Available clients: {clients}"
         })
@@ -260,7 +259,7 @@ def file_admin_email_to_dms(
     # Validate matter exists
     matters = dms.list_dms_matters(client)
     if matter not in matters:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": f"Matter '{matter}' not found for client '{client}'. Available matters: {matters}"
         })
@@ -271,7 +270,7 @@ def file_admin_email_to_dms(
         matter_name=matter,
     )
     
-    return json.dumps(result, indent=2)
+    return encode_response(result)
 
 
 def batch_file_emails_to_dms(
@@ -293,7 +292,7 @@ def batch_file_emails_to_dms(
         JSON with filed_count, failed_count, and details for each.
     """
     if not email_ids:
-        return json.dumps({
+        return encode_response({
             "success": True,
             "filed_count": 0,
             "failed_count": 0,
@@ -302,14 +301,14 @@ def batch_file_emails_to_dms(
             "message": "No emails provided to file"
         })
     if not client:
-        return json.dumps({"success": False, "error": "client parameter is required"})
+        return encode_response({"success": False, "error": "client parameter is required"})
     if not matter:
-        return json.dumps({"success": False, "error": "matter parameter is required"})
+        return encode_response({"success": False, "error": "matter parameter is required"})
     
     # Validate client exists
     clients = dms.list_dms_clients()
     if client not in clients:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": f"Client '{client}' not found in DMS. Available clients: {clients}"
         })
@@ -317,7 +316,7 @@ def batch_file_emails_to_dms(
     # Validate matter exists
     matters = dms.list_dms_matters(client)
     if matter not in matters:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": f"Matter '{matter}' not found for client '{client}'. Available matters: {matters}"
         })
@@ -328,5 +327,5 @@ def batch_file_emails_to_dms(
         matter_name=matter,
     )
     
-    return json.dumps(result, indent=2)
+    return encode_response(result)
 
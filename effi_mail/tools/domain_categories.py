@@ -1,9 +1,9 @@
 """Domain categorization tools for effi-mail MCP server."""
 
-import json
+from datetime import datetime, timedelta
 from typing import Optional
 
-from effi_mail.helpers import retrieval, build_response_with_auto_file
+from effi_mail.helpers import retrieval, domain_stats, build_response_with_auto_file, encode_response
 from domain_categories import (
     get_domain_category,
     set_domain_category,
@@ -16,7 +16,8 @@ def get_uncategorized_domains(
     limit: int = 20,
     output_file: str = "",
     force_inline: bool = False,
-    auto_file_threshold: int = 20
+    auto_file_threshold: int = 20,
+    rescan: bool = False
 ) -> str:
     """Get domains without a category, with email counts.
     
@@ -32,9 +33,12 @@ def get_uncategorized_domains(
         output_file: Path to save results to (optional)
         force_inline: Return full payload inline regardless of size (default False)
         auto_file_threshold: Auto-file results above this count (default 20)
+        rescan: Rebuild the domain statistics from the whole Inbox (default False)
     """
-    # Scan ALL emails in date range for uncategorized domains (no limit)
-    result = retrieval.get_domain_counts(days=days, limit=None, pending_only=False)
+    # Counts come from the materialized per-domain store, refreshed from
+    # messages modified since its watermark (full Inbox scan only on rescan)
+    refresh = retrieval.refresh_domain_stats(domain_stats, full=rescan)
+    result = domain_stats.query(date_from=datetime.now() - timedelta(days=days))
     
     uncategorized = []
     for domain_data in result.get("domains", []):
@@ -55,6 +59,7 @@ def get_uncategorized_domains(
     return build_response_with_auto_file(
         data={
             "days_scanned": days,
+            "full_scan": refresh["full_scan"],
             "domains": uncategorized
         },
         items_key="domains",
@@ -72,7 +77,7 @@ def get_uncategorized_domains(
 def categorize_domain(domain: str, category: str) -> str:
     """Set domain category (case-insensitive): Client, Internal, Marketing, Personal, or Spam."""
     set_domain_category(domain, category)
-    return json.dumps({"success": True, "domain": domain, "category": category})
+    return encode_response({"success": True, "domain": domain, "category": category})
 
 
 def get_domain_summary() -> str:
@@ -88,4 +93,4 @@ def get_domain_summary() -> str:
         if len(result[category]["domains"]) < 10:
             result[category]["domains"].append(domain)
     
-    return json.dumps(result, indent=2)
+    return encode_response(result)
@@ -1,9 +1,17 @@
 """Email retrieval tools for effi-mail MCP server."""
 
-import json
-from typing import Optional
+from typing import List, Optional
 
-from effi_mail.helpers import retrieval, search, format_email_summary, truncate_text, build_response_with_auto_file
+from effi_mail.helpers import (
+    retrieval,
+    search,
+    format_email_summary,
+    truncate_text,
+    build_response_with_auto_file,
+    encode_cursor,
+    decode_cursor,
+    encode_response,
+)
 from domain_categories import get_domain_category
 
 
@@ -108,7 +116,8 @@ def get_inbox_emails_by_domain(
     limit: int = 20,
     output_file: str = "",
     force_inline: bool = False,
-    auto_file_threshold: int = 20
+    auto_file_threshold: int = 20,
+    cursor: str = ""
 ) -> str:
     """Get Inbox emails from a sender domain.
     
@@ -117,11 +126,19 @@ def get_inbox_emails_by_domain(
     Use output_file to save results to a specific path.
     
     ⚠️ Results are LIMITED. Check 'results_truncated' in response to determine if more records exist.
+    Pass 'next_cursor' from a truncated response as cursor to get the next page.
     """
+    filters = {"tool": "get_inbox_emails_by_domain", "domain": domain}
+    try:
+        position = decode_cursor(cursor, "Inbox", filters) if cursor else None
+    except ValueError as e:
+        return encode_response({"error": str(e)})
+    
     # Search Outlook with limit+1 to detect truncation
-    emails = search.search_outlook(sender_domain=domain, limit=limit + 1)
+    emails = search.search_outlook(sender_domain=domain, limit=limit + 1, **(position or {}))
     was_truncated = len(emails) > limit
     emails = emails[:limit]
+    next_cursor = encode_cursor("Inbox", emails, filters, position) if was_truncated else None
     
     formatted = [format_email_summary(e, include_preview=True) for e in emails]
     return build_response_with_auto_file(
@@ -138,7 +155,8 @@ def get_inbox_emails_by_domain(
         output_file=output_file,
         force_inline=force_inline,
         auto_file_threshold=auto_file_threshold,
-        cache_prefix=f"inbox_{domain}"
+        cache_prefix=f"inbox_{domain}",
+        next_cursor=next_cursor
     )
 
 
@@ -148,7 +166,8 @@ def get_sent_emails_by_domain(
     limit: int = 20,
     output_file: str = "",
     force_inline: bool = False,
-    auto_file_threshold: int = 20
+    auto_file_threshold: int = 20,
+    cursor: str = ""
 ) -> str:
     """Get Sent Items emails to a recipient domain. Use to verify if emails have been responded to.
     
@@ -157,14 +176,23 @@ def get_sent_emails_by_domain(
     Use output_file to save results to a specific path.
     
     ⚠️ Results are LIMITED. Check 'results_truncated' in response to determine if more records exist.
+    Pass 'next_cursor' from a truncated response as cursor to get the next page.
     """
-    # Ensure recipient domains are set on recent sent items
-    retrieval._set_recipient_domains()
+    filters = {"tool": "get_sent_emails_by_domain", "domain": domain, "days": days}
+    try:
+        position = decode_cursor(cursor, "Sent Items", filters) if cursor else None
+    except ValueError as e:
+        return encode_response({"error": str(e)})
     
+    # RecipientDomain is kept stamped by the background stamper (helpers.py),
+    # so the request path only runs the DASL query.
     # Search Outlook Sent Items with limit+1 to detect truncation
-    emails = search.search_outlook(recipient_domain=domain, folder="Sent Items", days=days, limit=limit + 1)
+    emails = search.search_outlook(
+        recipient_domain=domain, folder="Sent Items", days=days, limit=limit + 1, **(position or {})
+    )
     was_truncated = len(emails) > limit
     emails = emails[:limit]
+    next_cursor = encode_cursor("Sent Items", emails, filters, position) if was_truncated else None
     
     formatted = [format_email_summary(e, include_preview=True) for e in emails]
     return build_response_with_auto_file(
@@ -181,7 +209,8 @@ def get_sent_emails_by_domain(
         output_file=output_file,
         force_inline=force_inline,
         auto_file_threshold=auto_file_threshold,
-        cache_prefix=f"sent_{domain}"
+        cache_prefix=f"sent_{domain}",
+        next_cursor=next_cursor
     )
 
 
@@ -192,21 +221,23 @@ def get_email_by_id(
     max_body_length: Optional[int] = None
 ) -> str:
     """Get full email by EntryID or internet_message_id (auto-detected)."""
-    # Get email directly from Outlook
-    full_email = retrieval.get_email_full(email_id)
+    # Body size limits are applied by the client as the body is read
+    full_email = retrieval.get_email_full(
+        email_id, include_body=include_body, max_body_length=max_body_length
+    )
     
     if full_email:
         result = full_email.copy()
         if not include_body:
             result.pop("body", None)
             result.pop("html_body", None)
-        elif max_body_length and "body" in result:
+        elif max_body_length and "body" in result and not result.get("body_truncated"):
             result["body"] = truncate_text(result["body"], max_body_length)
         if not include_attachments:
             result.pop("attachments", None)
-        return json.dumps(result, indent=2)
+        return encode_response(result)
     else:
-        return json.dumps({"error": f"Email not found: {email_id}"})
+        return encode_response({"error": f"Email not found: {email_id}"})
 
 
 def download_attachment(
@@ -223,7 +254,7 @@ def download_attachment(
     from pathlib import Path
     
     # Get email timestamp for filename suffix
-    full_email = retrieval.get_email_full(email_id)
+    full_email = retrieval.get_email_full(email_id, include_body=False)
     timestamp_suffix = ""
     if full_email:
         received = full_email.get("received_time", "")
@@ -256,7 +287,31 @@ def download_attachment(
         attachment_name=attachment_name,
         save_path=save_path
     )
-    return json.dumps(result, indent=2)
+    return encode_response(result)
+
+
+def list_attachments_many(
+    email_ids: List[str],
+    documents_only: bool = False
+) -> str:
+    """List attachments (name, size, content type, inline flag) for several emails at once.
+    
+    Email listings only report has_attachments; use this when the attachment
+    details are actually needed.
+    
+    Args:
+        email_ids: EntryIDs of the emails
+        documents_only: Only return document attachments (skip images and inline content)
+    """
+    results = retrieval.list_attachments_many(email_ids)
+    emails = {}
+    for email_id, result in results.items():
+        if not result.get("success"):
+            emails[email_id] = {"error": result.get("error", "Unknown error")}
+            continue
+        attachments = result["documents"] if documents_only else result["attachments"]
+        emails[email_id] = {"count": len(attachments), "attachments": attachments}
+    return encode_response({"count": len(emails), "emails": emails})
 
 
 def search_inbox_by_subject(
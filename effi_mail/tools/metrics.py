@@ -0,0 +1,19 @@
+"""Server metrics tools for effi-mail MCP server.
+
+Reports counters from the shared caches and connection broker.
+"""
+
+
+from effi_mail.helpers import collect_metrics, encode_response
+
+
+def get_server_metrics() -> str:
+    """Get runtime metrics for the server's shared caches and connection.
+    
+    Includes SMTP address cache hits, misses and hit rate, and connection
+    broker reconnect/probe counts. Counters are cumulative since startup.
+    
+    Returns:
+        JSON with one section per metrics source
+    """
+    return encode_response(collect_metrics())
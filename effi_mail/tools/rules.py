@@ -0,0 +1,52 @@
+"""Mailbox rules tools for effi-mail MCP server.
+
+Runs declarative bulk maintenance rules (archive, delete, categorize or
+move mail by domain category, sender, subject and age) from a YAML or
+JSON rule file.
+"""
+
+
+from effi_mail.helpers import folders, category_queue, rules_engine, encode_response
+from domain_categories import get_domains_by_category
+
+
+def run_mailbox_rules(
+    rules_file: str,
+    dry_run: bool = True,
+    max_items: int = 500,
+    restart: bool = False,
+) -> str:
+    """Run bulk mailbox maintenance rules from a YAML or JSON file.
+    
+    Rules are compiled into a few store-side Restrict queries (rules with
+    the same folder and action are OR-combined). A dry run (the default)
+    only counts what each rule group would act on.
+    
+    A real run stops after max_items messages and saves its progress;
+    call again to continue until 'complete' is true.
+    
+    Args:
+        rules_file: Path to the rule file (.yaml, .yml or .json)
+        dry_run: Only count matching messages (default True)
+        max_items: Maximum messages acted on in this call (default 500)
+        restart: Ignore saved progress and start from the first rule group
+        
+    Returns:
+        JSON with per-group counts (and throughput for real runs)
+    """
+    try:
+        from outlook_client import compile_rules, load_rules
+        
+        rules = load_rules(rules_file)
+        plan = compile_rules(rules, get_domains_by_category,
+                             triage_categories=folders.TRIAGE_CATEGORIES)
+    except ValueError as e:
+        return encode_response({"error": str(e)})
+    
+    if dry_run:
+        return encode_response(rules_engine.dry_run(plan))
+    
+    # Queued category changes must land before rules rewrite categories
+    category_queue.flush()
+    report = rules_engine.run(plan, max_items=max_items or None, resume=not restart)
+    return encode_response(report)
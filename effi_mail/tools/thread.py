@@ -4,10 +4,9 @@ Uses Exchange ConversationID to deterministically find related emails
 across Inbox, Sent Items, and optionally DMS folders.
 """
 
-import json
 from typing import Optional
 
-from effi_mail.helpers import retrieval, build_response_with_auto_file
+from effi_mail.helpers import retrieval, build_response_with_auto_file, encode_response
 
 
 def get_email_thread(
@@ -44,21 +43,21 @@ def get_email_thread(
     """
     try:
         # Get source email to extract ConversationID and ConversationTopic
-        source_email = retrieval.get_email_full(email_id)
+        source_email = retrieval.get_email_full(email_id, include_body=False)
         
         if not source_email:
-            return json.dumps({"error": f"Email not found: {email_id}"})
+            return encode_response({"error": f"Email not found: {email_id}"})
         
         conversation_id = source_email.get("conversation_id")
         conversation_topic = source_email.get("conversation_topic")
         
         if not conversation_id:
-            return json.dumps({
+            return encode_response({
                 "error": "Email has no ConversationID - cannot retrieve thread"
             })
         
         if not conversation_topic:
-            return json.dumps({
+            return encode_response({
                 "error": "Email has no ConversationTopic - cannot retrieve thread"
             })
         
@@ -128,7 +127,7 @@ def get_email_thread(
         )
         
     except Exception as e:
-        return json.dumps({"error": f"Failed to retrieve thread: {str(e)}"})
+        return encode_response({"error": f"Failed to retrieve thread: {str(e)}"})
 
 
 def get_thread_locations(email_id: str) -> str:
@@ -145,21 +144,21 @@ def get_thread_locations(email_id: str) -> str:
     """
     try:
         # Get source email
-        source_email = retrieval.get_email_full(email_id)
+        source_email = retrieval.get_email_full(email_id, include_body=False)
         
         if not source_email:
-            return json.dumps({"error": f"Email not found: {email_id}"})
+            return encode_response({"error": f"Email not found: {email_id}"})
         
         conversation_id = source_email.get("conversation_id")
         conversation_topic = source_email.get("conversation_topic")
         
         if not conversation_id:
-            return json.dumps({
+            return encode_response({
                 "error": "Email has no ConversationID - cannot retrieve thread"
             })
         
         if not conversation_topic:
-            return json.dumps({
+            return encode_response({
                 "error": "Email has no ConversationTopic - cannot retrieve thread"
             })
         
@@ -169,7 +168,8 @@ def get_thread_locations(email_id: str) -> str:
             conversation_topic=conversation_topic,
             include_sent=True,
             include_dms=False,
-            limit=50
+            limit=50,
+            lazy_body=True,
         )
         
         # Sort chronologically
@@ -185,11 +185,11 @@ def get_thread_locations(email_id: str) -> str:
                 "received": email.received_time.isoformat(),
             })
         
-        return json.dumps({
+        return encode_response({
             "conversation_id": conversation_id,
             "message_count": len(locations),
             "locations": locations
-        }, indent=2)
+        })
         
     except Exception as e:
-        return json.dumps({"error": f"Failed to retrieve thread locations: {str(e)}"})
+        return encode_response({"error": f"Failed to retrieve thread locations: {str(e)}"})
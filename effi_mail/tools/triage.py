@@ -1,24 +1,43 @@
 """Triage tools for effi-mail MCP server."""
 
-import json
-from typing import List
+from typing import List, Optional
 
-from effi_mail.helpers import triage, folders
+from effi_mail.helpers import triage, folders, category_queue, queue_category_writes, encode_response
 
 
 def triage_email(email_id: str, status: str) -> str:
     """Set triage status ('action', 'waiting', 'processed', 'archived') on an email."""
+    # Apply any queued change first so it can't overwrite this one later
+    category_queue.flush([email_id])
     success = triage.set_triage_status(email_id, status)
     if success:
-        return json.dumps({"success": True, "email_id": email_id, "status": status})
-    return json.dumps({"error": f"Failed to set triage status on {email_id}"})
+        return encode_response({"success": True, "email_id": email_id, "status": status})
+    return encode_response({"error": f"Failed to set triage status on {email_id}"})
 
 
-def batch_triage(email_ids: List[str], status: str) -> str:
-    """Triage multiple emails with the same status."""
+def batch_triage(email_ids: List[str], status: str, background: Optional[bool] = None) -> str:
+    """Triage multiple emails with the same status.
+    
+    Large batches (over EFFI_CATEGORY_SYNC_LIMIT, default 50) or
+    background=True are queued and return immediately with a handle;
+    poll get_category_write_status(handle) for per-email results.
+    """
+    if status not in triage.TRIAGE_CATEGORIES:
+        return encode_response({"error": f"Invalid status: {status}"})
+    
+    if queue_category_writes(len(email_ids), background):
+        handle = category_queue.submit_triage(email_ids, status)
+        return encode_response({
+            "queued": True,
+            "handle": handle.id,
+            "queued_count": len(handle.email_ids),
+            "status": status
+        })
+    
+    category_queue.flush(email_ids)
     results = triage.batch_set_triage_status(email_ids, status)
     
-    return json.dumps({
+    return encode_response({
         "success": results["failed"] == 0,
         "triaged": results["success"],
         "failed": results["failed"],
@@ -26,22 +45,80 @@ def batch_triage(email_ids: List[str], status: str) -> str:
     })
 
 
-def batch_archive_domain(domain: str, days: int = 30) -> str:
-    """Archive all pending emails from a domain. Useful for marketing cleanup."""
-    # Get pending emails from this domain
-    pending_emails = triage.get_pending_emails_from_domain(domain, days=days)
+def batch_archive_domain(domain: str, days: int = 30, dry_run: bool = False,
+                         move_to: str = "", create_path: bool = False) -> str:
+    r"""Archive all pending emails from a domain. Useful for marketing cleanup.
+    
+    Works on the restricted Inbox collection in one pass, so domains with
+    thousands of messages don't need each email fetched separately.
+    
+    Args:
+        domain: Sender domain to archive
+        days: Days to look back (default: 30)
+        dry_run: Only count the pending emails that would be archived
+        move_to: Optional folder path to also move them into, e.g. "Archive"
+            or "Inbox\~Zero\Marketing"
+        create_path: Create missing folders in move_to
+        
+    Returns:
+        JSON with archived_count (or would_archive for a dry run), moved_count
+        and failed_count
+    """
+    target_folder = None
+    if move_to and not dry_run:
+        try:
+            resolved = folders.resolve_folder(move_to, create_path=create_path)
+        except Exception as e:
+            resolved = {"error": str(e)}
+        if "error" in resolved:
+            return encode_response({"error": resolved["error"]})
+        target_folder = resolved["folder"]
     
-    # Archive them all
-    archived = 0
-    for email in pending_emails:
-        if triage.set_triage_status(email.id, "archived"):
-            archived += 1
+    # Queued category changes must land before the domain is rewritten
+    category_queue.flush()
+    result = triage.triage_domain(domain, "archived", days=days,
+                                  target_folder=target_folder, dry_run=dry_run)
+    if "error" in result:
+        return encode_response({"error": result["error"]})
     
-    return json.dumps({
-        "success": True,
+    if dry_run:
+        return encode_response({
+            "success": True,
+            "dry_run": True,
+            "domain": domain,
+            "would_archive": result["matched"]
+        })
+    
+    response = {
+        "success": result["failed"] == 0,
         "domain": domain,
-        "archived_count": archived
-    })
+        "archived_count": result["triaged"],
+        "failed_count": result["failed"]
+    }
+    if target_folder is not None:
+        response["moved_count"] = result["moved"]
+        response["folder"] = target_folder.FolderPath
+    if result["errors"]:
+        response["errors"] = result["errors"]
+    return encode_response(response)
+
+
+def get_category_write_status(handle: str = "") -> str:
+    """Get progress of a queued batch triage or batch mark-scanned.
+    
+    Args:
+        handle: Handle returned by a queued batch; empty for queue totals
+        
+    Returns:
+        JSON with applied/failed/pending counts and failed_ids, or the
+        queue's overall status when no handle is given
+    """
+    if not handle:
+        return encode_response(category_queue.status())
+    job = category_queue.get_handle(handle)
+    if job is None:
+        return encode_response({"error": f"Unknown or expired handle: {handle}"})
+    return encode_response(job.status())
 
 
 def archive_email(email_id: str, folder: str = "Archive", create_path: bool = False) -> str:
@@ -63,7 +140,7 @@ def archive_email(email_id: str, folder: str = "Archive", create_path: bool = Fa
         JSON with success status, old_id, new_id, folder path, and folders_created if any
     """
     result = folders.move_to_archive(email_id, folder_path=folder, create_path=create_path)
-    return json.dumps(result)
+    return encode_response(result)
 
 
 def batch_archive_emails(email_ids: List[str], folder: str = "Archive", create_path: bool = False) -> str:
@@ -85,7 +162,7 @@ def batch_archive_emails(email_ids: List[str], folder: str = "Archive", create_p
         JSON with success/failed counts, moved email details, and folders_created if any
     """
     result = folders.batch_move_to_archive(email_ids, folder_path=folder, create_path=create_path)
-    return json.dumps(result)
+    return encode_response(result)
 
 
 def list_subfolders(folder: str) -> str:
@@ -104,8 +181,8 @@ def list_subfolders(folder: str) -> str:
         JSON with folder path and sorted list of subfolder names
     """
     subfolders = folders.list_subfolders(folder)
-    return json.dumps({
+    return encode_response({
         "folder": folder,
         "count": len(subfolders),
         "subfolders": subfolders
-    }, indent=2)
+    })
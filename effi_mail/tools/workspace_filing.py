@@ -7,15 +7,15 @@ Includes thread-aware filing that splits threads into individual emails,
 with deduplication and edited-quote detection.
 """
 
+import functools
 import hashlib
-import json
 import re
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Tuple
 from html import unescape
 
-from effi_mail.helpers import outlook
+from effi_mail.helpers import outlook, encode_response
 
 
 def fix_mojibake(text: str) -> str:
@@ -250,7 +250,26 @@ REPLY_SEPARATORS = [
 ]
 
 # Multi-line header block pattern (From/Sent/To/Subject on separate lines)
-HEADER_BLOCK_START = re.compile(r"^From:\s+.+$", re.IGNORECASE)
+HEADER_BLOCK_START = r"^From:\s+.+$"
+
+
+@functools.lru_cache(maxsize=None)
+def _thread_patterns():
+    """Compile the reply separator and header patterns on first use.
+    
+    Returns:
+        (header block start, any reply separator) compiled patterns
+    """
+    return (
+        re.compile(HEADER_BLOCK_START, re.IGNORECASE),
+        re.compile("|".join(f"(?:{p})" for p in REPLY_SEPARATORS), re.IGNORECASE),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _quote_markers():
+    """Leading ">" quote markers of every line."""
+    return re.compile(r"^>+", re.MULTILINE)
 
 
 def extract_new_content_only(body: str) -> str:
@@ -267,6 +286,7 @@ def extract_new_content_only(body: str) -> str:
     
     lines = body.split("\n")
     new_content_lines = []
+    header_start, reply_separator = _thread_patterns()
     
     for i, line in enumerate(lines):
         # Check if this line starts a quoted section
@@ -277,7 +297,7 @@ def extract_new_content_only(body: str) -> str:
             is_separator = True
         
         # Check for multi-line header block (From: followed by Sent:/Date:, To:, Subject:)
-        if not is_separator and HEADER_BLOCK_START.match(line.strip()):
+        if not is_separator and header_start.match(line.strip()):
             # Look ahead for Sent/Date, To, Subject pattern
             remaining = lines[i:i+5]  # Check next few lines
             remaining_text = "\n".join(remaining)
@@ -287,15 +307,11 @@ def extract_new_content_only(body: str) -> str:
                 is_separator = True
         
         # Check for single-line separator patterns
-        if not is_separator:
-            for pattern in REPLY_SEPARATORS:
-                if re.search(pattern, line, re.IGNORECASE):
-                    # Special case: don't treat signature separators as reply separators
-                    # Signature separator is exactly "-- " or "--" at start of line
-                    if line.strip() == "--" or line.strip() == "-- ":
-                        continue
-                    is_separator = True
-                    break
+        if not is_separator and reply_separator.search(line):
+            # Special case: don't treat signature separators as reply separators
+            # Signature separator is exactly "-- " or "--" at start of line
+            if line.strip() not in ("--", "-- "):
+                is_separator = True
         
         if is_separator:
             # Stop here - everything after is quoted content
@@ -419,7 +435,8 @@ def get_thread_emails_for_filing(
             conversation_topic=conversation_topic,
             include_sent=include_sent,
             include_dms=False,
-            limit=100
+            limit=100,
+            lazy_body=True,
         )
         
         if not emails:
@@ -442,6 +459,64 @@ def get_thread_emails_for_filing(
         return [], None, str(e)
 
 
+# Share of an original email's words that must appear in a later email's
+# quoted section for the quote to count as unedited
+QUOTE_OVERLAP_THRESHOLD = 0.7
+
+# New content shorter than this is too short to meaningfully compare
+MIN_QUOTE_COMPARE_LENGTH = 50
+
+
+def _normalized_words(text: str) -> frozenset:
+    """Lowercased word set of text (split on any whitespace)."""
+    return frozenset(text.lower().split())
+
+
+def _new_content_words(body: str) -> Optional[frozenset]:
+    """Word set of an email's new content, or None if too short to compare."""
+    if not body:
+        return None
+    new_content = extract_new_content_only(body)
+    if not new_content or len(new_content) < MIN_QUOTE_COMPARE_LENGTH:
+        return None
+    return _normalized_words(new_content) or None
+
+
+def _quoted_words(body: str) -> Optional[frozenset]:
+    """Word set of the quoted section of a body (after the first reply separator).
+    
+    Returns:
+        The words with ">" quote markers stripped, or None if the body
+        quotes nothing
+    """
+    if not body:
+        return None
+    reply_separator = _thread_patterns()[1]
+    start = 0
+    while True:
+        end = body.find("\n", start)
+        line = body[start:] if end == -1 else body[start:end]
+        if reply_separator.search(line):
+            break
+        if end == -1:
+            return None
+        start = end + 1
+    if end == -1:
+        # Separator on the last line: nothing quoted after it
+        return None
+    # Quote markers and whitespace only separate words, so stripping them
+    # across the whole section gives the same words as line by line
+    return _normalized_words(_quote_markers().sub("", body[end + 1:]))
+
+
+def _quote_edited(original_words: Optional[frozenset], quoted_words: Optional[frozenset]) -> bool:
+    """True if too few of the original's words survive in a quoted section."""
+    if not original_words or quoted_words is None:
+        return False
+    overlap = len(original_words & quoted_words) / len(original_words)
+    return overlap < QUOTE_OVERLAP_THRESHOLD
+
+
 def detect_quote_modification(
     original_body: str,
     later_email_body: str,
@@ -450,7 +525,8 @@ def detect_quote_modification(
     """Detect if an original email's content was modified when quoted.
     
     Looks for the original content in the later email's quoted section
-    and checks if it differs significantly.
+    and checks if it differs significantly. To check a whole thread, use
+    ThreadQuoteIndex, which parses each body once.
     
     Args:
         original_body: The original email's body
@@ -462,52 +538,45 @@ def detect_quote_modification(
     """
     if not original_body or not later_email_body:
         return False
+    return _quote_edited(_new_content_words(original_body), _quoted_words(later_email_body))
+
+
+class ThreadQuoteIndex:
+    """Per-thread word sets for edited-quote detection.
     
-    # Get just the new content from original (what would be quoted)
-    original_new = extract_new_content_only(original_body)
-    if not original_new or len(original_new) < 50:
-        # Too short to meaningfully compare
-        return False
-    
-    # Normalize for comparison
-    original_normalized = re.sub(r"\s+", " ", original_new.lower()).strip()
-    
-    # Look for the quoted section in the later email
-    # This is the content AFTER the separator
-    later_lines = later_email_body.split("\n")
-    in_quote = False
-    quoted_content = []
-    
-    for line in later_lines:
-        if in_quote:
-            # Strip quote markers
-            clean_line = re.sub(r"^>+\s*", "", line)
-            quoted_content.append(clean_line)
-        else:
-            # Check if we're entering a quote
-            for pattern in REPLY_SEPARATORS:
-                if re.search(pattern, line, re.IGNORECASE):
-                    in_quote = True
-                    break
-    
-    if not quoted_content:
-        return False
-    
-    quoted_text = "\n".join(quoted_content)
-    quoted_normalized = re.sub(r"\s+", " ", quoted_text.lower()).strip()
+    Each body is parsed once: its new content (the text a later reply
+    would quote) and its quoted section are reduced to word sets. Checking
+    an email against every later one is then a set intersection per pair
+    instead of re-splitting and re-scanning both bodies, so a thread costs
+    one pass over its text plus n²/2 cheap comparisons (instead of
+    re-scanning ever longer quoted chains, roughly n³).
     
-    # Check if original content appears in the quote (with some fuzzy matching)
-    # We use a substring check - if >80% of original appears, it's not modified
-    original_words = set(original_normalized.split())
-    quoted_words = set(quoted_normalized.split())
+    Args:
+        bodies: Email bodies in thread order (oldest first)
+    """
     
-    if not original_words:
-        return False
+    def __init__(self, bodies: List[str]):
+        self.new_words = [_new_content_words(body) for body in bodies]
+        self.quoted_words = [_quoted_words(body) for body in bodies]
+        # Emails that quote something; only these can show an edit
+        self._quoting = [j for j, words in enumerate(self.quoted_words) if words is not None]
     
-    overlap = len(original_words & quoted_words) / len(original_words)
+    def __len__(self):
+        return len(self.new_words)
     
-    # If less than 70% overlap, consider it modified
-    return overlap < 0.7
+    def first_edit(self, index: int) -> Optional[int]:
+        """Index of the first later email whose quote of email `index` was edited.
+        
+        Equivalent to calling detect_quote_modification against each later
+        email in order and stopping at the first True.
+        """
+        original = self.new_words[index]
+        if not original:
+            return None
+        for j in self._quoting:
+            if j > index and _quote_edited(original, self.quoted_words[j]):
+                return j
+        return None
 
 
 def format_email_markdown(email: dict) -> str:
@@ -744,13 +813,13 @@ def file_email_to_workspace(
     Filename format: YYYY-MM-DD-HHMM_email__sender-name____topic.md
     """
     if not email_id:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": "email_id parameter is required"
         })
     
     if not destination_folder:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": "destination_folder parameter is required"
         })
@@ -759,7 +828,7 @@ def file_email_to_workspace(
         # Fetch email
         email = outlook.get_email_full(email_id)
         if not email:
-            return json.dumps({
+            return encode_response({
                 "success": False,
                 "error": f"Email not found: {email_id}"
             })
@@ -780,14 +849,14 @@ def file_email_to_workspace(
         # Write file
         filepath.write_text(markdown_content, encoding="utf-8")
         
-        return json.dumps({
+        return encode_response({
             "success": True,
             "filename": filepath.name,
             "path": str(filepath).replace("\\", "/")
         })
         
     except Exception as e:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": str(e)
         })
@@ -847,13 +916,13 @@ def file_thread_to_workspace(
         JSON with success status, filed/skipped files, and thread info
     """
     if not email_id:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": "email_id parameter is required"
         })
     
     if not destination_folder:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": "destination_folder parameter is required"
         })
@@ -869,13 +938,13 @@ def file_thread_to_workspace(
         )
         
         if error:
-            return json.dumps({
+            return encode_response({
                 "success": False,
                 "error": error
             })
         
         if not emails:
-            return json.dumps({
+            return encode_response({
                 "success": False,
                 "error": "No emails found in thread"
             })
@@ -888,6 +957,8 @@ def file_thread_to_workspace(
         filed = []
         skipped = []
         edit_detected = None
+        # Word sets for edit detection, built when the first email needs them
+        quote_index = None
         
         # Process emails oldest-first
         for i, email in enumerate(emails):
@@ -933,20 +1004,15 @@ def file_thread_to_workspace(
             # Check for quote modification in later emails (if we have more emails)
             quote_modified = False
             if i < len(emails) - 1 and strip_quotes:
-                email_body = email.get("body", "")
-                for later_email in emails[i + 1:]:
-                    if detect_quote_modification(
-                        email_body,
-                        later_email.get("body", ""),
-                        sender
-                    ):
-                        quote_modified = True
-                        edit_detected = {
-                            "at_email_index": i,
-                            "internet_message_id": email_msg_id,
-                            "reason": "Quoted content was edited in a later email"
-                        }
-                        break
+                if quote_index is None:
+                    quote_index = ThreadQuoteIndex([e.get("body", "") for e in emails])
+                if quote_index.first_edit(i) is not None:
+                    quote_modified = True
+                    edit_detected = {
+                        "at_email_index": i,
+                        "internet_message_id": email_msg_id,
+                        "reason": "Quoted content was edited in a later email"
+                    }
             
             # Generate filename
             filename = generate_email_filename(email, topic_slug)
@@ -987,10 +1053,10 @@ def file_thread_to_workspace(
         if edit_detected:
             result["edit_detected"] = edit_detected
         
-        return json.dumps(result, indent=2)
+        return encode_response(result)
         
     except Exception as e:
-        return json.dumps({
+        return encode_response({
             "success": False,
             "error": str(e)
         })
@@ -1,8 +1,9 @@
 """Data models for email entities."""
 
+import sys
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Optional, List
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 from enum import Enum
 
 
@@ -49,33 +50,175 @@ class EmailDirection(Enum):
     OUTBOUND = "outbound"
 
 
-@dataclass
+def _intern(value):
+    """Intern a string so repeated values share one object."""
+    return sys.intern(value) if type(value) is str else value
+
+
 class Email:
-    """Represents an email message."""
-    id: str  # Outlook EntryID
-    subject: str
-    sender_name: str
-    sender_email: str
-    domain: str
-    received_time: datetime
-    body_preview: str = ""
-    has_attachments: bool = False
-    attachment_names: List[str] = field(default_factory=list)
-    categories: str = ""
-    conversation_id: Optional[str] = None
-    folder_path: str = "Inbox"
-    direction: str = "inbound"  # 'inbound' or 'outbound'
-    recipients_to: List[str] = field(default_factory=list)  # JSON array of To addresses
-    recipients_cc: List[str] = field(default_factory=list)  # JSON array of CC addresses
-    recipient_domains: str = ""  # Comma-separated domains from To/CC (computed at sync)
-    internet_message_id: Optional[str] = None  # RFC2822 Message-ID (permanent identifier)
-    
-    # Triage fields
-    triage_status: TriageStatus = TriageStatus.PENDING
-    client_id: Optional[str] = None
-    matter_id: Optional[str] = None
-    processed_at: Optional[datetime] = None
-    notes: str = ""
+    """Represents an email message.
+    
+    A slotted class rather than a dataclass: scans and thread merges can
+    hold tens of thousands of these, so instances carry no __dict__,
+    domain/folder/direction/category strings are interned (a scan repeats
+    a handful of values), and recipients are stored as tuples.
+    
+    body_preview and attachment_names may be deferred with
+    defer_body_preview() / defer_attachment_names(): the loader is kept in
+    the field's slot and replaced by its result on first access.
+    """
+    
+    FIELDS = (
+        "id", "subject", "sender_name", "sender_email", "domain", "received_time",
+        "body_preview", "has_attachments", "attachment_names", "categories",
+        "conversation_id", "folder_path", "direction", "recipients_to", "recipients_cc",
+        "recipient_domains", "internet_message_id",
+        "triage_status", "client_id", "matter_id", "processed_at", "notes",
+    )
+    
+    __slots__ = (
+        "id", "subject", "sender_name", "sender_email", "domain", "received_time",
+        "_body_preview", "has_attachments", "_attachment_names", "categories",
+        "conversation_id", "folder_path", "direction", "_recipients_to", "_recipients_cc",
+        "recipient_domains", "internet_message_id",
+        "triage_status", "client_id", "matter_id", "processed_at", "notes",
+    )
+    
+    def __init__(
+        self,
+        id: str,  # Outlook EntryID
+        subject: str,
+        sender_name: str,
+        sender_email: str,
+        domain: str,
+        received_time: datetime,
+        body_preview: str = "",
+        has_attachments: bool = False,
+        attachment_names: Sequence[str] = (),
+        categories: str = "",
+        conversation_id: Optional[str] = None,
+        folder_path: str = "Inbox",
+        direction: str = "inbound",  # 'inbound' or 'outbound'
+        recipients_to: Sequence[str] = (),  # To addresses
+        recipients_cc: Sequence[str] = (),  # CC addresses
+        recipient_domains: str = "",  # Comma-separated domains from To/CC (computed at sync)
+        internet_message_id: Optional[str] = None,  # RFC2822 Message-ID (permanent identifier)
+        # Triage fields
+        triage_status: TriageStatus = TriageStatus.PENDING,
+        client_id: Optional[str] = None,
+        matter_id: Optional[str] = None,
+        processed_at: Optional[datetime] = None,
+        notes: str = "",
+    ):
+        self.id = id
+        self.subject = subject
+        self.sender_name = sender_name
+        self.sender_email = sender_email
+        self.domain = _intern(domain)
+        self.received_time = received_time
+        self._body_preview = body_preview
+        self.has_attachments = has_attachments
+        self._attachment_names = attachment_names
+        self.categories = _intern(categories)
+        self.conversation_id = conversation_id
+        self.folder_path = _intern(folder_path)
+        self.direction = _intern(direction)
+        self.recipients_to = recipients_to
+        self.recipients_cc = recipients_cc
+        self.recipient_domains = _intern(recipient_domains)
+        self.internet_message_id = internet_message_id
+        self.triage_status = triage_status
+        self.client_id = client_id
+        self.matter_id = matter_id
+        self.processed_at = processed_at
+        self.notes = notes
+    
+    @property
+    def recipients_to(self) -> Tuple[str, ...]:
+        return self._recipients_to
+    
+    @recipients_to.setter
+    def recipients_to(self, value: Sequence[str]):
+        self._recipients_to = tuple(value) if value else ()
+    
+    @property
+    def recipients_cc(self) -> Tuple[str, ...]:
+        return self._recipients_cc
+    
+    @recipients_cc.setter
+    def recipients_cc(self, value: Sequence[str]):
+        self._recipients_cc = tuple(value) if value else ()
+    
+    @property
+    def body_preview(self) -> str:
+        value = self._body_preview
+        if callable(value):
+            try:
+                value = value() or ""
+            except Exception:
+                value = ""
+            self._body_preview = value
+        return value
+    
+    @body_preview.setter
+    def body_preview(self, value: str):
+        self._body_preview = value
+    
+    @property
+    def attachment_names(self) -> List[str]:
+        value = self._attachment_names
+        if callable(value):
+            try:
+                value = value()
+            except Exception:
+                value = []
+        if not isinstance(value, list):
+            value = list(value)
+        self._attachment_names = value
+        return value
+    
+    @attachment_names.setter
+    def attachment_names(self, value: Sequence[str]):
+        self._attachment_names = value
+    
+    def defer_body_preview(self, loader: Callable[[], str]):
+        """Compute body_preview on first access by calling loader.
+        
+        Used by scans without a preview table, whose callers often need
+        only ids and dates, so Body is not read for every message.
+        """
+        self._body_preview = loader
+    
+    def defer_attachment_names(self, loader: Callable[[], List[str]]):
+        """Compute attachment_names on first access by calling loader.
+        
+        Enumerating attachments (and checking images for a content-ID) is
+        expensive, so clients defer it until a caller needs the names.
+        """
+        self._attachment_names = loader
+    
+    def to_dict(self, fields: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+        """Return the fields as a plain dict (shallow; recipients stay tuples).
+        
+        Args:
+            fields: Field names to include (default: all). Deferred fields
+                are only loaded if included.
+        """
+        return {name: getattr(self, name) for name in (fields or self.FIELDS)}
+    
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.FIELDS)
+    
+    __hash__ = None
+    
+    def __repr__(self):
+        values = ", ".join(
+            f"{name}=<deferred>" if callable(getattr(self, f"_{name}", None)) else f"{name}={getattr(self, name)!r}"
+            for name in self.FIELDS
+        )
+        return f"Email({values})"
 
 
 @dataclass
@@ -8,23 +8,113 @@ This package provides specialized client classes for different Outlook operation
 - RetrievalClient: Email fetching, body retrieval, attachments
 - SearchClient: DASL query building and flexible search
 - FoldersClient: Folder navigation, moving, archiving
+- OutlookConnection: Connection broker shared by all clients
+- AddressCache: LRU cache of Exchange address -> SMTP, shared by all clients
+- DomainStatsStore: Persistent per-domain, per-day Inbox aggregates
+- FolderCache: Folder path -> EntryID/StoreID handles and subfolder listings
+- QueryCache: Search/DMS results with folder-precise invalidation and a TTL
+- ComExecutor: Dedicated STA worker thread that runs COM calls
+- ReadWorkerPool: Worker threads with their own MAPI sessions for parallel scans
+- RecipientDomainStamper: Background RecipientDomain stamping of Sent Items
+- CategoryWriteQueue: Coalescing write-behind queue for category updates
+- RulesEngine: Declarative bulk mailbox rules compiled to store-side queries
+- ItemEventListener: ItemAdd/ItemChange/ItemRemove subscriptions feeding a ChangeFeed
 
-Each client manages its own COM connection. For a long-running MCP server,
-create singleton instances in helpers.py.
+Clients share an OutlookConnection broker (one connection per thread).
+For a long-running MCP server, create singleton instances in helpers.py and
+route calls through a shared ComExecutor so the connection lives on a
+single thread.
+
+Names are imported from their submodules on first access, so importing
+the package (e.g. for one class) does not load pywin32 or every client.
 """
 
-from outlook_client.base import BaseOutlookClient
-from outlook_client.dms import DMSClient
-from outlook_client.triage import TriageClient
-from outlook_client.retrieval import RetrievalClient
-from outlook_client.search import SearchClient
-from outlook_client.folders import FoldersClient
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from outlook_client.connection import OutlookConnection, shared_connection
+    from outlook_client.address_cache import AddressCache, shared_address_cache
+    from outlook_client.domain_stats import DomainStatsStore
+    from outlook_client.folder_cache import FolderCache
+    from outlook_client.query_cache import QueryCache
+    from outlook_client.base import BaseOutlookClient
+    from outlook_client.dms import DMSClient
+    from outlook_client.triage import TriageClient
+    from outlook_client.retrieval import RetrievalClient
+    from outlook_client.search import SearchClient
+    from outlook_client.folders import FoldersClient
+    from outlook_client.executor import ComExecutor
+    from outlook_client.pool import ReadWorkerPool, merge_by_received
+    from outlook_client.stamping import RecipientDomainStamper
+    from outlook_client.category_queue import CategoryWriteQueue
+    from outlook_client.rules import RulesEngine, compile_rules, load_rules
+    from outlook_client.item_events import ChangeFeed, ItemEventListener, parse_dms_folders
+
+# Public name -> submodule defining it
+_EXPORTS = {
+    "OutlookConnection": "outlook_client.connection",
+    "shared_connection": "outlook_client.connection",
+    "AddressCache": "outlook_client.address_cache",
+    "shared_address_cache": "outlook_client.address_cache",
+    "DomainStatsStore": "outlook_client.domain_stats",
+    "FolderCache": "outlook_client.folder_cache",
+    "QueryCache": "outlook_client.query_cache",
+    "BaseOutlookClient": "outlook_client.base",
+    "DMSClient": "outlook_client.dms",
+    "TriageClient": "outlook_client.triage",
+    "RetrievalClient": "outlook_client.retrieval",
+    "SearchClient": "outlook_client.search",
+    "FoldersClient": "outlook_client.folders",
+    "ComExecutor": "outlook_client.executor",
+    "ReadWorkerPool": "outlook_client.pool",
+    "merge_by_received": "outlook_client.pool",
+    "RecipientDomainStamper": "outlook_client.stamping",
+    "CategoryWriteQueue": "outlook_client.category_queue",
+    "RulesEngine": "outlook_client.rules",
+    "compile_rules": "outlook_client.rules",
+    "load_rules": "outlook_client.rules",
+    "ChangeFeed": "outlook_client.item_events",
+    "ItemEventListener": "outlook_client.item_events",
+    "parse_dms_folders": "outlook_client.item_events",
+}
 
 __all__ = [
+    "OutlookConnection",
+    "shared_connection",
+    "AddressCache",
+    "shared_address_cache",
+    "DomainStatsStore",
+    "FolderCache",
+    "QueryCache",
     "BaseOutlookClient",
     "DMSClient", 
     "TriageClient",
     "RetrievalClient",
     "SearchClient",
     "FoldersClient",
+    "ComExecutor",
+    "ReadWorkerPool",
+    "merge_by_received",
+    "RecipientDomainStamper",
+    "CategoryWriteQueue",
+    "RulesEngine",
+    "compile_rules",
+    "load_rules",
+    "ChangeFeed",
+    "ItemEventListener",
+    "parse_dms_folders",
 ]
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,133 @@
+"""SMTP address resolution cache.
+
+Resolving an Exchange address to SMTP (``GetExchangeUser()`` or
+``PR_SMTP_ADDRESS``) is a round trip per sender and per recipient, and the
+same colleagues appear on thousands of messages. This LRU cache maps an
+address entry key (Exchange legacy DN, or AddressEntry ID when no address
+is available) to its SMTP address. One instance is shared by all clients
+and can optionally be persisted to disk across restarts.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+class AddressCache:
+    """Thread-safe LRU cache of address key -> SMTP address.
+
+    Args:
+        max_entries: Maximum entries kept before the least recently used
+            entry is evicted
+        path: Optional JSON file used by load()/save() for persistence
+    """
+
+    def __init__(self, max_entries: int = 10000, path: Optional[Union[str, Path]] = None):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached SMTP address for key, or None on a miss."""
+        with self._lock:
+            smtp = self._entries.get(key)
+            if smtp is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return smtp
+
+    def put(self, key: str, smtp: str):
+        """Store an SMTP address, evicting the oldest entry when full."""
+        with self._lock:
+            self._entries[key] = smtp
+            self._entries.move_to_end(key)
+            self._dirty = True
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drop all entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._dirty = True
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, Union[int, float, str, None]]:
+        """Return hit/miss statistics for the metrics surface."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "persist_path": str(self.path) if self.path else None,
+            }
+
+    def load(self) -> int:
+        """Load entries from the persistence file.
+
+        Returns:
+            Number of entries loaded (0 if no file or unreadable)
+        """
+        if not self.path or not self.path.exists():
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return 0
+        entries = data.get("entries", {}) if isinstance(data, dict) else {}
+        with self._lock:
+            for key, smtp in entries.items():
+                if isinstance(key, str) and isinstance(smtp, str):
+                    self._entries[key] = smtp
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = False
+        return len(entries)
+
+    def save(self) -> bool:
+        """Write entries to the persistence file if anything changed.
+
+        Entries are written oldest first so load() restores LRU order.
+        The file is replaced atomically.
+
+        Returns:
+            True if the file was written
+        """
+        if not self.path:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+            entries = dict(self._entries)
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"entries": entries}, f)
+        os.replace(tmp_path, self.path)
+        return True
+
+
+# Default cache shared by every client
+shared_address_cache = AddressCache()
@@ -1,13 +1,53 @@
 """Base Outlook client with connection management and shared utilities."""
 
-import win32com.client
 from datetime import datetime, timedelta
-from typing import List, Optional, Dict, Any
-import pythoncom
+from functools import partial
+from typing import Any, Collection, Dict, Iterator, List, Optional
 import os
 import mimetypes
 
 from models import Email, TriageStatus
+from outlook_client.address_cache import shared_address_cache
+from outlook_client.connection import OutlookConnection, shared_connection
+from outlook_client.query_cache import DEFAULT_FOLDER_TAGS, folder_tag
+from outlook_client.properties import PR_BODY, get_properties, is_property_error
+
+
+class StreamedPreviews:
+    """EntryID -> body preview mapping filled from a folder Table on demand.
+    
+    The table is sorted like the Items being scanned, so each lookup reads
+    at most a few rows ahead. Rows already read stay cached; a table error
+    ends reading and later lookups miss (callers then read Body).
+    """
+    
+    def __init__(self, table, read_row):
+        self._table = table
+        self._read_row = read_row
+        self._previews: Dict[str, str] = {}
+    
+    def __len__(self) -> int:
+        return len(self._previews)
+    
+    def __contains__(self, entry_id) -> bool:
+        self._read_until(entry_id)
+        return entry_id in self._previews
+    
+    def __getitem__(self, entry_id) -> str:
+        self._read_until(entry_id)
+        return self._previews[entry_id]
+    
+    def _read_until(self, entry_id):
+        while self._table is not None and entry_id not in self._previews:
+            try:
+                if self._table.EndOfTable is not False:
+                    self._table = None
+                    break
+                row_id, preview = self._read_row(self._table)
+            except Exception:
+                self._table = None
+                break
+            self._previews[row_id] = preview
 
 
 class BaseOutlookClient:
@@ -26,6 +66,12 @@ class BaseOutlookClient:
     # MAPI property for PR_INTERNET_MESSAGE_ID
     PR_INTERNET_MESSAGE_ID = "http://schemas.microsoft.com/mapi/proptag/0x1035001F"
     
+    # Characters of body kept in Email.body_preview
+    PREVIEW_LENGTH = 500
+    
+    # MAPI property for PR_SMTP_ADDRESS
+    PR_SMTP_ADDRESS = "http://schemas.microsoft.com/mapi/proptag/0x39FE001F"
+    
     # Triage category constants
     TRIAGE_CATEGORY_PREFIX = "effi:"
     TRIAGE_CATEGORIES = {
@@ -35,6 +81,9 @@ class BaseOutlookClient:
         "archived": "effi:archived",
     }
     
+    # DASL property holding an item's categories (multi-valued)
+    KEYWORDS_PROP = "urn:schemas-microsoft-com:office:office#Keywords"
+    
     # DMS constants
     DMS_STORE_NAME = "DMSforLegal"
     DMS_ROOT_FOLDER = "_My Matters"
@@ -44,48 +93,112 @@ class BaseOutlookClient:
     # DASL property for custom RecipientDomain field
     RECIPIENT_DOMAIN_PROP = "http://schemas.microsoft.com/mapi/string/{00020329-0000-0000-C000-000000000046}/RecipientDomain"
     
-    def __init__(self):
-        self._outlook = None
-        self._namespace = None
+    # Optional ReadWorkerPool for parallel folder scans (None = sequential)
+    read_pool = None
+    
+    # SMTP resolution cache shared by all clients (None disables caching)
+    address_cache = shared_address_cache
+    
+    # Optional QueryCache serving repeated searches (None = always query)
+    query_cache = None
+    
+    def __init__(self, connection: Optional[OutlookConnection] = None):
+        self._connection = connection or shared_connection
+        self._outlook_override = None
+        self._namespace_override = None
+    
+    # _outlook/_namespace come from the shared connection broker. Assigning
+    # them pins this client to a specific object (used by tests and scripts).
+    
+    @property
+    def _outlook(self):
+        if self._outlook_override is not None:
+            return self._outlook_override
+        return self._connection.outlook
+    
+    @_outlook.setter
+    def _outlook(self, value):
+        self._outlook_override = value
+    
+    @property
+    def _namespace(self):
+        if self._namespace_override is not None:
+            return self._namespace_override
+        return self._connection.namespace
+    
+    @_namespace.setter
+    def _namespace(self, value):
+        self._namespace_override = value
     
     def _reset_connection(self):
         """Reset COM connection (call when Outlook restarts)."""
-        self._outlook = None
-        self._namespace = None
+        self._outlook_override = None
+        self._namespace_override = None
+        self._connection.reset()
     
     def _ensure_connection(self):
-        """Ensure COM connection is established. Auto-reconnects if stale."""
-        if self._outlook is None:
-            pythoncom.CoInitialize()
-            self._outlook = win32com.client.Dispatch("Outlook.Application")
-            self._namespace = self._outlook.GetNamespace("MAPI")
-        else:
-            try:
-                _ = self._namespace.CurrentUser
-            except Exception:
-                self._reset_connection()
-                pythoncom.CoInitialize()
-                self._outlook = win32com.client.Dispatch("Outlook.Application")
-                self._namespace = self._outlook.GetNamespace("MAPI")
+        """Ensure COM connection is established.
+        
+        Liveness is probed by the shared broker at most once per TTL;
+        RPC disconnects on namespace calls reconnect and retry.
+        """
+        if self._namespace_override is not None:
+            return
+        self._connection.ensure()
     
     # =========================================================================
     # Email Address Extraction
     # =========================================================================
     
+    def _address_key(self, entry) -> Optional[str]:
+        """Return the address cache key for an AddressEntry or Recipient.
+        
+        Uses the address (legacy DN for Exchange entries), falling back to
+        the AddressEntry ID. Returns None if neither is available.
+        """
+        for attr in ("Address", "ID"):
+            try:
+                value = getattr(entry, attr)
+            except:
+                continue
+            if isinstance(value, str) and value:
+                return value.lower() if attr == "Address" else value
+        return None
+    
+    def _cached_smtp(self, key: Optional[str], resolve) -> Optional[str]:
+        """Look up an SMTP address in the shared cache, resolving on a miss.
+        
+        Only SMTP addresses (containing "@") are cached, so a failed lookup
+        is retried next time instead of pinning a fallback value.
+        """
+        cache = self.address_cache
+        if key is None or cache is None:
+            return resolve()
+        smtp = cache.get(key)
+        if smtp is None:
+            smtp = resolve()
+            if smtp and "@" in smtp:
+                cache.put(key, smtp)
+        return smtp
+    
     def _get_recipient_email(self, recipient) -> Optional[str]:
         """Extract SMTP email from a recipient (To, CC, or BCC)."""
         try:
-            if recipient.AddressEntry:
-                if recipient.AddressEntry.AddressEntryUserType == 0:
-                    exch_user = recipient.AddressEntry.GetExchangeUser()
-                    if exch_user:
-                        return exch_user.PrimarySmtpAddress
-                try:
-                    return recipient.PropertyAccessor.GetProperty(
-                        "http://schemas.microsoft.com/mapi/proptag/0x39FE001F"
-                    )
-                except:
-                    return recipient.Address
+            entry = recipient.AddressEntry
+            if entry:
+                def resolve():
+                    if entry.AddressEntryUserType == 0:
+                        exch_user = entry.GetExchangeUser()
+                        if exch_user:
+                            return exch_user.PrimarySmtpAddress
+                    try:
+                        return recipient.PropertyAccessor.GetProperty(self.PR_SMTP_ADDRESS)
+                    except:
+                        return None
+                smtp = self._cached_smtp(self._address_key(recipient), resolve)
+                # Recipient.Address is a legacy DN for Exchange entries, so
+                # it is only a fallback and never cached
+                return smtp or recipient.Address
         except:
             pass
         return None
@@ -95,16 +208,18 @@ class BaseOutlookClient:
         try:
             sender = message.Sender
             if sender is not None:
-                if sender.AddressEntryUserType == 0:
-                    exch_user = sender.GetExchangeUser()
-                    if exch_user:
-                        return exch_user.PrimarySmtpAddress
-                try:
-                    return message.PropertyAccessor.GetProperty(
-                        "http://schemas.microsoft.com/mapi/proptag/0x39FE001F"
-                    )
-                except:
-                    pass
+                def resolve():
+                    if sender.AddressEntryUserType == 0:
+                        exch_user = sender.GetExchangeUser()
+                        if exch_user:
+                            return exch_user.PrimarySmtpAddress
+                    try:
+                        return message.PropertyAccessor.GetProperty(self.PR_SMTP_ADDRESS)
+                    except:
+                        return None
+                smtp = self._cached_smtp(self._address_key(sender), resolve)
+                if smtp:
+                    return smtp
             return message.SenderEmailAddress
         except:
             return message.SenderEmailAddress or ""
@@ -132,29 +247,36 @@ class BaseOutlookClient:
                     domains.add(domain)
         return ",".join(sorted(domains))
     
-    def _extract_recipients(self, message, recipient_type: str) -> List[str]:
-        """Extract recipient email addresses from a message."""
-        recipients = []
+    def _extract_recipient_lists(self, message) -> Dict[str, List[str]]:
+        """Extract To, CC and BCC addresses in one pass over the recipients.
+        
+        SMTP addresses come from the shared address cache, keyed on the
+        recipient's address; the PropertyAccessor is only used on a miss.
+        """
+        lists = {"To": [], "CC": [], "BCC": []}
+        type_names = {1: "To", 2: "CC", 3: "BCC"}
         try:
             recipient_collection = message.Recipients
-            type_map = {"To": 1, "CC": 2, "BCC": 3}
-            target_type = type_map.get(recipient_type, 1)
-            
             for i in range(1, recipient_collection.Count + 1):
                 recipient = recipient_collection.Item(i)
-                if recipient.Type == target_type:
-                    try:
-                        smtp_address = recipient.PropertyAccessor.GetProperty(
-                            "http://schemas.microsoft.com/mapi/proptag/0x39FE001F"
-                        )
-                        recipients.append(smtp_address.lower())
-                    except:
-                        addr = recipient.Address
-                        if addr and "@" in addr:
-                            recipients.append(addr.lower())
+                type_name = type_names.get((recipient.Type or 0) & 0xF)
+                if type_name is None:
+                    continue
+                key = self._address_key(recipient)
+                smtp_address = self._cached_smtp(
+                    key, lambda: get_properties(recipient, "recipient")["smtp_address"]
+                )
+                if not smtp_address:
+                    smtp_address = key if key and "@" in key else None
+                if smtp_address:
+                    lists[type_name].append(smtp_address.lower())
         except:
             pass
-        return recipients
+        return lists
+    
+    def _extract_recipients(self, message, recipient_type: str) -> List[str]:
+        """Extract recipient email addresses from a message."""
+        return self._extract_recipient_lists(message).get(recipient_type, [])
     
     def _get_primary_recipient_domain(self, message) -> str:
         """Extract domain from primary recipient of a sent message."""
@@ -163,8 +285,9 @@ class BaseOutlookClient:
             if recipients.Count > 0:
                 recipient = recipients.Item(1)
                 try:
-                    smtp_address = recipient.PropertyAccessor.GetProperty(
-                        "http://schemas.microsoft.com/mapi/proptag/0x39FE001F"
+                    smtp_address = self._cached_smtp(
+                        self._address_key(recipient),
+                        lambda: recipient.PropertyAccessor.GetProperty(self.PR_SMTP_ADDRESS),
                     )
                     return self._extract_domain(smtp_address)
                 except:
@@ -178,74 +301,62 @@ class BaseOutlookClient:
     # =========================================================================
     
     def _message_to_email(self, message, folder_path: str = "Inbox", direction: str = "inbound", 
-                           recipient_domain: str = None) -> Optional[Email]:
-        """Convert Outlook message to Email object."""
+                           recipient_domain: str = None,
+                           previews: Optional[Dict[str, str]] = None,
+                           lazy_body: bool = False) -> Optional[Email]:
+        """Convert Outlook message to Email object.
+        
+        Args:
+            previews: Body previews by EntryID from _read_body_previews()
+                or _stream_body_previews(). Messages not in it fall back
+                to reading Body.
+            lazy_body: Defer that fallback until body_preview is read
+                (re-opening the message by EntryID)
+        """
         try:
+            entry_id = message.EntryID
             sender_email = self._get_sender_email(message)
             received = message.ReceivedTime
             if hasattr(received, 'replace'):
                 received = received.replace(tzinfo=None)
             
-            # Get attachments - filter out inline images
-            attachments = []
-            has_attachments = message.Attachments.Count > 0
-            if has_attachments:
-                for i in range(1, message.Attachments.Count + 1):
-                    try:
-                        att = message.Attachments.Item(i)
-                        filename = att.FileName
-                        lower_name = filename.lower()
-                        
-                        doc_extensions = ('.docx', '.doc', '.pdf', '.xlsx', '.xls', 
-                                         '.pptx', '.ppt', '.zip', '.rar', '.csv', '.txt')
-                        is_document = lower_name.endswith(doc_extensions)
-                        
-                        if is_document:
-                            attachments.append(filename)
-                        else:
-                            is_image = lower_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))
-                            if is_image:
-                                try:
-                                    content_id = att.PropertyAccessor.GetProperty(
-                                        "http://schemas.microsoft.com/mapi/proptag/0x3712001F"
-                                    )
-                                    has_content_id = bool(content_id)
-                                except:
-                                    has_content_id = False
-                                is_inline = has_content_id or lower_name.startswith('image')
-                                if is_inline:
-                                    continue
-                            attachments.append(filename)
-                    except:
-                        pass
-            
-            attachments = attachments[:20]
+            # PR_HASATTACH is read with the other message properties; the
+            # attachment list itself is only enumerated if a caller reads
+            # Email.attachment_names.
+            message_props = get_properties(message, "message")
+            has_attachments = message_props["has_attachments"]
+            if not isinstance(has_attachments, bool):
+                has_attachments = message.Attachments.Count > 0
             
-            body_preview = ""
-            try:
-                body = message.Body or ""
-                body_preview = body[:500].replace("\r\n", " ").strip()
-            except:
-                pass
+            if previews is not None and entry_id in previews:
+                body_preview = previews[entry_id]
+            elif lazy_body:
+                body_preview = None
+            else:
+                body_preview = ""
+                try:
+                    body_preview = self._format_preview(message.Body or "")
+                except:
+                    pass
             
             domain = recipient_domain if recipient_domain else self._extract_domain(sender_email)
             triage_status = TriageStatus.PROCESSED if direction == "outbound" else TriageStatus.PENDING
             
-            recipients_to = self._extract_recipients(message, "To")
-            recipients_cc = self._extract_recipients(message, "CC")
+            recipient_lists = self._extract_recipient_lists(message)
+            recipients_to = recipient_lists["To"]
+            recipients_cc = recipient_lists["CC"]
             recipient_domains = self._compute_recipient_domains(recipients_to, recipients_cc)
-            internet_message_id = self._get_internet_message_id(message)
+            internet_message_id = message_props["internet_message_id"]
             
-            return Email(
-                id=message.EntryID,
+            email = Email(
+                id=entry_id,
                 subject=message.Subject or "(No Subject)",
                 sender_name=message.SenderName or "",
                 sender_email=sender_email,
                 domain=domain,
                 received_time=received,
-                body_preview=body_preview,
+                body_preview=body_preview or "",
                 has_attachments=has_attachments,
-                attachment_names=attachments,
                 categories=message.Categories or "",
                 conversation_id=getattr(message, 'ConversationID', None),
                 folder_path=folder_path,
@@ -256,9 +367,215 @@ class BaseOutlookClient:
                 internet_message_id=internet_message_id,
                 triage_status=triage_status,
             )
+            if body_preview is None:
+                email.defer_body_preview(partial(self._load_body_preview, entry_id))
+            if has_attachments:
+                email.defer_attachment_names(partial(self._load_attachment_names, entry_id))
+            return email
         except Exception as e:
             return None
     
+    def _page_after_cursor(self, messages, received_before: datetime = None,
+                           skip_ids: Collection[str] = ()) -> Iterator[Any]:
+        """Yield messages positioned after a pagination cursor.
+        
+        Messages must be sorted newest first. Jet/DASL dates only have
+        minute precision, so the collection may start slightly above the
+        cursor: messages newer than received_before, or at exactly that
+        time and already returned (skip_ids), are skipped. Checking stops
+        at the first older message.
+        
+        Args:
+            messages: Restricted, newest-first Items collection
+            received_before: ReceivedTime of the last message already returned
+            skip_ids: EntryIDs already returned at received_before
+        """
+        iterator = iter(messages)
+        if received_before is not None:
+            for message in iterator:
+                try:
+                    received = message.ReceivedTime
+                    if hasattr(received, 'replace'):
+                        received = received.replace(tzinfo=None)
+                    if received > received_before:
+                        continue
+                    if received == received_before and message.EntryID in skip_ids:
+                        continue
+                except:
+                    continue
+                yield message
+                if received < received_before:
+                    break
+        yield from iterator
+    
+    def _has_triage_category(self, categories: str) -> bool:
+        """Return True if a Categories string contains any effi: category."""
+        return any(cat.strip().startswith(self.TRIAGE_CATEGORY_PREFIX)
+                   for cat in (categories or "").split(",") if cat.strip())
+    
+    def _pending_query(self, date_from: datetime, sender_domain: str = None) -> str:
+        """Build a DASL query for untriaged inbound mail.
+        
+        The "no effi: category" test runs in the store against the Keywords
+        property, combined with the date (and optional sender domain)
+        predicates, so triaged messages are never returned to Python.
+        """
+        date_str = date_from.strftime("%d/%m/%Y %H:%M")
+        conditions = [
+            f"\"urn:schemas:httpmail:datereceived\" >= '{date_str}'",
+            f"(\"{self.KEYWORDS_PROP}\" IS NULL"
+            f" OR NOT (\"{self.KEYWORDS_PROP}\" LIKE '{self.TRIAGE_CATEGORY_PREFIX}%'))",
+        ]
+        if sender_domain:
+            conditions.append(f"\"urn:schemas:httpmail:fromemail\" LIKE '%@{sender_domain}'")
+        return "@SQL=" + " AND ".join(conditions)
+    
+    def _restrict_pending(self, folder, messages, date_from: datetime, sender_domain: str = None,
+                          max_rows: Optional[int] = None, with_previews: bool = True):
+        """Restrict sorted Inbox items to untriaged mail using _pending_query.
+        
+        If the store rejects the combined query, falls back to the old Jet
+        date filter (chained with the DASL domain filter); callers still
+        check categories per message.
+        
+        Returns:
+            Tuple of (restricted items, body previews or None)
+        """
+        pending_query = self._pending_query(date_from, sender_domain)
+        try:
+            filtered = messages.Restrict(pending_query)
+            filter_str = pending_query
+        except Exception:
+            # Triaged messages may still appear; rows past max_rows may be needed
+            max_rows = None
+            filter_str = f"[ReceivedTime] >= '{date_from.strftime('%d/%m/%Y %H:%M')}'"
+            try:
+                filtered = messages.Restrict(filter_str)
+                if sender_domain:
+                    filtered = filtered.Restrict(
+                        f"@SQL=\"urn:schemas:httpmail:fromemail\" LIKE '%@{sender_domain}'"
+                    )
+            except Exception:
+                return messages, None
+        
+        if not with_previews:
+            previews = None
+        elif max_rows is None:
+            previews = self._stream_body_previews(folder, filter_str)
+        else:
+            previews = self._read_body_previews(folder, filter_str, max_rows=max_rows)
+        return filtered, previews
+    
+    def _format_preview(self, body: str) -> str:
+        """Cut a body down to a single-line preview."""
+        return body[:self.PREVIEW_LENGTH].replace("\r\n", " ").strip()
+    
+    def _open_preview_table(self, folder, filter_str: Optional[str] = None):
+        """Open a folder Table with EntryID and PR_BODY columns, newest first."""
+        table = folder.GetTable(filter_str) if filter_str else folder.GetTable()
+        columns = table.Columns
+        columns.RemoveAll()
+        columns.Add("EntryID")
+        columns.Add(PR_BODY)
+        table.Sort("[ReceivedTime]", True)
+        return table
+    
+    def _read_preview_row(self, table):
+        """Read the next (EntryID, preview) pair from a preview table."""
+        entry_id, body = table.GetNextRow().GetValues()
+        if is_property_error(PR_BODY, body) or not isinstance(body, str):
+            body = ""
+        return entry_id, self._format_preview(body)
+    
+    def _read_body_previews(self, folder, filter_str: Optional[str] = None,
+                            max_rows: Optional[int] = None) -> Optional[Dict[str, str]]:
+        """Read body previews for a folder in one Table pass.
+        
+        The PR_BODY column of a Table is truncated by the store (255
+        characters on Exchange), so full bodies are never loaded.
+        
+        Args:
+            folder: Outlook folder
+            filter_str: Same Jet/DASL filter used to restrict the Items
+            max_rows: Stop after this many rows (newest first)
+            
+        Returns:
+            Dict of EntryID -> preview, or None if the table can't be read
+            (callers then fall back to reading Body per message)
+        """
+        try:
+            table = self._open_preview_table(folder, filter_str)
+            previews = {}
+            while table.EndOfTable is False:
+                if max_rows is not None and len(previews) >= max_rows:
+                    break
+                entry_id, preview = self._read_preview_row(table)
+                previews[entry_id] = preview
+            return previews
+        except Exception:
+            return None
+    
+    def _stream_body_previews(self, folder, filter_str: Optional[str] = None) -> Optional["StreamedPreviews"]:
+        """Body previews for scans with no row limit, read as they are used.
+        
+        Like _read_body_previews, but rows are only read up to the last
+        EntryID looked up, so a consumer that stops early never reads
+        PR_BODY for the rest of the window.
+        
+        Returns:
+            StreamedPreviews, or None if the table can't be opened
+        """
+        try:
+            return StreamedPreviews(self._open_preview_table(folder, filter_str), self._read_preview_row)
+        except Exception:
+            return None
+    
+    def _read_attachment_names(self, message) -> List[str]:
+        """List document and non-inline attachment names (max 20)."""
+        attachments = []
+        attachment_collection = message.Attachments
+        for i in range(1, attachment_collection.Count + 1):
+            try:
+                att = attachment_collection.Item(i)
+                filename = att.FileName
+                lower_name = filename.lower()
+                
+                doc_extensions = ('.docx', '.doc', '.pdf', '.xlsx', '.xls', 
+                                 '.pptx', '.ppt', '.zip', '.rar', '.csv', '.txt')
+                is_document = lower_name.endswith(doc_extensions)
+                
+                if is_document:
+                    attachments.append(filename)
+                else:
+                    is_image = lower_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))
+                    if is_image:
+                        try:
+                            content_id = att.PropertyAccessor.GetProperty(
+                                "http://schemas.microsoft.com/mapi/proptag/0x3712001F"
+                            )
+                            has_content_id = bool(content_id)
+                        except:
+                            has_content_id = False
+                        is_inline = has_content_id or lower_name.startswith('image')
+                        if is_inline:
+                            continue
+                    attachments.append(filename)
+            except:
+                pass
+        return attachments[:20]
+    
+    def _load_body_preview(self, email_id: str) -> str:
+        """Re-open a message by EntryID and cut its body to a preview."""
+        self._ensure_connection()
+        message = self._namespace.GetItemFromID(email_id)
+        return self._format_preview(message.Body or "")
+    
+    def _load_attachment_names(self, email_id: str) -> List[str]:
+        """Re-open a message by EntryID and list its attachment names."""
+        self._ensure_connection()
+        message = self._namespace.GetItemFromID(email_id)
+        return self._read_attachment_names(message)
+    
     # =========================================================================
     # Category Operations
     # =========================================================================
@@ -273,6 +590,32 @@ class BaseOutlookClient:
             if category not in existing:
                 message.Categories = f"{existing}, {category}".strip(", ")
             message.Save()
+            self._invalidate_queries()
             return True
         except:
             return False
+    
+    def _invalidate_queries(self, *tags: str):
+        """Drop cached query results for folders this client just changed.
+        
+        Without tags, the folders triage categories live in (Inbox and
+        Sent Items) are invalidated.
+        """
+        if self.query_cache is not None:
+            self.query_cache.invalidate(*(tags or DEFAULT_FOLDER_TAGS))
+    
+    def _invalidate_moves(self, target_folder=None):
+        """Drop cached query results after messages moved into target_folder.
+        
+        The source is taken to be Inbox or Sent Items, where triage and
+        filing start from.
+        """
+        if self.query_cache is None:
+            return
+        tags = list(DEFAULT_FOLDER_TAGS)
+        if target_folder is not None:
+            try:
+                tags.append(folder_tag(target_folder.FolderPath))
+            except Exception:
+                pass
+        self.query_cache.invalidate(*tags)
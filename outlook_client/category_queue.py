@@ -0,0 +1,428 @@
+"""Coalescing write-behind queue for Outlook category updates.
+
+Every triage or "scanned" update used to open the item with
+GetItemFromID, rewrite Categories and Save() synchronously, once per
+call. CategoryWriteQueue accepts changes immediately and applies them
+later in batches on the COM thread:
+
+- changes to the same EntryID are coalesced before they are applied (the
+  latest triage status wins, added categories accumulate), so rapid
+  re-triage of a message costs one Save;
+- each submit() returns a CategoryWriteHandle whose status() reports
+  per-item results as the batches complete;
+- pending changes are appended to a JSONL journal and marked done once
+  applied, so a crash between accepting and applying a change replays
+  it on the next start instead of losing it.
+
+Flushes take their batch inside the job that runs on the COM thread, so
+a synchronous write made by another COM-thread tool can never be
+overtaken by an older queued change for the same message.
+"""
+
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def merge_change(old: Optional[Dict[str, Any]], new: Dict[str, Any]) -> Dict[str, Any]:
+    """Coalesce two category changes for the same message.
+
+    A change has an optional 'triage' key (status to set, '' to clear) and
+    an optional 'add' list of categories. The newer triage value replaces
+    the older one; added categories are unioned in order.
+    """
+    merged = dict(old or {})
+    if new.get("triage") is not None:
+        merged["triage"] = new["triage"]
+    added = list(merged.get("add", []))
+    for category in new.get("add", []):
+        if category not in added:
+            added.append(category)
+    if added:
+        merged["add"] = added
+    return merged
+
+
+class CategoryWriteHandle:
+    """Pollable status of one submit() to a CategoryWriteQueue.
+
+    Args:
+        handle_id: Identifier returned to callers
+        email_ids: EntryIDs covered by the submission
+    """
+
+    def __init__(self, handle_id: str, email_ids: Iterable[str]):
+        self.id = handle_id
+        self.email_ids = list(dict.fromkeys(email_ids))
+        self.created = datetime.now()
+        self.completed: Optional[datetime] = None
+        # entry_id -> None (applied) or error message
+        self.results: Dict[str, Optional[str]] = {}
+        self._done = threading.Event()
+        if not self.email_ids:
+            self._finish()
+
+    def _record(self, email_id: str, error: Optional[str]):
+        if email_id in self.results or email_id not in self.email_ids:
+            return
+        self.results[email_id] = error
+        if len(self.results) == len(self.email_ids):
+            self._finish()
+
+    def _finish(self):
+        self.completed = datetime.now()
+        self._done.set()
+
+    @property
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until every item has a result.
+
+        Do not call from the COM thread: the queue could never flush.
+
+        Returns:
+            True if the submission completed within timeout
+        """
+        return self._done.wait(timeout)
+
+    def status(self) -> Dict[str, Any]:
+        """Return progress and per-item failures."""
+        results = dict(self.results)
+        failed = {email_id: error for email_id, error in results.items() if error is not None}
+        return {
+            "handle": self.id,
+            "total": len(self.email_ids),
+            "applied": len(results) - len(failed),
+            "failed": len(failed),
+            "pending": len(self.email_ids) - len(results),
+            "complete": self.done,
+            "failed_ids": list(failed),
+            "errors": failed,
+            "created": self.created.strftime(DATE_FORMAT),
+            "completed": self.completed.strftime(DATE_FORMAT) if self.completed else None,
+        }
+
+
+class CategoryWriteQueue:
+    """Write-behind queue that coalesces category changes per EntryID.
+
+    Args:
+        apply: Callable taking {entry_id: change} and returning
+            {entry_id: None or error message}
+            (e.g. ``TriageClient.apply_category_changes``)
+        journal_path: Optional JSONL file that makes pending changes durable
+        batch_size: Maximum messages applied per COM job
+        flush_delay: Seconds to wait after a submit so further changes to the
+            same messages can coalesce
+        max_handles: Completed handles kept for status polling
+    """
+
+    def __init__(
+        self,
+        apply: Callable[[Dict[str, Dict[str, Any]]], Dict[str, Optional[str]]],
+        journal_path: Optional[Union[str, Path]] = None,
+        batch_size: int = 100,
+        flush_delay: float = 0.2,
+        max_handles: int = 100,
+    ):
+        self.apply = apply
+        self.journal_path = Path(journal_path) if journal_path else None
+        self.batch_size = batch_size
+        self.flush_delay = flush_delay
+        self.max_handles = max_handles
+        # entry_id -> coalesced change, in first-submitted order
+        self._pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        # entry_id -> change taken by flush_batch but not yet marked done
+        self._in_flight: Dict[str, Dict[str, Any]] = {}
+        # entry_id -> handles waiting on that message
+        self._waiters: Dict[str, List[CategoryWriteHandle]] = {}
+        self._handles: "OrderedDict[str, CategoryWriteHandle]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._journal_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.submitted = 0
+        self.coalesced = 0
+        self.applied = 0
+        self.failed = 0
+        self.batches = 0
+        self.replayed = 0
+        self.last_error: Optional[str] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # ------------------------------------------------------------------
+    # Submitting
+    # ------------------------------------------------------------------
+
+    def submit(self, changes: Dict[str, Dict[str, Any]]) -> CategoryWriteHandle:
+        """Queue changes and return a handle immediately.
+
+        Args:
+            changes: EntryID -> change ('triage' and/or 'add')
+
+        Returns:
+            Handle reporting per-item results as batches are applied
+        """
+        handle = CategoryWriteHandle(uuid.uuid4().hex[:12], changes)
+        with self._lock:
+            # Journal under the lock so compact() cannot drop the records
+            self._journal([{"op": "enqueue", "id": email_id, "change": change}
+                           for email_id, change in changes.items()])
+            self._register(handle)
+            for email_id, change in changes.items():
+                if email_id in self._pending:
+                    self.coalesced += 1
+                self._pending[email_id] = merge_change(self._pending.get(email_id), change)
+                self._waiters.setdefault(email_id, []).append(handle)
+            self.submitted += len(changes)
+        self._wake.set()
+        return handle
+
+    def submit_triage(self, email_ids: Iterable[str], status: str) -> CategoryWriteHandle:
+        """Queue a triage status ('' to clear) for each email."""
+        return self.submit({email_id: {"triage": status} for email_id in email_ids})
+
+    def submit_categories(self, email_ids: Iterable[str], *categories: str) -> CategoryWriteHandle:
+        """Queue adding categories to each email."""
+        return self.submit({email_id: {"add": list(categories)} for email_id in email_ids})
+
+    def _register(self, handle: CategoryWriteHandle):
+        self._handles[handle.id] = handle
+        while len(self._handles) > self.max_handles:
+            oldest_id, oldest = next(iter(self._handles.items()))
+            if not oldest.done:
+                break
+            del self._handles[oldest_id]
+
+    def get_handle(self, handle_id: str) -> Optional[CategoryWriteHandle]:
+        """Look up a recent submission by handle ID."""
+        with self._lock:
+            return self._handles.get(handle_id)
+
+    # ------------------------------------------------------------------
+    # Flushing (on the COM thread)
+    # ------------------------------------------------------------------
+
+    def flush_batch(self, email_ids: Optional[Iterable[str]] = None) -> int:
+        """Apply one batch of pending changes.
+
+        Must run on the COM thread. With email_ids, only pending changes
+        for those messages are applied (used before a synchronous write so
+        older queued changes cannot overwrite it).
+
+        Returns:
+            Number of messages applied in this batch
+        """
+        with self._lock:
+            if email_ids is None:
+                batch_ids = list(self._pending)[:self.batch_size]
+            else:
+                batch_ids = [i for i in dict.fromkeys(email_ids) if i in self._pending]
+            batch = OrderedDict((i, self._pending.pop(i)) for i in batch_ids)
+            waiters = {i: self._waiters.pop(i, []) for i in batch_ids}
+            # Still journaled by compact() until the batch is applied
+            self._in_flight.update(batch)
+        if not batch:
+            return 0
+
+        try:
+            results = self.apply(batch)
+        except Exception as e:
+            logger.warning(f"Category batch failed: {e}")
+            self.last_error = str(e)
+            results = {email_id: str(e) or "Failed to update categories" for email_id in batch}
+
+        with self._lock:
+            self.batches += 1
+            for email_id in batch:
+                self._in_flight.pop(email_id, None)
+                error = results.get(email_id, "No result")
+                if error is None:
+                    self.applied += 1
+                else:
+                    self.failed += 1
+                    self.last_error = error
+                for handle in waiters[email_id]:
+                    handle._record(email_id, error)
+        self._journal([{"op": "done", "ids": list(batch)}])
+        return len(batch)
+
+    def flush(self, email_ids: Optional[Iterable[str]] = None) -> int:
+        """Apply all pending changes (or those for email_ids) in batches.
+
+        Must run on the COM thread.
+
+        Returns:
+            Number of messages applied
+        """
+        if email_ids is not None:
+            return self.flush_batch(list(email_ids))
+        total = 0
+        while True:
+            applied = self.flush_batch()
+            if not applied:
+                self.compact()
+                return total
+            total += applied
+
+    # ------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------
+
+    def _journal(self, records: List[Dict[str, Any]]):
+        if not self.journal_path or not records:
+            return
+        try:
+            with self._journal_lock:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    for record in records:
+                        f.write(json.dumps(record) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+        except OSError as e:
+            logger.warning(f"Could not write category journal {self.journal_path}: {e}")
+
+    def replay(self) -> int:
+        """Re-queue changes that were journaled but never applied.
+
+        Call once at startup, before any submit(). Unreadable lines (e.g.
+        a torn final write) are skipped.
+
+        Returns:
+            Number of messages re-queued
+        """
+        if not self.journal_path or not self.journal_path.exists():
+            return 0
+        pending: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("op") == "enqueue":
+                        pending[record["id"]] = merge_change(pending.get(record["id"]), record["change"])
+                    elif record.get("op") == "done":
+                        for email_id in record.get("ids", []):
+                            pending.pop(email_id, None)
+        except OSError as e:
+            logger.warning(f"Could not read category journal {self.journal_path}: {e}")
+            return 0
+
+        self.compact(pending)
+        if pending:
+            handle = CategoryWriteHandle("replay", pending)
+            with self._lock:
+                self._register(handle)
+                for email_id, change in pending.items():
+                    self._pending[email_id] = merge_change(self._pending.get(email_id), change)
+                    self._waiters.setdefault(email_id, []).append(handle)
+            self._wake.set()
+        self.replayed = len(pending)
+        return self.replayed
+
+    def compact(self, pending: Optional[Dict[str, Dict[str, Any]]] = None):
+        """Rewrite the journal to hold only changes not yet applied.
+
+        Without pending, keeps the queued changes and any batch a
+        concurrent flush_batch() is still applying.
+        """
+        if not self.journal_path:
+            return
+        with self._lock, self._journal_lock:
+            if pending is None:
+                records = list(self._in_flight.items()) + list(self._pending.items())
+            else:
+                records = list(pending.items())
+            if not records and not self.journal_path.exists():
+                return
+            try:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.journal_path.with_suffix(self.journal_path.suffix + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    for email_id, change in records:
+                        f.write(json.dumps({"op": "enqueue", "id": email_id, "change": change}) + "\n")
+                os.replace(tmp_path, self.journal_path)
+            except OSError as e:
+                logger.warning(f"Could not compact category journal {self.journal_path}: {e}")
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def status(self) -> Dict[str, Any]:
+        """Return queue depth and counters for the metrics surface."""
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "in_flight": len(self._in_flight),
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "applied": self.applied,
+                "failed": self.failed,
+                "batches": self.batches,
+                "replayed": self.replayed,
+                "last_error": self.last_error,
+                "running": self._thread is not None and self._thread.is_alive(),
+                "journal_path": str(self.journal_path) if self.journal_path else None,
+            }
+
+    def start(self, run: Optional[Callable[[Callable], Any]] = None):
+        """Start the background flusher thread.
+
+        Args:
+            run: Callable that runs a job on the COM thread and returns its
+                result (e.g. ``ComExecutor.call``). Defaults to calling the
+                job directly on the flusher thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        run = run or (lambda fn: fn())
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(run,), name="effi-category-queue", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        """Stop the flusher thread (pending changes stay journaled)."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _loop(self, run: Callable[[Callable], Any]):
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            # Let further changes to the same messages coalesce
+            if self._stop.wait(self.flush_delay):
+                return
+            try:
+                while self._pending and not self._stop.is_set():
+                    run(self.flush_batch)
+                if not self._pending:
+                    self.compact()
+            except Exception as e:
+                logger.warning(f"Category queue flush failed: {e}")
+                self.last_error = str(e)
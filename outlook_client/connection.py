@@ -0,0 +1,165 @@
+"""Shared Outlook connection broker.
+
+All client instances share one broker instead of each dispatching its own
+``Outlook.Application``. COM objects belong to the thread that created
+them, so the broker keeps one connection per thread: the server's COM
+thread and each read-pool worker get their own, shared by every client
+used on that thread.
+
+Liveness is checked at most once per ``liveness_ttl`` seconds rather than
+on every call. Namespace calls that fail because Outlook went away
+(RPC disconnected / server unavailable) reconnect and retry once.
+"""
+
+import inspect
+import threading
+import time
+from typing import Any, Optional
+
+import pythoncom
+import win32com.client
+
+
+# HRESULTs raised when the Outlook server process has gone away
+RPC_DISCONNECT_HRESULTS = {
+    -2147417848,  # RPC_E_DISCONNECTED (0x80010108)
+    -2147418105,  # RPC_E_SERVER_DIED (0x80010007)
+    -2147418094,  # RPC_E_SERVER_DIED_DNE (0x80010012)
+    -2147023174,  # RPC_S_SERVER_UNAVAILABLE (0x800706BA)
+    -2147023170,  # RPC_S_CALL_FAILED (0x800706BE)
+    -2147220995,  # CO_E_OBJNOTCONNECTED (0x800401FD)
+}
+
+
+def is_disconnect_error(error: BaseException) -> bool:
+    """Return True if a COM error means the Outlook connection is dead."""
+    hresult = getattr(error, "hresult", None)
+    if hresult is None and error.args and isinstance(error.args[0], int):
+        hresult = error.args[0]
+    return hresult in RPC_DISCONNECT_HRESULTS
+
+
+class _NamespaceProxy:
+    """Forwards to the current MAPI namespace, reconnecting on disconnect.
+
+    Only calls made directly on the namespace are retried; objects it
+    returns (folders, items) are real COM objects.
+    """
+
+    def __init__(self, connection: "OutlookConnection"):
+        self._connection = connection
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            attr = getattr(self._connection._raw_namespace(), name)
+        except Exception as e:
+            if not is_disconnect_error(e):
+                raise
+            self._connection.reconnect()
+            attr = getattr(self._connection._raw_namespace(), name)
+
+        if not (inspect.ismethod(attr) or inspect.isfunction(attr)):
+            self._connection.mark_alive()
+            return attr
+
+        def call(*args, **kwargs):
+            try:
+                result = getattr(self._connection._raw_namespace(), name)(*args, **kwargs)
+            except Exception as e:
+                if not is_disconnect_error(e):
+                    raise
+                self._connection.reconnect()
+                result = getattr(self._connection._raw_namespace(), name)(*args, **kwargs)
+            self._connection.mark_alive()
+            return result
+        return call
+
+
+class OutlookConnection:
+    """Per-thread Outlook connection shared by all clients.
+
+    Args:
+        liveness_ttl: Seconds a connection is trusted without a health probe
+    """
+
+    def __init__(self, liveness_ttl: float = 60.0):
+        self.liveness_ttl = liveness_ttl
+        self._local = threading.local()
+        self._proxy = _NamespaceProxy(self)
+        self.connects = 0
+        self.probes = 0
+
+    def _state(self):
+        local = self._local
+        if not hasattr(local, "outlook"):
+            local.outlook = None
+            local.namespace = None
+            local.checked_at = 0.0
+        return local
+
+    def _raw_namespace(self):
+        state = self._state()
+        if state.namespace is None:
+            self._connect(state)
+        return state.namespace
+
+    def _connect(self, state):
+        pythoncom.CoInitialize()
+        state.outlook = win32com.client.Dispatch("Outlook.Application")
+        state.namespace = state.outlook.GetNamespace("MAPI")
+        state.checked_at = time.monotonic()
+        self.connects += 1
+
+    @property
+    def outlook(self):
+        """Outlook.Application for the current thread (None if not connected)."""
+        return self._state().outlook
+
+    @property
+    def namespace(self):
+        """MAPI namespace for the current thread (None if not connected).
+
+        Returns a proxy that reconnects and retries on RPC disconnects.
+        """
+        if self._state().namespace is None:
+            return None
+        return self._proxy
+
+    def is_connected(self) -> bool:
+        """Return True if the current thread has a connection."""
+        return self._state().namespace is not None
+
+    def mark_alive(self):
+        """Record that the connection just answered a call."""
+        self._state().checked_at = time.monotonic()
+
+    def ensure(self):
+        """Connect if needed; probe liveness only once the TTL has expired."""
+        state = self._state()
+        if state.namespace is None:
+            self._connect(state)
+            return
+        if time.monotonic() - state.checked_at < self.liveness_ttl:
+            return
+        self.probes += 1
+        try:
+            _ = state.namespace.CurrentUser
+            state.checked_at = time.monotonic()
+        except Exception:
+            self.reconnect()
+
+    def reset(self):
+        """Drop the current thread's connection (call when Outlook restarts)."""
+        state = self._state()
+        state.outlook = None
+        state.namespace = None
+        state.checked_at = 0.0
+
+    def reconnect(self):
+        """Drop and re-establish the current thread's connection."""
+        self.reset()
+        self._connect(self._state())
+
+
+# Default broker shared by every client that isn't given one explicitly
+shared_connection = OutlookConnection()
@@ -1,9 +1,11 @@
 """DMS client for DMSforLegal operations."""
 
 from datetime import datetime
+from functools import partial
 from typing import List, Dict, Any, Optional
 
 from outlook_client.base import BaseOutlookClient
+from outlook_client.query_cache import DEFAULT_FOLDER_TAGS, dms_tag, dms_tags, memoized_query
 from models import Email
 
 
@@ -77,6 +79,7 @@ class DMSClient(BaseOutlookClient):
         except Exception:
             return []
     
+    @memoized_query(lambda p: (dms_tag(p["client"], p["matter"]),))
     def get_dms_emails(self, client: str, matter: str, limit: int = 50) -> List[Email]:
         """Get emails from a matter's Emails folder in DMS."""
         path = f"{self.DMS_ROOT_FOLDER}\\{client}\\{matter}\\{self.DMS_EMAILS_FOLDER}"
@@ -88,6 +91,7 @@ class DMSClient(BaseOutlookClient):
         try:
             items = folder.Items
             items.Sort("[ReceivedTime]", True)
+            previews = self._read_body_previews(folder, max_rows=limit)
             
             for message in items:
                 if len(results) >= limit:
@@ -96,7 +100,8 @@ class DMSClient(BaseOutlookClient):
                     email = self._message_to_email(
                         message, 
                         folder_path=f"DMS/{client}/{matter}",
-                        direction="filed"
+                        direction="filed",
+                        previews=previews
                     )
                     if email:
                         results.append(email)
@@ -107,6 +112,7 @@ class DMSClient(BaseOutlookClient):
         
         return results
     
+    @memoized_query(lambda p: (dms_tag(p["client"], p["matter"]),))
     def get_dms_admin_emails(self, client: str, matter: str, limit: int = 50) -> List[Email]:
         """Get emails from a matter's Admin folder in DMS."""
         path = f"{self.DMS_ROOT_FOLDER}\\{client}\\{matter}\\{self.DMS_ADMIN_FOLDER}"
@@ -118,6 +124,7 @@ class DMSClient(BaseOutlookClient):
         try:
             items = folder.Items
             items.Sort("[ReceivedTime]", True)
+            previews = self._read_body_previews(folder, max_rows=limit)
             
             for message in items:
                 if len(results) >= limit:
@@ -126,6 +133,58 @@ class DMSClient(BaseOutlookClient):
                     email = self._message_to_email(
                         message, 
                         folder_path=f"DMS/{client}/{matter}/Admin",
+                        direction="filed",
+                        previews=previews
+                    )
+                    if email:
+                        results.append(email)
+                except Exception:
+                    continue
+        except Exception:
+            pass
+        
+        return results
+    
+    def _scan_dms_matter(
+        self,
+        client: str,
+        matter: str,
+        subject_contains: str = None,
+        date_from: datetime = None,
+        date_to: datetime = None,
+        limit: int = 50,
+    ) -> List[Email]:
+        """Collect up to limit emails from one matter's Emails folder."""
+        path = f"{self.DMS_ROOT_FOLDER}\\{client}\\{matter}\\{self.DMS_EMAILS_FOLDER}"
+        folder = self._get_folder_by_path(path)
+        if not folder:
+            return []
+        
+        results = []
+        try:
+            items = folder.Items
+            items.Sort("[ReceivedTime]", True)
+            
+            if date_from:
+                date_str = date_from.strftime("%d/%m/%Y %H:%M")
+                items = items.Restrict(f"[ReceivedTime] >= '{date_str}'")
+            if date_to:
+                date_str = date_to.strftime("%d/%m/%Y %H:%M")
+                items = items.Restrict(f"[ReceivedTime] <= '{date_str}'")
+            
+            for message in items:
+                if len(results) >= limit:
+                    break
+                
+                try:
+                    if subject_contains:
+                        subject = message.Subject or ""
+                        if subject_contains.lower() not in subject.lower():
+                            continue
+                    
+                    email = self._message_to_email(
+                        message,
+                        folder_path=f"DMS/{client}/{matter}",
                         direction="filed"
                     )
                     if email:
@@ -137,6 +196,7 @@ class DMSClient(BaseOutlookClient):
         
         return results
     
+    @memoized_query(lambda p: (dms_tag(p["client"], p["matter"]),))
     def search_dms_emails(
         self,
         client: str = None,
@@ -146,7 +206,11 @@ class DMSClient(BaseOutlookClient):
         date_to: datetime = None,
         limit: int = 50,
     ) -> List[Email]:
-        """Search emails across DMS with optional filters."""
+        """Search emails across DMS with optional filters.
+        
+        With a read_pool configured, matters are scanned concurrently and
+        merged newest-first by ReceivedTime.
+        """
         results = []
         
         if client:
@@ -154,6 +218,18 @@ class DMSClient(BaseOutlookClient):
         else:
             clients_to_search = self.list_dms_clients()
         
+        if self.read_pool is not None:
+            client_cls = type(self)
+            scans = []
+            for c in clients_to_search:
+                matters_to_search = [matter] if matter and client else self.list_dms_matters(c)
+                scans.extend(
+                    partial(client_cls._scan_dms_matter, client=c, matter=m, subject_contains=subject_contains,
+                            date_from=date_from, date_to=date_to, limit=limit)
+                    for m in matters_to_search
+                )
+            return self.read_pool.scan_merged(client_cls, scans, limit=limit)
+        
         for c in clients_to_search:
             if len(results) >= limit:
                 break
@@ -167,43 +243,13 @@ class DMSClient(BaseOutlookClient):
                 if len(results) >= limit:
                     break
                 
-                path = f"{self.DMS_ROOT_FOLDER}\\{c}\\{m}\\{self.DMS_EMAILS_FOLDER}"
-                folder = self._get_folder_by_path(path)
-                if not folder:
-                    continue
-                
-                try:
-                    items = folder.Items
-                    items.Sort("[ReceivedTime]", True)
-                    
-                    if date_from:
-                        date_str = date_from.strftime("%d/%m/%Y %H:%M")
-                        items = items.Restrict(f"[ReceivedTime] >= '{date_str}'")
-                    if date_to:
-                        date_str = date_to.strftime("%d/%m/%Y %H:%M")
-                        items = items.Restrict(f"[ReceivedTime] <= '{date_str}'")
-                    
-                    for message in items:
-                        if len(results) >= limit:
-                            break
-                        
-                        try:
-                            if subject_contains:
-                                subject = message.Subject or ""
-                                if subject_contains.lower() not in subject.lower():
-                                    continue
-                            
-                            email = self._message_to_email(
-                                message,
-                                folder_path=f"DMS/{c}/{m}",
-                                direction="filed"
-                            )
-                            if email:
-                                results.append(email)
-                        except Exception:
-                            continue
-                except Exception:
-                    continue
+                results.extend(self._scan_dms_matter(
+                    c, m,
+                    subject_contains=subject_contains,
+                    date_from=date_from,
+                    date_to=date_to,
+                    limit=limit - len(results),
+                ))
         
         return results
     
@@ -280,6 +326,7 @@ class DMSClient(BaseOutlookClient):
             filed_entry_id = filed_message.EntryID
         except Exception as e:
             return {"success": False, "error": f"Failed to copy email to DMS: {str(e)}"}
+        self._invalidate_queries(*DEFAULT_FOLDER_TAGS, *dms_tags(client_name, matter_name))
         
         try:
             existing_categories = message.Categories or ""
@@ -361,6 +408,7 @@ class DMSClient(BaseOutlookClient):
             filed_entry_id = filed_message.EntryID
         except Exception as e:
             return {"success": False, "error": f"Failed to copy email to DMS Admin: {str(e)}"}
+        self._invalidate_queries(*DEFAULT_FOLDER_TAGS, *dms_tags(client_name, matter_name))
         
         try:
             existing_categories = message.Categories or ""
@@ -474,6 +522,9 @@ class DMSClient(BaseOutlookClient):
                     "error": str(e)
                 })
         
+        if filed_emails:
+            self._invalidate_queries(*DEFAULT_FOLDER_TAGS, *dms_tags(client_name, matter_name))
+        
         return {
             "success": True,
             "filed_count": len(filed_emails),
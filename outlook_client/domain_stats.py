@@ -0,0 +1,268 @@
+"""Materialized per-domain Inbox statistics.
+
+``get_domain_counts`` resolves the sender SMTP address of every message in
+the window on every call. DomainStatsStore instead keeps a persistent
+aggregate of the Inbox, bucketed per sender domain and per received day,
+so any date window can be answered without touching Outlook.
+
+The store is kept current by ``RetrievalClient.refresh_domain_stats``,
+which only reads messages modified since the watermark (new mail and
+category changes). Each message's contribution (domain, day, pending) is
+remembered so a changed message moves between buckets instead of being
+counted twice; known messages never need their sender resolved again.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+DAY_FORMAT = "%Y-%m-%d"
+
+
+class DomainStatsStore:
+    """Thread-safe per-domain, per-day aggregate of Inbox messages.
+
+    Args:
+        path: Optional JSON file used by load()/save() for persistence
+        sample_size: Sample subjects kept per domain
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, sample_size: int = 3):
+        self.path = Path(path) if path else None
+        self.sample_size = sample_size
+        self.watermark: Optional[datetime] = None
+        self.last_refresh: Optional[datetime] = None
+        self.last_full_scan: Optional[datetime] = None
+        # entry_id -> [domain, received, pending]
+        self._messages: Dict[str, list] = {}
+        # domain -> day -> [count, pending, latest received]
+        self._buckets: Dict[str, Dict[str, list]] = {}
+        # domain -> [[received, subject], ...] newest first
+        self._samples: Dict[str, List[list]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __contains__(self, entry_id: str) -> bool:
+        return entry_id in self._messages
+
+    def domain_of(self, entry_id: str) -> Optional[str]:
+        """Return the recorded sender domain of a message, if known."""
+        record = self._messages.get(entry_id)
+        return record[0] if record else None
+
+    def entry_ids(self) -> List[str]:
+        """EntryIDs of every message in the store."""
+        with self._lock:
+            return list(self._messages)
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def _bucket_add(self, domain: str, received: str, pending: bool, sign: int):
+        day = received[:10]
+        days = self._buckets.setdefault(domain, {})
+        bucket = days.setdefault(day, [0, 0, received])
+        bucket[0] += sign
+        bucket[1] += sign if pending else 0
+        if sign > 0 and received > bucket[2]:
+            bucket[2] = received
+        if bucket[0] <= 0:
+            del days[day]
+            if not days:
+                del self._buckets[domain]
+                self._samples.pop(domain, None)
+
+    def upsert(self, entry_id: str, domain: str, received: datetime, subject: str, pending: bool):
+        """Record a new or changed message, moving it between buckets if needed."""
+        received_str = received.strftime(DATE_FORMAT)
+        with self._lock:
+            old = self._messages.get(entry_id)
+            if old == [domain, received_str, pending]:
+                return
+            if old:
+                self._bucket_add(old[0], old[1], old[2], -1)
+            self._messages[entry_id] = [domain, received_str, pending]
+            self._bucket_add(domain, received_str, pending, +1)
+
+            samples = self._samples.setdefault(domain, [])
+            if not any(s[1] == subject for s in samples):
+                samples.append([received_str, subject])
+                samples.sort(reverse=True)
+                del samples[self.sample_size:]
+            self._dirty = True
+
+    def remove(self, entry_id: str) -> bool:
+        """Drop a message that has left the Inbox.
+
+        Returns:
+            True if the message was in the store
+        """
+        with self._lock:
+            old = self._messages.pop(entry_id, None)
+            if old is None:
+                return False
+            self._bucket_add(old[0], old[1], old[2], -1)
+            self._dirty = True
+            return True
+
+    def clear(self):
+        """Drop everything, including the watermark (forces a full scan)."""
+        with self._lock:
+            self._messages.clear()
+            self._buckets.clear()
+            self._samples.clear()
+            self.watermark = None
+            self._dirty = True
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def query(
+        self,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        pending_only: bool = False,
+    ) -> Dict[str, Any]:
+        """Aggregate domains over a received-date window from day buckets.
+
+        Windows are resolved to whole days. Returns the same shape as
+        ``RetrievalClient.get_domain_counts``: domains (newest first) with
+        count and sample_subjects, plus pending counts and totals.
+        """
+        first_day = date_from.strftime(DAY_FORMAT) if date_from else ""
+        last_day = date_to.strftime(DAY_FORMAT) if date_to else "9999-12-31"
+        first_sample = date_from.strftime(DATE_FORMAT) if date_from else ""
+
+        domains = []
+        total_count = total_pending = 0
+        with self._lock:
+            for domain, days in self._buckets.items():
+                count = pending = 0
+                latest = ""
+                for day, (day_count, day_pending, day_latest) in days.items():
+                    if first_day <= day <= last_day:
+                        count += day_count
+                        pending += day_pending
+                        latest = max(latest, day_latest)
+                total_count += count
+                total_pending += pending
+                if (pending if pending_only else count) == 0:
+                    continue
+                samples = [
+                    subject for received, subject in self._samples.get(domain, [])
+                    if first_sample <= received and received[:10] <= last_day
+                ]
+                domains.append({
+                    "domain": domain,
+                    "count": pending if pending_only else count,
+                    "pending": pending,
+                    "latest": latest,
+                    "sample_subjects": samples,
+                })
+
+        domains.sort(key=lambda d: d["latest"], reverse=True)
+        return {
+            "domains": domains,
+            "total_scanned": total_count,
+            "total_pending": total_pending,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return store size and freshness for the metrics surface."""
+        with self._lock:
+            return {
+                "messages": len(self._messages),
+                "domains": len(self._buckets),
+                "watermark": self.watermark.strftime(DATE_FORMAT) if self.watermark else None,
+                "last_refresh": self.last_refresh.strftime(DATE_FORMAT) if self.last_refresh else None,
+                "last_full_scan": self.last_full_scan.strftime(DATE_FORMAT) if self.last_full_scan else None,
+                "persist_path": str(self.path) if self.path else None,
+            }
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self) -> int:
+        """Load the store from the persistence file.
+
+        Buckets are rebuilt from the per-message records.
+
+        Returns:
+            Number of messages loaded (0 if no file or unreadable)
+        """
+        self.loaded = True
+        if not self.path or not self.path.exists():
+            return 0
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return 0
+        if not isinstance(data, dict):
+            return 0
+
+        def parse(value):
+            try:
+                return datetime.strptime(value, DATE_FORMAT) if value else None
+            except (TypeError, ValueError):
+                return None
+
+        with self._lock:
+            self._messages.clear()
+            self._buckets.clear()
+            for entry_id, record in data.get("messages", {}).items():
+                if isinstance(record, list) and len(record) == 3:
+                    domain, received, pending = record
+                    self._messages[entry_id] = [domain, received, bool(pending)]
+                    self._bucket_add(domain, received, bool(pending), +1)
+            self._samples = {
+                domain: samples for domain, samples in data.get("samples", {}).items()
+                if domain in self._buckets
+            }
+            self.watermark = parse(data.get("watermark"))
+            self.last_full_scan = parse(data.get("last_full_scan"))
+            self._dirty = False
+            return len(self._messages)
+
+    def save(self) -> bool:
+        """Write the store to the persistence file if anything changed.
+
+        The file is replaced atomically.
+
+        Returns:
+            True if the file was written
+        """
+        if not self.path:
+            return False
+        with self._lock:
+            if not self._dirty:
+                return False
+            data = {
+                "watermark": self.watermark.strftime(DATE_FORMAT) if self.watermark else None,
+                "last_full_scan": self.last_full_scan.strftime(DATE_FORMAT) if self.last_full_scan else None,
+                "messages": dict(self._messages),
+                "samples": {domain: list(samples) for domain, samples in self._samples.items()},
+            }
+            self._dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        return True
+
+    def mark_dirty(self):
+        """Flag watermark changes for the next save()."""
+        with self._lock:
+            self._dirty = True
@@ -0,0 +1,160 @@
+"""Single-threaded apartment executor for Outlook COM calls.
+
+Outlook's COM objects belong to the apartment that created them. Running
+every ``outlook_client`` call on one dedicated STA worker thread keeps the
+connection in a single apartment and lets the MCP event loop stay free
+while a long scan is in progress.
+
+Work items are queued FIFO, so concurrent clients are served in arrival
+order. A job that is cancelled before the worker picks it up is skipped;
+a job that is already running completes, but its result is discarded.
+
+With ``pump_interval`` set, idle workers pump Windows messages at that
+interval so COM event sinks created on the thread (e.g. ItemAdd
+subscriptions) receive their callbacks.
+"""
+
+import asyncio
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional
+
+import pythoncom
+
+
+class ComExecutor:
+    """Runs callables on dedicated COM (STA) worker threads.
+
+    Worker threads are started lazily on first submit and each initialises
+    COM for itself, so any Outlook connection created by a job is owned
+    by that thread for the life of the process. The default of one worker
+    gives a single apartment that owns the server's Outlook connection;
+    ReadWorkerPool uses several.
+
+    Args:
+        name: Thread name (suffixed with the index for several workers)
+        workers: Number of worker threads
+        pump_interval: Seconds between message pumps while idle; None
+            blocks on the queue without pumping
+    """
+
+    def __init__(self, name: str = "effi-com", workers: int = 1,
+                 pump_interval: Optional[float] = None):
+        self._name = name
+        self._workers = max(1, workers)
+        self.pump_interval = pump_interval
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+
+    @property
+    def workers(self) -> int:
+        """Number of worker threads."""
+        return self._workers
+
+    @property
+    def thread(self) -> Optional[threading.Thread]:
+        """The first worker thread, or None if not started yet."""
+        return self._threads[0] if self._threads else None
+
+    def on_com_thread(self) -> bool:
+        """Return True if the caller is running on one of the worker threads."""
+        return threading.current_thread() in self._threads
+
+    def pending(self) -> int:
+        """Approximate number of jobs waiting in the queue."""
+        return self._queue.qsize()
+
+    def _running(self) -> bool:
+        return bool(self._threads) and all(t.is_alive() for t in self._threads)
+
+    def _start_locked(self):
+        """Start fresh workers sharing a new queue. Caller holds the lock."""
+        self._queue = queue.Queue()
+        self._threads = []
+        for i in range(self._workers):
+            name = self._name if self._workers == 1 else f"{self._name}-{i}"
+            thread = threading.Thread(
+                target=self._worker, args=(self._queue,), name=name, daemon=True
+            )
+            self._threads.append(thread)
+            thread.start()
+
+    def _worker(self, jobs: "queue.Queue[Optional[tuple]]"):
+        """Worker loop: initialise COM, then drain the queue until shutdown."""
+        pythoncom.CoInitialize()
+        try:
+            while True:
+                if self.pump_interval:
+                    try:
+                        job = jobs.get(timeout=self.pump_interval)
+                    except queue.Empty:
+                        pythoncom.PumpWaitingMessages()
+                        continue
+                else:
+                    job = jobs.get()
+                if job is None:
+                    break
+                future, fn, args, kwargs = job
+                # Skip jobs cancelled while still queued
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as e:
+                    future.set_exception(e)
+                else:
+                    future.set_result(result)
+        finally:
+            pythoncom.CoUninitialize()
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """Queue a callable for the COM thread.
+
+        Calls made from the COM thread itself run inline, so a job may
+        safely call back into code that also submits.
+
+        Returns:
+            concurrent.futures.Future resolving to the callable's result
+        """
+        if self.on_com_thread():
+            future: Future = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+            return future
+
+        future = Future()
+        with self._lock:
+            if not self._running():
+                self._start_locked()
+            self._queue.put((future, fn, args, kwargs))
+        return future
+
+    def call(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run a callable on the COM thread and block until it finishes."""
+        return self.submit(fn, *args, **kwargs).result()
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Await a callable on the COM thread without blocking the event loop.
+
+        Cancelling the awaiting task cancels the queued job if it has not
+        started yet.
+        """
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers after already-queued jobs have run."""
+        with self._lock:
+            threads = self._threads
+            if not threads:
+                return
+            for _ in threads:
+                self._queue.put(None)
+            self._threads = []
+        if wait:
+            for thread in threads:
+                thread.join()
@@ -0,0 +1,135 @@
+"""Folder handle cache.
+
+Resolving a path like ``Inbox\\~Zero\\Growth Engineering`` walks the
+folder tree one ``Folders`` enumeration per level, and every move or
+listing used to repeat that walk. FolderCache maps a normalized path to
+the folder's EntryID and StoreID (plain strings, so safe to share across
+threads and connections); ``Namespace.GetFolderFromID`` turns a hit back
+into a folder in one call. Subfolder name lists are cached alongside and
+expire after a TTL, since folders can be added outside effi-mail.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Union
+
+
+def normalize_folder_path(folder_path: str) -> List[str]:
+    r"""Split a folder path into its parts below the mailbox root.
+
+    A leading mailbox name (``\\someone@firm.com\Inbox``) is stripped, as
+    are empty parts.
+    """
+    clean_path = folder_path.strip("\\")
+    parts = [p for p in clean_path.split("\\") if p]
+    if len(parts) > 1 and "@" in parts[0]:
+        parts = parts[1:]
+    return parts
+
+
+def folder_key(parts: List[str]) -> str:
+    """Cache key for a list of path parts (case-insensitive, like Outlook)."""
+    return "\\".join(p.lower() for p in parts)
+
+
+class FolderCache:
+    """Thread-safe cache of normalized folder path -> EntryID/StoreID.
+
+    Args:
+        subfolder_ttl: Seconds a cached subfolder listing stays valid
+    """
+
+    def __init__(self, subfolder_ttl: float = 300):
+        self.subfolder_ttl = subfolder_ttl
+        # key -> {"entry_id", "store_id", "path"}
+        self._entries: Dict[str, Dict[str, str]] = {}
+        # key -> (expires_at, [names])
+        self._subfolders: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def longest_prefix(self, parts: List[str]):
+        """Find the deepest cached folder along a path.
+
+        Returns:
+            (depth, entry) for the longest cached prefix of parts, or
+            (0, None) if no level is cached
+        """
+        with self._lock:
+            for depth in range(len(parts), 0, -1):
+                entry = self._entries.get(folder_key(parts[:depth]))
+                if entry is not None:
+                    if depth == len(parts):
+                        self.hits += 1
+                    else:
+                        self.misses += 1
+                    return depth, entry
+            self.misses += 1
+            return 0, None
+
+    def put(self, key: str, folder) -> None:
+        """Remember a folder's EntryID and StoreID under key."""
+        try:
+            entry = {
+                "entry_id": folder.EntryID,
+                "store_id": folder.StoreID,
+                "path": folder.FolderPath,
+            }
+        except Exception:
+            return
+        with self._lock:
+            self._entries[key] = entry
+
+    def get_subfolders(self, key: str) -> Optional[List[str]]:
+        """Return the cached subfolder names of key if not expired."""
+        with self._lock:
+            cached = self._subfolders.get(key)
+            if cached is None or cached[0] < time.monotonic():
+                return None
+            return list(cached[1])
+
+    def put_subfolders(self, key: str, names: List[str]) -> None:
+        """Cache the subfolder names of key for subfolder_ttl seconds."""
+        with self._lock:
+            self._subfolders[key] = (time.monotonic() + self.subfolder_ttl, list(names))
+
+    def forget_subfolders(self, key: str) -> None:
+        """Drop the cached subfolder listing of key (after a folder is added)."""
+        with self._lock:
+            self._subfolders.pop(key, None)
+
+    def invalidate(self, key: str = "") -> None:
+        """Drop key and everything below it (everything when key is empty)."""
+        prefix = key + "\\"
+        with self._lock:
+            self.invalidations += 1
+            for cache in (self._entries, self._subfolders):
+                for cached_key in [k for k in cache if not key or k == key or k.startswith(prefix)]:
+                    del cache[cached_key]
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._subfolders.clear()
+            self.hits = 0
+            self.misses = 0
+            self.invalidations = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return hit/miss statistics for the metrics surface."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "subfolder_listings": len(self._subfolders),
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
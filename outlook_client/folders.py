@@ -1,13 +1,18 @@
 """Folders client for Outlook folder operations."""
 
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from outlook_client.base import BaseOutlookClient
+from outlook_client.folder_cache import FolderCache, folder_key, normalize_folder_path
 
 
 class FoldersClient(BaseOutlookClient):
     """Client for Outlook folder operations."""
     
+    def __init__(self, connection=None, folder_cache: Optional[FolderCache] = None):
+        super().__init__(connection)
+        self.folder_cache = folder_cache if folder_cache is not None else FolderCache()
+    
     def move_to_folder(self, email_id: str, folder_name: str) -> bool:
         """Move an email to a specified folder."""
         self._ensure_connection()
@@ -24,11 +29,61 @@ class FoldersClient(BaseOutlookClient):
             
             if dest_folder:
                 message.Move(dest_folder)
+                self._invalidate_moves(dest_folder)
                 return True
             return False
         except Exception:
             return False
     
+    def resolve_folder(self, folder_path: str, create_path: bool = False) -> Dict[str, Any]:
+        r"""Resolve a folder path to a folder object, using the folder cache.
+        
+        The deepest cached level of the path is reopened by EntryID/StoreID
+        and only the remaining levels are walked; every level walked is
+        cached. A cached handle that no longer opens (or has moved) is
+        dropped and the path is walked again from the root.
+        
+        Returns:
+            Dict with 'folder' and 'folders_created', or 'error'
+        """
+        self._ensure_connection()
+        parts = normalize_folder_path(folder_path)
+        if not parts:
+            return {"error": f"Invalid folder path: {folder_path}"}
+        
+        depth, entry = self.folder_cache.longest_prefix(parts)
+        current_folder = None
+        if entry is not None:
+            try:
+                current_folder = self._namespace.GetFolderFromID(entry["entry_id"], entry["store_id"])
+                if current_folder.FolderPath != entry["path"]:
+                    raise ValueError("folder moved")
+            except Exception:
+                self.folder_cache.invalidate(folder_key(parts[:depth]))
+                current_folder = None
+        if current_folder is None:
+            depth = 0
+            current_folder = self._namespace.GetDefaultFolder(self.FOLDER_INBOX).Parent
+        
+        folders_created = []
+        for index in range(depth, len(parts)):
+            part = parts[index]
+            found = None
+            for subfolder in current_folder.Folders:
+                if subfolder.Name.lower() == part.lower():
+                    found = subfolder
+                    break
+            if found is None:
+                if not create_path:
+                    return {"error": f"Folder '{part}' not found in path '{folder_path}'"}
+                found = current_folder.Folders.Add(part)
+                folders_created.append(part)
+                self.folder_cache.forget_subfolders(folder_key(parts[:index]))
+            current_folder = found
+            self.folder_cache.put(folder_key(parts[:index + 1]), current_folder)
+        
+        return {"folder": current_folder, "folders_created": folders_created}
+    
     def move_to_archive(self, email_id: str, folder_path: str = "Archive", 
                         create_path: bool = False) -> Dict[str, Any]:
         r"""Move an email to a folder (default: Archive).
@@ -44,37 +99,13 @@ class FoldersClient(BaseOutlookClient):
         try:
             message = self._namespace.GetItemFromID(email_id)
             
-            inbox = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
-            root = inbox.Parent
-            
-            clean_path = folder_path.strip("\\")
-            first_part = clean_path.split("\\")[0] if "\\" in clean_path else ""
-            if "@" in first_part:
-                clean_path = "\\".join(clean_path.split("\\")[1:])
-            
-            path_parts = [p for p in clean_path.split("\\") if p]
-            
-            current_folder = root
-            folders_created = []
-            for part in path_parts:
-                found = False
-                for subfolder in current_folder.Folders:
-                    if subfolder.Name.lower() == part.lower():
-                        current_folder = subfolder
-                        found = True
-                        break
-                if not found:
-                    if create_path:
-                        current_folder = current_folder.Folders.Add(part)
-                        folders_created.append(part)
-                    else:
-                        return {"success": False, "error": f"Folder '{part}' not found in path '{folder_path}'"}
-            target_folder = current_folder
-            
-            if target_folder == root:
-                return {"success": False, "error": f"Invalid folder path: {folder_path}"}
+            resolved = self.resolve_folder(folder_path, create_path=create_path)
+            if "error" in resolved:
+                return {"success": False, "error": resolved["error"]}
+            target_folder = resolved["folder"]
             
             moved_message = message.Move(target_folder)
+            self._invalidate_moves(target_folder)
             
             result = {
                 "success": True,
@@ -82,30 +113,45 @@ class FoldersClient(BaseOutlookClient):
                 "new_id": moved_message.EntryID,
                 "folder": target_folder.FolderPath
             }
-            if folders_created:
-                result["folders_created"] = folders_created
+            if resolved["folders_created"]:
+                result["folders_created"] = resolved["folders_created"]
             return result
         except Exception as e:
             return {"success": False, "error": str(e)}
     
     def batch_move_to_archive(self, email_ids: List[str], folder_path: str = "Archive",
                               create_path: bool = False) -> Dict[str, Any]:
-        """Move multiple emails to a folder (default: Archive)."""
+        """Move multiple emails to a folder (default: Archive).
+        
+        The destination is resolved once, then every email is moved into it.
+        """
+        self._ensure_connection()
         results = {"success": 0, "failed": 0, "moved": [], "errors": [], "folders_created": []}
         
+        try:
+            resolved = self.resolve_folder(folder_path, create_path=create_path)
+        except Exception as e:
+            resolved = {"error": str(e)}
+        if "error" in resolved:
+            results["failed"] = len(email_ids)
+            results["errors"] = [{"id": email_id, "error": resolved["error"]} for email_id in email_ids]
+            del results["folders_created"]
+            return results
+        target_folder = resolved["folder"]
+        results["folders_created"] = resolved["folders_created"]
+        
         for email_id in email_ids:
-            result = self.move_to_archive(email_id, folder_path=folder_path, create_path=create_path)
-            if result.get("success"):
+            try:
+                message = self._namespace.GetItemFromID(email_id)
+                moved_message = message.Move(target_folder)
                 results["success"] += 1
-                results["moved"].append({"old_id": email_id, "new_id": result.get("new_id")})
-                if result.get("folders_created"):
-                    for folder in result["folders_created"]:
-                        if folder not in results["folders_created"]:
-                            results["folders_created"].append(folder)
-            else:
+                results["moved"].append({"old_id": email_id, "new_id": moved_message.EntryID})
+            except Exception as e:
                 results["failed"] += 1
-                results["errors"].append({"id": email_id, "error": result.get("error")})
+                results["errors"].append({"id": email_id, "error": str(e)})
         
+        if results["success"]:
+            self._invalidate_moves(target_folder)
         if not results["folders_created"]:
             del results["folders_created"]
         
@@ -114,35 +160,31 @@ class FoldersClient(BaseOutlookClient):
     def list_subfolders(self, folder_path: str) -> List[str]:
         r"""List subfolders within a given folder path.
         
+        Listings are served from the folder cache for a few minutes.
+        
         Args:
             folder_path: Path to the folder, e.g. "Inbox\~Zero" or "Inbox"
         """
         self._ensure_connection()
         
         try:
-            inbox = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
-            root = inbox.Parent
+            parts = normalize_folder_path(folder_path)
+            key = folder_key(parts)
+            cached = self.folder_cache.get_subfolders(key)
+            if cached is not None:
+                return cached
             
-            clean_path = folder_path.strip("\\")
-            first_part = clean_path.split("\\")[0] if "\\" in clean_path else ""
-            if "@" in first_part:
-                clean_path = "\\".join(clean_path.split("\\")[1:])
-            
-            path_parts = [p for p in clean_path.split("\\") if p]
-            
-            current_folder = root
-            for part in path_parts:
-                found = False
-                for subfolder in current_folder.Folders:
-                    if subfolder.Name.lower() == part.lower():
-                        current_folder = subfolder
-                        found = True
-                        break
-                if not found:
+            if parts:
+                resolved = self.resolve_folder(folder_path)
+                if "error" in resolved:
                     return []
+                current_folder = resolved["folder"]
+            else:
+                current_folder = self._namespace.GetDefaultFolder(self.FOLDER_INBOX).Parent
             
-            subfolders = [f.Name for f in current_folder.Folders]
-            return sorted(subfolders)
+            subfolders = sorted(f.Name for f in current_folder.Folders)
+            self.folder_cache.put_subfolders(key, subfolders)
+            return subfolders
             
         except Exception:
             return []
@@ -157,6 +199,7 @@ class FoldersClient(BaseOutlookClient):
             if category not in existing:
                 message.Categories = f"{existing}, {category}".strip(", ")
             message.Save()
+            self._invalidate_queries()
             return True
         except:
             return False
@@ -0,0 +1,362 @@
+"""Outlook item events and the in-process change feed.
+
+Caches in effi-mail (the query cache, listings built from it) otherwise
+learn about new or changed mail only by expiring and rescanning. An
+ItemEventListener subscribes to ``Items.ItemAdd``, ``ItemChange`` and
+``ItemRemove`` on the Inbox, Sent Items and any configured DMS matter
+folders, and publishes every event to a ChangeFeed. Consumers either
+subscribe a callback (run synchronously on the COM thread, so it must be
+quick) or poll ``since(seq)`` from their own thread.
+
+Outlook does not guarantee delivery: ItemAdd is skipped when many items
+arrive at once, and a subscription lapses silently if its Items
+collection is released. The listener therefore checks each folder's item
+count against the events it has seen every ``resync_interval`` seconds
+and publishes a ``resync`` event for a folder that has drifted, telling
+consumers to drop their view of it. Subscriptions that fail are retried
+by the same check.
+"""
+
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from outlook_client.query_cache import INBOX_TAG, SENT_TAG, dms_tag, dms_tags
+
+logger = logging.getLogger(__name__)
+
+EVENT_KINDS = ("add", "change", "remove", "resync")
+
+
+class ChangeFeed:
+    """Thread-safe, bounded feed of item change events.
+
+    Each event is a dict with a sequence number ``seq``, ``kind`` (add,
+    change, remove or resync), the watched ``folder``, the query cache
+    ``tags`` it affects, the ``entry_id`` when Outlook provides one
+    (ItemRemove does not) and the ``time`` it was published.
+
+    Args:
+        max_events: Events kept for consumers polling with since()
+    """
+
+    def __init__(self, max_events: int = 1000):
+        self._events: deque = deque(maxlen=max_events)
+        self._subscribers: List[Callable[[Dict[str, Any]], Any]] = []
+        self._lock = threading.Lock()
+        self._seq = 0
+        self.published = {kind: 0 for kind in EVENT_KINDS}
+        self.subscriber_errors = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], Any]) -> Callable:
+        """Call callback with every event published from now on."""
+        with self._lock:
+            self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback: Callable) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def publish(self, kind: str, folder: str, tags: Sequence[str] = (),
+                entry_id: Optional[str] = None) -> Dict[str, Any]:
+        """Append an event and hand it to every subscriber."""
+        with self._lock:
+            self._seq += 1
+            event = {
+                "seq": self._seq,
+                "kind": kind,
+                "folder": folder,
+                "tags": tuple(tags) or (folder,),
+                "entry_id": entry_id,
+                "time": datetime.now().isoformat(timespec="seconds"),
+            }
+            self._events.append(event)
+            self.published[kind] = self.published.get(kind, 0) + 1
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                self.subscriber_errors += 1
+                logger.warning(f"Change feed subscriber failed: {e}")
+        return event
+
+    def since(self, seq: int = 0) -> Dict[str, Any]:
+        """Return the events after seq.
+
+        Returns:
+            Dict with 'events', 'last_seq' and 'complete', which is False
+            when events after seq have already been dropped from the
+            buffer (the consumer should then rebuild its view)
+        """
+        with self._lock:
+            events = [e for e in self._events if e["seq"] > seq]
+            oldest = self._events[0]["seq"] if self._events else self._seq + 1
+            return {
+                "events": events,
+                "last_seq": self._seq,
+                "complete": seq >= oldest - 1,
+            }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return event counters for the metrics surface."""
+        with self._lock:
+            return {
+                "last_seq": self._seq,
+                "buffered": len(self._events),
+                "subscribers": len(self._subscribers),
+                "published": dict(self.published),
+                "subscriber_errors": self.subscriber_errors,
+            }
+
+
+class _ItemsEvents:
+    """COM event sink for ``Items`` events of one watched folder."""
+
+    listener: "ItemEventListener" = None
+    folder: str = None
+
+    def OnItemAdd(self, item):
+        if self.listener is not None:
+            self.listener.item_event(self.folder, "add", item)
+
+    def OnItemChange(self, item):
+        if self.listener is not None:
+            self.listener.item_event(self.folder, "change", item)
+
+    def OnItemRemove(self):
+        if self.listener is not None:
+            self.listener.item_event(self.folder, "remove")
+
+
+def _with_events(items, sink_class):
+    """Attach a pywin32 event sink to a live Items collection."""
+    import win32com.client
+
+    return win32com.client.WithEvents(items, sink_class)
+
+
+def parse_dms_folders(value: str) -> List[Tuple[str, str]]:
+    """Parse "Client/Matter; Other/Matter" into (client, matter) pairs."""
+    pairs = []
+    for spec in (value or "").split(";"):
+        parts = [p.strip() for p in spec.replace("\\", "/").split("/") if p.strip()]
+        if len(parts) == 2:
+            pairs.append((parts[0], parts[1]))
+    return pairs
+
+
+class ItemEventListener:
+    """Publishes Outlook item events of watched folders to a ChangeFeed.
+
+    Args:
+        client: Outlook client (a DMSClient to watch DMS folders)
+        feed: ChangeFeed receiving the events
+        dms_folders: (client, matter) pairs whose Emails folders are watched
+        sink_factory: Attaches a sink class to an Items collection and
+            returns the sink; defaults to ``win32com.client.WithEvents``
+        resync_interval: Seconds between drift checks
+    """
+
+    def __init__(
+        self,
+        client,
+        feed: ChangeFeed,
+        dms_folders: Iterable[Tuple[str, str]] = (),
+        sink_factory: Optional[Callable[[Any, type], Any]] = None,
+        resync_interval: float = 300,
+    ):
+        self.client = client
+        self.feed = feed
+        self.dms_folders = list(dms_folders)
+        self.sink_factory = sink_factory or _with_events
+        self.resync_interval = resync_interval
+        # folder -> {"items", "sink", "tags", "expected"}
+        self._subscriptions: Dict[str, Dict[str, Any]] = {}
+        self._failed: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.resyncs = 0
+        self.last_check: Optional[datetime] = None
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def watched_folders(self) -> List[Tuple[str, Tuple[str, ...], Callable[[], Any]]]:
+        """(name, query cache tags, folder opener) for every watched folder."""
+        client = self.client
+        folders = [
+            (INBOX_TAG, (INBOX_TAG,), lambda: client._namespace.GetDefaultFolder(client.FOLDER_INBOX)),
+            (SENT_TAG, (SENT_TAG,), lambda: client._namespace.GetDefaultFolder(client.FOLDER_SENT)),
+        ]
+        for dms_client, matter in self.dms_folders:
+            path = f"{client.DMS_ROOT_FOLDER}\\{dms_client}\\{matter}\\{client.DMS_EMAILS_FOLDER}"
+            folders.append((
+                dms_tag(dms_client, matter),
+                dms_tags(dms_client, matter),
+                lambda path=path: client._get_folder_by_path(path),
+            ))
+        return folders
+
+    def _subscribe_folder(self, name: str, tags: Tuple[str, ...], opener: Callable[[], Any]) -> bool:
+        try:
+            folder = opener()
+            if folder is None:
+                raise ValueError("folder not found")
+            items = folder.Items
+            sink = self.sink_factory(items, _ItemsEvents)
+            sink.listener = self
+            sink.folder = name
+            expected = items.Count
+        except Exception as e:
+            self._failed[name] = str(e)
+            logger.warning(f"Could not subscribe to item events on {name}: {e}")
+            return False
+        # Keep the Items collection alive or the subscription lapses
+        with self._lock:
+            self._subscriptions[name] = {"items": items, "sink": sink, "tags": tags, "expected": expected}
+        self._failed.pop(name, None)
+        return True
+
+    def subscribe(self) -> int:
+        """Subscribe to every watched folder not yet subscribed.
+
+        Must be called on the COM thread that pumps messages for the
+        sinks.
+
+        Returns:
+            Number of folders subscribed
+        """
+        self.client._ensure_connection()
+        for name, tags, opener in self.watched_folders():
+            if name not in self._subscriptions:
+                self._subscribe_folder(name, tags, opener)
+        return len(self._subscriptions)
+
+    def unsubscribe(self) -> None:
+        """Drop every subscription (their Items collections are released)."""
+        with self._lock:
+            self._subscriptions.clear()
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def item_event(self, folder: str, kind: str, item=None) -> None:
+        """Record an event raised by a folder's sink and publish it."""
+        entry_id = None
+        if item is not None:
+            try:
+                entry_id = item.EntryID
+            except Exception:
+                pass
+        with self._lock:
+            subscription = self._subscriptions.get(folder)
+            if subscription is not None:
+                if kind == "add":
+                    subscription["expected"] += 1
+                elif kind == "remove":
+                    subscription["expected"] -= 1
+            tags = subscription["tags"] if subscription else (folder,)
+        self.feed.publish(kind, folder, tags, entry_id=entry_id)
+
+    def check(self) -> List[str]:
+        """Resync folders whose item count no longer matches the events seen.
+
+        Also retries subscriptions that failed or whose collection no
+        longer answers. Must be called on the COM thread.
+
+        Returns:
+            Names of the folders a resync event was published for
+        """
+        resynced = []
+        with self._lock:
+            subscriptions = list(self._subscriptions.items())
+        for name, subscription in subscriptions:
+            try:
+                count = subscription["items"].Count
+            except Exception:
+                with self._lock:
+                    self._subscriptions.pop(name, None)
+                self._failed[name] = "subscription lapsed"
+                self.feed.publish("resync", name, subscription["tags"])
+                resynced.append(name)
+                continue
+            with self._lock:
+                drifted = count != subscription["expected"]
+                subscription["expected"] = count
+            if drifted:
+                self.feed.publish("resync", name, subscription["tags"])
+                resynced.append(name)
+        if self._failed:
+            self.subscribe()
+        self.resyncs += len(resynced)
+        self.last_check = datetime.now()
+        return resynced
+
+    def resync(self) -> None:
+        """Tell consumers to drop their view of every watched folder."""
+        with self._lock:
+            subscriptions = list(self._subscriptions.items())
+        for name, subscription in subscriptions:
+            self.feed.publish("resync", name, subscription["tags"])
+        self.resyncs += len(subscriptions)
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def start(self, run: Optional[Callable[[Callable], Any]] = None):
+        """Start the drift-check thread.
+
+        Args:
+            run: Callable that runs a job on the COM thread and returns its
+                result (e.g. ``ComExecutor.call``). Defaults to calling the
+                job directly on the checker thread.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        run = run or (lambda fn: fn())
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(run,), name="effi-item-events", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """Stop the drift-check thread."""
+        self._stop.set()
+        thread = self._thread
+        if wait and thread is not None:
+            thread.join()
+        self._thread = None
+
+    def _loop(self, run: Callable[[Callable], Any]):
+        while not self._stop.wait(self.resync_interval):
+            try:
+                run(self.check)
+            except Exception as e:
+                logger.warning(f"Item event resync check failed: {e}")
+
+    def status(self) -> Dict[str, Any]:
+        """Return subscription state and feed counters for the metrics surface."""
+        with self._lock:
+            watching = sorted(self._subscriptions)
+        return {
+            "watching": watching,
+            "failed": dict(self._failed),
+            "resyncs": self.resyncs,
+            "last_check": self.last_check.isoformat(timespec="seconds") if self.last_check else None,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "feed": self.feed.stats(),
+        }
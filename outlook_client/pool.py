@@ -0,0 +1,131 @@
+"""Multi-apartment worker pool for parallel read-only folder scans.
+
+Each worker thread initialises COM and lazily builds its own client
+instances, so every worker has its own MAPI namespace. COM objects are
+never shared between workers: a scan is described as a callable that
+receives the worker's client and resolves folders for itself.
+
+Results from independent folders are merged newest-first by ReceivedTime.
+"""
+
+import heapq
+import threading
+from itertools import islice
+from typing import Callable, Iterable, List, Optional, Type, TypeVar
+
+from outlook_client.executor import ComExecutor
+from models import Email
+
+
+ClientT = TypeVar("ClientT")
+
+
+def merge_sorted_by_received(streams: Iterable[Iterable[Email]], limit: Optional[int] = None) -> List[Email]:
+    """Lazily merge streams that are already newest-first, dropping duplicate IDs.
+
+    Streams are consumed only as far as needed, so generators that convert
+    COM items on demand stop as soon as ``limit`` emails have been merged.
+
+    Args:
+        streams: Email iterables, each sorted by received_time descending
+        limit: Maximum emails to return (None for all)
+
+    Returns:
+        Merged list sorted by received_time descending
+    """
+    merged = heapq.merge(*streams, key=lambda e: e.received_time, reverse=True)
+
+    seen_ids = set()
+
+    def unique():
+        for email in merged:
+            if email.id not in seen_ids:
+                seen_ids.add(email.id)
+                yield email
+
+    return list(islice(unique(), limit))
+
+
+def merge_by_received(streams: Iterable[List[Email]], limit: Optional[int] = None) -> List[Email]:
+    """Merge email lists newest-first by received_time, dropping duplicate IDs.
+
+    Args:
+        streams: Email lists, one per scanned folder
+        limit: Maximum emails to return (None for all)
+
+    Returns:
+        Merged list sorted by received_time descending
+    """
+    ordered = [
+        sorted(stream, key=lambda e: e.received_time, reverse=True)
+        for stream in streams
+    ]
+    return merge_sorted_by_received(ordered, limit)
+
+
+class ReadWorkerPool:
+    """Pool of COM worker threads for concurrent read-only scans.
+
+    Args:
+        workers: Maximum number of scans running at once
+        name: Thread name prefix
+    """
+
+    def __init__(self, workers: int = 4, name: str = "effi-read"):
+        self._executor = ComExecutor(name=name, workers=workers)
+        self._local = threading.local()
+
+    @property
+    def workers(self) -> int:
+        """Configured concurrency limit."""
+        return self._executor.workers
+
+    def _worker_client(self, client_cls: Type[ClientT]) -> ClientT:
+        """Get this worker thread's own instance of client_cls."""
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if client_cls not in clients:
+            clients[client_cls] = client_cls()
+        return clients[client_cls]
+
+    def _run_with_client(self, client_cls, scan):
+        return scan(self._worker_client(client_cls))
+
+    def map(self, client_cls: Type[ClientT], scans: List[Callable[[ClientT], List[Email]]]) -> List[List[Email]]:
+        """Run scans concurrently, each with a worker-local client.
+
+        A scan that raises contributes an empty list, matching the
+        per-folder error handling of the sequential scans.
+
+        Args:
+            client_cls: Client class to instantiate on each worker
+            scans: Callables taking a client and returning a list of emails
+
+        Returns:
+            One result list per scan, in the order given
+        """
+        futures = [
+            self._executor.submit(self._run_with_client, client_cls, scan)
+            for scan in scans
+        ]
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception:
+                results.append([])
+        return results
+
+    def scan_merged(
+        self,
+        client_cls: Type[ClientT],
+        scans: List[Callable[[ClientT], List[Email]]],
+        limit: Optional[int] = None,
+    ) -> List[Email]:
+        """Run scans concurrently and merge the results by received_time."""
+        return merge_by_received(self.map(client_cls, scans), limit)
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker threads."""
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,99 @@
+"""Batched MAPI property reads.
+
+Each ``PropertyAccessor.GetProperty`` call is a COM round trip. Callers
+instead name a projection - a declarative list of the MAPI tags needed for
+one kind of object - and ``get_properties`` fetches all of them with a
+single ``GetProperties`` call.
+"""
+
+from typing import Any, Dict
+
+PROPTAG = "http://schemas.microsoft.com/mapi/proptag/"
+
+# Message properties
+PR_INTERNET_MESSAGE_ID = PROPTAG + "0x1035001F"
+PR_HASATTACH = PROPTAG + "0x0E1B000B"
+PR_BODY = PROPTAG + "0x1000001F"
+
+# Recipient properties
+PR_RECIPIENT_TYPE = PROPTAG + "0x0C150003"
+PR_EMAIL_ADDRESS = PROPTAG + "0x3003001F"
+PR_SMTP_ADDRESS = PROPTAG + "0x39FE001F"
+
+# Attachment properties
+PR_ATTACH_SIZE = PROPTAG + "0x0E200003"
+PR_ATTACH_LONG_FILENAME = PROPTAG + "0x3707001F"
+PR_ATTACH_MIME_TAG = PROPTAG + "0x370E001F"
+PR_ATTACH_CONTENT_ID = PROPTAG + "0x3712001F"
+
+# Tags fetched together for each kind of object, keyed by projection name.
+# Field names are the keys of the dict returned by get_properties().
+PROJECTIONS: Dict[str, Dict[str, str]] = {
+    # _message_to_email / get_email_full
+    "message": {
+        "internet_message_id": PR_INTERNET_MESSAGE_ID,
+        "has_attachments": PR_HASATTACH,
+    },
+    # _extract_recipients, on an address cache miss (type and address come
+    # from Recipient.Type/Address, which the cache lookup reads anyway)
+    "recipient": {
+        "smtp_address": PR_SMTP_ADDRESS,
+    },
+    # get_email_full / list_attachments
+    "attachment_detail": {
+        "filename": PR_ATTACH_LONG_FILENAME,
+        "size": PR_ATTACH_SIZE,
+        "content_id": PR_ATTACH_CONTENT_ID,
+        "mime_type": PR_ATTACH_MIME_TAG,
+    },
+}
+
+# SCODEs returned in place of a value when a property can't be read
+MAPI_ERROR_CODES = {
+    -2147221233,  # MAPI_E_NOT_FOUND (0x8004010F)
+    -2147024882,  # MAPI_E_NOT_ENOUGH_MEMORY (0x8007000E)
+    -2147467259,  # MAPI_E_CALL_FAILED (0x80004005)
+}
+
+
+def is_property_error(tag: str, value: Any) -> bool:
+    """Return True if a GetProperties value is an error code, not a value.
+
+    GetProperties returns an SCODE in the slot of any property it couldn't
+    read. Only PT_LONG (``...0003``) tags can legitimately hold an int.
+    """
+    if type(value) is not int:
+        return False
+    return not tag.endswith("0003") or value in MAPI_ERROR_CODES
+
+
+def get_properties(item, projection: str) -> Dict[str, Any]:
+    """Read every tag in a projection with one GetProperties call.
+
+    Falls back to one GetProperty per tag if GetProperties is unavailable.
+
+    Args:
+        item: Outlook item, recipient or attachment with a PropertyAccessor
+        projection: Key into PROJECTIONS
+
+    Returns:
+        Dict of field name -> value (None where the property is missing)
+    """
+    fields = PROJECTIONS[projection]
+    tags = list(fields.values())
+    accessor = item.PropertyAccessor
+    try:
+        values = list(accessor.GetProperties(tags))
+        if len(values) != len(tags):
+            raise ValueError("GetProperties returned wrong number of values")
+    except Exception:
+        values = []
+        for tag in tags:
+            try:
+                values.append(accessor.GetProperty(tag))
+            except Exception:
+                values.append(None)
+    return {
+        name: None if is_property_error(tag, value) else value
+        for (name, tag), value in zip(fields.items(), values)
+    }
@@ -0,0 +1,222 @@
+"""Query result cache.
+
+During a triage session agents repeat the same search (``search_outlook_direct``,
+``get_inbox_emails_by_domain``, ``get_dms_emails``...) within a minute,
+and each repeat re-runs the Restrict and converts every message again.
+QueryCache keeps recent results of SearchClient and DMSClient queries,
+keyed on the method and its normalized parameters, in a bounded LRU.
+
+Every entry is tagged with the folders it read (see ``folder_tag`` and
+``dms_tag``). The server's own triage, move and filing operations
+invalidate exactly the folders they touch; changes made outside
+effi-mail (new mail, Outlook rules, the user) are picked up when the
+entry's TTL expires.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Union
+
+from outlook_client.folder_cache import folder_key
+
+INBOX_TAG = "inbox"
+SENT_TAG = "sent items"
+DMS_TAG = "dms"
+
+# Folders whose categories triage writes can change when the message's
+# folder is not known
+DEFAULT_FOLDER_TAGS = (INBOX_TAG, SENT_TAG)
+
+
+def folder_tag(folder: str) -> str:
+    r"""Tag for a mailbox folder, resolved the way search_outlook resolves it.
+
+    "Sent"/"Sent Items" paths start at Sent Items; every other path
+    (including bare names) starts at the Inbox, e.g. "Inbox\~Zero\Acme"
+    -> "inbox\~zero\acme". A Folder.FolderPath ("\\<store>\...") drops
+    its store root, whatever the store is called.
+    """
+    path = (folder or "").replace("/", "\\")
+    parts = [p for p in path.split("\\") if p]
+    if len(parts) > 1 and (path.startswith("\\\\") or "@" in parts[0]):
+        parts = parts[1:]
+    if not parts:
+        return INBOX_TAG
+    root = SENT_TAG if parts[0].lower() in ("sent", "sent items") else INBOX_TAG
+    if len(parts) == 1:
+        return root
+    return folder_key([root] + parts[1:])
+
+
+def dms_tag(client: str = None, matter: str = None) -> str:
+    """Tag for the DMS tree, one client or one matter."""
+    parts = [DMS_TAG]
+    if client:
+        parts.append(client)
+        if matter:
+            parts.append(matter)
+    return folder_key(parts)
+
+
+def dms_tags(client: str, matter: str) -> tuple:
+    """Tags invalidated by filing into a matter: it, its client and the whole tree."""
+    return (dms_tag(), dms_tag(client), dms_tag(client, matter))
+
+
+def normalize_value(value: Any) -> Hashable:
+    """Make a parameter value hashable and case-insensitive.
+
+    Strings are lowercased and stripped, collections become sorted tuples
+    (order of domains or skip ids does not change a query), datetimes are
+    kept as they are.
+    """
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(sorted((normalize_value(v) for v in value), key=repr))
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize_value(v)) for k, v in value.items()))
+    return value
+
+
+class QueryCache:
+    """Thread-safe LRU of query results with folder tags and a TTL.
+
+    Args:
+        ttl: Seconds a result is served before the query runs again
+        max_entries: Maximum number of cached results (0 disables caching)
+    """
+
+    def __init__(self, ttl: float = 60, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        # key -> (expires_at, result, tags)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped by every invalidation; results computed across one are not stored
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl > 0
+
+    @staticmethod
+    def _copy(result):
+        return list(result) if isinstance(result, list) else result
+
+    def get_or_run(self, key: Hashable, tags: Iterable[str], run: Callable[[], Any]):
+        """Return the cached result for key, or run the query and cache it.
+
+        Lists are copied on the way in and out, so callers may sort or
+        slice what they get back.
+        """
+        if not self.enabled:
+            return run()
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._copy(cached[1])
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+            generation = self._generation
+
+        result = run()
+
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic() + self.ttl, self._copy(result), frozenset(tags))
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop results that read any of the given folder tags (all without tags).
+
+        Returns:
+            Number of results dropped
+        """
+        wanted = set(tags)
+        with self._lock:
+            self._generation += 1
+            self.invalidations += 1
+            if not wanted:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            stale = [key for key, (_, _, entry_tags) in self._entries.items() if entry_tags & wanted]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        """Drop all entries and reset statistics."""
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.expirations = 0
+            self.invalidations = 0
+
+    def stats(self) -> Dict[str, Union[int, float]]:
+        """Return hit/miss statistics for the metrics surface."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+def memoized_query(tags: Callable[[Dict[str, Any]], Iterable[str]]):
+    """Serve a client query method from the client's query_cache.
+
+    The cache key is the method name plus its bound, defaulted and
+    normalized arguments. ``tags`` maps the bound arguments to the folder
+    tags the query reads. Without a query_cache on the client the method
+    runs as before.
+    """
+    def decorate(method):
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self.query_cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = dict(bound.arguments)
+            del params["self"]
+            key = (method.__name__, tuple((name, normalize_value(v)) for name, v in params.items()))
+            return cache.get_or_run(key, tags(params), lambda: method(self, *args, **kwargs))
+
+        return wrapper
+
+    return decorate
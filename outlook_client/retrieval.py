@@ -1,62 +1,116 @@
 """Retrieval client for fetching emails from Outlook."""
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Generator, Dict, Any
+from functools import partial
+from typing import List, Optional, Generator, Dict, Any, Tuple
 import os
 import mimetypes
 
 from outlook_client.base import BaseOutlookClient
+from outlook_client.properties import get_properties
 from models import Email
 
 
 class RetrievalClient(BaseOutlookClient):
     """Client for email retrieval operations."""
     
-    def _set_recipient_domains(self, limit: int = 200) -> dict:
-        """Set RecipientDomain custom property on recent Sent Items."""
+    def stamp_recipient_domains(
+        self,
+        sent_from: datetime = None,
+        sent_before: datetime = None,
+        limit: int = 200,
+        scan_limit: int = None,
+        newest_first: bool = True,
+    ) -> Dict[str, Any]:
+        """Set the RecipientDomain custom property on Sent Items.
+        
+        Items that already have the property are skipped. Both bounds are
+        inclusive (Jet dates have minute precision), so callers can resume
+        from the SentOn of the last item seen without missing any.
+        
+        Args:
+            sent_from: Only items sent at or after this time
+            sent_before: Only items sent at or before this time
+            limit: Stop after stamping this many items
+            scan_limit: Stop after examining this many items (default 10 x limit)
+            newest_first: Walk newest to oldest (False walks oldest to newest)
+        
+        Returns:
+            Dict with processed/updated counts, newest_sent/oldest_sent of
+            the items examined, and more=True if a limit stopped the walk
+        """
         self._ensure_connection()
         
         sent_folder = self._namespace.GetDefaultFolder(self.FOLDER_SENT)
         messages = sent_folder.Items
-        messages.Sort("[SentOn]", True)
+        messages.Sort("[SentOn]", newest_first)
+        
+        conditions = []
+        if sent_from:
+            conditions.append(f"[SentOn] >= '{sent_from.strftime('%d/%m/%Y %H:%M')}'")
+        if sent_before:
+            conditions.append(f"[SentOn] <= '{sent_before.strftime('%d/%m/%Y %H:%M')}'")
+        if conditions:
+            messages = messages.Restrict(" AND ".join(conditions))
         
-        prop_path = "http://schemas.microsoft.com/mapi/string/{00020329-0000-0000-C000-000000000046}/RecipientDomain"
+        scan_limit = scan_limit or limit * 10
         processed = 0
         updated = 0
+        newest_sent = None
+        oldest_sent = None
+        more = False
         
         for message in messages:
-            if processed >= limit:
+            if updated >= limit or processed >= scan_limit:
+                more = True
                 break
             processed += 1
             
             try:
+                sent_on = message.SentOn
+                if hasattr(sent_on, 'replace'):
+                    sent_on = sent_on.replace(tzinfo=None)
+                if newest_sent is None or sent_on > newest_sent:
+                    newest_sent = sent_on
+                if oldest_sent is None or sent_on < oldest_sent:
+                    oldest_sent = sent_on
+                
                 try:
-                    existing = message.PropertyAccessor.GetProperty(prop_path)
+                    existing = message.PropertyAccessor.GetProperty(self.RECIPIENT_DOMAIN_PROP)
                     if existing:
                         continue
                 except:
                     pass
                 
-                domains = set()
-                for recipient in message.Recipients:
-                    try:
-                        email = self._get_recipient_email(recipient)
-                        if email and "@" in email:
-                            domain = email.split("@")[-1].lower()
-                            domains.add(domain)
-                    except:
-                        continue
+                recipient_lists = self._extract_recipient_lists(message)
+                domains = {
+                    self._extract_domain(email)
+                    for addresses in recipient_lists.values()
+                    for email in addresses
+                    if "@" in email
+                }
                 
                 if domains:
                     domain_str = ";".join(sorted(domains))
-                    message.PropertyAccessor.SetProperty(prop_path, domain_str)
+                    message.PropertyAccessor.SetProperty(self.RECIPIENT_DOMAIN_PROP, domain_str)
                     message.Save()
                     updated += 1
                     
             except:
                 continue
         
-        return {"processed": processed, "updated": updated}
+        return {
+            "processed": processed,
+            "updated": updated,
+            "newest_sent": newest_sent,
+            "oldest_sent": oldest_sent,
+            "more": more,
+        }
+    
+    def _set_recipient_domains(self, limit: int = 200) -> dict:
+        """Set RecipientDomain custom property on recent Sent Items."""
+        result = self.stamp_recipient_domains(limit=limit, scan_limit=limit)
+        return {"processed": result["processed"], "updated": result["updated"]}
     
     def get_emails(self, days: int = 7, folder_id: int = None, 
                    exclude_categories: List[str] = None, direction: str = "inbound",
@@ -91,6 +145,9 @@ class RetrievalClient(BaseOutlookClient):
         messages = folder.Items
         messages.Sort("[ReceivedTime]", True)
         filtered = messages.Restrict(filter_str)
+        # No row limit here (callers stop when they have enough), so
+        # previews are read from the table in step with the scan
+        previews = self._stream_body_previews(folder, filter_str)
         
         exclude_categories = exclude_categories or []
         
@@ -104,21 +161,94 @@ class RetrievalClient(BaseOutlookClient):
                 if direction == "outbound":
                     recipient_domain = self._get_primary_recipient_domain(message)
                 
-                email = self._message_to_email(message, folder_path, direction, recipient_domain)
+                email = self._message_to_email(message, folder_path, direction, recipient_domain,
+                                               previews=previews)
                 if email:
                     yield email
-            except:
+            except Exception:
                 continue
     
+    def _scan_conversation_folder(
+        self,
+        folder,
+        direction: str,
+        folder_path: str,
+        filter_str: str,
+        conversation_id: str,
+        limit: int,
+        lazy_body: bool = False,
+    ) -> List[Email]:
+        """Collect up to limit emails in one folder matching a conversation."""
+        results = []
+        try:
+            messages = folder.Items.Restrict(filter_str)
+            for message in messages:
+                if len(results) >= limit:
+                    break
+                msg_conv_id = getattr(message, 'ConversationID', None)
+                if msg_conv_id != conversation_id:
+                    continue
+                if direction == "outbound":
+                    recipient_domain = self._get_primary_recipient_domain(message)
+                    email = self._message_to_email(message, folder_path, direction, recipient_domain,
+                                                   lazy_body=lazy_body)
+                else:
+                    email = self._message_to_email(message, folder_path, direction, lazy_body=lazy_body)
+                if email:
+                    results.append(email)
+        except Exception:
+            pass
+        return results
+    
+    def _scan_conversation_in(
+        self,
+        location: Tuple[str, Any],
+        filter_str: str,
+        conversation_id: str,
+        limit: int,
+        lazy_body: bool = False,
+    ) -> List[Email]:
+        """Resolve a folder location on this client's connection and scan it.
+        
+        Args:
+            location: ("default", folder constant) or ("dms", top-level DMS folder name)
+        """
+        self._ensure_connection()
+        kind, key = location
+        if kind == "dms":
+            dms_store = self._get_dms_store()
+            if not dms_store:
+                return []
+            for folder in dms_store.Folders:
+                if folder.Name == key:
+                    return self._scan_conversation_folder(
+                        folder, "inbound", f"DMS\\{key}", filter_str, conversation_id, limit, lazy_body
+                    )
+            return []
+        folder = self._namespace.GetDefaultFolder(key)
+        direction = "outbound" if key == self.FOLDER_SENT else "inbound"
+        return self._scan_conversation_folder(
+            folder, direction, folder.Name, filter_str, conversation_id, limit, lazy_body
+        )
+    
     def get_emails_by_conversation_id(
         self,
         conversation_id: str,
         include_sent: bool = True,
         include_dms: bool = False,
         limit: int = 50,
-        conversation_topic: str = None
+        conversation_topic: str = None,
+        lazy_body: bool = False,
     ) -> List[Email]:
-        """Get all emails matching a ConversationID across folders."""
+        """Get all emails matching a ConversationID across folders.
+        
+        With a read_pool configured, Inbox, Sent Items and each DMS folder
+        are scanned concurrently and merged newest-first by ReceivedTime.
+        
+        Args:
+            lazy_body: Defer reading Body until body_preview is used, for
+                callers that only need ids, dates and folders
+        """
         self._ensure_connection()
         
         results = []
@@ -129,34 +259,38 @@ class RetrievalClient(BaseOutlookClient):
         escaped_topic = conversation_topic.replace("'", "''")
         filter_str = f"[ConversationTopic] = '{escaped_topic}'"
         
-        def search_folder(folder, direction: str, folder_path: str = None):
-            nonlocal results
-            if folder_path is None:
-                folder_path = folder.Name
-            try:
-                messages = folder.Items.Restrict(filter_str)
-                for message in messages:
-                    if len(results) >= limit:
-                        return
-                    msg_conv_id = getattr(message, 'ConversationID', None)
-                    if msg_conv_id != conversation_id:
-                        continue
-                    if direction == "outbound":
-                        recipient_domain = self._get_primary_recipient_domain(message)
-                        email = self._message_to_email(message, folder_path, direction, recipient_domain)
-                    else:
-                        email = self._message_to_email(message, folder_path, direction)
-                    if email:
-                        results.append(email)
-            except Exception:
-                pass
+        if self.read_pool is not None:
+            locations = [("default", self.FOLDER_INBOX)]
+            if include_sent:
+                locations.append(("default", self.FOLDER_SENT))
+            if include_dms:
+                try:
+                    dms_store = self._get_dms_store()
+                    if dms_store:
+                        locations.extend(("dms", folder.Name) for folder in dms_store.Folders)
+                except Exception:
+                    pass
+            client_cls = type(self)
+            return self.read_pool.scan_merged(
+                client_cls,
+                [
+                    partial(client_cls._scan_conversation_in, location=location, filter_str=filter_str,
+                            conversation_id=conversation_id, limit=limit, lazy_body=lazy_body)
+                    for location in locations
+                ],
+                limit=limit,
+            )
         
         inbox = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
-        search_folder(inbox, "inbound")
+        results.extend(self._scan_conversation_folder(
+            inbox, "inbound", inbox.Name, filter_str, conversation_id, limit, lazy_body
+        ))
         
         if include_sent and len(results) < limit:
             sent = self._namespace.GetDefaultFolder(self.FOLDER_SENT)
-            search_folder(sent, "outbound")
+            results.extend(self._scan_conversation_folder(
+                sent, "outbound", sent.Name, filter_str, conversation_id, limit - len(results), lazy_body
+            ))
         
         if include_dms and len(results) < limit:
             try:
@@ -166,7 +300,10 @@ class RetrievalClient(BaseOutlookClient):
                         if len(results) >= limit:
                             break
                         folder_path = f"DMS\\{folder.Name}"
-                        search_folder(folder, "inbound", folder_path)
+                        results.extend(self._scan_conversation_folder(
+                            folder, "inbound", folder_path, filter_str, conversation_id, limit - len(results),
+                            lazy_body
+                        ))
             except Exception:
                 pass
         
@@ -206,33 +343,49 @@ class RetrievalClient(BaseOutlookClient):
         except Exception as e:
             return f"Error retrieving email HTML: {e}"
     
-    def get_email_full(self, email_id: str) -> Dict[str, Any]:
-        """Get full email details by EntryID including body and attachments."""
+    def get_email_full(self, email_id: str, include_body: bool = True,
+                       max_body_length: Optional[int] = None) -> Dict[str, Any]:
+        """Get full email details by EntryID including body and attachments.
+        
+        Args:
+            email_id: Outlook EntryID
+            include_body: Read Body and HTMLBody (skipped entirely when False)
+            max_body_length: Cut body and html_body to this many characters
+                as soon as they are read; body_truncated is set if cut
+        """
         self._ensure_connection()
         
         try:
             message = self._namespace.GetItemFromID(email_id)
             
-            body = message.Body or ""
-            
-            try:
-                html_body = message.HTMLBody or ""
-            except Exception:
-                html_body = ""
+            body = ""
+            html_body = ""
+            body_truncated = False
+            if include_body:
+                body = message.Body or ""
+                try:
+                    html_body = message.HTMLBody or ""
+                except Exception:
+                    html_body = ""
+                if max_body_length:
+                    if len(body) > max_body_length:
+                        body = body[:max_body_length] + f"... [{len(body) - max_body_length} more chars]"
+                        body_truncated = True
+                    html_body = html_body[:max_body_length]
             
             attachments = []
             try:
-                for i in range(1, message.Attachments.Count + 1):
-                    att = message.Attachments.Item(i)
+                for details in self._read_attachment_details(message):
                     attachments.append({
-                        "name": att.FileName,
-                        "size": att.Size,
+                        "name": details["name"],
+                        "size": details["size"],
                     })
             except Exception:
                 pass
             
-            recipients_to = self._extract_recipients(message, "To")
-            recipients_cc = self._extract_recipients(message, "CC")
+            recipient_lists = self._extract_recipient_lists(message)
+            recipients_to = recipient_lists["To"]
+            recipients_cc = recipient_lists["CC"]
             
             message_class = getattr(message, 'MessageClass', 'IPM.Note')
             
@@ -247,12 +400,18 @@ class RetrievalClient(BaseOutlookClient):
                 "recipients_to": recipients_to,
                 "recipients_cc": recipients_cc,
                 "attachments": attachments,
-                "internet_message_id": self._get_internet_message_id(message),
+                "internet_message_id": get_properties(message, "message")["internet_message_id"],
                 "conversation_id": getattr(message, 'ConversationID', None),
                 "conversation_topic": getattr(message, 'ConversationTopic', None),
                 "message_class": message_class,
             }
             
+            if body_truncated:
+                result["body_truncated"] = True
+            if not include_body:
+                result.pop("body")
+                result.pop("html_body")
+            
             if message_class.startswith('IPM.Schedule.Meeting'):
                 result["is_meeting_request"] = True
                 try:
@@ -285,7 +444,11 @@ class RetrievalClient(BaseOutlookClient):
         limit: int = 200,
         group_by_domain: bool = True,
     ) -> Dict[str, Any]:
-        """Get inbound emails that haven't been triaged (no effi: category)."""
+        """Get inbound emails that haven't been triaged (no effi: category).
+        
+        The untriaged predicate is part of the store query (see
+        _pending_query), so triaged messages are never enumerated.
+        """
         self._ensure_connection()
         
         folder = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
@@ -293,16 +456,10 @@ class RetrievalClient(BaseOutlookClient):
         if not date_from:
             date_from = datetime.now() - timedelta(days=days)
         
-        date_str = date_from.strftime("%d/%m/%Y %H:%M")
-        date_query = f"[ReceivedTime] >= '{date_str}'"
-        
         messages = folder.Items
         messages.Sort("[ReceivedTime]", True)
         
-        try:
-            filtered = messages.Restrict(date_query)
-        except:
-            filtered = messages
+        filtered, previews = self._restrict_pending(folder, messages, date_from, max_rows=limit)
         
         pending_emails = []
         
@@ -311,12 +468,10 @@ class RetrievalClient(BaseOutlookClient):
                 break
             
             try:
-                categories = message.Categories or ""
-                has_triage = any(cat.strip().startswith(self.TRIAGE_CATEGORY_PREFIX) 
-                                for cat in categories.split(",") if cat.strip())
-                
-                if not has_triage:
-                    email = self._message_to_email(message, folder.Name, "inbound")
+                # Cheap re-check; only matters if the store ignored the
+                # Keywords predicate and we fell back to a date filter
+                if not self._has_triage_category(message.Categories):
+                    email = self._message_to_email(message, folder.Name, "inbound", previews=previews)
                     if email:
                         pending_emails.append(email)
             except:
@@ -352,22 +507,27 @@ class RetrievalClient(BaseOutlookClient):
         limit: Optional[int] = None,
         pending_only: bool = True,
     ) -> Dict[str, Any]:
-        """Fast method to get domain counts from emails."""
+        """Fast method to get domain counts from emails.
+        
+        With pending_only, triaged messages are excluded by the store query.
+        """
         self._ensure_connection()
         
         folder = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
         
         date_from = datetime.now() - timedelta(days=days)
-        date_str = date_from.strftime("%d/%m/%Y %H:%M")
-        date_query = f"[ReceivedTime] >= '{date_str}'"
         
         messages = folder.Items
         messages.Sort("[ReceivedTime]", True)
         
-        try:
-            filtered = messages.Restrict(date_query)
-        except:
-            filtered = messages
+        if pending_only:
+            filtered, _ = self._restrict_pending(folder, messages, date_from, with_previews=False)
+        else:
+            date_str = date_from.strftime("%d/%m/%Y %H:%M")
+            try:
+                filtered = messages.Restrict(f"[ReceivedTime] >= '{date_str}'")
+            except:
+                filtered = messages
         
         domain_data: Dict[str, Dict] = {}
         scanned = 0
@@ -378,12 +538,8 @@ class RetrievalClient(BaseOutlookClient):
             scanned += 1
             
             try:
-                if pending_only:
-                    categories = message.Categories or ""
-                    has_triage = any(cat.strip().startswith(self.TRIAGE_CATEGORY_PREFIX) 
-                                    for cat in categories.split(",") if cat.strip())
-                    if has_triage:
-                        continue
+                if pending_only and self._has_triage_category(message.Categories):
+                    continue
                 
                 sender_email = self._get_sender_email(message)
                 domain = self._extract_domain(sender_email)
@@ -415,6 +571,117 @@ class RetrievalClient(BaseOutlookClient):
             "total_pending": sum(d["count"] for d in domain_data.values())
         }
     
+    def _inbox_entry_ids(self, folder) -> set:
+        """Read every EntryID in a folder (one table column, no item loads)."""
+        try:
+            table = folder.GetTable()
+            columns = table.Columns
+            columns.RemoveAll()
+            columns.Add("EntryID")
+            entry_ids = set()
+            while table.EndOfTable is False:
+                entry_ids.add(table.GetNextRow().GetValues()[0])
+            return entry_ids
+        except Exception:
+            return {message.EntryID for message in folder.Items}
+    
+    def refresh_domain_stats(self, store, full: bool = False) -> Dict[str, Any]:
+        """Bring a DomainStatsStore up to date with the Inbox.
+        
+        Only messages modified since the store's watermark are read (new
+        mail, and messages whose categories changed); senders of messages
+        already in the store are not resolved again. If the store then
+        holds more messages than the Inbox, the missing ones are found with
+        an EntryID-only table sweep and dropped. The store is loaded from
+        its file on first use; if it has no watermark yet, or full=True,
+        it is rebuilt from the whole Inbox.
+        
+        Args:
+            store: DomainStatsStore to update (saved afterwards if it has a path)
+            full: Clear the store and rescan everything
+            
+        Returns:
+            Dict with messages read, senders resolved, messages removed,
+            store size and whether this was a full scan
+        """
+        self._ensure_connection()
+        
+        folder = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
+        started = datetime.now()
+        
+        if not store.loaded:
+            store.load()
+        if full:
+            store.clear()
+        full = store.watermark is None
+        
+        messages = folder.Items
+        if not full:
+            watermark_str = store.watermark.strftime("%d/%m/%Y %H:%M")
+            messages = messages.Restrict(f"[LastModificationTime] >= '{watermark_str}'")
+        
+        read = 0
+        resolved = 0
+        newest = store.watermark
+        
+        for message in messages:
+            try:
+                entry_id = message.EntryID
+                received = message.ReceivedTime
+                modified = message.LastModificationTime
+                if hasattr(received, 'replace'):
+                    received = received.replace(tzinfo=None)
+                if hasattr(modified, 'replace'):
+                    modified = modified.replace(tzinfo=None)
+                
+                domain = store.domain_of(entry_id)
+                if domain is None:
+                    domain = self._extract_domain(self._get_sender_email(message))
+                    resolved += 1
+                
+                store.upsert(
+                    entry_id,
+                    domain,
+                    received,
+                    message.Subject or "(No Subject)",
+                    pending=not self._has_triage_category(message.Categories),
+                )
+                read += 1
+                if newest is None or modified > newest:
+                    newest = modified
+            except:
+                continue
+        
+        removed = 0
+        try:
+            inbox_count = folder.Items.Count
+        except Exception:
+            inbox_count = None
+        if isinstance(inbox_count, int) and inbox_count < len(store):
+            present = self._inbox_entry_ids(folder)
+            for entry_id in store.entry_ids():
+                if entry_id not in present and store.remove(entry_id):
+                    removed += 1
+        
+        # upsert()/remove() flag real changes; the messages re-read from the
+        # inclusive watermark minute don't, so an idle refresh writes nothing
+        watermark = newest or started
+        if full or watermark != store.watermark:
+            store.mark_dirty()
+        store.watermark = watermark
+        store.last_refresh = started
+        if full:
+            store.last_full_scan = started
+        store.save()
+        
+        return {
+            "read": read,
+            "resolved": resolved,
+            "removed": removed,
+            "messages": len(store),
+            "full_scan": full,
+        }
+    
     def download_attachment(self, email_id: str, attachment_name: str, 
                            save_path: Optional[str] = None) -> Dict[str, Any]:
         """Download an attachment from an email and save it to disk."""
@@ -500,6 +767,25 @@ class RetrievalClient(BaseOutlookClient):
         except Exception as e:
             return {"success": False, "error": f"Failed to save attachment: {e}"}
     
+    def _read_attachment_details(self, message) -> List[Dict[str, Any]]:
+        """Read name, size, content-ID and MIME type for each attachment.
+        
+        Each attachment's properties are fetched with one batched call;
+        name and size fall back to the object model if missing.
+        """
+        details = []
+        attachment_collection = message.Attachments
+        for i in range(1, attachment_collection.Count + 1):
+            att = attachment_collection.Item(i)
+            props = get_properties(att, "attachment_detail")
+            details.append({
+                "name": props["filename"] or att.FileName,
+                "size": props["size"] if props["size"] is not None else att.Size,
+                "content_id": props["content_id"],
+                "mime_type": props["mime_type"],
+            })
+        return details
+    
     def list_attachments(self, email_id: str) -> Dict[str, Any]:
         """List all attachments for an email with details."""
         self._ensure_connection()
@@ -510,9 +796,8 @@ class RetrievalClient(BaseOutlookClient):
             return {"success": False, "error": f"Email not found: {e}"}
         
         attachments = []
-        for i in range(1, message.Attachments.Count + 1):
-            att = message.Attachments.Item(i)
-            filename = att.FileName
+        for details in self._read_attachment_details(message):
+            filename = details["name"]
             lower_name = filename.lower()
             
             doc_extensions = ('.docx', '.doc', '.pdf', '.xlsx', '.xls', 
@@ -520,13 +805,13 @@ class RetrievalClient(BaseOutlookClient):
             is_document = lower_name.endswith(doc_extensions)
             
             is_image = lower_name.endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp'))
-            is_inline = is_image and lower_name.startswith('image')
+            is_inline = is_image and (bool(details["content_id"]) or lower_name.startswith('image'))
             
-            content_type, _ = mimetypes.guess_type(filename)
+            content_type = details["mime_type"] or mimetypes.guess_type(filename)[0]
             
             attachments.append({
                 "name": filename,
-                "size": att.Size,
+                "size": details["size"],
                 "content_type": content_type or "application/octet-stream",
                 "is_document": is_document,
                 "is_inline_image": is_inline
@@ -539,3 +824,20 @@ class RetrievalClient(BaseOutlookClient):
             "documents": [a for a in attachments if a["is_document"]],
             "inline_images": [a for a in attachments if a["is_inline_image"]]
         }
+    
+    def list_attachments_many(self, email_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """List attachments for several emails.
+        
+        Returns:
+            Dict of email_id -> list_attachments() result (failures are
+            reported per email with success=False)
+        """
+        results = {}
+        for email_id in email_ids:
+            if email_id in results:
+                continue
+            try:
+                results[email_id] = self.list_attachments(email_id)
+            except Exception as e:
+                results[email_id] = {"success": False, "error": str(e)}
+        return results
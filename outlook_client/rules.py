@@ -0,0 +1,530 @@
+"""Declarative bulk mailbox maintenance rules.
+
+Replaces the one-off ``scripts/*_emails.py`` loops, which tested every
+Inbox message in Python, with a rule file (YAML or JSON)::
+
+    rules:
+      - name: marketing
+        match: {domain_category: Marketing, older_than_days: 7}
+        action: archive
+      - name: law360
+        match: {domains: [law360.com]}
+        action: delete
+      - name: newsletters
+        match: {subject_contains: ["Weekly digest"]}
+        action: categorize
+        category: Newsletter
+
+Match keys (all optional, ANDed; list values are ORed): ``domain_category``
+(expanded through domain_categories.json), ``domains``, ``senders``,
+``subject_contains``, ``older_than_days`` and ``folder`` (source folder
+path, default Inbox). Actions: ``archive`` (move to ``target``, default
+Archive), ``move`` (to ``target``), ``delete`` (to Deleted Items) and
+``categorize`` (add ``category``, or set triage ``status``).
+
+compile_rules() turns the rules into store-side DASL queries: rules with
+the same source folder and action are OR-combined into as few Restrict
+queries as MAX_DASL_LENGTH allows. RulesEngine runs them in batches,
+walking each restricted collection from the end so acted-on messages
+dropping out don't shift the rest. Every action removes the message from
+its query (moved, deleted, or excluded by the category condition), so
+rerunning a query resumes where it stopped; progress and statistics are
+saved after every batch so an interrupted or budget-limited run picks up
+with its totals intact.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from domain_categories import VALID_CATEGORIES
+from outlook_client.query_cache import folder_tag
+from outlook_client.search import MAX_DASL_LENGTH, or_chunks
+
+logger = logging.getLogger(__name__)
+
+try:
+    import yaml
+except ImportError:  # pragma: no cover - PyYAML ships with python-frontmatter
+    yaml = None
+
+ACTIONS = {"archive", "move", "delete", "categorize"}
+MATCH_KEYS = {"domain_category", "domains", "senders", "subject_contains", "older_than_days", "folder"}
+
+FROM_PROP = "urn:schemas:httpmail:fromemail"
+SUBJECT_PROP = "urn:schemas:httpmail:subject"
+RECEIVED_PROP = "urn:schemas:httpmail:datereceived"
+KEYWORDS_PROP = "urn:schemas-microsoft-com:office:office#Keywords"
+
+
+# ----------------------------------------------------------------------
+# Loading and validation
+# ----------------------------------------------------------------------
+
+def _as_list(value) -> List[str]:
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [value]
+    return [str(v) for v in value]
+
+
+def _domain_categories(name: str, values: List[str]) -> List[str]:
+    """Canonical domain category names, matched case-insensitively."""
+    known = {c.lower(): c for c in VALID_CATEGORIES}
+    categories = []
+    for value in values:
+        category = known.get(value.strip().lower())
+        if category is None:
+            raise ValueError(
+                f"Rule '{name}': unknown domain_category '{value}' "
+                f"(expected one of {sorted(VALID_CATEGORIES)})"
+            )
+        categories.append(category)
+    return categories
+
+
+def parse_rules(data: Any) -> List[Dict[str, Any]]:
+    """Validate rule definitions and fill in defaults.
+
+    Args:
+        data: Parsed rule file: a list of rules or a dict with 'rules'
+
+    Returns:
+        List of normalized rule dicts
+
+    Raises:
+        ValueError: If a rule is malformed
+    """
+    rules = data.get("rules") if isinstance(data, dict) else data
+    if not isinstance(rules, list) or not rules:
+        raise ValueError("Rule file must contain a non-empty 'rules' list")
+
+    parsed = []
+    for index, rule in enumerate(rules):
+        if not isinstance(rule, dict):
+            raise ValueError(f"Rule {index + 1} must be a mapping")
+        name = rule.get("name") or f"rule-{index + 1}"
+        match = rule.get("match") or {}
+        unknown = set(match) - MATCH_KEYS
+        if unknown:
+            raise ValueError(f"Rule '{name}': unknown match keys {sorted(unknown)}")
+        action = rule.get("action")
+        if action not in ACTIONS:
+            raise ValueError(f"Rule '{name}': action must be one of {sorted(ACTIONS)}")
+
+        normalized = {
+            "name": name,
+            "folder": match.get("folder") or "Inbox",
+            "domain_categories": _domain_categories(name, _as_list(match.get("domain_category"))),
+            "domains": [d.lower().lstrip("@") for d in _as_list(match.get("domains"))],
+            "senders": [s.lower() for s in _as_list(match.get("senders"))],
+            "subject_contains": _as_list(match.get("subject_contains")),
+            "older_than_days": match.get("older_than_days"),
+            "action": action,
+            "target": rule.get("target") or ("Archive" if action == "archive" else None),
+            "create_path": bool(rule.get("create_path", False)),
+            "category": rule.get("category"),
+            "status": rule.get("status"),
+        }
+        if not (normalized["domain_categories"] or normalized["domains"] or normalized["senders"]
+                or normalized["subject_contains"]):
+            raise ValueError(f"Rule '{name}': match needs a domain, sender or subject condition")
+        if action == "move" and not normalized["target"]:
+            raise ValueError(f"Rule '{name}': move needs a target folder")
+        if action == "categorize" and not (normalized["category"] or normalized["status"]):
+            raise ValueError(f"Rule '{name}': categorize needs a category or status")
+        if normalized["older_than_days"] is not None:
+            normalized["older_than_days"] = int(normalized["older_than_days"])
+        parsed.append(normalized)
+    return parsed
+
+
+def load_rules(path: Union[str, Path]) -> List[Dict[str, Any]]:
+    """Read and validate a YAML or JSON rule file.
+
+    Raises:
+        ValueError: If the file can't be read or a rule is malformed
+    """
+    path = Path(path).expanduser()
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise ValueError(f"Could not read rule file {path}: {e}")
+    if path.suffix.lower() in (".yaml", ".yml"):
+        if yaml is None:
+            raise ValueError("PyYAML is required for YAML rule files")
+        try:
+            data = yaml.safe_load(text)
+        except yaml.YAMLError as e:
+            raise ValueError(f"Invalid YAML in {path}: {e}")
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON in {path}: {e}")
+    return parse_rules(data)
+
+
+# ----------------------------------------------------------------------
+# Compilation
+# ----------------------------------------------------------------------
+
+def _quote(value: str) -> str:
+    return value.replace("'", "''")
+
+
+def _action_key(rule: Dict[str, Any]) -> tuple:
+    return (rule["folder"].lower(), rule["action"], (rule["target"] or "").lower(),
+            rule["create_path"], rule["category"], rule["status"])
+
+
+def _category_for(rule: Dict[str, Any], triage_categories: Dict[str, str]) -> Optional[str]:
+    if rule["action"] != "categorize":
+        return None
+    if rule["status"]:
+        if rule["status"] not in triage_categories:
+            raise ValueError(f"Rule '{rule['name']}': invalid status '{rule['status']}'")
+        return triage_categories[rule["status"]]
+    return rule["category"]
+
+
+def _rule_terms(rule: Dict[str, Any], domains: List[str], now: datetime, limit: int) -> List[str]:
+    """DASL terms for one rule: identity conditions chunked, the rest ANDed to each."""
+    identities = (
+        [f"\"{FROM_PROP}\" LIKE '%@{_quote(d)}'" for d in domains]
+        + [f"\"{FROM_PROP}\" = '{_quote(s)}'" for s in rule["senders"]]
+    )
+    rest = []
+    if rule["subject_contains"]:
+        subjects = [f"\"{SUBJECT_PROP}\" LIKE '%{_quote(s)}%'" for s in rule["subject_contains"]]
+        rest.append("(" + " OR ".join(subjects) + ")")
+    if rule["older_than_days"] is not None:
+        before = now - timedelta(days=rule["older_than_days"])
+        rest.append(f"\"{RECEIVED_PROP}\" < '{before.strftime('%d/%m/%Y %H:%M')}'")
+    suffix = "".join(f" AND {c}" for c in rest)
+
+    if not identities:
+        return ["(" + " AND ".join(rest) + ")"]
+
+    chunks = or_chunks(identities, len("(() )") + len(suffix), limit)
+    return ["((" + " OR ".join(chunk) + ")" + suffix + ")" for chunk in chunks]
+
+
+def compile_rules(
+    rules: List[Dict[str, Any]],
+    domains_for_category: Callable[[str], List[str]],
+    triage_categories: Optional[Dict[str, str]] = None,
+    now: Optional[datetime] = None,
+    max_length: int = MAX_DASL_LENGTH,
+) -> Dict[str, Any]:
+    """Compile rules into grouped store-side DASL queries.
+
+    Rules sharing a source folder and action (including target/category)
+    form one group; their conditions are OR-combined and split only when a
+    query would exceed max_length. Groups keep the order of their first
+    rule.
+
+    Args:
+        rules: Rules from parse_rules()/load_rules()
+        domains_for_category: Returns the domains of a domain category
+            (e.g. ``domain_categories.get_domains_by_category``)
+        triage_categories: Triage status -> category, for 'status' rules
+        now: Reference time for older_than_days (default: now)
+        max_length: Maximum DASL query length
+
+    Returns:
+        Dict with 'signature' (stable hash of the rules), 'groups', each
+        with rule names, folder, action, target, category and queries, and
+        'unmatched_rules': rules whose domain categories have no domains
+    """
+    now = now or datetime.now()
+    triage_categories = triage_categories or {}
+    groups: Dict[tuple, Dict[str, Any]] = {}
+    unmatched = []
+
+    for rule in rules:
+        domains = list(rule["domains"])
+        for category in rule["domain_categories"]:
+            domains += [d.lower() for d in domains_for_category(category)]
+        domains = list(dict.fromkeys(domains))
+        if not (domains or rule["senders"] or rule["subject_contains"]):
+            # A domain category with no domains matches nothing
+            logger.warning(f"Rule '{rule['name']}': domain categories {rule['domain_categories']} have no domains")
+            unmatched.append(rule["name"])
+            continue
+
+        key = _action_key(rule)
+        group = groups.get(key)
+        if group is None:
+            category = _category_for(rule, triage_categories)
+            group = groups[key] = {
+                "rules": [],
+                "folder": rule["folder"],
+                "action": rule["action"],
+                "target": rule["target"],
+                "create_path": rule["create_path"],
+                "category": category,
+                "replace_triage": bool(rule["status"]),
+                "terms": [],
+            }
+        group["rules"].append(rule["name"])
+        group["terms"] += _rule_terms(rule, domains, now, max_length)
+
+    compiled = []
+    for group in groups.values():
+        suffix = ""
+        if group["category"]:
+            # Already-categorised messages drop out, so reruns resume
+            category = _quote(group["category"])
+            suffix = (f" AND (\"{KEYWORDS_PROP}\" IS NULL"
+                      f" OR NOT (\"{KEYWORDS_PROP}\" = '{category}'))")
+        chunks = or_chunks(group.pop("terms"), len("@SQL=()") + len(suffix), max_length)
+        queries = ["@SQL=(" + " OR ".join(chunk) + ")" + suffix for chunk in chunks]
+        group["queries"] = queries
+        compiled.append(group)
+
+    signature = hashlib.sha256(json.dumps(rules, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+    return {"signature": signature, "groups": compiled, "unmatched_rules": unmatched}
+
+
+# ----------------------------------------------------------------------
+# Execution
+# ----------------------------------------------------------------------
+
+class RulesEngine:
+    """Runs compiled rule groups against Outlook in resumable batches.
+
+    Args:
+        client: FoldersClient used to resolve source and target folders
+        progress_path: Optional JSON file holding progress across runs
+        batch_size: Messages processed between progress saves
+    """
+
+    def __init__(
+        self,
+        client,
+        progress_path: Optional[Union[str, Path]] = None,
+        batch_size: int = 100,
+    ):
+        self.client = client
+        self.progress_path = Path(progress_path) if progress_path else None
+        self.batch_size = batch_size
+
+    # ------------------------------------------------------------------
+    # Progress persistence
+    # ------------------------------------------------------------------
+
+    def load_progress(self, signature: str) -> Optional[Dict[str, Any]]:
+        """Return saved progress for these rules, if any."""
+        if not self.progress_path or not self.progress_path.exists():
+            return None
+        try:
+            with open(self.progress_path, "r", encoding="utf-8") as f:
+                progress = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(progress, dict) or progress.get("signature") != signature:
+            return None
+        return progress
+
+    def save_progress(self, progress: Dict[str, Any]):
+        """Write progress atomically."""
+        if not self.progress_path:
+            return
+        try:
+            self.progress_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.progress_path.with_suffix(self.progress_path.suffix + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(progress, f, indent=2)
+            os.replace(tmp_path, self.progress_path)
+        except OSError as e:
+            logger.warning(f"Could not save rules progress {self.progress_path}: {e}")
+
+    def clear_progress(self):
+        """Forget saved progress (next run starts from the first group)."""
+        if self.progress_path and self.progress_path.exists():
+            try:
+                self.progress_path.unlink()
+            except OSError:
+                pass
+
+    # ------------------------------------------------------------------
+    # Running
+    # ------------------------------------------------------------------
+
+    def _source_folder(self, folder_path: str):
+        if folder_path.strip("\\").lower() == "inbox":
+            return self.client._namespace.GetDefaultFolder(self.client.FOLDER_INBOX)
+        resolved = self.client.resolve_folder(folder_path)
+        if "error" in resolved:
+            raise ValueError(resolved["error"])
+        return resolved["folder"]
+
+    def _apply(self, message, group: Dict[str, Any], target_folder):
+        action = group["action"]
+        if action == "delete":
+            message.Delete()
+        elif action in ("archive", "move"):
+            message.Move(target_folder)
+        else:
+            existing = message.Categories or ""
+            categories = [c.strip() for c in existing.split(",") if c.strip()]
+            if group["replace_triage"]:
+                prefix = self.client.TRIAGE_CATEGORY_PREFIX
+                categories = [c for c in categories if not c.startswith(prefix)]
+            if group["category"] not in categories:
+                categories.append(group["category"])
+            message.Categories = ", ".join(categories)
+            message.Save()
+
+    def dry_run(self, plan: Dict[str, Any], sample_size: int = 3) -> Dict[str, Any]:
+        """Count what each group would act on, without changing anything."""
+        self.client._ensure_connection()
+        groups = []
+        for group in plan["groups"]:
+            start = time.perf_counter()
+            stats = {"rules": group["rules"], "action": group["action"], "target": group["target"],
+                     "queries": len(group["queries"]), "matched": 0, "sample_subjects": []}
+            try:
+                folder = self._source_folder(group["folder"])
+                for query in group["queries"]:
+                    items = folder.Items.Restrict(query)
+                    count = items.Count
+                    stats["matched"] += count
+                    for index in range(1, min(count, sample_size - len(stats["sample_subjects"])) + 1):
+                        stats["sample_subjects"].append(items.Item(index).Subject)
+            except Exception as e:
+                stats["error"] = str(e)
+            stats["elapsed"] = round(time.perf_counter() - start, 3)
+            groups.append(stats)
+        return {
+            "dry_run": True,
+            "groups": groups,
+            "total_matched": sum(g["matched"] for g in groups),
+            "queries": sum(g["queries"] for g in groups),
+            "unmatched_rules": plan.get("unmatched_rules", []),
+        }
+
+    def run(
+        self,
+        plan: Dict[str, Any],
+        max_items: Optional[int] = None,
+        resume: bool = True,
+    ) -> Dict[str, Any]:
+        """Apply the plan, stopping after max_items messages.
+
+        Progress is saved after every batch, so a run stopped by the budget
+        or a crash continues from its current group on the next call.
+
+        Returns:
+            Report with per-group processed/failed counts and throughput,
+            and 'complete' once every group has run
+        """
+        self.client._ensure_connection()
+        progress = self.load_progress(plan["signature"]) if resume else None
+        if progress is None:
+            progress = {
+                "signature": plan["signature"],
+                "started": datetime.now().isoformat(),
+                "completed_groups": [],
+                "groups": {},
+            }
+
+        budget = max_items
+        run_processed = 0
+        touched = set()
+        run_start = time.perf_counter()
+        stopped = False
+
+        for index, group in enumerate(plan["groups"]):
+            key = str(index)
+            stats = progress["groups"].setdefault(key, {
+                "rules": group["rules"], "action": group["action"], "target": group["target"],
+                "processed": 0, "failed": 0, "elapsed": 0.0, "errors": [],
+            })
+            if index in progress["completed_groups"]:
+                continue
+
+            group_start = time.perf_counter()
+            try:
+                folder = self._source_folder(group["folder"])
+                target_folder = None
+                if group["action"] in ("archive", "move"):
+                    resolved = self.client.resolve_folder(group["target"], create_path=group["create_path"])
+                    if "error" in resolved:
+                        raise ValueError(resolved["error"])
+                    target_folder = resolved["folder"]
+
+                touched.add(folder_tag(group["folder"]))
+                if target_folder is not None:
+                    touched.add(folder_tag(group["target"]))
+                for query in group["queries"]:
+                    items = folder.Items.Restrict(query)
+                    since_save = 0
+                    for position in range(items.Count, 0, -1):
+                        if budget is not None and budget <= 0:
+                            stopped = True
+                            break
+                        try:
+                            self._apply(items.Item(position), group, target_folder)
+                            stats["processed"] += 1
+                        except Exception as e:
+                            stats["failed"] += 1
+                            if len(stats["errors"]) < 10:
+                                stats["errors"].append(str(e))
+                        run_processed += 1
+                        since_save += 1
+                        if budget is not None:
+                            budget -= 1
+                        if since_save >= self.batch_size:
+                            stats["elapsed"] += time.perf_counter() - group_start
+                            group_start = time.perf_counter()
+                            self.save_progress(progress)
+                            since_save = 0
+                    if stopped:
+                        break
+            except Exception as e:
+                stats["error"] = str(e)
+            stats["elapsed"] += time.perf_counter() - group_start
+
+            if stopped:
+                break
+            progress["completed_groups"].append(index)
+            self.save_progress(progress)
+
+        if run_processed:
+            self.client._invalidate_queries(*touched)
+
+        complete = not stopped
+        if complete:
+            self.clear_progress()
+        else:
+            self.save_progress(progress)
+
+        groups = []
+        for key, stats in sorted(progress["groups"].items(), key=lambda kv: int(kv[0])):
+            report = dict(stats)
+            report["elapsed"] = round(stats["elapsed"], 3)
+            report["items_per_second"] = (
+                round(stats["processed"] / stats["elapsed"], 1) if stats["elapsed"] > 0 else None
+            )
+            groups.append(report)
+        run_elapsed = time.perf_counter() - run_start
+        return {
+            "dry_run": False,
+            "complete": complete,
+            "groups": groups,
+            "run_processed": run_processed,
+            "total_processed": sum(g["processed"] for g in groups),
+            "total_failed": sum(g["failed"] for g in groups),
+            "elapsed": round(run_elapsed, 3),
+            "items_per_second": round(run_processed / run_elapsed, 1) if run_elapsed > 0 else None,
+            "started": progress["started"],
+            "unmatched_rules": plan.get("unmatched_rules", []),
+        }
@@ -1,18 +1,58 @@
 """Search client for Outlook DASL queries and searches."""
 
 from datetime import datetime, timedelta
-from typing import List, Optional, Tuple
+from functools import partial
+from typing import Collection, Iterator, List, Optional, Tuple
 
 from outlook_client.base import BaseOutlookClient
+from outlook_client.pool import merge_sorted_by_received
+from outlook_client.query_cache import DEFAULT_FOLDER_TAGS, folder_tag, memoized_query
 from models import Email
 
 
+# Longest DASL filter passed to one Restrict call. OR-combined conditions
+# that would exceed it are split into several queries.
+MAX_DASL_LENGTH = 4000
+
+
+def or_chunks(conditions: List[str], overhead: int, max_length: int = MAX_DASL_LENGTH) -> List[List[str]]:
+    """Split conditions into groups whose OR-combination fits max_length.
+    
+    Args:
+        conditions: DASL conditions to OR-combine
+        overhead: Length of the text wrapped around each " OR "-joined group
+        max_length: Longest query allowed
+    
+    Returns:
+        Lists of conditions, in order; a single over-long condition gets
+        a group of its own
+    """
+    chunks = []
+    current: List[str] = []
+    length = overhead
+    for condition in conditions:
+        added = len(condition) + (len(" OR ") if current else 0)
+        if current and length + added > max_length:
+            chunks.append(current)
+            current = []
+            length = overhead
+            added = len(condition)
+        current.append(condition)
+        length += added
+    if current:
+        chunks.append(current)
+    return chunks
+
+
 class SearchClient(BaseOutlookClient):
     """Client for Outlook search operations using DASL queries."""
     
     # DASL property path for custom RecipientDomain field (PS_PUBLIC_STRINGS namespace)
     RECIPIENT_DOMAIN_PROP = "http://schemas.microsoft.com/mapi/string/{00020329-0000-0000-C000-000000000046}/RecipientDomain"
     
+    # Per-client override of the module limit (tests lower it)
+    MAX_DASL_LENGTH = MAX_DASL_LENGTH
+    
     def _build_query(
         self,
         sender_domain: str = None,
@@ -71,6 +111,7 @@ class SearchClient(BaseOutlookClient):
         jet_query = " AND ".join(jet_conditions) if jet_conditions else None
         return (jet_query, None)
     
+    @memoized_query(lambda p: (folder_tag(p["folder"]),))
     def search_outlook(
         self,
         sender_domain: str = None,
@@ -84,8 +125,15 @@ class SearchClient(BaseOutlookClient):
         days: int = 30,
         folder: str = "Inbox",
         limit: int = 50,
+        received_before: datetime = None,
+        skip_ids: Collection[str] = (),
     ) -> List[Email]:
-        """Search Outlook directly with flexible filters."""
+        """Search Outlook directly with flexible filters.
+        
+        received_before/skip_ids continue from a pagination cursor: only
+        messages received at or before that time, minus those already
+        returned at exactly that time, are considered.
+        """
         self._ensure_connection()
         
         direction = "inbound"
@@ -120,6 +168,7 @@ class SearchClient(BaseOutlookClient):
         
         if not date_from:
             date_from = datetime.now() - timedelta(days=days)
+        date_to = self._page_date_to(date_to, received_before)
         
         jet_query, dasl_query = self._build_query(
             sender_domain=sender_domain,
@@ -136,23 +185,22 @@ class SearchClient(BaseOutlookClient):
         messages = folder_obj.Items
         messages.Sort("[ReceivedTime]", True)
         
+        filter_str = dasl_query or jet_query
         try:
-            if dasl_query:
-                filtered = messages.Restrict(dasl_query)
-            elif jet_query:
-                filtered = messages.Restrict(jet_query)
-            else:
-                filtered = messages
+            filtered = messages.Restrict(filter_str) if filter_str else messages
         except Exception:
             date_str = date_from.strftime("%d/%m/%Y %H:%M")
-            filtered = messages.Restrict(f"[ReceivedTime] >= '{date_str}'")
+            filter_str = f"[ReceivedTime] >= '{date_str}'"
+            filtered = messages.Restrict(filter_str)
         
-        for message in filtered:
+        previews = self._read_body_previews(folder_obj, filter_str, max_rows=limit)
+        
+        for message in self._page_after_cursor(filtered, received_before, skip_ids):
             if len(results) >= limit:
                 break
             
             try:
-                email = self._message_to_email(message, folder_obj.Name, direction)
+                email = self._message_to_email(message, folder_obj.Name, direction, previews=previews)
                 if email:
                     results.append(email)
             except:
@@ -160,6 +208,117 @@ class SearchClient(BaseOutlookClient):
         
         return results
     
+    def _page_date_to(self, date_to: datetime = None, received_before: datetime = None) -> datetime:
+        """Upper date bound for a page starting at received_before.
+        
+        Restrict dates have minute precision, so the bound is rounded up a
+        minute; _page_after_cursor drops anything past the cursor.
+        """
+        if received_before is None:
+            return date_to
+        page_end = received_before + timedelta(minutes=1)
+        return min(date_to, page_end) if date_to else page_end
+    
+    def _date_conditions(self, date_from: datetime = None, date_to: datetime = None) -> List[str]:
+        """DASL received-date conditions (same format as _build_query)."""
+        conditions = []
+        if date_from:
+            date_str = date_from.strftime("%d/%m/%Y %H:%M")
+            conditions.append(f"\"urn:schemas:httpmail:datereceived\" >= '{date_str}'")
+        if date_to:
+            date_str = date_to.strftime("%d/%m/%Y %H:%M")
+            conditions.append(f"\"urn:schemas:httpmail:datereceived\" <= '{date_str}'")
+        return conditions
+    
+    def _or_queries(self, conditions: List[str], date_conditions: List[str]) -> List[str]:
+        """OR-combine conditions into as few DASL queries as MAX_DASL_LENGTH allows.
+        
+        Each query is ``@SQL=(c1 OR c2 ...) AND <date conditions>``.
+        """
+        suffix = "".join(f" AND {c}" for c in date_conditions)
+        chunks = or_chunks(conditions, len("@SQL=()") + len(suffix), self.MAX_DASL_LENGTH)
+        
+        return ["@SQL=(" + " OR ".join(chunk) + ")" + suffix for chunk in chunks]
+    
+    def _identifier_queries(
+        self,
+        domains: List[str],
+        contact_emails: List[str],
+        date_from: datetime = None,
+        date_to: datetime = None,
+    ) -> List[Tuple[str, str]]:
+        """Build the (folder, DASL query) scans for an identifier search.
+        
+        Inbox senders matching any domain or contact email are found with one
+        OR-combined query, and Sent Items recipients matching any domain with
+        another (each split only if it would exceed MAX_DASL_LENGTH).
+        """
+        date_conditions = self._date_conditions(date_from, date_to)
+        
+        inbox_conditions = (
+            [f"\"urn:schemas:httpmail:fromemail\" LIKE '%@{domain}'" for domain in domains]
+            + [f"\"urn:schemas:httpmail:fromemail\" LIKE '%{email}%'" for email in contact_emails]
+        )
+        sent_conditions = [
+            f'"{self.RECIPIENT_DOMAIN_PROP}" LIKE \'%{domain}%\'' for domain in domains
+        ]
+        
+        scans = []
+        if inbox_conditions:
+            scans += [("Inbox", q) for q in self._or_queries(inbox_conditions, date_conditions)]
+        if sent_conditions:
+            scans += [("Sent Items", q) for q in self._or_queries(sent_conditions, date_conditions)]
+        return scans
+    
+    def _iter_query(self, folder: str, filter_str: str, limit: int,
+                    received_before: datetime = None,
+                    skip_ids: Collection[str] = ()) -> Iterator[Email]:
+        """Yield emails matching a DASL query newest-first, converting lazily.
+        
+        Args:
+            folder: "Inbox" or "Sent Items"
+            filter_str: DASL query for Items.Restrict
+            limit: Maximum emails to yield
+            received_before: Continue after this pagination cursor time
+            skip_ids: EntryIDs already returned at received_before
+        """
+        self._ensure_connection()
+        
+        if folder == "Sent Items":
+            folder_obj = self._namespace.GetDefaultFolder(self.FOLDER_SENT)
+            direction = "outbound"
+        else:
+            folder_obj = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
+            direction = "inbound"
+        
+        messages = folder_obj.Items
+        messages.Sort("[ReceivedTime]", True)
+        try:
+            filtered = messages.Restrict(filter_str)
+        except Exception:
+            return
+        
+        previews = self._read_body_previews(folder_obj, filter_str, max_rows=limit)
+        
+        count = 0
+        for message in self._page_after_cursor(filtered, received_before, skip_ids):
+            if count >= limit:
+                break
+            try:
+                email = self._message_to_email(message, folder_obj.Name, direction, previews=previews)
+            except:
+                continue
+            if email:
+                count += 1
+                yield email
+    
+    def _scan_query(self, folder: str, filter_str: str, limit: int,
+                    received_before: datetime = None,
+                    skip_ids: Collection[str] = ()) -> List[Email]:
+        """Run one identifier query to completion (used by read-pool workers)."""
+        return list(self._iter_query(folder, filter_str, limit, received_before, skip_ids))
+    
+    @memoized_query(lambda p: DEFAULT_FOLDER_TAGS)
     def search_outlook_by_identifiers(
         self,
         domains: List[str],
@@ -168,51 +327,118 @@ class SearchClient(BaseOutlookClient):
         date_from: datetime = None,
         date_to: datetime = None,
         limit: int = 100,
+        received_before: datetime = None,
+        skip_ids: Collection[str] = (),
     ) -> List[Email]:
-        """Search Outlook for emails matching client domains/contact emails."""
-        results = []
+        """Search Outlook for emails matching client domains/contact emails.
+        
+        All identifiers are OR-combined into one DASL query per folder
+        (Inbox senders, Sent Items recipients), chunked only when a query
+        would exceed MAX_DASL_LENGTH. The folder streams are heap-merged
+        newest-first by ReceivedTime and conversion stops at ``limit``.
+        
+        With a read_pool configured, the folder queries run concurrently
+        and are merged the same way. received_before/skip_ids continue from
+        a pagination cursor, as for search_outlook.
+        """
         contact_emails = contact_emails or []
         
         if not date_from:
             date_from = datetime.now() - timedelta(days=days)
+        date_to = self._page_date_to(date_to, received_before)
         
-        for domain in domains:
-            inbox_results = self.search_outlook(
-                sender_domain=domain,
-                date_from=date_from,
-                date_to=date_to,
-                folder="Inbox",
-                limit=limit,
-            )
-            results.extend(inbox_results)
-        
-        for email in contact_emails:
-            inbox_results = self.search_outlook(
-                sender_email=email,
-                date_from=date_from,
-                date_to=date_to,
-                folder="Inbox",
-                limit=limit,
-            )
-            results.extend(inbox_results)
-        
-        for domain in domains:
-            sent_results = self.search_outlook(
-                recipient_domain=domain,
-                date_from=date_from,
-                date_to=date_to,
-                folder="Sent Items",
+        scans = self._identifier_queries(domains, contact_emails, date_from, date_to)
+        
+        if self.read_pool is not None:
+            client_cls = type(self)
+            return self.read_pool.scan_merged(
+                client_cls,
+                [
+                    partial(client_cls._scan_query, folder=folder, filter_str=query, limit=limit,
+                            received_before=received_before, skip_ids=skip_ids)
+                    for folder, query in scans
+                ],
                 limit=limit,
             )
-            results.extend(sent_results)
-        
-        seen_ids = set()
-        unique_results = []
-        for email in results:
-            if email.id not in seen_ids:
-                seen_ids.add(email.id)
-                unique_results.append(email)
-                if len(unique_results) >= limit:
-                    break
-        
-        return unique_results
+        
+        return merge_sorted_by_received(
+            [self._iter_query(folder, query, limit, received_before, skip_ids) for folder, query in scans],
+            limit=limit,
+        )
+    
+    # =========================================================================
+    # Commitment Scanning
+    # =========================================================================
+    
+    def _unscanned_query(self, category: str, date_from: datetime, date_to: datetime = None) -> str:
+        """DASL query for Sent Items without the given category.
+        
+        The category test runs in the store against the Keywords property,
+        so messages already scanned are never returned to Python.
+        """
+        escaped = category.replace("'", "''")
+        conditions = self._date_conditions(date_from, date_to)
+        conditions.append(f"(\"{self.KEYWORDS_PROP}\" IS NULL"
+                          f" OR NOT (\"{self.KEYWORDS_PROP}\" = '{escaped}'))")
+        return "@SQL=" + " AND ".join(conditions)
+    
+    def iter_unscanned_sent(
+        self,
+        category: str,
+        days: int = 14,
+        received_before: datetime = None,
+        skip_ids: Collection[str] = (),
+    ) -> Iterator[dict]:
+        """Yield sent emails without category, newest first, with body and recipients.
+        
+        Each message is read once for exactly what commitment scanning
+        needs (subject, sent time, plain body, To/CC); HTML bodies and
+        attachments are never loaded. The caller stops iterating at its
+        limit, so the "not scanned" filter never under-fills a page. If the
+        store rejects the Keywords predicate, the date filter is used alone
+        and categories are checked per message. Must be consumed on the COM
+        thread.
+        
+        Args:
+            category: Category marking an email as already scanned
+            days: Look-back window
+            received_before/skip_ids: Continue from a pagination cursor, as
+                for search_outlook
+            
+        Yields:
+            Dicts with id, subject, received_time (datetime), body,
+            recipients_to and recipients_cc
+        """
+        self._ensure_connection()
+        
+        folder = self._namespace.GetDefaultFolder(self.FOLDER_SENT)
+        date_from = datetime.now() - timedelta(days=days)
+        date_to = self._page_date_to(None, received_before)
+        
+        messages = folder.Items
+        messages.Sort("[ReceivedTime]", True)
+        try:
+            filtered = messages.Restrict(self._unscanned_query(category, date_from, date_to))
+            exact = True
+        except Exception:
+            filtered = messages.Restrict(f"[ReceivedTime] >= '{date_from.strftime('%d/%m/%Y %H:%M')}'")
+            exact = False
+        
+        for message in self._page_after_cursor(filtered, received_before, skip_ids):
+            try:
+                if not exact and category in [c.strip() for c in (message.Categories or "").split(",")]:
+                    continue
+                received = message.ReceivedTime
+                if hasattr(received, 'replace'):
+                    received = received.replace(tzinfo=None)
+                recipient_lists = self._extract_recipient_lists(message)
+                yield {
+                    "id": message.EntryID,
+                    "subject": message.Subject or "(No Subject)",
+                    "received_time": received,
+                    "body": message.Body or "",
+                    "recipients_to": recipient_lists["To"],
+                    "recipients_cc": recipient_lists["CC"],
+                }
+            except Exception:
+                continue
@@ -0,0 +1,286 @@
+"""Background RecipientDomain stamping for Sent Items.
+
+``get_sent_emails_by_domain`` finds sent mail with a DASL query on the
+``RecipientDomain`` custom property, which has to be written onto each
+Sent Items message first. Rather than stamping on every request, a
+RecipientDomainStamper keeps the whole Sent history stamped in the
+background:
+
+- a forward pass stamps anything sent since the persisted watermark
+  (newest SentOn already covered), and
+- a backfill pass walks older history newest-to-oldest in resumable
+  chunks until it reaches the oldest item.
+
+The watermark is saved to a JSON file after every chunk, so a restart
+resumes where the last run stopped. Runs happen on a timer and, when
+subscribed, immediately after Outlook raises ItemAdd on Sent Items.
+"""
+
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S"
+
+
+def _format_date(value: Optional[datetime]) -> Optional[str]:
+    return value.strftime(DATE_FORMAT) if value else None
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        return None
+
+
+class _SentItemsEvents:
+    """COM event sink for Sent Items ``Items.ItemAdd``."""
+
+    stamper: "RecipientDomainStamper" = None
+
+    def OnItemAdd(self, item):
+        if self.stamper is not None:
+            self.stamper.item_added()
+
+
+class RecipientDomainStamper:
+    """Incrementally stamps RecipientDomain on Sent Items from a watermark.
+
+    Args:
+        client: RetrievalClient used to read and stamp Sent Items
+        path: Optional JSON file holding the watermark across restarts
+        chunk_size: Maximum items stamped per pass
+        interval: Seconds between scheduled runs once backfill is complete
+        backfill_interval: Seconds between runs while backfill is in progress
+    """
+
+    def __init__(
+        self,
+        client,
+        path: Optional[Union[str, Path]] = None,
+        chunk_size: int = 200,
+        interval: float = 300,
+        backfill_interval: float = 5,
+    ):
+        self.client = client
+        self.path = Path(path) if path else None
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self.backfill_interval = backfill_interval
+        self.newest_sent: Optional[datetime] = None
+        self.backfill_before: Optional[datetime] = None
+        self.backfill_complete = False
+        self.stamped_total = 0
+        self.runs = 0
+        self.errors = 0
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._events = None
+
+    # ------------------------------------------------------------------
+    # Watermark persistence
+    # ------------------------------------------------------------------
+
+    def load(self) -> bool:
+        """Load the watermark from the state file.
+
+        Returns:
+            True if state was loaded
+        """
+        if not self.path or not self.path.exists():
+            return False
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Could not read stamping state {self.path}: {e}")
+            return False
+        if not isinstance(data, dict):
+            return False
+        self.newest_sent = _parse_date(data.get("newest_sent"))
+        self.backfill_before = _parse_date(data.get("backfill_before"))
+        self.backfill_complete = bool(data.get("backfill_complete", False))
+        self.stamped_total = int(data.get("stamped_total", 0))
+        return True
+
+    def save(self) -> bool:
+        """Write the watermark to the state file atomically.
+
+        Returns:
+            True if the file was written
+        """
+        if not self.path:
+            return False
+        data = {
+            "newest_sent": _format_date(self.newest_sent),
+            "backfill_before": _format_date(self.backfill_before),
+            "backfill_complete": self.backfill_complete,
+            "stamped_total": self.stamped_total,
+            "updated_at": datetime.now().strftime(DATE_FORMAT),
+        }
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Could not save stamping state {self.path}: {e}")
+            return False
+        return True
+
+    # ------------------------------------------------------------------
+    # Stamping
+    # ------------------------------------------------------------------
+
+    def run_once(self) -> Dict[str, Any]:
+        """Run one forward pass and one backfill chunk.
+
+        Must be called on a thread that can hold an Outlook connection
+        (the scheduler thread when run from the server, which connects
+        through the per-thread broker).
+
+        Returns:
+            Dict with the items stamped by each pass and whether more work
+            remains
+        """
+        with self._lock:
+            forward = None
+            backfill = None
+
+            if self.newest_sent is not None:
+                forward = self.client.stamp_recipient_domains(
+                    sent_from=self.newest_sent,
+                    limit=self.chunk_size,
+                    newest_first=False,
+                )
+                if forward["newest_sent"] and forward["newest_sent"] > self.newest_sent:
+                    self.newest_sent = forward["newest_sent"]
+                self.stamped_total += forward["updated"]
+
+            if not self.backfill_complete:
+                backfill = self.client.stamp_recipient_domains(
+                    sent_before=self.backfill_before,
+                    limit=self.chunk_size,
+                    newest_first=True,
+                )
+                if self.newest_sent is None:
+                    self.newest_sent = backfill["newest_sent"] or datetime.now()
+                if backfill["oldest_sent"]:
+                    self.backfill_before = backfill["oldest_sent"]
+                if not backfill["more"]:
+                    self.backfill_complete = True
+                self.stamped_total += backfill["updated"]
+
+            self.runs += 1
+            self.last_run = datetime.now()
+            self.save()
+
+            return {
+                "forward": forward,
+                "backfill": backfill,
+                "more": bool(
+                    (forward and forward["more"]) or not self.backfill_complete
+                ),
+            }
+
+    def status(self) -> Dict[str, Any]:
+        """Return watermark and run statistics for the metrics surface."""
+        return {
+            "newest_sent": _format_date(self.newest_sent),
+            "backfill_before": _format_date(self.backfill_before),
+            "backfill_complete": self.backfill_complete,
+            "stamped_total": self.stamped_total,
+            "runs": self.runs,
+            "errors": self.errors,
+            "last_run": _format_date(self.last_run),
+            "last_error": self.last_error,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "watching_sent_items": self._events is not None,
+            "state_path": str(self.path) if self.path else None,
+        }
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def item_added(self):
+        """Request an immediate run (called when Sent Items gains an item)."""
+        self._wake.set()
+
+    def watch_sent_items(self) -> bool:
+        """Subscribe to ItemAdd on Sent Items.
+
+        Must be called on the COM thread that will pump messages for the
+        event sink. Failure leaves the timer as the only trigger.
+
+        Returns:
+            True if the subscription was made
+        """
+        try:
+            import win32com.client
+
+            self.client._ensure_connection()
+            folder = self.client._namespace.GetDefaultFolder(self.client.FOLDER_SENT)
+            items = folder.Items
+            sink = win32com.client.WithEvents(items, _SentItemsEvents)
+            sink.stamper = self
+            # Keep the Items collection alive or the subscription lapses
+            self._events = (items, sink)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not subscribe to Sent Items ItemAdd: {e}")
+            return False
+
+    def start(self, run: Optional[Callable[[Callable], Any]] = None):
+        """Start the background scheduler thread.
+
+        Args:
+            run: Callable that runs a job and returns its result (e.g.
+                ``ComExecutor.call`` to run on the COM thread). Defaults to
+                calling the job directly on the scheduler thread, so a long
+                backfill never holds up other COM work.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        run = run or (lambda fn: fn())
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._loop, args=(run,), name="effi-stamper", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, wait: bool = True):
+        """Stop the scheduler thread after any run in progress."""
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if wait and thread is not None:
+            thread.join()
+        self._thread = None
+
+    def _loop(self, run: Callable[[Callable], Any]):
+        """Scheduler loop: run, then sleep until the next tick or ItemAdd."""
+        while not self._stop.is_set():
+            more = False
+            try:
+                more = run(self.run_once)["more"]
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+                logger.warning(f"RecipientDomain stamping failed: {e}")
+            self._wake.wait(self.backfill_interval if more else self.interval)
+            self._wake.clear()
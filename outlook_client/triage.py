@@ -40,6 +40,7 @@ class TriageClient(BaseOutlookClient):
             
             message.Categories = ", ".join(categories)
             message.Save()
+            self._invalidate_queries()
             return True
         except Exception as e:
             return False
@@ -87,6 +88,7 @@ class TriageClient(BaseOutlookClient):
             
             message.Categories = ", ".join(categories)
             message.Save()
+            self._invalidate_queries()
             return True
         except:
             return False
@@ -112,6 +114,133 @@ class TriageClient(BaseOutlookClient):
         
         return results
     
+    def apply_category_changes(self, changes: Dict[str, Dict[str, Any]]) -> Dict[str, Optional[str]]:
+        """Apply coalesced category changes, one Save per changed email.
+        
+        Used by CategoryWriteQueue to flush a batch on the COM thread.
+        
+        Args:
+            changes: EntryID -> change dict with optional keys 'triage'
+                (status to set, or '' to clear the triage status) and
+                'add' (categories to add if absent)
+            
+        Returns:
+            EntryID -> None on success, or an error message
+        """
+        self._ensure_connection()
+        results = {}
+        
+        for email_id, change in changes.items():
+            status = change.get("triage")
+            if status and status not in self.TRIAGE_CATEGORIES:
+                results[email_id] = f"Invalid status: {status}"
+                continue
+            try:
+                message = self._namespace.GetItemFromID(email_id)
+                existing = message.Categories or ""
+                categories = [c.strip() for c in existing.split(",") if c.strip()]
+                
+                if status is not None:
+                    categories = [c for c in categories if not c.startswith(self.TRIAGE_CATEGORY_PREFIX)]
+                    if status:
+                        categories.append(self.TRIAGE_CATEGORIES[status])
+                for category in change.get("add", []):
+                    if category not in categories:
+                        categories.append(category)
+                
+                updated = ", ".join(categories)
+                if updated != existing:
+                    message.Categories = updated
+                    message.Save()
+                results[email_id] = None
+            except Exception as e:
+                results[email_id] = str(e) or "Failed to update categories"
+        
+        if changes:
+            self._invalidate_queries()
+        return results
+    
+    def triage_domain(
+        self,
+        domain: str,
+        status: str = "archived",
+        days: int = 30,
+        target_folder=None,
+        dry_run: bool = False,
+    ) -> Dict[str, Any]:
+        """Triage (and optionally move) every pending email from a domain.
+        
+        Works directly on the restricted Inbox Items: each message is
+        recategorised (and moved) as it is enumerated, without building
+        Email objects or reopening it with GetItemFromID. Items are walked
+        from the end so messages dropping out of the live collection after
+        Save() or Move() don't shift the ones still to visit.
+        
+        Args:
+            domain: Sender domain
+            status: Triage status to set
+            days: Days to look back
+            target_folder: Optional Outlook folder to move the emails into
+            dry_run: Only count the emails that would be changed
+            
+        Returns:
+            Dict with matched, triaged, moved and failed counts, plus the
+            first few errors
+        """
+        from datetime import datetime, timedelta
+        
+        if status not in self.TRIAGE_CATEGORIES:
+            return {"error": f"Invalid status: {status}"}
+        
+        self._ensure_connection()
+        
+        folder = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
+        date_from = datetime.now() - timedelta(days=days)
+        
+        try:
+            items = folder.Items.Restrict(self._pending_query(date_from, sender_domain=domain))
+            exact = True
+        except Exception:
+            # Store rejected the Keywords predicate: check categories per item
+            items, _ = self._restrict_pending(folder, folder.Items, date_from,
+                                              sender_domain=domain, with_previews=False)
+            exact = False
+        
+        result = {"matched": 0, "triaged": 0, "moved": 0, "failed": 0, "errors": []}
+        
+        if dry_run and exact:
+            result["matched"] = items.Count
+            return result
+        
+        category = self.TRIAGE_CATEGORIES[status]
+        for index in range(items.Count, 0, -1):
+            try:
+                message = items.Item(index)
+                existing = message.Categories or ""
+                if not exact and self._has_triage_category(existing):
+                    continue
+                result["matched"] += 1
+                if dry_run:
+                    continue
+                
+                categories = [c.strip() for c in existing.split(",") if c.strip()]
+                categories.append(category)
+                message.Categories = ", ".join(categories)
+                message.Save()
+                result["triaged"] += 1
+                
+                if target_folder is not None:
+                    message.Move(target_folder)
+                    result["moved"] += 1
+            except Exception as e:
+                result["failed"] += 1
+                if len(result["errors"]) < 10:
+                    result["errors"].append(str(e))
+        
+        if result["triaged"]:
+            self._invalidate_moves(target_folder if result["moved"] else None)
+        return result
+    
     def get_pending_emails_from_domain(
         self,
         domain: str,
@@ -135,19 +264,12 @@ class TriageClient(BaseOutlookClient):
         folder = self._namespace.GetDefaultFolder(self.FOLDER_INBOX)
         
         date_from = datetime.now() - timedelta(days=days)
-        date_str = date_from.strftime("%d/%m/%Y %H:%M")
-        
-        dasl_query = f"@SQL=\"urn:schemas:httpmail:fromemail\" LIKE '%@{domain}'"
-        date_query = f"[ReceivedTime] >= '{date_str}'"
         
         messages = folder.Items
         messages.Sort("[ReceivedTime]", True)
         
-        try:
-            filtered_by_date = messages.Restrict(date_query)
-            filtered = filtered_by_date.Restrict(dasl_query)
-        except:
-            filtered = messages.Restrict(date_query)
+        # Date, domain and "no effi: category" predicates in one store query
+        filtered, previews = self._restrict_pending(folder, messages, date_from, sender_domain=domain, max_rows=limit)
         
         pending_emails = []
         
@@ -156,12 +278,8 @@ class TriageClient(BaseOutlookClient):
                 break
             
             try:
-                categories = message.Categories or ""
-                has_triage = any(cat.strip().startswith(self.TRIAGE_CATEGORY_PREFIX) 
-                                for cat in categories.split(",") if cat.strip())
-                
-                if not has_triage:
-                    email = self._message_to_email(message, folder.Name, "inbound")
+                if not self._has_triage_category(message.Categories):
+                    email = self._message_to_email(message, folder.Name, "inbound", previews=previews)
                     if email:
                         pending_emails.append(email)
             except:
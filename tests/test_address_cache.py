@@ -0,0 +1,217 @@
+"""Tests for the shared SMTP address resolution cache.
+
+Senders and recipients are resolved to SMTP once per address entry and
+then served from an LRU cache shared by all clients:
+- LRU eviction and hit/miss statistics
+- Optional persistence across restarts
+- GetExchangeUser/PR_SMTP_ADDRESS called once per distinct address
+- Statistics exposed through get_server_metrics
+"""
+
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from outlook_client import AddressCache, RetrievalClient
+
+
+LEGACY_DN = "/O=EXCHANGELABS/OU=EXCHANGE ADMINISTRATIVE GROUP/CN=RECIPIENTS/CN=ALICE"
+
+
+def make_exchange_entry(address=LEGACY_DN, smtp="alice@harperjames.co.uk"):
+    """Create an Exchange AddressEntry whose GetExchangeUser is counted."""
+    entry = Mock()
+    entry.Address = address
+    entry.AddressEntryUserType = 0
+    entry.GetExchangeUser = Mock(return_value=Mock(PrimarySmtpAddress=smtp))
+    return entry
+
+
+def make_recipient(address, smtp, recipient_type=1):
+    """Create a recipient whose PR_SMTP_ADDRESS lookup is counted."""
+    recipient = Mock()
+    recipient.Address = address
+    recipient.Type = recipient_type
+    recipient.PropertyAccessor.GetProperty = Mock(return_value=smtp)
+    return recipient
+
+
+def make_message(sender, recipients):
+    """Create a message with a sender AddressEntry and a Recipients collection."""
+    message = Mock()
+    message.Sender = sender
+    message.Recipients.Count = len(recipients)
+    message.Recipients.Item = lambda i: recipients[i - 1]
+    return message
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def cache():
+    """A small cache so eviction is easy to trigger."""
+    return AddressCache(max_entries=3)
+
+
+@pytest.fixture
+def client(cache):
+    """A client using its own cache rather than the shared one."""
+    c = RetrievalClient()
+    c.address_cache = cache
+    return c
+
+
+# ============================================================================
+# Tests: AddressCache
+# ============================================================================
+
+class TestAddressCache:
+    """LRU behaviour, statistics and persistence."""
+
+    def test_hit_and_miss_counted(self, cache):
+        """get() should count a miss before put() and a hit after."""
+        assert cache.get("dn") is None
+        cache.put("dn", "a@x.com")
+
+        assert cache.get("dn") == "a@x.com"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_evicts_least_recently_used(self, cache):
+        """The entry not touched most recently should be evicted first."""
+        cache.put("a", "a@x.com")
+        cache.put("b", "b@x.com")
+        cache.put("c", "c@x.com")
+        cache.get("a")
+        cache.put("d", "d@x.com")
+
+        assert cache.get("b") is None
+        assert cache.get("a") == "a@x.com"
+        assert cache.stats()["evictions"] == 1
+
+    def test_persists_across_instances(self, tmp_path):
+        """save() then load() in a new instance should restore entries."""
+        path = tmp_path / "addresses.json"
+        first = AddressCache(path=path)
+        first.put(LEGACY_DN.lower(), "alice@harperjames.co.uk")
+        assert first.save() is True
+
+        second = AddressCache(path=path)
+        assert second.load() == 1
+        assert second.get(LEGACY_DN.lower()) == "alice@harperjames.co.uk"
+
+    def test_save_skipped_when_unchanged(self, tmp_path):
+        """save() should not rewrite the file when nothing changed."""
+        cache = AddressCache(path=tmp_path / "addresses.json")
+        cache.put("a", "a@x.com")
+        cache.save()
+
+        assert cache.save() is False
+
+    def test_load_ignores_corrupt_file(self, tmp_path):
+        """An unreadable persistence file should load nothing."""
+        path = tmp_path / "addresses.json"
+        path.write_text("not json")
+
+        assert AddressCache(path=path).load() == 0
+
+
+# ============================================================================
+# Tests: client resolution
+# ============================================================================
+
+class TestClientResolution:
+    """Clients resolve each distinct address once."""
+
+    def test_sender_resolved_once_across_messages(self, client):
+        """GetExchangeUser should run once for a sender on many messages."""
+        sender = make_exchange_entry()
+        messages = [make_message(sender, []) for _ in range(50)]
+
+        emails = [client._get_sender_email(m) for m in messages]
+
+        assert set(emails) == {"alice@harperjames.co.uk"}
+        assert sender.GetExchangeUser.call_count == 1
+
+    def test_sender_key_is_case_insensitive(self, client):
+        """Legacy DNs differing only in case should share an entry."""
+        first = make_exchange_entry(address=LEGACY_DN)
+        second = make_exchange_entry(address=LEGACY_DN.lower())
+
+        client._get_sender_email(make_message(first, []))
+        client._get_sender_email(make_message(second, []))
+
+        assert second.GetExchangeUser.call_count == 0
+
+    def test_recipients_resolved_once(self, client):
+        """PR_SMTP_ADDRESS should be read once per distinct recipient."""
+        bob = make_recipient("/o=x/cn=bob", "Bob@harperjames.co.uk")
+        carol = make_recipient("/o=x/cn=carol", "carol@acme.com")
+        messages = [make_message(make_exchange_entry(), [bob, carol]) for _ in range(20)]
+
+        for message in messages:
+            assert client._extract_recipients(message, "To") == [
+                "bob@harperjames.co.uk", "carol@acme.com"
+            ]
+
+        assert bob.PropertyAccessor.GetProperty.call_count == 1
+        assert carol.PropertyAccessor.GetProperty.call_count == 1
+
+    def test_failed_resolution_not_cached(self, client, cache):
+        """A sender that can't be resolved should fall back and not be cached."""
+        sender = make_exchange_entry()
+        sender.GetExchangeUser.return_value = None
+        message = make_message(sender, [])
+        message.PropertyAccessor.GetProperty.side_effect = Exception("no prop")
+        message.SenderEmailAddress = LEGACY_DN
+
+        assert client._get_sender_email(message) == LEGACY_DN
+        assert len(cache) == 0
+
+    def test_recipient_dn_fallback_not_cached(self, client, cache):
+        """A failed PR_SMTP_ADDRESS read should return the DN without caching it."""
+        recipient = make_recipient(LEGACY_DN, None)
+        recipient.AddressEntry.AddressEntryUserType = 1
+        recipient.PropertyAccessor.GetProperty.side_effect = Exception("transient")
+
+        assert client._get_recipient_email(recipient) == LEGACY_DN
+        assert len(cache) == 0
+
+        recipient.PropertyAccessor.GetProperty.side_effect = None
+        recipient.PropertyAccessor.GetProperty.return_value = "alice@harperjames.co.uk"
+
+        assert client._get_recipient_email(recipient) == "alice@harperjames.co.uk"
+        assert cache.get(LEGACY_DN.lower()) == "alice@harperjames.co.uk"
+
+    def test_clients_share_default_cache(self):
+        """Clients that don't override address_cache share one instance."""
+        from outlook_client import SearchClient, TriageClient
+
+        assert SearchClient().address_cache is TriageClient().address_cache
+
+
+# ============================================================================
+# Tests: metrics surface
+# ============================================================================
+
+class TestAddressCacheMetrics:
+    """Hit/miss statistics are reported by get_server_metrics."""
+
+    def test_metrics_tool_reports_address_cache(self):
+        """get_server_metrics should include the address cache section."""
+        from effi_mail.helpers import address_cache
+        from effi_mail.tools import get_server_metrics
+
+        address_cache.clear()
+        address_cache.get("missing")
+
+        metrics = json.loads(get_server_metrics())
+
+        assert metrics["address_cache"]["misses"] == 1
+        assert "hit_rate" in metrics["address_cache"]
+        assert "connects" in metrics["connection"]
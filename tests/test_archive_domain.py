@@ -0,0 +1,236 @@
+"""Tests for collection-level batch_archive_domain.
+
+TriageClient.triage_domain recategorises (and optionally moves) the
+pending mail of a domain straight from the restricted Inbox Items, with
+no Email conversion and no GetItemFromID per message. The fake store
+keeps restricted collections live, as Outlook does, so messages that stop
+matching after Save() or Move() drop out mid-iteration.
+"""
+
+import json
+import re
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from outlook_client import FoldersClient, TriageClient
+
+
+KEYWORDS = TriageClient.KEYWORDS_PROP
+DOMAIN_PATTERN = re.compile(r"fromemail\" LIKE '%@([^']+)'")
+
+
+class FakeMessage:
+    def __init__(self, store, index, sender, categories=""):
+        self.store = store
+        self.EntryID = f"msg-{index}"
+        self.SenderEmailAddress = sender
+        self.ReceivedTime = datetime.now() - timedelta(hours=index)
+        self.Categories = categories
+        self.folder = store.inbox
+
+    def Save(self):
+        self.store.saves += 1
+        self.store.changed(self)
+
+    def Move(self, folder):
+        self.folder = folder
+        self.store.changed(self)
+        return self
+
+
+class LiveItems:
+    """Restricted Items whose membership follows the messages, like Outlook."""
+
+    def __init__(self, store, filter_str):
+        self.store = store
+        self.filter_str = filter_str
+        self.members = []
+        store.collections.append(self)
+        self.refresh()
+
+    def matches(self, message):
+        if message.folder is not self.store.inbox:
+            return False
+        if KEYWORDS in self.filter_str and any(
+            c.strip().startswith("effi:") for c in message.Categories.split(",")
+        ):
+            return False
+        domain = DOMAIN_PATTERN.search(self.filter_str)
+        return not domain or message.SenderEmailAddress.endswith("@" + domain.group(1))
+
+    def refresh(self):
+        self.members = [m for m in self.store.messages if self.matches(m)]
+
+    @property
+    def Count(self):
+        return len(self.members)
+
+    def Item(self, index):
+        return self.members[index - 1]
+
+    def __iter__(self):
+        return iter(list(self.members))
+
+    def Restrict(self, filter_str):
+        return LiveItems(self.store, self.filter_str + " AND " + filter_str)
+
+
+class FakeInboxItems:
+    def __init__(self, store):
+        self.store = store
+
+    def Restrict(self, filter_str):
+        if KEYWORDS in filter_str and not self.store.supports_keywords:
+            raise Exception("Condition is not valid")
+        return LiveItems(self.store, filter_str)
+
+    def Sort(self, column, descending):
+        pass
+
+
+class FakeFolder:
+    def __init__(self, store, name):
+        self.store = store
+        self.Name = name
+        self.FolderPath = f"\\\\me@firm.com\\{name}"
+
+    @property
+    def Items(self):
+        return FakeInboxItems(self.store)
+
+    def GetTable(self, filter_str=None):
+        raise Exception("GetTable not supported")
+
+
+class FakeStore:
+    """Inbox with 1000 marketing emails (one already triaged) and some client mail."""
+
+    def __init__(self, supports_keywords=True):
+        self.supports_keywords = supports_keywords
+        self.inbox = FakeFolder(self, "Inbox")
+        self.archive = FakeFolder(self, "Archive")
+        self.collections = []
+        self.saves = 0
+        self.opens = 0
+        self.messages = [FakeMessage(self, i, f"news{i}@marketing.com") for i in range(1000)]
+        self.messages[0].Categories = "effi:action"
+        self.messages += [FakeMessage(self, 3000 + i, f"c{i}@client.com") for i in range(20)]
+
+    def changed(self, message):
+        for collection in self.collections:
+            if message in collection.members and not collection.matches(message):
+                collection.members.remove(message)
+
+    def GetDefaultFolder(self, folder_id):
+        return self.inbox
+
+    def GetItemFromID(self, entry_id):
+        self.opens += 1
+        raise AssertionError("triage_domain should not reopen messages")
+
+
+def make_client(store):
+    client = TriageClient()
+    client._namespace = store
+    client._outlook = object()
+    return client
+
+
+# ============================================================================
+# Tests: triage_domain
+# ============================================================================
+
+class TestTriageDomain:
+    """Pending mail from a domain is triaged from the collection itself."""
+
+    def test_dry_run_counts_without_writing(self):
+        """A dry run should return the count and save nothing."""
+        store = FakeStore()
+
+        result = make_client(store).triage_domain("marketing.com", days=365, dry_run=True)
+
+        assert result["matched"] == 999
+        assert store.saves == 0
+
+    def test_archives_every_pending_email(self):
+        """Every pending email should be archived despite the live collection."""
+        store = FakeStore()
+
+        result = make_client(store).triage_domain("marketing.com", days=365)
+
+        assert result["triaged"] == 999
+        assert store.saves == 999
+        assert store.opens == 0
+        marketing = [m for m in store.messages if m.SenderEmailAddress.endswith("@marketing.com")]
+        assert marketing[0].Categories == "effi:action"
+        assert all(m.Categories == "effi:archived" for m in marketing[1:])
+        assert all(m.Categories == "" for m in store.messages if "client.com" in m.SenderEmailAddress)
+
+    def test_moves_in_the_same_pass(self):
+        """With a target folder each email is categorised then moved."""
+        store = FakeStore()
+
+        result = make_client(store).triage_domain("marketing.com", days=365, target_folder=store.archive)
+
+        assert result["moved"] == 999
+        assert sum(m.folder is store.archive for m in store.messages) == 999
+
+    def test_keywords_fallback(self):
+        """Stores that reject the Keywords query skip triaged mail per item."""
+        store = FakeStore(supports_keywords=False)
+
+        dry = make_client(store).triage_domain("marketing.com", days=365, dry_run=True)
+        result = make_client(store).triage_domain("marketing.com", days=365)
+
+        assert dry["matched"] == 999
+        assert result["triaged"] == 999
+        assert store.messages[0].Categories == "effi:action"
+
+
+# ============================================================================
+# Tests: batch_archive_domain tool
+# ============================================================================
+
+class TestBatchArchiveDomainTool:
+    """The tool resolves move_to once and reports counts."""
+
+    def test_dry_run_response(self):
+        """dry_run should report would_archive."""
+        from effi_mail.tools import batch_archive_domain
+
+        store = FakeStore()
+        with patch("effi_mail.tools.triage.triage", make_client(store)):
+            result = json.loads(batch_archive_domain("marketing.com", days=365, dry_run=True))
+
+        assert result == {"success": True, "dry_run": True, "domain": "marketing.com", "would_archive": 999}
+
+    def test_archive_and_move(self):
+        """move_to should be resolved through the folders client."""
+        from effi_mail.tools import batch_archive_domain
+
+        store = FakeStore()
+        folders = FoldersClient()
+        with patch("effi_mail.tools.triage.triage", make_client(store)), \
+             patch("effi_mail.tools.triage.folders", folders), \
+             patch.object(folders, "resolve_folder", return_value={"folder": store.archive, "folders_created": []}):
+            result = json.loads(batch_archive_domain("marketing.com", days=365, move_to="Archive"))
+
+        assert result["archived_count"] == 999
+        assert result["moved_count"] == 999
+        assert result["folder"].endswith("\\Archive")
+
+    def test_unknown_move_to_folder(self):
+        """A missing destination should fail before anything is archived."""
+        from effi_mail.tools import batch_archive_domain
+
+        store = FakeStore()
+        folders = FoldersClient()
+        with patch("effi_mail.tools.triage.triage", make_client(store)), \
+             patch("effi_mail.tools.triage.folders", folders), \
+             patch.object(folders, "resolve_folder", return_value={"error": "Folder 'Nope' not found"}):
+            result = json.loads(batch_archive_domain("marketing.com", move_to="Nope"))
+
+        assert "error" in result
+        assert store.saves == 0
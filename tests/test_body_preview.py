@@ -0,0 +1,337 @@
+"""Tests for bounded body previews.
+
+Listing scans read previews from the PR_BODY column of a folder Table,
+which the store truncates (255 characters on Exchange), instead of
+loading each message's full Body. get_email_full skips or cuts the body
+as it is read. Memory and latency are measured on a fixture mailbox whose
+messages have multi-megabyte bodies.
+"""
+
+import itertools
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pytest
+
+from outlook_client import RetrievalClient, SearchClient
+from outlook_client.address_cache import AddressCache
+from outlook_client.properties import PR_BODY
+
+
+BODY_SIZE = 2 * 1024 * 1024
+MESSAGE_COUNT = 20
+TABLE_STRING_LIMIT = 255
+BODY_READ_LATENCY = 0.002
+
+
+class FakeAccessor:
+    """PropertyAccessor with no readable properties."""
+
+    def GetProperties(self, tags):
+        return tuple(-2147221233 for _ in tags)
+
+
+class EmptyCollection:
+    """Recipients/Attachments collection with no items."""
+    Count = 0
+
+
+class FakeMessage:
+    """Message whose Body is materialised (and slow) on every read."""
+
+    def __init__(self, index):
+        self.EntryID = f"entry-{index}"
+        self.Subject = f"Long thread {index}"
+        self.SenderName = "Sender"
+        self.SenderEmailAddress = "sender@client.com"
+        self.Sender = None
+        self.ReceivedTime = datetime(2026, 1, 15) - timedelta(hours=index)
+        self.Categories = ""
+        self.ConversationID = f"conv-{index}"
+        self.HTMLBody = "<html></html>"
+        self.PropertyAccessor = FakeAccessor()
+        self.Recipients = EmptyCollection()
+        self.Attachments = EmptyCollection()
+        self.body_reads = 0
+
+    def body_text(self, limit=None):
+        # The store truncates table columns server-side, so a limited read
+        # never builds the full body
+        size = BODY_SIZE if limit is None else limit
+        return (f"Message {self.EntryID} opening line.\r\n" + "x" * size)[:limit]
+
+    @property
+    def Body(self):
+        self.body_reads += 1
+        time.sleep(BODY_READ_LATENCY)
+        return self.body_text()
+
+
+class FakeRow:
+    def __init__(self, values):
+        self.values = values
+
+    def GetValues(self):
+        return self.values
+
+
+class FakeColumns:
+    def __init__(self):
+        self.names = []
+
+    def RemoveAll(self):
+        self.names = []
+
+    def Add(self, name):
+        self.names.append(name)
+
+
+class FakeTable:
+    """Folder table that truncates string columns like an Exchange store."""
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.Columns = FakeColumns()
+        self.position = 0
+
+    def Sort(self, column, descending):
+        pass
+
+    @property
+    def EndOfTable(self):
+        return self.position >= len(self.messages)
+
+    def GetNextRow(self):
+        message = self.messages[self.position]
+        self.position += 1
+        values = []
+        for name in self.Columns.names:
+            if name == "EntryID":
+                values.append(message.EntryID)
+            elif name == PR_BODY:
+                values.append(message.body_text(TABLE_STRING_LIMIT))
+        return FakeRow(tuple(values))
+
+
+class FakeItems(list):
+    def Sort(self, column, descending):
+        pass
+
+    def Restrict(self, filter_str):
+        return self
+
+
+class RejectingDaslItems(FakeItems):
+    """Items whose store rejects @SQL queries, forcing the Jet fallback."""
+
+    def Restrict(self, filter_str):
+        if filter_str.startswith("@SQL="):
+            raise Exception("query not supported")
+        return self
+
+
+class FakeFolder:
+    def __init__(self, messages, table=True):
+        self.Name = "Inbox"
+        self.Items = FakeItems(messages)
+        self.table = table
+        self.tables = []
+
+    def GetTable(self, filter_str=None):
+        if not self.table:
+            raise Exception("GetTable not supported")
+        table = FakeTable(list(self.Items))
+        self.tables.append(table)
+        return table
+
+
+class FakeNamespace:
+    def __init__(self, folder):
+        self.folder = folder
+
+    def GetDefaultFolder(self, folder_id):
+        return self.folder
+
+    def GetItemFromID(self, entry_id):
+        return next(m for m in self.folder.Items if m.EntryID == entry_id)
+
+
+def make_client(cls, folder):
+    client = cls()
+    client.address_cache = AddressCache()
+    client._namespace = FakeNamespace(folder)
+    client._outlook = object()
+    return client
+
+
+def measure(func):
+    """Run func and return (result, seconds, peak traced bytes)."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        result = func()
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def messages():
+    """Fixture mailbox: 20 messages with 2 MB bodies."""
+    return [FakeMessage(i) for i in range(MESSAGE_COUNT)]
+
+
+# ============================================================================
+# Tests: table previews
+# ============================================================================
+
+class TestTablePreviews:
+    """Scans take previews from the folder Table, not Body."""
+
+    def test_search_does_not_read_body(self, messages):
+        """search_outlook should build previews without touching Body."""
+        client = make_client(SearchClient, FakeFolder(messages))
+
+        emails = client.search_outlook(days=3650, limit=10)
+
+        assert len(emails) == 10
+        assert all(m.body_reads == 0 for m in messages)
+        assert emails[0].body_preview.startswith("Message entry-0 opening line. xxx")
+        assert len(emails[0].body_preview) <= TABLE_STRING_LIMIT
+
+    def test_table_stops_at_limit(self, messages):
+        """Only `limit` rows should be read from the table."""
+        folder = FakeFolder(messages)
+        client = make_client(SearchClient, folder)
+
+        client.search_outlook(days=3650, limit=5)
+
+        assert folder.tables[0].position == 5
+
+    def test_falls_back_to_body_without_table(self, messages):
+        """If the table can't be read, previews come from Body as before."""
+        client = make_client(SearchClient, FakeFolder(messages, table=False))
+
+        emails = client.search_outlook(days=3650, limit=3)
+
+        assert [m.body_reads for m in messages[:3]] == [1, 1, 1]
+        assert len(emails[0].body_preview) == SearchClient.PREVIEW_LENGTH - 1
+
+    def test_conversation_scan_reads_body_inline(self, messages):
+        """get_email_thread's scan should read each preview during the scan."""
+        client = make_client(RetrievalClient, FakeFolder(messages, table=False))
+
+        emails = client.get_emails_by_conversation_id("conv-1", include_sent=False,
+                                                      conversation_topic="Long thread")
+
+        assert messages[1].body_reads == 1
+        assert emails[0].body_preview.startswith("Message entry-1 opening line.")
+        assert messages[1].body_reads == 1
+
+    def test_conversation_scan_defers_body(self, messages):
+        """With lazy_body, thread scans should read Body only when body_preview is used."""
+        client = make_client(RetrievalClient, FakeFolder(messages, table=False))
+
+        emails = client.get_emails_by_conversation_id("conv-1", include_sent=False,
+                                                      conversation_topic="Long thread",
+                                                      lazy_body=True)
+
+        assert [e.id for e in emails] == ["entry-1"]
+        assert all(m.body_reads == 0 for m in messages)
+        assert emails[0].body_preview.startswith("Message entry-1 opening line.")
+        assert emails[0].body_preview.startswith("Message entry-1 opening line.")
+        assert messages[1].body_reads == 1
+
+    def test_get_emails_reads_table_in_step(self, messages):
+        """get_emails should read table rows only as far as it is consumed."""
+        folder = FakeFolder(messages)
+        client = make_client(RetrievalClient, folder)
+
+        emails = list(itertools.islice(client.get_emails(days=3650), 3))
+
+        assert [e.id for e in emails] == ["entry-0", "entry-1", "entry-2"]
+        assert all(m.body_reads == 0 for m in messages)
+        assert folder.tables[0].position == 3
+
+    def test_pending_fallback_streams_table(self, messages):
+        """Without the Keywords query, pending previews should not read the whole window."""
+        folder = FakeFolder(messages)
+        folder.Items = RejectingDaslItems(messages)
+        client = make_client(RetrievalClient, folder)
+
+        result = client.get_pending_emails(days=3650, limit=4, group_by_domain=False)
+
+        assert result["total"] == 4
+        assert all(m.body_reads == 0 for m in messages)
+        assert folder.tables[0].position == 4
+
+    def test_pending_emails_use_table(self, messages):
+        """get_pending_emails should also take previews from the table."""
+        client = make_client(RetrievalClient, FakeFolder(messages))
+
+        result = client.get_pending_emails(days=3650, limit=5, group_by_domain=False)
+
+        assert result["total"] == 5
+        assert all(m.body_reads == 0 for m in messages)
+
+
+# ============================================================================
+# Tests: get_email_full body limits
+# ============================================================================
+
+class TestGetEmailFullLimits:
+    """Body limits are applied as the body is read."""
+
+    def test_include_body_false_skips_body(self, messages):
+        """Neither Body nor HTMLBody should be read when not needed."""
+        client = make_client(RetrievalClient, FakeFolder(messages))
+
+        result = client.get_email_full("entry-0", include_body=False)
+
+        assert messages[0].body_reads == 0
+        assert "body" not in result
+        assert "html_body" not in result
+
+    def test_max_body_length_cuts_body(self, messages):
+        """The returned body should be capped with a truncation marker."""
+        client = make_client(RetrievalClient, FakeFolder(messages))
+
+        result = client.get_email_full("entry-0", max_body_length=1000)
+
+        assert result["body_truncated"] is True
+        assert result["body"].startswith("Message entry-0")
+        assert result["body"].endswith("more chars]")
+        assert len(result["body"]) < 1100
+
+
+# ============================================================================
+# Benchmark: memory and latency on large bodies
+# ============================================================================
+
+class TestLargeBodyBenchmark:
+    """Table previews avoid materialising multi-megabyte bodies."""
+
+    def test_memory_and_latency(self, messages):
+        """Peak memory and scan time should drop well below the Body path."""
+        body_client = make_client(SearchClient, FakeFolder(messages, table=False))
+        table_client = make_client(SearchClient, FakeFolder(messages))
+
+        _, body_time, body_peak = measure(
+            lambda: body_client.search_outlook(days=3650, limit=MESSAGE_COUNT)
+        )
+        emails, table_time, table_peak = measure(
+            lambda: table_client.search_outlook(days=3650, limit=MESSAGE_COUNT)
+        )
+
+        assert len(emails) == MESSAGE_COUNT
+        assert body_peak >= BODY_SIZE
+        assert table_peak < body_peak / 10
+        assert body_time >= MESSAGE_COUNT * BODY_READ_LATENCY
+        assert table_time < body_time
@@ -0,0 +1,207 @@
+"""Tests for the cache catalog, unique cache names and the eviction policy.
+
+CacheCatalog indexes the metadata, size and mtime of every cache file in
+_catalog.json, so list_cache_files and prune_cache scan the directory
+without parsing payloads. Only files the index does not know (or that
+changed on disk) are read, and then only their first line when it holds
+the metadata block.
+"""
+
+import json
+import os
+import time
+from unittest.mock import patch
+
+import pytest
+
+from effi_mail import helpers
+from effi_mail.cache_catalog import CATALOG_NAME, CacheCatalog
+from effi_mail.helpers import get_cache_path, read_cache_metadata, write_cache_file
+
+
+def make_items(count):
+    return [{"id": f"id-{i}", "subject": f"Subject {i}"} for i in range(count)]
+
+
+def make_catalog(directory):
+    return CacheCatalog(directory, helpers.is_cache_file, helpers.read_cache_metadata)
+
+
+def age(path, days):
+    stamp = time.time() - days * 86400
+    os.utime(path, (stamp, stamp))
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    catalog = make_catalog(tmp_path)
+    with patch.object(helpers, "CACHE_DIR", tmp_path), \
+         patch.object(helpers, "cache_catalog", catalog), \
+         patch.object(helpers, "CACHE_PRUNE_INTERVAL", 0), \
+         patch("effi_mail.tools.cache.CACHE_DIR", tmp_path), \
+         patch("effi_mail.tools.cache.cache_catalog", catalog):
+        yield tmp_path
+
+
+# ============================================================================
+# Tests: file names
+# ============================================================================
+
+class TestCacheNames:
+    """Cache file names never collide."""
+
+    def test_names_unique_within_a_second(self, cache_dir):
+        """Many paths for the same prefix at once should all differ."""
+        paths = {get_cache_path("emails") for _ in range(200)}
+
+        assert len(paths) == 200
+
+    def test_prefix_is_sanitized(self, cache_dir):
+        """Prefixes built from user input should stay inside the cache dir."""
+        path = get_cache_path("sent_a/../b c")
+
+        assert path.parent == cache_dir
+        assert path.name.startswith("sent_a_.._b_c_")
+
+
+# ============================================================================
+# Tests: catalog
+# ============================================================================
+
+class TestCacheCatalog:
+    """Listing reads the index instead of the files."""
+
+    def test_listing_does_not_parse_indexed_files(self, cache_dir):
+        """A fresh catalog over an indexed directory should parse nothing."""
+        from effi_mail.tools import list_cache_files
+
+        for _ in range(20):
+            write_cache_file(make_items(100), "emails", background=False)
+        fresh = make_catalog(cache_dir)
+
+        with patch("effi_mail.tools.cache.cache_catalog", fresh), \
+             patch.object(helpers, "load_cache_data", side_effect=AssertionError("parsed")):
+            listing = json.loads(list_cache_files())
+
+        assert listing["count"] == 20
+        assert fresh.parsed == 0
+        assert all(f["total_items"] == 100 for f in listing["files"])
+
+    def test_unknown_files_are_parsed_once(self, cache_dir):
+        """Files written elsewhere should be read once, then served from the index."""
+        from effi_mail.tools import list_cache_files
+
+        (cache_dir / "old_20250101_120000.json").write_text(json.dumps(
+            {"metadata": {"created": "2025-01-01T12:00:00", "source_tool": "old", "total_items": 2},
+             "items": [{}, {}]}, indent=2))
+        (cache_dir / "legacy.json").write_text("[1, 2, 3]")
+        catalog = helpers.cache_catalog
+
+        json.loads(list_cache_files(days=100000))
+        listing = json.loads(list_cache_files(days=100000))
+
+        assert catalog.parsed == 2
+        assert {f["name"]: f.get("source_tool", f.get("format")) for f in listing["files"]} == {
+            "old_20250101_120000.json": "old", "legacy.json": "legacy"}
+        assert (cache_dir / CATALOG_NAME).exists()
+
+    def test_counts_follow_tool_updates(self, cache_dir):
+        """mark_cache_processed should update the catalog entry."""
+        from effi_mail.tools import list_cache_files, mark_cache_processed
+
+        path = write_cache_file(make_items(10), "emails", background=False)
+        mark_cache_processed(path, ["id-1", "id-2"])
+
+        listing = json.loads(list_cache_files())
+
+        assert listing["files"][0]["processed_count"] == 2
+        assert helpers.cache_catalog.parsed == 0
+
+    def test_metadata_header_read_from_first_line(self, cache_dir):
+        """Only the first line should be needed for the metadata."""
+        path = write_cache_file(make_items(10), "emails", background=False)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write("not json")
+
+        assert read_cache_metadata(path)["total_items"] == 10
+
+
+# ============================================================================
+# Tests: eviction
+# ============================================================================
+
+class TestPruneCache:
+    """Files are evicted by age, processed status and total size."""
+
+    def test_expired_and_processed_files_removed(self, cache_dir):
+        """Old and fully processed files go; the rest stay."""
+        from effi_mail.tools import mark_cache_processed, prune_cache
+
+        old = write_cache_file(make_items(5), "old", background=False)
+        done = write_cache_file(make_items(2), "done", background=False)
+        fresh = write_cache_file(make_items(5), "fresh", background=False)
+        age(old, 30)
+        mark_cache_processed(done, ["id-0", "id-1"])
+
+        result = json.loads(prune_cache(max_age_days=14))
+
+        assert {r["reason"] for r in result["removed"]} == {"expired", "processed"}
+        assert not os.path.exists(old) and not os.path.exists(done)
+        assert os.path.exists(fresh)
+        assert result["remaining_files"] == 1
+
+    def test_size_budget_removes_oldest_first(self, cache_dir):
+        """Over budget, the oldest files should be removed first."""
+        paths = [write_cache_file(make_items(200), f"f{i}", background=False) for i in range(4)]
+        for days, path in zip((4, 3, 2, 1), paths):
+            age(path, days)
+        size = os.path.getsize(paths[0])
+
+        result = helpers.prune_cache_files(max_age_days=14, max_mb=2.5 * size / (1024 * 1024))
+
+        assert [r["reason"] for r in result["removed"]] == ["size", "size"]
+        assert [os.path.exists(p) for p in paths] == [False, False, True, True]
+
+    def test_dry_run_deletes_nothing(self, cache_dir):
+        """dry_run should report the same removals without deleting."""
+        from effi_mail.tools import prune_cache
+
+        path = write_cache_file(make_items(5), "old", background=False)
+        age(path, 30)
+
+        result = json.loads(prune_cache(max_age_days=14, dry_run=True))
+
+        assert result["dry_run"] is True
+        assert [r["name"] for r in result["removed"]] == [os.path.basename(path)]
+        assert os.path.exists(path)
+
+    def test_pending_writes_are_kept(self, cache_dir):
+        """A file still being written is never evicted."""
+        path = write_cache_file(make_items(5), "busy", background=False)
+        age(path, 30)
+
+        with patch.dict(helpers._cache_writes, {path: None}):
+            result = helpers.prune_cache_files(max_age_days=14)
+
+        assert result["removed"] == []
+        assert os.path.exists(path)
+
+    def test_writes_trigger_throttled_prune(self, cache_dir):
+        """A cache write should apply the policy when the interval has passed."""
+        old = write_cache_file(make_items(5), "old", background=False)
+        age(old, 30)
+
+        with patch.object(helpers, "CACHE_PRUNE_INTERVAL", 60), \
+             patch.object(helpers, "CACHE_MAX_AGE_DAYS", 14), \
+             patch.object(helpers, "_last_prune", 0.0):
+            write_cache_file(make_items(5), "new", background=False)
+            assert not os.path.exists(old)
+            helpers.cache_catalog.parsed = 0
+            age(write_cache_file(make_items(5), "later", background=False), 30)
+            write_cache_file(make_items(5), "again", background=False)
+
+        assert len(helpers.cache_catalog.entries()) == 3
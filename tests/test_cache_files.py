@@ -0,0 +1,214 @@
+"""Tests for streamed, compressed, background cache file writes.
+
+write_cache_file streams items to disk one per line (splicing in the
+tracking flags instead of copying each item), optionally gzip/zstd
+compressed, and by default on the cache writer thread so
+build_response_with_auto_file returns its preview first. The cache tools
+wait for a file that is still being written.
+"""
+
+import gzip
+import json
+import os
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from effi_mail import helpers
+from effi_mail.cache_catalog import CacheCatalog
+from effi_mail.helpers import build_response_with_auto_file, wait_for_cache_writes, write_cache_file
+
+
+def make_items(count):
+    return [
+        {
+            "id": f"id-{i}",
+            "subject": f"RE: Matter {i % 40} - draft agreement comments",
+            "sender": f"Person {i} <person{i}@client{i % 25}.com>",
+            "received": "2026-03-02T09:30:15",
+            "preview": "Thanks for the draft. A few comments on clause 4 and the schedule. " * 3,
+            "recipients_to": [f"me{i % 3}@firm.com"],
+            "recipients_cc": [],
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_write(items, path):
+    """The old write: copy every item, then json.dump with indent=2."""
+    tracked = []
+    for item in items:
+        copy = item.copy()
+        copy["_retrieved"] = False
+        copy["_processed"] = False
+        tracked.append(copy)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"metadata": {"total_items": len(tracked)}, "items": tracked}, f, indent=2, default=str)
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    catalog = CacheCatalog(tmp_path, helpers.is_cache_file, helpers.read_cache_metadata)
+    with patch.object(helpers, "CACHE_DIR", tmp_path), \
+         patch.object(helpers, "cache_catalog", catalog), \
+         patch("effi_mail.tools.cache.CACHE_DIR", tmp_path), \
+         patch("effi_mail.tools.cache.cache_catalog", catalog):
+        yield tmp_path
+    wait_for_cache_writes()
+
+
+# ============================================================================
+# Tests: streamed format
+# ============================================================================
+
+class TestStreamedWrite:
+    """Cache files keep their structure and tracking flags."""
+
+    def test_items_get_flags_without_being_copied(self, cache_dir):
+        """Each stored item should carry flags; the originals stay untouched."""
+        items = make_items(50)
+
+        path = write_cache_file(items, "emails", background=False)
+        data = json.loads(open(path, encoding="utf-8").read())
+
+        assert data["metadata"]["total_items"] == 50
+        assert data["metadata"]["source_tool"] == "emails"
+        assert data["items"][0]["_retrieved"] is False
+        assert data["items"][0]["_processed"] is False
+        assert "_retrieved" not in items[0]
+        assert len(open(path, encoding="utf-8").read().splitlines()) == 52
+
+    def test_iterator_input_writes_metadata_last(self, cache_dir):
+        """Items from a generator should be counted as they are written."""
+        path = write_cache_file((item for item in make_items(30)), "emails", background=False)
+        data = json.loads(open(path, encoding="utf-8").read())
+
+        assert data["metadata"]["total_items"] == 30
+        assert len(data["items"]) == 30
+
+    def test_non_dict_items_are_wrapped(self, cache_dir):
+        """Scalar items should be stored as {"value": item}."""
+        path = write_cache_file(["a", "b"], "values", background=False)
+
+        assert json.loads(open(path, encoding="utf-8").read())["items"][1]["value"] == "b"
+
+    def test_failed_write_leaves_no_file(self, cache_dir):
+        """An error mid-stream should remove the temporary file."""
+        def broken():
+            yield {"id": "1"}
+            raise RuntimeError("source failed")
+
+        with pytest.raises(RuntimeError):
+            write_cache_file(broken(), "emails", background=False)
+
+        assert list(cache_dir.iterdir()) == []
+
+
+# ============================================================================
+# Tests: compression
+# ============================================================================
+
+class TestCompression:
+    """Compressed files round-trip through the cache tools."""
+
+    def test_gzip_round_trip(self, cache_dir):
+        """read_cache_file and mark_cache_processed should keep gzip files gzipped."""
+        from effi_mail.tools import mark_cache_processed, read_cache_file
+
+        with patch.object(helpers, "CACHE_COMPRESSION", "gzip"):
+            path = write_cache_file(make_items(40), "emails", background=False)
+
+        assert path.endswith(".json.gz")
+        page = json.loads(read_cache_file(path, limit=10))
+        marked = json.loads(mark_cache_processed(path, ["id-0", "id-1"]))
+
+        assert page["count"] == 10
+        assert marked["processed_count"] == 2
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            assert json.load(f)["metadata"]["retrieved_count"] == 10
+
+    def test_zstd_round_trip(self, cache_dir):
+        """zstd files should be readable when zstandard is installed."""
+        pytest.importorskip("zstandard")
+        from effi_mail.tools import get_cache_status
+
+        with patch.object(helpers, "CACHE_COMPRESSION", "zstd"):
+            path = write_cache_file(make_items(40), "emails", background=False)
+
+        assert path.endswith(".json.zst")
+        assert json.loads(get_cache_status(path))["total_items"] == 40
+
+    def test_compressed_files_are_listed(self, cache_dir):
+        """list_cache_files should include compressed files and skip temp files."""
+        from effi_mail.tools import list_cache_files
+
+        write_cache_file(make_items(5), "plain", background=False)
+        with patch.object(helpers, "CACHE_COMPRESSION", "gzip"):
+            write_cache_file(make_items(5), "packed", background=False)
+        (cache_dir / "other_1.json.tmp").write_text("{")
+
+        listing = json.loads(list_cache_files())
+
+        assert sorted(f["source_tool"] for f in listing["files"]) == ["packed", "plain"]
+
+
+# ============================================================================
+# Tests: background writes
+# ============================================================================
+
+class TestBackgroundWrite:
+    """Tools return the preview before the file is complete."""
+
+    def test_preview_returned_before_items_finish(self, cache_dir):
+        """The response should not wait for the rest of a slow item stream."""
+        from effi_mail.tools import read_cache_file
+
+        release = threading.Event()
+
+        def produce():
+            for i, item in enumerate(make_items(100)):
+                if i == 5:
+                    release.wait(5)
+                yield item
+
+        response = json.loads(build_response_with_auto_file(
+            data={"emails": produce()}, items_key="emails", count=100, limit=100,
+            was_truncated=False, cache_prefix="emails",
+        ))
+
+        assert [p["id"] for p in response["preview"]] == [f"id-{i}" for i in range(5)]
+        assert helpers.cache_write_stats()["pending"] >= 1
+        release.set()
+        page = json.loads(read_cache_file(response["full_data_file"], limit=200))
+        assert page["count"] == 100
+
+    def test_benchmark_tool_latency_and_size(self, cache_dir, tmp_path_factory):
+        """5000 emails: return well before a synchronous write; gzip far smaller."""
+        items = make_items(5000)
+
+        started = time.perf_counter()
+        legacy_path = tmp_path_factory.mktemp("legacy") / "legacy.json"
+        legacy_write(items, legacy_path)
+        legacy_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        response = json.loads(build_response_with_auto_file(
+            data={"emails": items}, items_key="emails", count=5000, limit=5000,
+            was_truncated=False, cache_prefix="emails",
+        ))
+        returned_seconds = time.perf_counter() - started
+        wait_for_cache_writes()
+
+        with patch.object(helpers, "CACHE_COMPRESSION", "gzip"):
+            packed = write_cache_file(items, "emails", background=False)
+
+        plain_size = os.path.getsize(response["full_data_file"])
+        assert returned_seconds < legacy_seconds / 2
+        assert plain_size < os.path.getsize(legacy_path)
+        assert os.path.getsize(packed) < plain_size / 4
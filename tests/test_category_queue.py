@@ -0,0 +1,246 @@
+"""Tests for the coalescing write-behind category queue.
+
+CategoryWriteQueue accepts triage/scanned category changes immediately,
+coalesces them per EntryID and applies them in batches through
+TriageClient.apply_category_changes (one Save per changed message). A
+JSONL journal replays changes that were accepted but never applied.
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from outlook_client import CategoryWriteQueue, TriageClient
+from outlook_client.category_queue import merge_change
+
+
+class FakeMessage:
+    def __init__(self, entry_id, categories=""):
+        self.EntryID = entry_id
+        self.Categories = categories
+        self.saves = 0
+
+    def Save(self):
+        self.saves += 1
+
+
+class FakeNamespace:
+    def __init__(self, messages):
+        self.messages = {m.EntryID: m for m in messages}
+        self.opens = 0
+
+    def GetItemFromID(self, entry_id):
+        self.opens += 1
+        if entry_id not in self.messages:
+            raise Exception("The operation failed.")
+        return self.messages[entry_id]
+
+
+def make_client(messages):
+    client = TriageClient()
+    client._namespace = FakeNamespace(messages)
+    client._outlook = object()
+    return client
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def messages():
+    """500 messages, a few with existing user or triage categories."""
+    result = [FakeMessage(f"msg-{i}") for i in range(500)]
+    result[0].Categories = "Red, effi:action"
+    return result
+
+
+# ============================================================================
+# Tests: coalescing
+# ============================================================================
+
+class TestCoalescing:
+    """Changes to the same EntryID collapse into one write."""
+
+    def test_merge_change(self):
+        """The newest triage status wins; added categories accumulate."""
+        merged = merge_change({"triage": "action", "add": ["effi:scanned"]}, {"triage": "archived"})
+        merged = merge_change(merged, {"add": ["effi:scanned", "Blue"]})
+
+        assert merged == {"triage": "archived", "add": ["effi:scanned", "Blue"]}
+
+    def test_rapid_retriage_saves_once(self, messages):
+        """Three re-triages of one message should cost one open and one Save."""
+        client = make_client(messages)
+        queue = CategoryWriteQueue(client.apply_category_changes)
+
+        for status in ("action", "waiting", "processed"):
+            queue.submit_triage(["msg-0"], status)
+        queue.submit_categories(["msg-0"], "effi:scanned")
+        queue.flush()
+
+        assert client._namespace.opens == 1
+        assert messages[0].saves == 1
+        assert messages[0].Categories == "Red, effi:processed, effi:scanned"
+        assert queue.status()["coalesced"] == 3
+
+    def test_unchanged_categories_are_not_saved(self, messages):
+        """A change that leaves Categories as they are should skip Save()."""
+        client = make_client(messages)
+
+        results = client.apply_category_changes({"msg-0": {"triage": "action"}})
+
+        assert results == {"msg-0": None}
+        assert messages[0].saves == 0
+
+
+# ============================================================================
+# Tests: handles
+# ============================================================================
+
+class TestHandles:
+    """Each submit returns a handle with per-item results."""
+
+    def test_per_item_results(self, messages):
+        """Failures should be reported per EntryID without failing the batch."""
+        client = make_client(messages)
+        queue = CategoryWriteQueue(client.apply_category_changes, batch_size=2)
+
+        handle = queue.submit_triage(["msg-1", "missing", "msg-2"], "archived")
+        assert handle.status()["pending"] == 3
+
+        queue.flush()
+        status = handle.status()
+
+        assert status["complete"] is True
+        assert status["applied"] == 2
+        assert status["failed_ids"] == ["missing"]
+        assert queue.status()["batches"] == 2
+
+    def test_background_flusher(self, messages):
+        """The flusher thread should apply the batch and complete the handle."""
+        client = make_client(messages)
+        queue = CategoryWriteQueue(client.apply_category_changes, flush_delay=0)
+        queue.start()
+        try:
+            handle = queue.submit_triage([m.EntryID for m in messages[:50]], "waiting")
+            assert handle.wait(timeout=5) is True
+        finally:
+            queue.stop()
+
+        assert handle.status()["applied"] == 50
+        assert all(m.Categories.endswith("effi:waiting") for m in messages[:50])
+
+
+# ============================================================================
+# Tests: journal
+# ============================================================================
+
+class TestJournal:
+    """Accepted changes survive a crash."""
+
+    def test_replay_after_crash(self, messages, tmp_path):
+        """Changes never flushed should be applied after a restart."""
+        journal = tmp_path / "categories.jsonl"
+        client = make_client(messages)
+        crashed = CategoryWriteQueue(client.apply_category_changes, journal_path=journal)
+        crashed.submit_triage(["msg-1", "msg-2"], "action")
+        crashed.flush(["msg-1"])
+        crashed.submit_triage(["msg-2"], "processed")
+
+        restarted = CategoryWriteQueue(client.apply_category_changes, journal_path=journal)
+        assert restarted.replay() == 1
+        restarted.flush()
+
+        assert messages[1].Categories == "effi:action"
+        assert messages[2].Categories == "effi:processed"
+        assert messages[2].saves == 1
+        assert journal.read_text() == ""
+
+    def test_compact_keeps_in_flight_batch(self, messages, tmp_path):
+        """compact() during a slow apply should keep that batch journaled."""
+        journal = tmp_path / "categories.jsonl"
+        client = make_client(messages)
+        applying = threading.Event()
+        release = threading.Event()
+
+        def slow_apply(batch):
+            applying.set()
+            release.wait(5)
+            return client.apply_category_changes(batch)
+
+        queue = CategoryWriteQueue(slow_apply, journal_path=journal)
+        queue.submit_triage(["msg-4", "msg-5"], "waiting")
+        flusher = threading.Thread(target=queue.flush_batch, args=(["msg-4"],))
+        flusher.start()
+        assert applying.wait(5)
+
+        queue.compact()
+        # Crash here: the journal as it stands while msg-4 is being applied
+        crashed = tmp_path / "crashed.jsonl"
+        crashed.write_text(journal.read_text())
+        release.set()
+        flusher.join(5)
+
+        restarted = CategoryWriteQueue(client.apply_category_changes, journal_path=crashed)
+        assert restarted.replay() == 2
+
+    def test_torn_journal_line_is_skipped(self, messages, tmp_path):
+        """A partially written final record should not block replay."""
+        journal = tmp_path / "categories.jsonl"
+        journal.write_text(
+            json.dumps({"op": "enqueue", "id": "msg-3", "change": {"triage": "waiting"}})
+            + '\n{"op": "enq'
+        )
+        queue = CategoryWriteQueue(make_client(messages).apply_category_changes, journal_path=journal)
+
+        assert queue.replay() == 1
+
+
+# ============================================================================
+# Tests: tools
+# ============================================================================
+
+class TestBatchTools:
+    """Large batches are queued; small ones keep synchronous results."""
+
+    def test_batch_triage_500_returns_handle(self, messages):
+        """Triage of 500 emails should return before any Save happens."""
+        from effi_mail.tools import batch_triage, get_category_write_status
+
+        client = make_client(messages)
+        queue = CategoryWriteQueue(client.apply_category_changes)
+        ids = [m.EntryID for m in messages]
+        with patch("effi_mail.tools.triage.category_queue", queue):
+            result = json.loads(batch_triage(ids, "archived"))
+            assert result["queued"] is True
+            assert sum(m.saves for m in messages) == 0
+
+            queue.flush()
+            status = json.loads(get_category_write_status(result["handle"]))
+
+        assert status["complete"] is True
+        assert status["applied"] == 500
+
+    def test_sync_write_flushes_older_queued_change(self, messages):
+        """A synchronous triage must not be overwritten by an older queued one."""
+        from effi_mail.tools import batch_triage
+
+        client = make_client(messages)
+        queue = CategoryWriteQueue(client.apply_category_changes)
+        queue.submit_triage(["msg-5"], "waiting")
+        with patch("effi_mail.tools.triage.category_queue", queue), \
+             patch("effi_mail.tools.triage.triage", client):
+            result = json.loads(batch_triage(["msg-5"], "processed"))
+        queue.flush()
+
+        assert result["triaged"] == 1
+        assert messages[5].Categories == "effi:processed"
+
+    def test_unknown_handle(self):
+        """Polling an unknown handle should return an error."""
+        from effi_mail.tools import get_category_write_status
+
+        assert "error" in json.loads(get_category_write_status("nope"))
@@ -0,0 +1,177 @@
+"""Tests for the COM executor that runs Outlook calls on a dedicated STA thread.
+
+The executor must:
+- Run every job on one worker thread (the COM apartment owner)
+- Serve jobs in FIFO order so concurrent clients queue fairly
+- Keep the asyncio event loop responsive while a slow job runs
+- Skip queued jobs whose callers have been cancelled
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+
+import pytest
+
+from outlook_client import ComExecutor
+from effi_mail.helpers import com_tool
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def executor():
+    """Create a fresh executor and shut it down after the test."""
+    ex = ComExecutor(name="test-com")
+    yield ex
+    ex.shutdown()
+
+
+# ============================================================================
+# Tests: Threading
+# ============================================================================
+
+class TestComThread:
+    """Jobs run on a single dedicated worker thread."""
+
+    def test_jobs_run_on_worker_thread(self, executor):
+        """Job should not run on the calling thread."""
+        thread_name = executor.call(lambda: threading.current_thread().name)
+
+        assert thread_name == "test-com"
+        assert thread_name != threading.current_thread().name
+
+    def test_all_jobs_share_one_thread(self, executor):
+        """Every job should see the same thread identity."""
+        idents = {executor.call(threading.get_ident) for _ in range(5)}
+
+        assert len(idents) == 1
+
+    def test_worker_started_lazily(self, executor):
+        """No thread should exist until the first job is submitted."""
+        assert executor.thread is None
+        executor.call(lambda: None)
+        assert executor.thread is not None
+
+    def test_nested_submit_runs_inline(self, executor):
+        """Submitting from the COM thread should not deadlock."""
+        def outer():
+            return executor.call(lambda: "inner")
+
+        assert executor.call(outer) == "inner"
+
+    def test_exception_propagates(self, executor):
+        """Exceptions raised by a job should surface to the caller."""
+        def boom():
+            raise ValueError("COM error")
+
+        with pytest.raises(ValueError, match="COM error"):
+            executor.call(boom)
+
+    def test_restarts_after_shutdown(self, executor):
+        """Submitting after shutdown should start a new worker."""
+        executor.call(lambda: None)
+        executor.shutdown()
+
+        assert executor.call(lambda: 42) == 42
+
+
+# ============================================================================
+# Tests: Ordering and fairness
+# ============================================================================
+
+class TestQueueing:
+    """Jobs are served in arrival order."""
+
+    def test_fifo_order(self, executor):
+        """Jobs should complete in the order they were submitted."""
+        order = []
+        gate = threading.Event()
+        executor.submit(gate.wait)
+        futures = [executor.submit(order.append, i) for i in range(10)]
+        gate.set()
+        for f in futures:
+            f.result()
+
+        assert order == list(range(10))
+
+
+# ============================================================================
+# Tests: asyncio integration
+# ============================================================================
+
+class TestAsyncRun:
+    """Awaiting the executor keeps the event loop free."""
+
+    @pytest.mark.asyncio
+    async def test_event_loop_stays_responsive(self, executor):
+        """A slow COM job should not block other coroutines."""
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await executor.run(time.sleep, 0.2)
+        task.cancel()
+
+        assert result is None
+        assert ticks >= 5
+
+    @pytest.mark.asyncio
+    async def test_cancelled_job_is_skipped(self, executor):
+        """Cancelling the awaiting task should drop a job that hasn't started."""
+        gate = threading.Event()
+        ran = []
+        blocker = executor.submit(gate.wait)
+
+        task = asyncio.create_task(executor.run(ran.append, "queued"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        gate.set()
+        blocker.result()
+        executor.call(lambda: None)  # drain
+
+        assert ran == []
+
+
+# ============================================================================
+# Tests: com_tool wrapper
+# ============================================================================
+
+class TestComTool:
+    """com_tool turns sync tools into async tools with the same schema."""
+
+    def test_preserves_signature_and_doc(self):
+        """Wrapped tool keeps name, parameters and docstring."""
+        def sample_tool(domain: str, limit: int = 20) -> str:
+            """Sample docstring."""
+            return domain
+
+        wrapped = com_tool(sample_tool)
+
+        assert inspect.iscoroutinefunction(wrapped)
+        assert wrapped.__name__ == "sample_tool"
+        assert wrapped.__doc__ == "Sample docstring."
+        assert list(inspect.signature(wrapped).parameters) == ["domain", "limit"]
+
+    @pytest.mark.asyncio
+    async def test_runs_on_com_thread(self):
+        """Wrapped tool body should execute off the event loop thread."""
+        loop_thread = threading.get_ident()
+
+        def sample_tool() -> int:
+            return threading.get_ident()
+
+        tool_thread = await com_tool(sample_tool)()
+
+        assert tool_thread != loop_thread
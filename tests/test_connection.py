@@ -0,0 +1,204 @@
+"""Tests for the shared Outlook connection broker.
+
+The broker replaces per-client Outlook.Application dispatches and the
+per-call CurrentUser health probe:
+- All clients on a thread share one connection
+- Liveness is probed at most once per TTL
+- RPC-disconnected errors on namespace calls reconnect and retry once
+"""
+
+import threading
+from unittest.mock import Mock, patch
+
+import pytest
+
+from outlook_client import (
+    OutlookConnection,
+    TriageClient,
+    RetrievalClient,
+    SearchClient,
+    DMSClient,
+    FoldersClient,
+)
+from outlook_client.connection import is_disconnect_error
+
+
+RPC_E_DISCONNECTED = -2147417848
+
+
+class FakeComError(Exception):
+    """Stand-in for pywintypes.com_error (hresult is args[0])."""
+
+
+class FakeNamespace:
+    """MAPI namespace that counts CurrentUser probes."""
+
+    def __init__(self, message=None):
+        self.probe_count = 0
+        self.fail_probe = False
+        self.message = message or Mock(Categories="", Save=Mock())
+        self.get_item = Mock(return_value=self.message)
+
+    def GetItemFromID(self, entry_id):
+        # A real method, like win32com's bound dispatch methods
+        return self.get_item(entry_id)
+
+    @property
+    def CurrentUser(self):
+        self.probe_count += 1
+        if self.fail_probe:
+            raise FakeComError(RPC_E_DISCONNECTED, "disconnected", None, None)
+        return "user"
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def namespaces():
+    """List of namespaces handed out, one per Dispatch."""
+    return []
+
+
+@pytest.fixture
+def dispatch(namespaces):
+    """Patch Dispatch so each call creates a new fake Outlook/namespace."""
+    def make_outlook(prog_id):
+        ns = FakeNamespace()
+        namespaces.append(ns)
+        outlook = Mock()
+        outlook.GetNamespace = Mock(return_value=ns)
+        return outlook
+
+    with patch("outlook_client.connection.win32com.client.Dispatch", side_effect=make_outlook) as mock_dispatch, \
+         patch("outlook_client.connection.pythoncom.CoInitialize"):
+        yield mock_dispatch
+
+
+@pytest.fixture
+def connection():
+    """A fresh broker with a long TTL."""
+    return OutlookConnection(liveness_ttl=60)
+
+
+# ============================================================================
+# Tests: shared connection
+# ============================================================================
+
+class TestSharedConnection:
+    """All clients share one Outlook dispatch per thread."""
+
+    def test_five_clients_one_dispatch(self, dispatch, connection):
+        """Five client types should dispatch Outlook only once."""
+        clients = [cls(connection) for cls in
+                   (TriageClient, RetrievalClient, SearchClient, DMSClient, FoldersClient)]
+        for client in clients:
+            client._ensure_connection()
+
+        assert dispatch.call_count == 1
+        assert len({id(c._outlook) for c in clients}) == 1
+
+    def test_each_thread_gets_own_connection(self, dispatch, connection, namespaces):
+        """COM objects are per-apartment, so another thread must connect separately."""
+        connection.ensure()
+        thread = threading.Thread(target=connection.ensure)
+        thread.start()
+        thread.join()
+
+        assert dispatch.call_count == 2
+        assert len(namespaces) == 2
+
+    def test_assigned_namespace_bypasses_broker(self, dispatch, connection):
+        """Pinning _namespace on a client should not touch the broker."""
+        client = TriageClient(connection)
+        pinned = FakeNamespace()
+        client._namespace = pinned
+        client._outlook = Mock()
+
+        client.set_triage_status("id-1", "action")
+
+        assert dispatch.call_count == 0
+        pinned.get_item.assert_called_once_with("id-1")
+
+    def test_reset_connection_reconnects(self, dispatch, connection):
+        """_reset_connection should force a new dispatch on next use."""
+        client = TriageClient(connection)
+        client._ensure_connection()
+        client._reset_connection()
+        client._ensure_connection()
+
+        assert dispatch.call_count == 2
+
+
+# ============================================================================
+# Tests: TTL liveness
+# ============================================================================
+
+class TestLivenessTTL:
+    """CurrentUser is probed at most once per TTL."""
+
+    def test_no_probe_within_ttl(self, dispatch, connection, namespaces):
+        """Repeated calls inside the TTL should not probe CurrentUser."""
+        client = TriageClient(connection)
+        for _ in range(20):
+            client.get_triage_status("id-1")
+
+        assert namespaces[0].probe_count == 0
+        assert connection.probes == 0
+
+    def test_probe_after_ttl(self, dispatch, namespaces):
+        """An expired TTL should trigger exactly one probe."""
+        connection = OutlookConnection(liveness_ttl=0)
+        connection.ensure()
+        connection.ensure()
+
+        assert namespaces[0].probe_count == 1
+
+    def test_failed_probe_reconnects(self, dispatch, namespaces):
+        """A dead connection found by the probe should be replaced."""
+        connection = OutlookConnection(liveness_ttl=0)
+        connection.ensure()
+        namespaces[0].fail_probe = True
+
+        connection.ensure()
+
+        assert dispatch.call_count == 2
+
+
+# ============================================================================
+# Tests: reconnect and retry
+# ============================================================================
+
+class TestReconnectRetry:
+    """RPC disconnects are retried transparently on a fresh connection."""
+
+    def test_disconnect_on_call_retries(self, dispatch, connection, namespaces):
+        """GetItemFromID failing with RPC_E_DISCONNECTED should retry once."""
+        client = TriageClient(connection)
+        client._ensure_connection()
+        namespaces[0].get_item.side_effect = FakeComError(RPC_E_DISCONNECTED, "gone", None, None)
+
+        result = client.set_triage_status("id-1", "processed")
+
+        assert result is True
+        assert dispatch.call_count == 2
+        namespaces[1].get_item.assert_called_once_with("id-1")
+        assert "effi:processed" in namespaces[1].message.Categories
+
+    def test_other_errors_not_retried(self, dispatch, connection, namespaces):
+        """Non-disconnect errors should surface without reconnecting."""
+        connection.ensure()
+        namespaces[0].get_item.side_effect = FakeComError(-2147352567, "not found", None, None)
+
+        with pytest.raises(FakeComError):
+            connection.namespace.GetItemFromID("missing")
+
+        assert dispatch.call_count == 1
+
+    def test_is_disconnect_error(self):
+        """Known RPC HRESULTs should be classified as disconnects."""
+        assert is_disconnect_error(FakeComError(RPC_E_DISCONNECTED, "", None, None))
+        assert is_disconnect_error(FakeComError(-2147023174, "", None, None))
+        assert not is_disconnect_error(FakeComError(-2147352567, "", None, None))
+        assert not is_disconnect_error(ValueError("x"))
@@ -0,0 +1,272 @@
+"""Tests for materialized per-domain Inbox statistics.
+
+DomainStatsStore keeps per-domain, per-day buckets (count, pending,
+latest) plus sample subjects, persisted with a watermark.
+RetrievalClient.refresh_domain_stats updates it from messages modified
+since the watermark; a full rescan only happens on first use or when
+asked for.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+from outlook_client import DomainStatsStore, RetrievalClient
+from outlook_client.address_cache import AddressCache
+
+
+NOW = datetime(2026, 1, 15, 12, 0)
+DATE_PATTERN = re.compile(r"\[(\w+)\] >= '([^']+)'")
+
+
+class FakeAccessor:
+    def GetProperties(self, tags):
+        return tuple(-2147221233 for _ in tags)
+
+
+class EmptyCollection:
+    Count = 0
+
+
+class FakeMessage:
+    """Message that counts sender address reads (SMTP resolutions)."""
+
+    sender_reads = 0
+
+    def __init__(self, index, sender, received, categories=""):
+        self.EntryID = f"msg-{index}"
+        self.Subject = f"Subject {index}"
+        self.SenderName = "Sender"
+        self.Sender = None
+        self.ReceivedTime = received
+        self.LastModificationTime = received
+        self.Categories = categories
+        self._sender = sender
+
+    @property
+    def SenderEmailAddress(self):
+        FakeMessage.sender_reads += 1
+        return self._sender
+
+    def categorize(self, categories, when):
+        self.Categories = categories
+        self.LastModificationTime = when
+
+
+class FakeItems(list):
+    def __init__(self, messages, folder):
+        super().__init__(messages)
+        self.folder = folder
+
+    @property
+    def Count(self):
+        return len(self)
+
+    def Sort(self, column, descending):
+        self.sort(key=lambda m: m.ReceivedTime, reverse=descending)
+
+    def Restrict(self, filter_str):
+        self.folder.restricts.append(filter_str)
+        prop, value = DATE_PATTERN.search(filter_str).groups()
+        bound = datetime.strptime(value, "%d/%m/%Y %H:%M")
+        return FakeItems([m for m in self if getattr(m, prop) >= bound], self.folder)
+
+
+class FakeFolder:
+    def __init__(self, messages):
+        self.Name = "Inbox"
+        self.messages = messages
+        self.restricts = []
+
+    @property
+    def Items(self):
+        return FakeItems(self.messages, self)
+
+    def GetTable(self, filter_str=None):
+        raise Exception("GetTable not supported")
+
+
+class FakeNamespace:
+    def __init__(self, folder):
+        self.folder = folder
+
+    def GetDefaultFolder(self, folder_id):
+        return self.folder
+
+
+def make_client(messages):
+    client = RetrievalClient()
+    client.address_cache = AddressCache()
+    client._namespace = FakeNamespace(FakeFolder(messages))
+    client._outlook = object()
+    return client
+
+
+def counts(result):
+    return {d["domain"]: d["count"] for d in result["domains"]}
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def inbox():
+    """60 messages over 60 days from three domains; every third triaged."""
+    FakeMessage.sender_reads = 0
+    return [
+        FakeMessage(
+            i,
+            f"user{i}@{['acme.com', 'globex.com', 'initech.com'][i % 3]}",
+            NOW - timedelta(days=i, hours=1),
+            categories="effi:processed" if i % 3 == 0 else "",
+        )
+        for i in range(60)
+    ]
+
+
+# ============================================================================
+# Tests: DomainStatsStore
+# ============================================================================
+
+class TestDomainStatsStore:
+    """Per-day buckets answer any date window."""
+
+    def test_query_window_uses_day_buckets(self):
+        """Only days inside the window should be counted."""
+        store = DomainStatsStore()
+        for i in range(10):
+            store.upsert(f"m{i}", "acme.com", NOW - timedelta(days=i), f"s{i}", pending=i % 2 == 0)
+
+        week = store.query(date_from=NOW - timedelta(days=6))
+        everything = store.query()
+
+        assert counts(week) == {"acme.com": 7}
+        assert counts(everything) == {"acme.com": 10}
+        assert week["total_pending"] == 4
+        assert week["domains"][0]["sample_subjects"] == ["s0", "s1", "s2"]
+
+    def test_changed_message_moves_between_buckets(self):
+        """Re-upserting a message should replace its old contribution."""
+        store = DomainStatsStore()
+        store.upsert("m1", "acme.com", NOW, "s", pending=True)
+        store.upsert("m1", "acme.com", NOW, "s", pending=False)
+
+        result = store.query()
+
+        assert counts(result) == {"acme.com": 1}
+        assert result["total_pending"] == 0
+        assert store.query(pending_only=True)["domains"] == []
+
+    def test_remove_drops_empty_domain(self):
+        """Removing a domain's last message should remove the domain."""
+        store = DomainStatsStore()
+        store.upsert("m1", "acme.com", NOW, "s", pending=True)
+
+        assert store.remove("m1") is True
+        assert store.query()["domains"] == []
+        assert store.remove("m1") is False
+
+    def test_persistence_round_trip(self, tmp_path):
+        """Buckets, samples and watermark should survive save/load."""
+        path = tmp_path / "domain_stats.json"
+        store = DomainStatsStore(path=path)
+        store.upsert("m1", "acme.com", NOW, "Hello", pending=True)
+        store.upsert("m2", "globex.com", NOW - timedelta(days=3), "Hi", pending=False)
+        store.watermark = NOW
+        assert store.save() is True
+
+        loaded = DomainStatsStore(path=path)
+        assert loaded.load() == 2
+
+        assert loaded.query() == store.query()
+        assert loaded.watermark == NOW
+        assert loaded.domain_of("m2") == "globex.com"
+
+
+# ============================================================================
+# Tests: refresh_domain_stats
+# ============================================================================
+
+class TestRefreshDomainStats:
+    """Incremental refresh from the modification watermark."""
+
+    def test_first_refresh_is_full_and_matches_scan(self, inbox):
+        """The first refresh should build the same counts as get_domain_counts."""
+        client = make_client(inbox)
+        store = DomainStatsStore()
+
+        refresh = client.refresh_domain_stats(store)
+        expected = client.get_domain_counts(days=3650, pending_only=False)
+        result = store.query()
+
+        assert refresh["full_scan"] is True
+        assert refresh["read"] == 60
+        assert counts(result) == counts(expected)
+
+    def test_incremental_reads_only_changes(self, inbox):
+        """New and re-categorised messages are read; known senders aren't re-resolved."""
+        client = make_client(inbox)
+        store = DomainStatsStore()
+        client.refresh_domain_stats(store)
+        FakeMessage.sender_reads = 0
+
+        later = NOW + timedelta(hours=2)
+        inbox.append(FakeMessage(100, "new@hooli.com", later))
+        inbox[1].categorize("effi:archived", later)
+        refresh = client.refresh_domain_stats(store)
+
+        assert refresh["full_scan"] is False
+        # The two changes, plus the message in the (inclusive) watermark minute
+        assert refresh["read"] == 3
+        assert refresh["resolved"] == 1
+        assert FakeMessage.sender_reads == 1
+        result = store.query()
+        assert counts(result)["hooli.com"] == 1
+        assert result["total_pending"] == 40 - 1 + 1
+
+    def test_removed_messages_are_swept(self, inbox):
+        """Messages that left the Inbox should be dropped from the store."""
+        client = make_client(inbox)
+        store = DomainStatsStore()
+        client.refresh_domain_stats(store)
+
+        removed = inbox.pop(0)
+        refresh = client.refresh_domain_stats(store)
+
+        assert refresh["removed"] == 1
+        assert removed.EntryID not in store
+        assert len(store) == 59
+
+    def test_unchanged_refresh_does_not_rewrite_file(self, inbox, tmp_path):
+        """A refresh that finds nothing new should leave the JSON file alone."""
+        client = make_client(inbox)
+        path = tmp_path / "stats.json"
+        store = DomainStatsStore(path=path)
+        client.refresh_domain_stats(store)
+        path.write_text("{}")
+
+        refresh = client.refresh_domain_stats(store)
+
+        assert refresh["read"] == 1
+        assert path.read_text() == "{}"
+
+        inbox[1].categorize("effi:archived", NOW + timedelta(hours=2))
+        client.refresh_domain_stats(store)
+
+        assert path.read_text() != "{}"
+
+    def test_rescan_on_demand(self, inbox, tmp_path):
+        """full=True should rebuild from the whole Inbox."""
+        client = make_client(inbox)
+        store = DomainStatsStore(path=tmp_path / "stats.json")
+        client.refresh_domain_stats(store)
+        FakeMessage.sender_reads = 0
+
+        refresh = client.refresh_domain_stats(store, full=True)
+
+        assert refresh["full_scan"] is True
+        assert refresh["read"] == 60
+        assert FakeMessage.sender_reads == 60
+        assert (tmp_path / "stats.json").exists()
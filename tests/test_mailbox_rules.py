@@ -0,0 +1,365 @@
+"""Tests for the declarative mailbox rules engine.
+
+Rules (domain category / domains / senders / subject / age -> archive,
+delete, categorize, move) are compiled into OR-combined DASL queries, one
+per source folder and action where length allows, and run in resumable
+batches. The fake store evaluates the generated DASL and keeps restricted
+collections live, as Outlook does.
+"""
+
+import json
+import re
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from outlook_client import FoldersClient, RulesEngine, compile_rules, load_rules
+from outlook_client.rules import parse_rules
+
+
+NOW = datetime.now()
+ATOM = re.compile(r"\"([^\"]+)\" (LIKE|=|<|IS NULL)(?: '((?:[^']|'')*)')?")
+TRIAGE = FoldersClient.TRIAGE_CATEGORIES
+
+
+def like(value, pattern):
+    regex = ".*".join(re.escape(part) for part in pattern.split("%"))
+    return re.fullmatch(regex, value or "", re.IGNORECASE) is not None
+
+
+def evaluate_atom(match, message):
+    prop, op, value = match.groups()
+    value = (value or "").replace("''", "'")
+    if prop.endswith("#Keywords"):
+        categories = [c.strip() for c in message.Categories.split(",") if c.strip()]
+        if op == "IS NULL":
+            return not categories
+        return value in categories
+    if prop.endswith(":fromemail"):
+        field = message.SenderEmailAddress
+    elif prop.endswith(":subject"):
+        field = message.Subject
+    else:
+        return message.ReceivedTime < datetime.strptime(value, "%d/%m/%Y %H:%M")
+    if op == "LIKE":
+        return like(field, value)
+    return field.lower() == value.lower()
+
+
+def dasl_matches(message, query):
+    expression = ATOM.sub(lambda m: str(evaluate_atom(m, message)), query[len("@SQL="):])
+    expression = expression.replace(" AND ", " and ").replace(" OR ", " or ").replace("NOT ", "not ")
+    return eval(expression)
+
+
+class FakeMessage:
+    def __init__(self, store, index, sender, subject, age_days, categories=""):
+        self.store = store
+        self.EntryID = f"msg-{index}"
+        self.SenderEmailAddress = sender
+        self.Subject = subject
+        self.ReceivedTime = NOW - timedelta(days=age_days)
+        self.Categories = categories
+        self.folder = store.inbox
+
+    def Save(self):
+        self.store.saves += 1
+        self.store.changed(self)
+
+    def Move(self, folder):
+        self.folder = folder
+        self.store.changed(self)
+        return self
+
+    def Delete(self):
+        self.Move(self.store.deleted)
+
+
+class LiveItems:
+    def __init__(self, store, folder, query):
+        self.store = store
+        self.folder = folder
+        self.query = query
+        self.members = [m for m in store.messages if self.matches(m)]
+        store.collections.append(self)
+
+    def matches(self, message):
+        return message.folder is self.folder and dasl_matches(message, self.query)
+
+    @property
+    def Count(self):
+        return len(self.members)
+
+    def Item(self, index):
+        return self.members[index - 1]
+
+
+class FakeItems:
+    def __init__(self, store, folder):
+        self.store = store
+        self.folder = folder
+
+    def Restrict(self, query):
+        self.store.restricts.append(query)
+        return LiveItems(self.store, self.folder, query)
+
+
+class FakeFolder:
+    def __init__(self, store, name, parent=None):
+        self.store = store
+        self.Name = name
+        self.Parent = parent
+        self.Folders = []
+        self.EntryID = f"folder-{name}"
+        self.StoreID = "store"
+        self.FolderPath = f"\\\\me@firm.com\\{name}"
+
+    @property
+    def Items(self):
+        return FakeItems(self.store, self)
+
+
+class FakeStore:
+    """Inbox of marketing, Law360, newsletter and client mail."""
+
+    def __init__(self):
+        self.root = FakeFolder(self, "root")
+        self.inbox = FakeFolder(self, "Inbox", self.root)
+        self.archive = FakeFolder(self, "Archive", self.root)
+        self.deleted = FakeFolder(self, "Deleted Items", self.root)
+        self.root.Folders = [self.inbox, self.archive, self.deleted]
+        self.collections = []
+        self.restricts = []
+        self.saves = 0
+        self.messages = []
+        senders = ["promo@shop.com", "deals@sale.co.uk", "alerts@law360.com",
+                   "digest@news.org", "client@acme.com"]
+        for i in range(500):
+            sender = senders[i % len(senders)]
+            subject = "Weekly digest" if sender.startswith("digest") else f"Subject {i}"
+            self.messages.append(FakeMessage(self, i, sender, subject, age_days=i % 60))
+
+    def changed(self, message):
+        for collection in self.collections:
+            if message in collection.members and not collection.matches(message):
+                collection.members.remove(message)
+
+    def GetDefaultFolder(self, folder_id):
+        return self.inbox
+
+    def GetFolderFromID(self, entry_id, store_id):
+        return next(f for f in self.root.Folders if f.EntryID == entry_id)
+
+    def in_folder(self, folder):
+        return [m for m in self.messages if m.folder is folder]
+
+
+RULES = {
+    "rules": [
+        {"name": "marketing", "match": {"domain_category": "Marketing", "older_than_days": 7},
+         "action": "archive"},
+        {"name": "law360", "match": {"domains": ["law360.com"]}, "action": "delete"},
+        {"name": "law360-alerts", "match": {"senders": ["alerts@law360.com"]}, "action": "delete"},
+        {"name": "digests", "match": {"subject_contains": "Weekly digest"},
+         "action": "categorize", "category": "Newsletter"},
+    ]
+}
+CATEGORIES = {"Marketing": ["shop.com", "sale.co.uk"]}
+
+
+def make_engine(store, tmp_path=None, **kwargs):
+    client = FoldersClient()
+    client._namespace = store
+    client._outlook = object()
+    progress = tmp_path / "progress.json" if tmp_path else None
+    return RulesEngine(client, progress_path=progress, **kwargs)
+
+
+def make_plan(rules=RULES, **kwargs):
+    return compile_rules(parse_rules(rules), lambda c: CATEGORIES.get(c, []),
+                         triage_categories=TRIAGE, **kwargs)
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def store():
+    return FakeStore()
+
+
+# ============================================================================
+# Tests: loading and compiling
+# ============================================================================
+
+class TestCompileRules:
+    """Rules become as few store-side queries as possible."""
+
+    def test_rules_with_same_action_share_a_query(self):
+        """The two delete rules should be OR-combined into one query."""
+        plan = make_plan()
+
+        assert [g["rules"] for g in plan["groups"]] == [["marketing"], ["law360", "law360-alerts"], ["digests"]]
+        assert all(len(g["queries"]) == 1 for g in plan["groups"])
+        assert "law360.com" in plan["groups"][1]["queries"][0]
+
+    def test_long_domain_lists_are_chunked(self):
+        """A large domain category should split into queries under the limit."""
+        domains = [f"marketer{i}.com" for i in range(300)]
+        plan = compile_rules(
+            parse_rules(RULES), lambda c: domains if c == "Marketing" else [], max_length=1000
+        )
+        queries = plan["groups"][0]["queries"]
+
+        assert len(queries) > 1
+        assert all(len(q) <= 1000 for q in queries)
+        assert sum(q.count("LIKE '%@marketer") for q in queries) == 300
+        assert all("datereceived\" <" in q for q in queries)
+
+    def test_load_yaml_and_validate(self, tmp_path):
+        """YAML files load; malformed rules raise ValueError."""
+        path = tmp_path / "rules.yaml"
+        path.write_text("rules:\n  - match: {domains: law360.com}\n    action: delete\n")
+
+        rules = load_rules(path)
+
+        assert rules[0]["name"] == "rule-1"
+        assert rules[0]["domains"] == ["law360.com"]
+        with pytest.raises(ValueError):
+            parse_rules({"rules": [{"match": {"domains": ["x.com"]}, "action": "shred"}]})
+        with pytest.raises(ValueError):
+            parse_rules({"rules": [{"match": {"older_than_days": 3}, "action": "delete"}]})
+
+    def test_domain_category_is_case_insensitive(self):
+        """'marketing' should expand like 'Marketing'; unknown names are rejected."""
+        rules = {"rules": [{"match": {"domain_category": "marketing"}, "action": "archive"}]}
+
+        plan = make_plan(rules)
+
+        assert parse_rules(rules)[0]["domain_categories"] == ["Marketing"]
+        assert "shop.com" in plan["groups"][0]["queries"][0]
+        with pytest.raises(ValueError, match="Marketting"):
+            parse_rules({"rules": [{"match": {"domain_category": "Marketting"}, "action": "archive"}]})
+
+    def test_empty_domain_category_is_reported(self, store):
+        """A rule whose category has no domains should be listed, not silently dropped."""
+        rules = {"rules": [
+            {"name": "spam", "match": {"domain_category": "Spam"}, "action": "delete"},
+            {"match": {"domains": ["law360.com"]}, "action": "delete"},
+        ]}
+
+        plan = make_plan(rules)
+        report = make_engine(store).dry_run(plan)
+
+        assert plan["unmatched_rules"] == ["spam"]
+        assert report["unmatched_rules"] == ["spam"]
+        assert report["total_matched"] == 100
+
+
+# ============================================================================
+# Tests: running rules
+# ============================================================================
+
+class TestRulesEngine:
+    """Dry runs count; real runs act in batches and resume."""
+
+    def test_dry_run_counts_without_changes(self, store):
+        """Dry-run counts should match a naive Python scan and change nothing."""
+        report = make_engine(store).dry_run(make_plan())
+        matched = [g["matched"] for g in report["groups"]]
+
+        marketing = sum(1 for m in store.messages
+                        if m.SenderEmailAddress.split("@")[1] in CATEGORIES["Marketing"]
+                        and m.ReceivedTime < NOW - timedelta(days=7))
+        assert matched == [marketing, 100, 100]
+        assert report["queries"] == 3
+        assert len(store.restricts) == 3
+        assert store.saves == 0 and len(store.in_folder(store.inbox)) == 500
+
+    def test_run_applies_every_action(self, store):
+        """Archive, delete and categorize should each run in one pass."""
+        report = make_engine(store).run(make_plan())
+
+        assert report["complete"] is True
+        assert len(store.in_folder(store.deleted)) == 100
+        assert len(store.in_folder(store.archive)) == report["groups"][0]["processed"]
+        digests = [m for m in store.messages if m.Subject == "Weekly digest"]
+        assert all(m.Categories == "Newsletter" for m in digests)
+        assert report["total_failed"] == 0
+        assert report["items_per_second"] > 0
+
+    def test_rerun_is_idempotent(self, store):
+        """A second run should find nothing left to do."""
+        engine = make_engine(store)
+        engine.run(make_plan())
+        saves = store.saves
+
+        report = engine.run(make_plan())
+
+        assert report["total_processed"] == 0
+        assert store.saves == saves
+
+    def test_budgeted_run_resumes(self, store, tmp_path):
+        """Runs stopped by max_items should continue with cumulative totals."""
+        engine = make_engine(store, tmp_path, batch_size=20)
+        plan = make_plan()
+
+        first = engine.run(plan, max_items=60)
+        assert first["complete"] is False
+        assert first["run_processed"] == 60
+        assert (tmp_path / "progress.json").exists()
+
+        runs = 1
+        report = first
+        while not report["complete"]:
+            report = engine.run(plan, max_items=60)
+            runs += 1
+
+        expected = make_engine(FakeStore()).run(make_plan())["total_processed"]
+        assert report["total_processed"] == expected
+        assert runs == -(-expected // 60)
+        assert not (tmp_path / "progress.json").exists()
+
+    def test_missing_target_reports_error(self, store):
+        """A move to an unknown folder should fail its group only."""
+        rules = {"rules": [
+            {"match": {"domains": ["acme.com"]}, "action": "move", "target": "Nope"},
+            {"match": {"domains": ["law360.com"]}, "action": "delete"},
+        ]}
+
+        report = make_engine(store).run(make_plan(rules))
+
+        assert "Nope" in report["groups"][0]["error"]
+        assert report["groups"][1]["processed"] == 100
+
+
+# ============================================================================
+# Tests: run_mailbox_rules tool
+# ============================================================================
+
+class TestRunMailboxRulesTool:
+    """The tool loads, compiles and defaults to a dry run."""
+
+    def test_dry_run_by_default(self, store, tmp_path):
+        """Without dry_run=False the tool should only count."""
+        from effi_mail.tools import run_mailbox_rules
+
+        path = tmp_path / "rules.json"
+        path.write_text(json.dumps(RULES))
+        with patch("effi_mail.tools.rules.rules_engine", make_engine(store)), \
+             patch("effi_mail.tools.rules.get_domains_by_category", lambda c: CATEGORIES.get(c, [])):
+            result = json.loads(run_mailbox_rules(str(path)))
+
+        assert result["dry_run"] is True
+        assert result["total_matched"] > 0
+        assert store.saves == 0
+
+    def test_invalid_file_returns_error(self, tmp_path):
+        """A missing rule file should return an error, not raise."""
+        from effi_mail.tools import run_mailbox_rules
+
+        result = json.loads(run_mailbox_rules(str(tmp_path / "missing.yaml")))
+
+        assert "error" in result
@@ -0,0 +1,268 @@
+"""Tests for cursor-based pagination of Outlook searches.
+
+A continuation cursor encodes the folder, the ReceivedTime of the last
+email returned, the EntryIDs returned at exactly that time and a hash of
+the search filters. The next page restricts on ReceivedTime <= cursor and
+skips the ties, so each page costs about one page of conversions and
+stays correct when new mail arrives between calls.
+"""
+
+import json
+import re
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from effi_mail.helpers import decode_cursor, encode_cursor
+from models import Email
+from outlook_client import SearchClient
+from outlook_client.address_cache import AddressCache
+
+
+BASE_TIME = datetime(2026, 1, 15, 12, 0, 30)
+DATE_CONDITION = re.compile(r"(\[ReceivedTime\]|\"urn:schemas:httpmail:datereceived\") (>=|<=) '([^']+)'")
+
+
+class FakeAccessor:
+    def GetProperties(self, tags):
+        return tuple(-2147221233 for _ in tags)
+
+
+class EmptyCollection:
+    Count = 0
+
+
+class FakeMessage:
+    def __init__(self, entry_id, received):
+        self.EntryID = entry_id
+        self.Subject = f"Subject {entry_id}"
+        self.SenderName = "Sender"
+        self.SenderEmailAddress = "someone@client.com"
+        self.Sender = None
+        self.ReceivedTime = received
+        self.Categories = ""
+        self.ConversationID = f"conv-{entry_id}"
+        self.Body = "Body"
+        self.HTMLBody = ""
+        self.PropertyAccessor = FakeAccessor()
+        self.Recipients = EmptyCollection()
+        self.Attachments = EmptyCollection()
+
+
+class FakeItems(list):
+    """Items that apply date conditions with minute precision, like Outlook."""
+
+    def Sort(self, column, descending):
+        self.sort(key=lambda m: m.ReceivedTime, reverse=descending)
+
+    def Restrict(self, filter_str):
+        result = FakeItems(self)
+        for _, op, value in DATE_CONDITION.findall(filter_str):
+            bound = datetime.strptime(value, "%d/%m/%Y %H:%M")
+            if op == ">=":
+                result = FakeItems(m for m in result if m.ReceivedTime >= bound)
+            else:
+                result = FakeItems(m for m in result if m.ReceivedTime <= bound)
+        return result
+
+
+class FakeFolder:
+    def __init__(self, messages):
+        self.Name = "Inbox"
+        self.messages = messages
+
+    @property
+    def Items(self):
+        return FakeItems(self.messages)
+
+    def GetTable(self, filter_str=None):
+        raise Exception("GetTable not supported")
+
+
+class FakeNamespace:
+    def __init__(self, folder):
+        self.folder = folder
+
+    def GetDefaultFolder(self, folder_id):
+        return self.folder
+
+
+class CountingSearchClient(SearchClient):
+    """SearchClient that counts message conversions."""
+
+    def __init__(self):
+        super().__init__()
+        self.conversions = 0
+
+    def _message_to_email(self, *args, **kwargs):
+        self.conversions += 1
+        return super()._message_to_email(*args, **kwargs)
+
+
+def make_client(messages):
+    client = CountingSearchClient()
+    client.address_cache = AddressCache()
+    client._namespace = FakeNamespace(FakeFolder(messages))
+    client._outlook = object()
+    return client
+
+
+def make_email(email_id, received):
+    return Email(
+        id=email_id, subject="s", sender_name="n", sender_email="a@b.com",
+        domain="b.com", received_time=received,
+    )
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def messages():
+    """200 messages, several sharing a timestamp (ties) at second precision."""
+    result = []
+    for i in range(200):
+        received = BASE_TIME - timedelta(seconds=20 * (i // 3))
+        result.append(FakeMessage(f"msg-{i:03d}", received))
+    return result
+
+
+# ============================================================================
+# Tests: cursor encoding
+# ============================================================================
+
+class TestCursorEncoding:
+    """Cursors are opaque, round-trip, and bound to one search."""
+
+    def test_round_trip(self):
+        """A cursor should decode to the last time and the IDs at that time."""
+        page = [make_email("a", BASE_TIME), make_email("b", BASE_TIME - timedelta(minutes=1)),
+                make_email("c", BASE_TIME - timedelta(minutes=1))]
+        cursor = encode_cursor("Inbox", page, {"domain": "client.com"})
+
+        position = decode_cursor(cursor, "Inbox", {"domain": "client.com"})
+
+        assert position["received_before"] == BASE_TIME - timedelta(minutes=1)
+        assert position["skip_ids"] == {"b", "c"}
+
+    def test_rejects_other_filters_or_folder(self):
+        """A cursor can't be replayed against a different search."""
+        cursor = encode_cursor("Inbox", [make_email("a", BASE_TIME)], {"domain": "client.com"})
+
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "Inbox", {"domain": "other.com"})
+        with pytest.raises(ValueError):
+            decode_cursor(cursor, "Sent Items", {"domain": "client.com"})
+
+    def test_rejects_malformed_cursor(self):
+        """Garbage should raise ValueError, not crash the tool."""
+        with pytest.raises(ValueError):
+            decode_cursor("not-a-cursor!", "Inbox", {})
+
+    def test_keeps_ties_across_pages(self):
+        """A page that ends on its starting timestamp keeps the earlier tie IDs."""
+        previous = {"received_before": BASE_TIME, "skip_ids": {"a", "b"}}
+        cursor = encode_cursor("Inbox", [make_email("c", BASE_TIME)], {}, previous)
+
+        assert decode_cursor(cursor, "Inbox", {})["skip_ids"] == {"a", "b", "c"}
+
+
+# ============================================================================
+# Tests: paged search_outlook
+# ============================================================================
+
+class TestPagedSearch:
+    """Pages continue from the cursor instead of rescanning."""
+
+    def page_through(self, client, page_size, between_pages=None):
+        pages = []
+        position = None
+        while True:
+            emails = client.search_outlook(days=3650, limit=page_size + 1, **(position or {}))
+            page = emails[:page_size]
+            pages.append(page)
+            if len(emails) <= page_size:
+                return pages
+            position = decode_cursor(encode_cursor("Inbox", page, {}, position), "Inbox", {})
+            if between_pages:
+                between_pages()
+
+    def test_pages_cover_everything_once(self, messages):
+        """Every message should appear exactly once, newest first, despite ties."""
+        client = make_client(messages)
+
+        pages = self.page_through(client, page_size=7)
+        ids = [e.id for page in pages for e in page]
+
+        assert sorted(ids) == sorted(m.EntryID for m in messages)
+        assert len(ids) == len(set(ids))
+        times = [e.received_time for page in pages for e in page]
+        assert times == sorted(times, reverse=True)
+
+    def test_page_cost_is_page_size(self, messages):
+        """A later page should convert about one page of messages, not all prior ones."""
+        client = make_client(messages)
+        first = client.search_outlook(days=3650, limit=11)
+        position = decode_cursor(encode_cursor("Inbox", first[:10], {}), "Inbox", {})
+
+        client.conversions = 0
+        client.search_outlook(days=3650, limit=11, **position)
+
+        assert client.conversions == 11
+
+    def test_new_mail_does_not_shift_pages(self, messages):
+        """Mail arriving between pages must not cause repeats or gaps."""
+        client = make_client(messages)
+        counter = iter(range(1000))
+
+        def new_mail():
+            messages.insert(0, FakeMessage(f"new-{next(counter)}", BASE_TIME + timedelta(hours=1)))
+
+        pages = self.page_through(client, page_size=25, between_pages=new_mail)
+        ids = [e.id for page in pages for e in page]
+
+        assert len(ids) == len(set(ids))
+        assert {i for i in ids if i.startswith("msg-")} == {f"msg-{i:03d}" for i in range(200)}
+        assert not any(i.startswith("new-") for i in ids)
+
+
+# ============================================================================
+# Tests: tool responses
+# ============================================================================
+
+class TestToolCursor:
+    """Tools return next_cursor and accept it back."""
+
+    def test_search_outlook_direct_pages(self, messages):
+        """next_cursor from page 1 should fetch page 2 without overlap."""
+        from effi_mail.tools import search_outlook_direct
+
+        client = make_client(messages)
+        with patch("effi_mail.tools.client_search.search", client), \
+             patch("effi_mail.helpers.triage") as triage:
+            triage.get_triage_status.return_value = None
+            first = json.loads(search_outlook_direct(days=3650, limit=5))
+            second = json.loads(search_outlook_direct(days=3650, limit=5, cursor=first["next_cursor"]))
+
+        assert first["results_truncated"] is True
+        first_ids = [e["id"] for e in first["emails"]]
+        second_ids = [e["id"] for e in second["emails"]]
+        assert first_ids == [f"msg-{i:03d}" for i in range(5)]
+        assert second_ids == [f"msg-{i:03d}" for i in range(5, 10)]
+
+    def test_mismatched_cursor_returns_error(self, messages):
+        """Reusing a cursor with different filters should return an error."""
+        from effi_mail.tools import search_outlook_direct
+
+        client = make_client(messages)
+        with patch("effi_mail.tools.client_search.search", client), \
+             patch("effi_mail.helpers.triage") as triage:
+            triage.get_triage_status.return_value = None
+            first = json.loads(search_outlook_direct(days=3650, limit=5))
+            result = json.loads(search_outlook_direct(
+                days=3650, limit=5, sender_domain="other.com", cursor=first["next_cursor"]
+            ))
+
+        assert "error" in result
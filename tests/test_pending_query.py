@@ -0,0 +1,238 @@
+"""Tests for store-side triage-pending filtering.
+
+The "no effi: category" predicate is expressed in DASL on the Keywords
+property and combined with the date (and domain) predicates, so triaged
+messages never cross the COM boundary. The benchmark uses a mostly
+triaged Inbox and compares against stores that reject the Keywords
+predicate, where the old per-message category check still applies.
+"""
+
+import re
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from outlook_client import RetrievalClient, TriageClient
+from outlook_client.address_cache import AddressCache
+
+
+BASE_TIME = datetime(2026, 1, 15, 12, 0)
+INBOX_SIZE = 1000
+PENDING_EVERY = 20
+PROPERTY_LATENCY = 0.0002
+KEYWORDS = RetrievalClient.KEYWORDS_PROP
+
+
+class FakeAccessor:
+    def GetProperties(self, tags):
+        return tuple(-2147221233 for _ in tags)
+
+
+class EmptyCollection:
+    Count = 0
+
+
+class FakeMessage:
+    """Message whose Categories read costs a COM round trip."""
+
+    reads = 0
+
+    def __init__(self, index, categories, sender):
+        self.EntryID = f"msg-{index}"
+        self.Subject = f"Subject {index}"
+        self.SenderName = "Sender"
+        self.SenderEmailAddress = sender
+        self.Sender = None
+        self.ReceivedTime = BASE_TIME - timedelta(minutes=index)
+        self.ConversationID = f"conv-{index}"
+        self.Body = "Body"
+        self.HTMLBody = ""
+        self.PropertyAccessor = FakeAccessor()
+        self.Recipients = EmptyCollection()
+        self.Attachments = EmptyCollection()
+        self.categories = categories
+
+    @property
+    def Categories(self):
+        FakeMessage.reads += 1
+        time.sleep(PROPERTY_LATENCY)
+        return self.categories
+
+
+def keyword_filter_allows(message, filter_str):
+    """Evaluate the Keywords and fromemail predicates of a pending query."""
+    if f'"{KEYWORDS}" LIKE' in filter_str:
+        prefix = re.search(rf'"{re.escape(KEYWORDS)}" LIKE \'([^%\']*)%\'', filter_str).group(1)
+        if any(c.strip().startswith(prefix) for c in message.categories.split(",") if c.strip()):
+            return False
+    domain = re.search(r"fromemail\" LIKE '%@([^']+)'", filter_str)
+    if domain and not message.SenderEmailAddress.endswith("@" + domain.group(1)):
+        return False
+    return True
+
+
+class FakeItems(list):
+    def __init__(self, messages, store):
+        super().__init__(messages)
+        self.store = store
+
+    def Sort(self, column, descending):
+        self.sort(key=lambda m: m.ReceivedTime, reverse=descending)
+
+    def Restrict(self, filter_str):
+        self.store.restricts.append(filter_str)
+        if KEYWORDS in filter_str and not self.store.supports_keywords:
+            raise Exception("Condition is not valid")
+        return FakeItems([m for m in self if keyword_filter_allows(m, filter_str)], self.store)
+
+
+class FakeFolder:
+    def __init__(self, messages, supports_keywords=True):
+        self.Name = "Inbox"
+        self.messages = messages
+        self.supports_keywords = supports_keywords
+        self.restricts = []
+
+    @property
+    def Items(self):
+        return FakeItems(self.messages, self)
+
+    def GetTable(self, filter_str=None):
+        raise Exception("GetTable not supported")
+
+
+class FakeNamespace:
+    def __init__(self, folder):
+        self.folder = folder
+
+    def GetDefaultFolder(self, folder_id):
+        return self.folder
+
+
+def make_client(cls, folder):
+    client = cls()
+    client.address_cache = AddressCache()
+    client._namespace = FakeNamespace(folder)
+    client._outlook = object()
+    return client
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def inbox():
+    """1000 messages; only every 20th is untriaged (5% pending)."""
+    FakeMessage.reads = 0
+    triaged = ["effi:processed", "Red, effi:archived", "effi:action"]
+    messages = []
+    for i in range(INBOX_SIZE):
+        categories = "Blue" if i % PENDING_EVERY == 0 else triaged[i % 3]
+        sender = f"user{i}@client{i % 4}.com"
+        messages.append(FakeMessage(i, categories, sender))
+    return messages
+
+
+# ============================================================================
+# Tests: query building
+# ============================================================================
+
+class TestPendingQuery:
+    """The pending predicate is part of one DASL query."""
+
+    def test_query_combines_predicates(self):
+        """Date, Keywords and domain conditions should be ANDed in one query."""
+        query = RetrievalClient()._pending_query(datetime(2026, 1, 1), sender_domain="acme.com")
+
+        assert query.startswith("@SQL=")
+        assert "datereceived\" >= '01/01/2026 00:00'" in query
+        assert f'"{KEYWORDS}" IS NULL OR NOT ("{KEYWORDS}" LIKE \'effi:%\')' in query
+        assert "fromemail\" LIKE '%@acme.com'" in query
+
+    def test_has_triage_category(self):
+        """Any effi: category marks a message as triaged."""
+        client = RetrievalClient()
+
+        assert client._has_triage_category("Red, effi:waiting") is True
+        assert client._has_triage_category("Red, Blue") is False
+        assert client._has_triage_category(None) is False
+
+
+# ============================================================================
+# Tests: store-side filtering
+# ============================================================================
+
+class TestStoreSideFiltering:
+    """Triaged messages are excluded by the Restrict, not in Python."""
+
+    def test_pending_emails_single_restrict(self, inbox):
+        """get_pending_emails should Restrict once and see only pending mail."""
+        folder = FakeFolder(inbox)
+        client = make_client(RetrievalClient, folder)
+
+        result = client.get_pending_emails(days=3650, limit=500, group_by_domain=False)
+
+        assert result["total"] == INBOX_SIZE // PENDING_EVERY
+        assert len(folder.restricts) == 1
+        assert FakeMessage.reads <= 2 * result["total"]
+
+    def test_domain_counts_pending_only(self, inbox):
+        """get_domain_counts should only enumerate pending messages."""
+        client = make_client(RetrievalClient, FakeFolder(inbox))
+
+        result = client.get_domain_counts(days=3650, pending_only=True)
+
+        assert result["total_scanned"] == INBOX_SIZE // PENDING_EVERY
+        assert result["total_pending"] == INBOX_SIZE // PENDING_EVERY
+
+    def test_domain_query_from_triage_client(self, inbox):
+        """get_pending_emails_from_domain should combine domain and pending predicates."""
+        folder = FakeFolder(inbox)
+        client = make_client(TriageClient, folder)
+
+        emails = client.get_pending_emails_from_domain("client0.com", days=3650)
+
+        assert len(emails) == INBOX_SIZE // PENDING_EVERY
+        assert all(e.sender_email.endswith("@client0.com") for e in emails)
+        assert len(folder.restricts) == 1
+
+    def test_fallback_when_keywords_rejected(self, inbox):
+        """Stores that reject the Keywords filter still get correct results."""
+        client = make_client(RetrievalClient, FakeFolder(inbox, supports_keywords=False))
+
+        result = client.get_pending_emails(days=3650, limit=500, group_by_domain=False)
+
+        assert result["total"] == INBOX_SIZE // PENDING_EVERY
+        assert all(e.categories == "Blue" for e in result["emails"])
+
+
+# ============================================================================
+# Benchmark: mostly triaged inbox
+# ============================================================================
+
+class TestMostlyTriagedBenchmark:
+    """Store-side filtering avoids touching triaged messages."""
+
+    def test_fewer_reads_and_faster(self, inbox):
+        """Category reads and time should drop roughly with the pending ratio."""
+        store_client = make_client(RetrievalClient, FakeFolder(inbox))
+        python_client = make_client(RetrievalClient, FakeFolder(inbox, supports_keywords=False))
+
+        FakeMessage.reads = 0
+        start = time.perf_counter()
+        python_result = python_client.get_domain_counts(days=3650, pending_only=True)
+        python_time = time.perf_counter() - start
+        python_reads = FakeMessage.reads
+
+        FakeMessage.reads = 0
+        start = time.perf_counter()
+        store_result = store_client.get_domain_counts(days=3650, pending_only=True)
+        store_time = time.perf_counter() - start
+        store_reads = FakeMessage.reads
+
+        assert store_result["total_pending"] == python_result["total_pending"]
+        assert python_reads == INBOX_SIZE
+        assert store_reads == INBOX_SIZE // PENDING_EVERY
+        assert store_time < python_time / 4
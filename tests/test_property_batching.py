@@ -0,0 +1,347 @@
+"""Tests for batched MAPI property reads and lazy attachment metadata.
+
+Projections name the tags needed for each kind of object, and
+get_properties fetches them with one PropertyAccessor.GetProperties call.
+Attachment names are only enumerated when Email.attachment_names is read;
+has_attachments comes from PR_HASATTACH. A fake COM object model counts
+every property read and method call so the per-message round trips can be
+compared with the unbatched baseline.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from outlook_client import RetrievalClient
+from outlook_client.address_cache import AddressCache
+from outlook_client.properties import (
+    PROJECTIONS,
+    PR_ATTACH_CONTENT_ID,
+    PR_ATTACH_LONG_FILENAME,
+    PR_ATTACH_MIME_TAG,
+    PR_ATTACH_SIZE,
+    PR_EMAIL_ADDRESS,
+    PR_HASATTACH,
+    PR_INTERNET_MESSAGE_ID,
+    PR_RECIPIENT_TYPE,
+    PR_SMTP_ADDRESS,
+    get_properties,
+    is_property_error,
+)
+
+
+MAPI_E_NOT_FOUND = -2147221233
+
+# COM round trips per message on the fixture below, measured with
+# one GetProperty per tag and one pass over Recipients per type
+UNBATCHED_MESSAGE_TO_EMAIL = 61
+UNBATCHED_GET_EMAIL_FULL = 62
+UNBATCHED_LIST_ATTACHMENTS = 14
+
+
+class CallCounter:
+    """Counts COM round trips by member name."""
+
+    def __init__(self):
+        self.calls = 0
+        self.by_name = {}
+
+    def hit(self, name):
+        self.calls += 1
+        self.by_name[name] = self.by_name.get(name, 0) + 1
+
+
+class FakeCom:
+    """Fake COM object: every read of a member is one round trip."""
+
+    def __init__(self, counter, **members):
+        object.__setattr__(self, "_counter", counter)
+        object.__setattr__(self, "_members", members)
+
+    def __getattr__(self, name):
+        members = object.__getattribute__(self, "_members")
+        if name not in members:
+            raise AttributeError(name)
+        object.__getattribute__(self, "_counter").hit(name)
+        return members[name]
+
+
+def make_accessor(counter, props, batched=True):
+    """PropertyAccessor over a tag -> value dict (missing tags are errors)."""
+    def get_property(tag):
+        if tag in props:
+            return props[tag]
+        raise Exception("property not found")
+
+    def get_properties_(tags):
+        return tuple(props.get(tag, MAPI_E_NOT_FOUND) for tag in tags)
+
+    members = {"GetProperty": get_property}
+    if batched:
+        members["GetProperties"] = get_properties_
+    return FakeCom(counter, **members)
+
+
+def make_message(counter, batched=True, attachment_names=("contract.pdf", "image001.png", "notes.docx")):
+    """Message with 4 recipients (2 To, 2 CC) and 3 attachments (1 inline)."""
+    recipients = []
+    for i in range(4):
+        smtp = f"r{i}@acme.com"
+        address = f"/o=acme/cn=r{i}"
+        recipient_type = 1 if i % 2 == 0 else 2
+        recipients.append(FakeCom(
+            counter, Type=recipient_type, Address=address,
+            PropertyAccessor=make_accessor(counter, {
+                PR_SMTP_ADDRESS: smtp,
+                PR_EMAIL_ADDRESS: address,
+                PR_RECIPIENT_TYPE: recipient_type,
+            }, batched),
+        ))
+
+    attachments = []
+    for name in attachment_names:
+        attachments.append(FakeCom(
+            counter, FileName=name, Size=100,
+            PropertyAccessor=make_accessor(counter, {
+                PR_ATTACH_LONG_FILENAME: name,
+                PR_ATTACH_SIZE: 100,
+                PR_ATTACH_CONTENT_ID: "cid:1" if name.startswith("image") else "",
+            }, batched),
+        ))
+
+    sender = FakeCom(counter, AddressEntryUserType=1, Address="ext@client.com", ID="id-1",
+                     GetExchangeUser=lambda: None)
+    return FakeCom(
+        counter,
+        EntryID="entry-1", Subject="Subject", SenderName="Sender",
+        SenderEmailAddress="ext@client.com", Sender=sender,
+        ReceivedTime=datetime(2026, 1, 15, 9, 0),
+        Attachments=FakeCom(counter, Count=len(attachments), Item=lambda i: attachments[i - 1]),
+        Recipients=FakeCom(counter, Count=len(recipients), Item=lambda i: recipients[i - 1]),
+        Body="Body", HTMLBody="<p>Body</p>", Categories="",
+        ConversationID="conv-1", ConversationTopic="Subject", MessageClass="IPM.Note",
+        PropertyAccessor=make_accessor(counter, {
+            PR_INTERNET_MESSAGE_ID: "<msg-1@client.com>",
+            PR_HASATTACH: bool(attachments),
+            PR_SMTP_ADDRESS: "ext@client.com",
+        }, batched),
+    )
+
+
+class FakeNamespace:
+    """Namespace that returns a fixed message."""
+
+    def __init__(self, message):
+        self.message = message
+
+    def GetItemFromID(self, entry_id):
+        return self.message
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def counter():
+    """Fresh COM call counter."""
+    return CallCounter()
+
+
+@pytest.fixture
+def client():
+    """Client with a private address cache (so no cross-test hits)."""
+    c = RetrievalClient()
+    c.address_cache = AddressCache()
+    return c
+
+
+# ============================================================================
+# Tests: get_properties
+# ============================================================================
+
+class TestGetProperties:
+    """One GetProperties call per projection, with graceful fallback."""
+
+    def test_single_call_for_projection(self, counter):
+        """All tags in a projection should be read with one call."""
+        att = FakeCom(counter, PropertyAccessor=make_accessor(counter, {
+            PR_ATTACH_LONG_FILENAME: "a.pdf",
+            PR_ATTACH_SIZE: 42,
+            PR_ATTACH_MIME_TAG: "application/pdf",
+        }))
+
+        props = get_properties(att, "attachment_detail")
+
+        assert props == {"filename": "a.pdf", "size": 42, "content_id": None,
+                         "mime_type": "application/pdf"}
+        assert counter.by_name == {"PropertyAccessor": 1, "GetProperties": 1}
+
+    def test_falls_back_to_get_property(self, counter):
+        """Without GetProperties, each tag should be read individually."""
+        att = FakeCom(counter, PropertyAccessor=make_accessor(counter, {
+            PR_ATTACH_LONG_FILENAME: "a.pdf",
+        }, batched=False))
+
+        props = get_properties(att, "attachment_detail")
+
+        assert props["filename"] == "a.pdf"
+        assert props["size"] is None
+        assert counter.by_name["GetProperty"] == len(PROJECTIONS["attachment_detail"])
+
+    def test_error_codes_are_missing_values(self):
+        """SCODEs in string slots are errors; ints in PT_LONG slots are values."""
+        assert is_property_error(PR_SMTP_ADDRESS, MAPI_E_NOT_FOUND)
+        assert is_property_error(PR_ATTACH_SIZE, MAPI_E_NOT_FOUND)
+        assert not is_property_error(PR_ATTACH_SIZE, 1024)
+        assert not is_property_error(PR_SMTP_ADDRESS, "a@b.com")
+
+
+# ============================================================================
+# Tests: COM call counts per message
+# ============================================================================
+
+class TestComCallReduction:
+    """Batched reads make fewer round trips than the unbatched baseline.
+
+    Counts are taken with the address cache warm (the same recipients
+    already seen), as in steady state; misses are covered separately.
+    """
+
+    @pytest.fixture(autouse=True)
+    def warm_address_cache(self, client):
+        client._message_to_email(make_message(CallCounter()))
+
+    def test_message_to_email(self, client, counter):
+        """_message_to_email should batch recipients and read them in one pass."""
+        email = client._message_to_email(make_message(counter))
+
+        assert email.recipients_to == ("r0@acme.com", "r2@acme.com")
+        assert email.recipients_cc == ("r1@acme.com", "r3@acme.com")
+        assert email.internet_message_id == "<msg-1@client.com>"
+        assert counter.by_name["Recipients"] == 1
+        assert counter.calls < UNBATCHED_MESSAGE_TO_EMAIL // 2
+
+    def test_get_email_full(self, client, counter):
+        """get_email_full should read each attachment with one batched call."""
+        client._namespace = FakeNamespace(make_message(counter))
+        client._outlook = object()
+
+        result = client.get_email_full("entry-1")
+
+        assert result["attachments"][1] == {"name": "image001.png", "size": 100}
+        assert result["recipients_cc"] == ["r1@acme.com", "r3@acme.com"]
+        assert "Size" not in counter.by_name
+        assert counter.calls < UNBATCHED_GET_EMAIL_FULL * 3 // 4
+
+    def test_list_attachments(self, client, counter):
+        """list_attachments should detect inline images from the content-ID."""
+        client._namespace = FakeNamespace(make_message(counter))
+        client._outlook = object()
+
+        result = client.list_attachments("entry-1")
+
+        assert [a["name"] for a in result["inline_images"]] == ["image001.png"]
+        assert result["attachments"][0]["content_type"] == "application/pdf"
+        assert counter.calls < UNBATCHED_LIST_ATTACHMENTS
+
+    def test_recipient_miss_reads_smtp_once(self, counter):
+        """On a cache miss each recipient's SMTP should be read with one batched call."""
+        client = RetrievalClient()
+        client.address_cache = AddressCache()
+
+        email = client._message_to_email(make_message(counter))
+
+        assert email.recipients_to == ("r0@acme.com", "r2@acme.com")
+        assert counter.by_name["GetProperties"] == 1 + 4
+        assert client.address_cache.get("/o=acme/cn=r3") == "r3@acme.com"
+
+    def test_fallback_matches_batched(self, client):
+        """Per-tag fallback should produce the same email as the batched path."""
+        batched = client._message_to_email(make_message(CallCounter()))
+        unbatched = client._message_to_email(make_message(CallCounter(), batched=False))
+        batched.attachment_names = []
+        unbatched.attachment_names = []
+
+        assert unbatched == batched
+
+
+# ============================================================================
+# Tests: lazy attachment metadata
+# ============================================================================
+
+class TestLazyAttachments:
+    """Attachment names are only enumerated when read."""
+
+    def test_listing_does_not_enumerate_attachments(self, client, counter):
+        """has_attachments should come from PR_HASATTACH, not Attachments."""
+        email = client._message_to_email(make_message(counter))
+
+        assert email.has_attachments is True
+        assert "Attachments" not in counter.by_name
+        assert "FileName" not in counter.by_name
+
+    def test_names_loaded_on_first_access(self, client, counter):
+        """Reading attachment_names should re-open the message once."""
+        message = make_message(counter)
+        client._namespace = FakeNamespace(message)
+        client._outlook = object()
+        email = client._message_to_email(message)
+
+        assert email.attachment_names == ["contract.pdf", "notes.docx"]
+        assert email.attachment_names == ["contract.pdf", "notes.docx"]
+        assert counter.by_name["Attachments"] == 1
+
+    def test_no_loader_without_attachments(self, client, counter):
+        """A message without attachments should have empty names and no lookup."""
+        email = client._message_to_email(make_message(counter, attachment_names=()))
+
+        assert email.has_attachments is False
+        assert email.attachment_names == []
+        assert "Attachments" not in counter.by_name
+
+    def test_missing_hasattach_falls_back_to_count(self, client, counter):
+        """Without PR_HASATTACH, Attachments.Count should decide has_attachments."""
+        message = make_message(counter)
+        del message.PropertyAccessor._members["GetProperties"]
+        message.PropertyAccessor._members["GetProperty"] = lambda tag: "<msg-1@client.com>"
+
+        email = client._message_to_email(message)
+
+        assert email.has_attachments is True
+        assert counter.by_name["Count"] >= 1
+
+    def test_list_attachments_many(self, client):
+        """list_attachments_many should return per-email details and errors."""
+        class Namespace:
+            def GetItemFromID(self, entry_id):
+                if entry_id == "missing":
+                    raise Exception("not found")
+                return make_message(CallCounter())
+
+        client._namespace = Namespace()
+        client._outlook = object()
+
+        results = client.list_attachments_many(["a", "missing", "a"])
+
+        assert list(results) == ["a", "missing"]
+        assert results["a"]["count"] == 3
+        assert results["missing"]["success"] is False
+
+    def test_list_attachments_many_tool(self):
+        """The tool should filter to documents when documents_only is set."""
+        import json
+        from unittest.mock import Mock, patch
+        from effi_mail.tools import list_attachments_many
+
+        mock_retrieval = Mock()
+        mock_retrieval.list_attachments_many.return_value = {
+            "a": {"success": True, "attachments": [{"name": "x.pdf"}, {"name": "y.png"}],
+                  "documents": [{"name": "x.pdf"}], "inline_images": []},
+            "b": {"success": False, "error": "Email not found"},
+        }
+        with patch("effi_mail.tools.email_retrieval.retrieval", mock_retrieval):
+            result = json.loads(list_attachments_many(["a", "b"], documents_only=True))
+
+        assert result["emails"]["a"] == {"count": 1, "attachments": [{"name": "x.pdf"}]}
+        assert result["emails"]["b"] == {"error": "Email not found"}
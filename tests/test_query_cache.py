@@ -0,0 +1,288 @@
+"""Tests for the query result cache in front of SearchClient and DMSClient.
+
+Repeated searches with the same normalized parameters are served from a
+bounded LRU. Results are tagged with the folders they read: triage, move
+and filing operations invalidate exactly those folders, and a TTL covers
+changes made outside effi-mail.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from outlook_client import FoldersClient, QueryCache, SearchClient, TriageClient
+from outlook_client.address_cache import AddressCache
+from outlook_client.query_cache import dms_tag, dms_tags, folder_tag
+
+
+NOW = datetime.now()
+
+
+class FakeAccessor:
+    def GetProperties(self, tags):
+        return tuple(-2147221233 for _ in tags)
+
+
+class EmptyCollection:
+    Count = 0
+
+
+class FakeMessage:
+    def __init__(self, store, index, folder):
+        self.store = store
+        self.EntryID = f"msg-{index:03d}"
+        self.Subject = f"Subject {index}"
+        self.SenderName = "Sender"
+        self.SenderEmailAddress = f"someone@client{index % 2}.com"
+        self.Sender = None
+        self.ReceivedTime = NOW - timedelta(minutes=index)
+        self.Categories = ""
+        self.ConversationID = f"conv-{index}"
+        self.Body = "Body"
+        self.HTMLBody = ""
+        self.PropertyAccessor = FakeAccessor()
+        self.Recipients = EmptyCollection()
+        self.Attachments = EmptyCollection()
+        self.folder = folder
+
+    def Save(self):
+        pass
+
+    def Move(self, folder):
+        self.folder = folder
+        return self
+
+
+class FakeItems(list):
+    def Sort(self, column, descending):
+        self.sort(key=lambda m: m.ReceivedTime, reverse=descending)
+
+    def Restrict(self, filter_str):
+        return FakeItems(self)
+
+
+class FakeFolder:
+    def __init__(self, store, name, parent=None):
+        self.store = store
+        self.Name = name
+        self.Parent = parent
+        self.Folders = []
+        self.EntryID = f"folder-{name}"
+        self.StoreID = "store"
+        self.FolderPath = f"\\\\me@firm.com\\{name}" if parent is None or parent.Parent is None \
+            else f"{parent.FolderPath}\\{name}"
+
+    @property
+    def Items(self):
+        return FakeItems(m for m in self.store.messages if m.folder is self)
+
+    def GetTable(self, filter_str=None):
+        raise Exception("GetTable not supported")
+
+
+class FakeStore:
+    """Inbox with 40 messages and an Inbox\\Done subfolder."""
+
+    def __init__(self):
+        self.root = FakeFolder(self, "root")
+        self.inbox = FakeFolder(self, "Inbox", self.root)
+        self.sent = FakeFolder(self, "Sent Items", self.root)
+        self.done = FakeFolder(self, "Done", self.inbox)
+        self.root.Folders = [self.inbox, self.sent]
+        self.inbox.Folders = [self.done]
+        self.messages = [FakeMessage(self, i, self.inbox) for i in range(40)]
+
+    def GetDefaultFolder(self, folder_id):
+        return self.sent if folder_id == SearchClient.FOLDER_SENT else self.inbox
+
+    def GetItemFromID(self, entry_id):
+        return next(m for m in self.messages if m.EntryID == entry_id)
+
+    def GetFolderFromID(self, entry_id, store_id):
+        return next(f for f in (self.inbox, self.sent, self.done) if f.EntryID == entry_id)
+
+
+class CountingSearchClient(SearchClient):
+    """SearchClient that counts message conversions."""
+
+    def __init__(self):
+        super().__init__()
+        self.conversions = 0
+
+    def _message_to_email(self, *args, **kwargs):
+        self.conversions += 1
+        return super()._message_to_email(*args, **kwargs)
+
+
+def attach(client, store, cache):
+    client.address_cache = AddressCache()
+    client._namespace = store
+    client._outlook = object()
+    client.query_cache = cache
+    return client
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def store():
+    return FakeStore()
+
+
+@pytest.fixture
+def cache():
+    return QueryCache(ttl=60, max_entries=16)
+
+
+@pytest.fixture
+def search(store, cache):
+    return attach(CountingSearchClient(), store, cache)
+
+
+# ============================================================================
+# Tests: memoized searches
+# ============================================================================
+
+class TestMemoizedSearch:
+    """Identical searches are answered without touching Outlook."""
+
+    def test_repeat_search_is_served_from_cache(self, search, cache):
+        """Same parameters (up to case) should convert messages only once."""
+        first = search.search_outlook(sender_domain="Client1.com", limit=10)
+        conversions = search.conversions
+        second = search.search_outlook(sender_domain="client1.com ", folder="INBOX", limit=10)
+
+        assert [e.id for e in second] == [e.id for e in first]
+        assert search.conversions == conversions
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["hit_rate"] == 0.5
+
+    def test_identifier_order_does_not_matter(self, search):
+        """Domain lists in a different order should share an entry."""
+        search.search_outlook_by_identifiers(["a.com", "b.com"], limit=5)
+        conversions = search.conversions
+
+        search.search_outlook_by_identifiers(["B.com", "a.com"], limit=5)
+
+        assert search.conversions == conversions
+
+    def test_results_are_copies(self, search):
+        """Callers mutating a result should not change the cached one."""
+        first = search.search_outlook(limit=10)
+        first.clear()
+
+        assert len(search.search_outlook(limit=10)) == 10
+
+    def test_without_cache_every_call_queries(self, search):
+        """A client without query_cache should behave as before."""
+        search.query_cache = None
+        search.search_outlook(limit=5)
+        search.search_outlook(limit=5)
+
+        assert search.conversions == 10
+
+
+# ============================================================================
+# Tests: invalidation
+# ============================================================================
+
+class TestInvalidation:
+    """Writes drop exactly the results of the folders they touch."""
+
+    def test_triage_invalidates_inbox_only(self, store, search, cache):
+        """Setting a triage status should drop Inbox results, not subfolder ones."""
+        triage = attach(TriageClient(), store, cache)
+        search.search_outlook(limit=5)
+        search.search_outlook(folder="Inbox\\Done", limit=5)
+        conversions = search.conversions
+
+        triage.set_triage_status("msg-001", "action")
+        search.search_outlook(limit=5)
+        search.search_outlook(folder="Inbox/done", limit=5)
+
+        assert search.conversions == conversions + 5
+        assert cache.stats()["invalidations"] == 1
+
+    def test_move_invalidates_source_and_target(self, store, search, cache):
+        """Archiving should refresh both the Inbox and the target folder."""
+        folders = attach(FoldersClient(), store, cache)
+        before_done = search.search_outlook(folder="Inbox\\Done", limit=50)
+        search.search_outlook(limit=50)
+
+        result = folders.move_to_archive("msg-000", folder_path="Inbox\\Done")
+
+        assert result["success"] is True
+        assert [e.id for e in search.search_outlook(folder="Inbox\\Done", limit=50)] == ["msg-000"]
+        assert before_done == []
+        assert "msg-000" not in [e.id for e in search.search_outlook(limit=50)]
+
+    def test_filing_invalidates_matter_client_and_tree(self, cache):
+        """DMS filing should keep results for other matters."""
+        for client, matter in (("acme", "m1"), ("acme", "m2"), ("acme", None), (None, None)):
+            cache.get_or_run((client, matter), [dms_tag(client, matter)], lambda: [1])
+
+        dropped = cache.invalidate(*dms_tags("Acme", "M1"))
+
+        assert dropped == 3
+        assert cache.get_or_run(("acme", "m2"), [dms_tag("acme", "m2")], lambda: [2]) == [1]
+
+    def test_query_overlapping_invalidation_is_not_stored(self, cache):
+        """A result computed while its folder changed should not be cached."""
+        def query():
+            cache.invalidate("inbox")
+            return ["stale"]
+
+        cache.get_or_run("key", ["inbox"], query)
+
+        assert cache.get_or_run("key", ["inbox"], lambda: ["fresh"]) == ["fresh"]
+
+    def test_folder_tags_follow_search_resolution(self):
+        """Tags should match how search_outlook resolves folder names."""
+        assert folder_tag("Inbox") == "inbox"
+        assert folder_tag("Sent") == folder_tag("\\\\me@firm.com\\Sent Items") == "sent items"
+        assert folder_tag("\\\\me@firm.com\\Inbox\\~Zero\\Acme") == "inbox\\~zero\\acme"
+
+    def test_folder_path_store_root_is_dropped(self):
+        """FolderPath store roots without an '@' should be dropped too."""
+        assert folder_tag("\\\\Mailbox - David Sant\\Inbox\\~Zero\\Acme") == "inbox\\~zero\\acme"
+        assert folder_tag("\\\\Personal Folders\\Sent Items") == "sent items"
+        assert folder_tag("\\\\Personal Folders\\Archive\\2024") == folder_tag("Archive\\2024")
+
+
+# ============================================================================
+# Tests: bounds
+# ============================================================================
+
+class TestBounds:
+    """Entries expire after the TTL and the LRU stays within its size."""
+
+    def test_ttl_expiry(self, cache):
+        """An expired entry should be recomputed and counted."""
+        cache.get_or_run("key", [], lambda: [1])
+
+        with patch("outlook_client.query_cache.time.monotonic", return_value=10 ** 9):
+            assert cache.get_or_run("key", [], lambda: [2]) == [2]
+
+        assert cache.stats()["expirations"] == 1
+
+    def test_lru_eviction(self):
+        """The least recently used entry should go first."""
+        cache = QueryCache(max_entries=2)
+        cache.get_or_run("a", [], lambda: 1)
+        cache.get_or_run("b", [], lambda: 2)
+        cache.get_or_run("a", [], lambda: 0)
+        cache.get_or_run("c", [], lambda: 3)
+
+        assert cache.get_or_run("a", [], lambda: 0) == 1
+        assert cache.get_or_run("b", [], lambda: 0) == 0
+        assert cache.stats()["evictions"] >= 1
+
+    def test_metrics_registered(self):
+        """The shared cache should report through collect_metrics."""
+        from effi_mail.helpers import collect_metrics, query_cache, resolve, search
+
+        assert search.query_cache is resolve(query_cache)
+        assert "hit_rate" in collect_metrics()["query_cache"]
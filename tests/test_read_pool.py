@@ -0,0 +1,281 @@
+"""Tests for the multi-apartment read worker pool.
+
+The pool runs independent folder scans concurrently, each worker with its
+own client (and therefore its own MAPI namespace), and merges the results
+newest-first by ReceivedTime. Speedup is measured against the sequential
+path using a fake store that injects per-scan latency.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+import pytest
+
+from models import Email
+from outlook_client import ReadWorkerPool, SearchClient, DMSClient, RetrievalClient, merge_by_received
+
+
+SCAN_LATENCY = 0.05
+BASE_TIME = datetime(2026, 1, 15, 12, 0)
+
+
+def make_email(email_id: str, hours_ago: int, folder: str = "Inbox") -> Email:
+    """Create an Email with a received_time relative to BASE_TIME."""
+    return Email(
+        id=email_id,
+        subject=f"Subject {email_id}",
+        sender_name="Sender",
+        sender_email="sender@example.com",
+        domain="example.com",
+        received_time=BASE_TIME - timedelta(hours=hours_ago),
+        folder_path=folder,
+    )
+
+
+class FakeSearchClient(SearchClient):
+    """SearchClient whose folder queries sleep instead of calling COM.
+
+    MAX_DASL_LENGTH is tiny so every identifier gets its own query,
+    giving one scan per identifier to parallelise.
+    """
+
+    MAX_DASL_LENGTH = 1
+    instances = []
+
+    def __init__(self):
+        super().__init__()
+        self.thread_id = threading.get_ident()
+        FakeSearchClient.instances.append(self)
+
+    def _iter_query(self, folder, filter_str, limit, received_before=None, skip_ids=()):
+        time.sleep(SCAN_LATENCY)
+        key = filter_str.split("LIKE '")[1].split("'")[0].strip("%@")
+        offset = sum(ord(ch) for ch in key) % 7
+        return iter([
+            make_email(f"{folder}-{key}-{i}", hours_ago=offset + i * 7, folder=folder)
+            for i in range(3)
+        ][:limit])
+
+
+class FakeDMSClient(DMSClient):
+    """DMSClient with a fake matter tree and slow matter scans."""
+
+    def list_dms_clients(self):
+        return ["Acme", "Globex"]
+
+    def list_dms_matters(self, client):
+        return ["Matter A", "Matter B", "Matter C"]
+
+    def _scan_dms_matter(self, client, matter, subject_contains=None,
+                         date_from=None, date_to=None, limit=50):
+        time.sleep(SCAN_LATENCY)
+        offset = len(client) + len(matter)
+        return [make_email(f"{client}-{matter}-{i}", hours_ago=offset + i, folder=f"DMS/{client}/{matter}")
+                for i in range(2)][:limit]
+
+
+class FakeRetrievalClient(RetrievalClient):
+    """RetrievalClient that records which folder locations were scanned."""
+
+    def _scan_conversation_in(self, location, filter_str, conversation_id, limit, lazy_body=False):
+        time.sleep(SCAN_LATENCY)
+        kind, key = location
+        return [make_email(f"{kind}-{key}", hours_ago=hash(str(key)) % 24)]
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def pool():
+    """Create a 4-worker pool and shut it down afterwards."""
+    p = ReadWorkerPool(workers=4, name="test-read")
+    yield p
+    p.shutdown()
+
+
+# ============================================================================
+# Tests: merge_by_received
+# ============================================================================
+
+class TestMergeByReceived:
+    """Merged results are newest-first, unique, and limited."""
+
+    def test_merges_newest_first(self):
+        """Interleaved streams should merge into a single descending order."""
+        a = [make_email("a1", 1), make_email("a2", 5)]
+        b = [make_email("b1", 2), make_email("b2", 3)]
+
+        merged = merge_by_received([a, b])
+
+        assert [e.id for e in merged] == ["a1", "b1", "b2", "a2"]
+
+    def test_drops_duplicate_ids(self):
+        """The same email found in two folders should appear once."""
+        a = [make_email("x", 1)]
+        b = [make_email("x", 1), make_email("y", 2)]
+
+        merged = merge_by_received([a, b])
+
+        assert [e.id for e in merged] == ["x", "y"]
+
+    def test_respects_limit(self):
+        """Only the newest `limit` emails should be returned."""
+        streams = [[make_email(f"s{i}-{j}", i + j * 10) for j in range(5)] for i in range(3)]
+
+        merged = merge_by_received(streams, limit=4)
+
+        assert len(merged) == 4
+        assert merged == sorted(merged, key=lambda e: e.received_time, reverse=True)
+
+    def test_unsorted_streams_are_sorted(self):
+        """Streams not already in ReceivedTime order should still merge correctly."""
+        a = [make_email("old", 10), make_email("new", 1)]
+
+        merged = merge_by_received([a])
+
+        assert [e.id for e in merged] == ["new", "old"]
+
+
+# ============================================================================
+# Tests: ReadWorkerPool
+# ============================================================================
+
+class TestReadWorkerPool:
+    """Each worker has its own client; failures are isolated."""
+
+    def test_each_worker_has_own_client(self, pool):
+        """Clients should be created on, and bound to, their worker thread."""
+        FakeSearchClient.instances = []
+        barrier = threading.Barrier(4)
+
+        def scan(client):
+            barrier.wait(timeout=5)
+            return [client]
+
+        results = pool.map(FakeSearchClient, [scan] * 4)
+        clients = [r[0] for r in results]
+
+        assert len({id(c) for c in clients}) == 4
+        assert all(c.thread_id != threading.get_ident() for c in clients)
+
+    def test_client_reused_within_worker(self):
+        """A worker should build one client per class and reuse it."""
+        single = ReadWorkerPool(workers=1, name="test-single")
+        try:
+            results = single.map(FakeSearchClient, [lambda c: [c]] * 3)
+        finally:
+            single.shutdown()
+
+        assert len({id(r[0]) for r in results}) == 1
+
+    def test_failed_scan_returns_empty(self, pool):
+        """A scan that raises should not break the other scans."""
+        def bad(client):
+            raise RuntimeError("folder gone")
+
+        results = pool.map(FakeSearchClient, [bad, lambda c: [make_email("ok", 1)]])
+
+        assert results[0] == []
+        assert [e.id for e in results[1]] == ["ok"]
+
+
+# ============================================================================
+# Tests: parallel scans in clients
+# ============================================================================
+
+class TestParallelClientScans:
+    """Clients use the pool when one is configured."""
+
+    def test_identifier_search_matches_sequential_ids(self, pool):
+        """Parallel and sequential paths should find the same emails."""
+        domains = ["acme.com", "globex.com"]
+        contacts = ["ceo@gmail.com"]
+
+        sequential = FakeSearchClient().search_outlook_by_identifiers(domains, contacts, limit=100)
+        client = FakeSearchClient()
+        client.read_pool = pool
+        parallel = client.search_outlook_by_identifiers(domains, contacts, limit=100)
+
+        assert {e.id for e in parallel} == {e.id for e in sequential}
+        assert parallel == sorted(parallel, key=lambda e: e.received_time, reverse=True)
+
+    def test_conversation_scans_inbox_sent_and_dms(self, pool):
+        """Every folder location should be scanned as a separate pool task."""
+        dms_store = Mock()
+        dms_store.DisplayName = "DMSforLegal"
+        dms_folders = [Mock(), Mock()]
+        dms_folders[0].Name = "Acme"
+        dms_folders[1].Name = "Globex"
+        dms_store.Folders = dms_folders
+        namespace = Mock()
+        namespace.Stores = [dms_store]
+
+        client = FakeRetrievalClient()
+        client._outlook = Mock()
+        client._namespace = namespace
+        client.read_pool = pool
+
+        emails = client.get_emails_by_conversation_id(
+            "conv-1", include_sent=True, include_dms=True, conversation_topic="Topic"
+        )
+
+        assert {e.id for e in emails} == {
+            f"default-{RetrievalClient.FOLDER_INBOX}",
+            f"default-{RetrievalClient.FOLDER_SENT}",
+            "dms-Acme",
+            "dms-Globex",
+        }
+
+    def test_dms_search_merged_by_received_time(self, pool):
+        """DMS matter scans should be merged newest-first."""
+        client = FakeDMSClient()
+        client.read_pool = pool
+
+        emails = client.search_dms_emails(limit=5)
+
+        assert len(emails) == 5
+        assert emails == sorted(emails, key=lambda e: e.received_time, reverse=True)
+
+
+# ============================================================================
+# Benchmark: parallel vs sequential with injected latency
+# ============================================================================
+
+class TestSpeedup:
+    """Concurrent scans should beat the sequential path on a slow store."""
+
+    def test_identifier_search_speedup(self, pool):
+        """8 domains + 4 contacts = 20 scans; 4 workers should be much faster."""
+        domains = [f"domain{i}.com" for i in range(8)]
+        contacts = [f"person{i}@gmail.com" for i in range(4)]
+
+        start = time.perf_counter()
+        FakeSearchClient().search_outlook_by_identifiers(domains, contacts, limit=500)
+        sequential = time.perf_counter() - start
+
+        client = FakeSearchClient()
+        client.read_pool = pool
+        start = time.perf_counter()
+        client.search_outlook_by_identifiers(domains, contacts, limit=500)
+        parallel = time.perf_counter() - start
+
+        assert sequential >= 20 * SCAN_LATENCY
+        assert parallel < sequential / 2
+
+    def test_dms_search_speedup(self, pool):
+        """6 matter scans on 4 workers should take about 2 latency rounds."""
+        start = time.perf_counter()
+        FakeDMSClient().search_dms_emails(limit=100)
+        sequential = time.perf_counter() - start
+
+        client = FakeDMSClient()
+        client.read_pool = pool
+        start = time.perf_counter()
+        client.search_dms_emails(limit=100)
+        parallel = time.perf_counter() - start
+
+        assert parallel < sequential * 0.75
@@ -0,0 +1,290 @@
+"""Tests for background RecipientDomain stamping.
+
+RecipientDomainStamper walks Sent Items from a persisted watermark: a
+forward pass for newly sent mail and a backfill pass over older history
+in resumable chunks. The request path (get_sent_emails_by_domain) no
+longer stamps anything itself.
+"""
+
+import json
+import re
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from outlook_client import RecipientDomainStamper, RetrievalClient
+from outlook_client.address_cache import AddressCache
+from outlook_client.properties import PR_RECIPIENT_TYPE, PR_SMTP_ADDRESS
+
+
+START = datetime(2026, 1, 1, 9, 0)
+
+
+class FakeRecipientAccessor:
+    def __init__(self, address, recipient_type):
+        self.values = {PR_SMTP_ADDRESS: address, PR_RECIPIENT_TYPE: recipient_type}
+
+    def GetProperties(self, tags):
+        return tuple(self.values.get(tag, -2147221233) for tag in tags)
+
+
+class FakeRecipient:
+    def __init__(self, address, recipient_type=1):
+        self.Type = recipient_type
+        self.Address = address
+        self.PropertyAccessor = FakeRecipientAccessor(address, recipient_type)
+
+
+class FakeRecipients:
+    def __init__(self, recipients):
+        self.recipients = recipients
+        self.Count = len(recipients)
+
+    def Item(self, index):
+        return self.recipients[index - 1]
+
+
+class FakeMessageAccessor:
+    """Message PropertyAccessor; GetProperty raises for unset props like Outlook."""
+
+    def __init__(self):
+        self.values = {}
+
+    def GetProperty(self, tag):
+        if tag not in self.values:
+            raise Exception("property not found")
+        return self.values[tag]
+
+    def SetProperty(self, tag, value):
+        self.values[tag] = value
+
+
+class FakeSentMessage:
+    def __init__(self, index, recipients):
+        self.EntryID = f"sent-{index}"
+        self.SentOn = START + timedelta(minutes=index)
+        self.Recipients = FakeRecipients(recipients)
+        self.PropertyAccessor = FakeMessageAccessor()
+        self.saves = 0
+
+    def Save(self):
+        self.saves += 1
+
+
+class FakeItems(list):
+    """Items collection supporting Sort and [SentOn] Restrict filters."""
+
+    def Sort(self, column, descending):
+        self.sort(key=lambda m: m.SentOn, reverse=descending)
+
+    def Restrict(self, filter_str):
+        result = FakeItems(self)
+        for op, value in re.findall(r"\[SentOn\] (>=|<=) '([^']+)'", filter_str):
+            bound = datetime.strptime(value, "%d/%m/%Y %H:%M")
+            if op == ">=":
+                result = FakeItems(m for m in result if m.SentOn >= bound)
+            else:
+                result = FakeItems(m for m in result if m.SentOn <= bound)
+        return result
+
+
+class FakeSentFolder:
+    def __init__(self, messages):
+        self.messages = messages
+
+    @property
+    def Items(self):
+        return FakeItems(self.messages)
+
+
+class FakeNamespace:
+    def __init__(self, folder):
+        self.folder = folder
+
+    def GetDefaultFolder(self, folder_id):
+        return self.folder
+
+
+def stamp(message):
+    return message.PropertyAccessor.values.get(RetrievalClient.RECIPIENT_DOMAIN_PROP)
+
+
+def make_client(messages):
+    client = RetrievalClient()
+    client.address_cache = AddressCache()
+    client._namespace = FakeNamespace(FakeSentFolder(messages))
+    client._outlook = object()
+    return client
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture
+def sent_messages():
+    """Fixture Sent Items: 25 messages, one per minute, To and CC recipients."""
+    return [
+        FakeSentMessage(i, [
+            FakeRecipient(f"person{i}@client{i % 3}.com", 1),
+            FakeRecipient("partner@firm.co.uk", 2),
+        ])
+        for i in range(25)
+    ]
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    """Watermark file in a temp directory."""
+    return tmp_path / "recipient_domain_stamp.json"
+
+
+# ============================================================================
+# Tests: stamp_recipient_domains
+# ============================================================================
+
+class TestStampRecipientDomains:
+    """Chunked stamping on RetrievalClient."""
+
+    def test_stamps_all_recipient_types(self, sent_messages):
+        """Domains from To and CC should be joined, sorted, on each item."""
+        client = make_client(sent_messages)
+
+        result = client.stamp_recipient_domains(limit=100)
+
+        assert result["updated"] == 25
+        assert result["more"] is False
+        assert stamp(sent_messages[4]) == "client1.com;firm.co.uk"
+        assert sent_messages[4].saves == 1
+
+    def test_skips_already_stamped(self, sent_messages):
+        """Items with RecipientDomain already set are not rewritten."""
+        client = make_client(sent_messages)
+        sent_messages[24].PropertyAccessor.SetProperty(RetrievalClient.RECIPIENT_DOMAIN_PROP, "x.com")
+
+        result = client.stamp_recipient_domains(limit=100)
+
+        assert result["updated"] == 24
+        assert stamp(sent_messages[24]) == "x.com"
+        assert sent_messages[24].saves == 0
+
+    def test_limit_reports_more(self, sent_messages):
+        """Stopping at the limit should report more work and the range seen."""
+        client = make_client(sent_messages)
+
+        result = client.stamp_recipient_domains(limit=10)
+
+        assert result["updated"] == 10
+        assert result["more"] is True
+        assert result["newest_sent"] == sent_messages[24].SentOn
+        assert result["oldest_sent"] == sent_messages[15].SentOn
+
+
+# ============================================================================
+# Tests: RecipientDomainStamper
+# ============================================================================
+
+class TestRecipientDomainStamper:
+    """Watermarked forward and backfill passes."""
+
+    def test_backfills_history_in_chunks(self, sent_messages, state_path):
+        """Repeated runs should cover the whole Sent history, then stop."""
+        stamper = RecipientDomainStamper(make_client(sent_messages), path=state_path, chunk_size=10)
+
+        results = [stamper.run_once() for _ in range(3)]
+
+        assert [r["more"] for r in results] == [True, True, False]
+        assert stamper.backfill_complete is True
+        assert stamper.stamped_total == 25
+        assert all(stamp(m) for m in sent_messages)
+
+    def test_resumes_from_persisted_watermark(self, sent_messages, state_path):
+        """A new stamper should continue the backfill where the last one stopped."""
+        RecipientDomainStamper(make_client(sent_messages), path=state_path, chunk_size=10).run_once()
+        saved = json.loads(state_path.read_text())
+        assert saved["backfill_before"] == "2026-01-01T09:15:00"
+
+        resumed = RecipientDomainStamper(make_client(sent_messages), path=state_path, chunk_size=10)
+        assert resumed.load() is True
+        result = resumed.run_once()
+
+        assert result["backfill"]["updated"] == 10
+        assert result["backfill"]["newest_sent"] == sent_messages[15].SentOn
+        assert not stamp(sent_messages[4])
+
+    def test_forward_pass_stamps_new_mail(self, sent_messages, state_path):
+        """Mail sent after the watermark is stamped without rescanning history."""
+        stamper = RecipientDomainStamper(make_client(sent_messages), path=state_path, chunk_size=100)
+        stamper.run_once()
+        new_message = FakeSentMessage(30, [FakeRecipient("ceo@newclient.com")])
+        sent_messages.append(new_message)
+
+        result = stamper.run_once()
+
+        assert result["backfill"] is None
+        assert result["forward"]["updated"] == 1
+        assert result["forward"]["processed"] == 2
+        assert stamp(new_message) == "newclient.com"
+        assert stamper.newest_sent == new_message.SentOn
+
+    def test_item_added_triggers_run(self, sent_messages):
+        """item_added() should wake the scheduler before the interval elapses."""
+        stamper = RecipientDomainStamper(make_client(sent_messages), chunk_size=100, interval=60)
+        stamper.start()
+        try:
+            deadline = time.time() + 5
+            while stamper.runs < 1 and time.time() < deadline:
+                time.sleep(0.01)
+            sent_messages.append(FakeSentMessage(40, [FakeRecipient("a@late.com")]))
+
+            stamper.item_added()
+            while stamper.runs < 2 and time.time() < deadline:
+                time.sleep(0.01)
+        finally:
+            stamper.stop()
+
+        assert stamper.runs == 2
+        assert stamp(sent_messages[-1]) == "late.com"
+
+
+# ============================================================================
+# Tests: request path
+# ============================================================================
+
+class TestSentEmailsRequestPath:
+    """get_sent_emails_by_domain only runs the DASL query."""
+
+    def test_does_not_stamp(self):
+        """The tool should not stamp Sent Items before searching."""
+        from effi_mail.tools import get_sent_emails_by_domain
+
+        with patch("effi_mail.tools.email_retrieval.retrieval") as retrieval, \
+             patch("effi_mail.tools.email_retrieval.search") as search:
+            search.search_outlook.return_value = []
+            get_sent_emails_by_domain("client.com")
+
+        retrieval._set_recipient_domains.assert_not_called()
+        retrieval.stamp_recipient_domains.assert_not_called()
+        search.search_outlook.assert_called_once()
+
+
+# ============================================================================
+# Tests: server wiring
+# ============================================================================
+
+class TestStartStamper:
+    """Stamping runs beside the COM thread, not on it."""
+
+    def test_runs_off_com_thread(self):
+        """Only the ItemAdd subscription should be queued on the COM thread."""
+        from effi_mail import helpers
+
+        with patch.object(helpers, "stamper") as stamper, \
+             patch.object(helpers, "com") as com, \
+             patch.dict(helpers._stamping_config, enabled=True):
+            helpers.start_stamper()
+
+        com.call.assert_called_once_with(stamper.watch_sent_items)
+        stamper.start.assert_called_once_with()
@@ -0,0 +1,353 @@
+"""Tests for the server-wide tool response encoder.
+
+encode_response() replaces the per-tool json.dumps(..., indent=2) calls.
+Pretty mode keeps the historical output; compact mode drops whitespace,
+empty and default-valued fields and can shorten common keys. The
+benchmarks encode a representative response for every registered tool
+and compare bytes and encode time against the old indent=2 output.
+"""
+
+import inspect
+import json
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from effi_mail import helpers
+from effi_mail.helpers import RESPONSE_KEY_ALIASES, encode_response
+
+
+NOW = datetime(2026, 3, 2, 9, 30, 15)
+
+
+def email_summary(i, preview=True):
+    summary = {
+        "id": f"00000000A1B2C3D4E5F6{i:08d}0700",
+        "subject": f"RE: Matter {i % 40} - draft agreement comments",
+        "sender": f"Person {i} <person{i}@client{i % 25}.com>",
+        "domain": f"client{i % 25}.com",
+        "received": (NOW - timedelta(minutes=i)).isoformat(),
+        "has_attachments": i % 4 == 0,
+        "direction": "inbound",
+    }
+    if i % 3 == 0:
+        summary["triage_status"] = "action"
+    if preview:
+        summary["preview"] = "Thanks for the draft. A few comments on clause 4 and the schedule." if i % 2 else ""
+    return summary
+
+
+def email_list(count, **extra):
+    return {
+        "count": count,
+        "limit_applied": count,
+        "results_truncated": False,
+        **extra,
+        "emails": [email_summary(i) for i in range(count)],
+    }
+
+
+def thread(count):
+    return {
+        "count": count,
+        "limit_applied": 50,
+        "results_truncated": False,
+        "conversation_id": "A1B2C3D4E5F6",
+        "participants": [f"person{i}@client.com" for i in range(8)],
+        "date_range": {"first": NOW.isoformat(), "last": NOW.isoformat()},
+        "messages": [
+            {**email_summary(i), "folder": "Inbox", "sender": f"person{i % 8}@client.com"}
+            for i in range(count)
+        ],
+    }
+
+
+def domain_list(count):
+    return {
+        "count": count,
+        "limit_applied": count,
+        "results_truncated": False,
+        "domains": [
+            {"domain": f"client{i}.com", "email_count": i + 1,
+             "sample_subjects": [f"Subject {i}", f"Subject {i + 1}"], "category": ""}
+            for i in range(count)
+        ],
+    }
+
+
+def full_email():
+    return {
+        "id": "00000000A1B2C3D4E5F600000001",
+        "internet_message_id": "<abc@client.com>",
+        "subject": "Draft agreement",
+        "sender_email": "person@client.com",
+        "received_time": NOW,
+        "recipients_to": ["me@firm.com"],
+        "recipients_cc": [],
+        "body": "Thanks for the draft.\n" * 40,
+        "html_body": None,
+        "attachments": [{"name": "draft.docx", "size": 48213}],
+    }
+
+
+def batch_result(count):
+    return {"success": True, "count": count, "failed_count": 0, "errors": [],
+            "email_ids": [f"id-{i}" for i in range(count)]}
+
+
+def status():
+    return {"success": True, "email_id": "00000000A1B2C3D4E5F600000001", "status": "archived"}
+
+
+def cache_page(count):
+    return {
+        "file_path": "/home/me/.effi/cache/emails_20260302_093015.json",
+        "total_in_file": count * 4,
+        "offset": 0,
+        "count": count,
+        "items": [{**email_summary(i), "_retrieved": True, "_processed": False} for i in range(count)],
+    }
+
+
+def metrics():
+    return {
+        "address_cache": {"entries": 412, "hits": 9120, "misses": 412, "hit_rate": 0.9568},
+        "folder_cache": {"entries": 12, "subfolder_listings": 3, "hits": 840, "misses": 12,
+                         "invalidations": 0, "hit_rate": 0.9859},
+        "connection": {"connects": 1, "probes": 44, "liveness_ttl": 60.0},
+    }
+
+
+def rules_report():
+    return {
+        "complete": True,
+        "groups": [{"rules": ["marketing"], "action": "archive", "matched": 812, "processed": 812,
+                    "failed": 0, "errors": [], "items_per_second": 410.2}],
+        "run_processed": 812, "total_processed": 812, "total_failed": 0, "elapsed": 1.98,
+    }
+
+
+# Representative response for every registered tool
+TOOL_RESPONSES = {
+    "get_pending_emails": lambda: email_list(500),
+    "get_inbox_emails_by_domain": lambda: email_list(200, domain="client1.com", category="Client"),
+    "get_sent_emails_by_domain": lambda: email_list(200, domain="client1.com", category="Client"),
+    "get_email_by_id": full_email,
+    "download_attachment": lambda: {"success": True, "path": "/tmp/draft__2026-03-02-0930.docx", "size": 48213},
+    "list_attachments_many": lambda: {"count": 50, "emails": {
+        f"id-{i}": {"count": 1, "attachments": [{"name": "a.pdf", "size": 100, "inline": False}]}
+        for i in range(50)}},
+    "search_inbox_by_subject": lambda: email_list(100),
+    "triage_email": status,
+    "batch_triage": lambda: batch_result(50),
+    "get_category_write_status": lambda: {"handle": "h1", "total": 500, "applied": 500, "failed": 0,
+                                          "pending": 0, "complete": True, "failed_ids": [], "errors": {}},
+    "batch_archive_domain": lambda: {"success": True, "domain": "client1.com", "archived_count": 812,
+                                     "failed_count": 0},
+    "archive_email": lambda: {"success": True, "folder": "\\\\me@firm.com\\Archive", "folders_created": []},
+    "batch_archive_emails": lambda: batch_result(200),
+    "list_subfolders": lambda: {"path": "Inbox", "subfolders": [f"Folder {i}" for i in range(30)]},
+    "get_uncategorized_domains": lambda: domain_list(300),
+    "categorize_domain": lambda: {"success": True, "domain": "client1.com", "category": "Client"},
+    "get_domain_summary": lambda: domain_list(100),
+    "get_emails_by_client": lambda: email_list(300, client="acme"),
+    "search_outlook_direct": lambda: email_list(200),
+    "scan_for_commitments": lambda: email_list(100),
+    "mark_scanned": status,
+    "batch_mark_scanned": lambda: batch_result(100),
+    "list_dms_clients": lambda: {"count": 80, "clients": [f"Client {i}" for i in range(80)]},
+    "list_dms_matters": lambda: {"client": "acme", "matters": [f"Matter {i}" for i in range(40)]},
+    "get_dms_emails": lambda: email_list(200, client="acme", matter="Matter 1"),
+    "get_dms_admin_emails": lambda: email_list(100, client="acme"),
+    "search_dms": lambda: email_list(200),
+    "file_email_to_dms": lambda: {"success": True, "client": "acme", "matter": "Matter 1", "filed": True},
+    "file_admin_email_to_dms": lambda: {"success": True, "client": "acme", "filed": True},
+    "batch_file_emails_to_dms": lambda: batch_result(100),
+    "file_email_to_workspace": lambda: {"success": True, "file_path": "/ws/emails/a.md", "frontmatter": {}},
+    "file_thread_to_workspace": lambda: {"success": True, "filed_count": 30, "skipped": [],
+                                         "files": [f"/ws/emails/{i}.md" for i in range(30)]},
+    "get_email_thread": lambda: thread(200),
+    "get_thread_locations": lambda: {"conversation_id": "A1B2", "locations": [
+        {"folder": "Inbox", "count": 12}, {"folder": "Sent Items", "count": 9}]},
+    "read_cache_file": lambda: cache_page(100),
+    "mark_cache_processed": lambda: {"success": True, "marked_count": 100, "remaining_unprocessed": 300},
+    "prune_cache": lambda: {"removed": [{"name": "emails_1.json", "reason": "expired", "size_kb": 120.5}],
+                            "freed_kb": 120.5, "remaining_files": 4, "remaining_kb": 480.0, "dry_run": False},
+    "get_cache_status": lambda: {"total_items": 400, "retrieved_count": 100, "processed_count": 100},
+    "reset_cache_flags": lambda: {"success": True, "total_items": 400},
+    "list_cache_files": lambda: {"count": 20, "files": [
+        {"filename": f"emails_{i}.json", "size_kb": 120.5, "created": NOW.isoformat()} for i in range(20)]},
+    "add_email_frontmatter": lambda: {"success": True, "file": "/ws/emails/a.md", "frontmatter": {"id": "1"}},
+    "get_server_metrics": metrics,
+    "run_mailbox_rules": rules_report,
+}
+
+
+def expand(value, legend):
+    """Undo key aliases using a response's _keys legend."""
+    if isinstance(value, dict):
+        return {legend.get(k, k): expand(v, legend) for k, v in value.items() if k != "_keys"}
+    if isinstance(value, list):
+        return [expand(v, legend) for v in value]
+    return value
+
+
+def best_time(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+# ============================================================================
+# Tests: pretty and compact modes
+# ============================================================================
+
+class TestEncodeResponse:
+    """Pretty mode is unchanged; compact mode drops only empty/default fields."""
+
+    def test_pretty_matches_legacy_output(self):
+        """Pretty output should decode to the same data as json.dumps(indent=2)."""
+        data = email_list(10)
+
+        encoded = encode_response(data, compact=False)
+
+        assert json.loads(encoded) == data
+        assert "\n  " in encoded
+
+    def test_compact_omits_empty_and_default_fields(self):
+        """None, '', [], {} and default flags should be dropped; False elsewhere kept."""
+        data = {"success": False, "error": "x", "errors": [], "note": None, "preview": "",
+                "frontmatter": {}, "has_attachments": False, "count": 0}
+
+        decoded = json.loads(encode_response(data, compact=True))
+
+        assert decoded == {"success": False, "error": "x", "count": 0}
+
+    def test_compact_has_no_whitespace(self):
+        """Compact output should contain no indentation."""
+        encoded = encode_response(email_list(5), compact=True)
+
+        assert "\n" not in encoded
+        assert ": " not in encoded.replace("RE: ", "")
+
+    def test_aliases_come_with_a_legend(self):
+        """Aliased keys should expand back to the compact data via _keys."""
+        data = thread(20)
+
+        plain = json.loads(encode_response(data, compact=True, aliases=False))
+        aliased = json.loads(encode_response(data, compact=True, aliases=True))
+
+        assert "_keys" not in plain
+        assert set(aliased["_keys"].values()) <= set(RESPONSE_KEY_ALIASES)
+        assert "sub" in aliased["messages"][0]
+        assert expand(aliased, aliased["_keys"]) == plain
+
+    def test_alias_skipped_when_it_would_collide(self):
+        """A dict already holding the alias name keeps the original key."""
+        decoded = json.loads(encode_response({"to": "x", "recipients_to": ["a"]}, compact=True, aliases=True))
+
+        assert decoded == {"to": "x", "recipients_to": ["a"]}
+
+
+# ============================================================================
+# Tests: datetimes and backends
+# ============================================================================
+
+class TestBackends:
+    """orjson is used when installed, with json as a fallback."""
+
+    @pytest.mark.parametrize("backend", ["json", "orjson"])
+    def test_datetimes_use_isoformat(self, backend):
+        """Datetimes should encode as ISO 8601 on either backend."""
+        if backend == "orjson":
+            pytest.importorskip("orjson")
+        with patch.object(helpers, "JSON_BACKEND", backend):
+            for compact in (False, True):
+                decoded = json.loads(encode_response(full_email(), compact=compact))
+                assert decoded["received_time"] == NOW.isoformat()
+
+    def test_backends_agree(self):
+        """orjson and json output should decode to the same data."""
+        pytest.importorskip("orjson")
+        data = email_list(50)
+        with patch.object(helpers, "JSON_BACKEND", "json"):
+            via_json = json.loads(encode_response(data, compact=True))
+        with patch.object(helpers, "JSON_BACKEND", "orjson"):
+            via_orjson = json.loads(encode_response(data, compact=True))
+
+        assert via_json == via_orjson
+
+    def test_unsupported_values_fall_back(self):
+        """Values orjson rejects (huge ints) should still encode."""
+        pytest.importorskip("orjson")
+        with patch.object(helpers, "JSON_BACKEND", "orjson"):
+            decoded = json.loads(encode_response({"big": 2 ** 70, "path": helpers.CACHE_DIR}))
+
+        assert decoded["big"] == 2 ** 70
+        assert decoded["path"] == str(helpers.CACHE_DIR)
+
+
+# ============================================================================
+# Benchmark: every tool
+# ============================================================================
+
+class TestEveryToolBenchmark:
+    """Each tool's response should shrink and encode at least as fast."""
+
+    def test_every_tool_is_covered(self):
+        """Every registered tool needs a benchmark response."""
+        import effi_mail.tools as tools
+
+        assert set(TOOL_RESPONSES) == set(tools.__all__)
+
+    def test_tools_return_through_encoder(self):
+        """No tool module should serialize responses with json.dumps directly."""
+        import effi_mail.tools as tools
+
+        for name in tools.__all__:
+            module = inspect.getmodule(getattr(tools, name))
+            assert "json.dumps(" not in inspect.getsource(module), module.__name__
+
+    @pytest.mark.parametrize("tool", sorted(TOOL_RESPONSES))
+    def test_compact_bytes(self, tool):
+        """Compact output should be smaller and carry the same non-empty data."""
+        data = TOOL_RESPONSES[tool]()
+
+        legacy = json.dumps(data, indent=2, default=str)
+        compact = encode_response(data, compact=True)
+
+        assert len(compact) < len(legacy)
+        decoded = json.loads(compact)
+        for key, value in data.items():
+            if value not in (None, "", [], {}) and helpers.RESPONSE_DEFAULTS.get(key, ...) is not value:
+                assert key in decoded
+
+    @pytest.mark.parametrize("tool", ["get_pending_emails", "get_email_thread", "get_uncategorized_domains"])
+    def test_large_results_shrink_and_encode_faster(self, tool):
+        """Large listings should be at least 25% smaller and faster to encode."""
+        data = TOOL_RESPONSES[tool]()
+
+        legacy = json.dumps(data, indent=2, default=str)
+        compact = encode_response(data, compact=True)
+        aliased = encode_response(data, compact=True, aliases=True)
+        legacy_time = best_time(lambda: json.dumps(data, indent=2, default=str))
+        compact_time = best_time(lambda: encode_response(data, compact=True))
+
+        assert len(compact) <= 0.75 * len(legacy)
+        assert len(aliased) < len(compact)
+        assert compact_time < legacy_time
+
+    def test_encoding_is_reported_in_metrics(self):
+        """The responses metrics source should count encoded bytes."""
+        before = helpers.response_stats()["bytes"]
+
+        encoded = encode_response(status())
+
+        stats = helpers.collect_metrics()["responses"]
+        assert stats["bytes"] >= before + len(encoded)
+        assert stats["backend"] == helpers.JSON_BACKEND
@@ -10,101 +10,123 @@ import json
 from datetime import datetime, timedelta
 from unittest.mock import Mock, patch
 
-from models import Email
+from outlook_client import SearchClient
+from outlook_client.address_cache import AddressCache
 
 
 # ============================================================================
 # Fixtures
 # ============================================================================
 
+def sent_row(entry_id, subject, body, hours_ago, recipients_to=(), recipients_cc=()):
+    """A row as yielded by SearchClient.iter_unscanned_sent."""
+    return {
+        "id": entry_id,
+        "subject": subject,
+        "received_time": datetime.now() - timedelta(hours=hours_ago),
+        "body": body,
+        "recipients_to": list(recipients_to),
+        "recipients_cc": list(recipients_cc),
+    }
+
+
 @pytest.fixture
 def sent_emails_with_commitments():
-    """Create sample sent emails with various commitment patterns."""
-    base_time = datetime.now()
+    """Unscanned sent emails with various commitment patterns."""
     return [
-        Email(
-            id="sent-001",
-            subject="Re: LA Service Agreement",
-            sender_name="David Sant",
-            sender_email="david.sant@harperjames.co.uk",
-            domain="harperjames.co.uk",
-            received_time=base_time - timedelta(hours=12),
-            body_preview="I'll take a look through your LA service agreement tomorrow",
-            has_attachments=False,
-            attachment_names=[],
-            categories="",
-            folder_path="Sent Items",
-        ),
-        Email(
-            id="sent-002",
-            subject="Re: Contract review",
-            sender_name="David Sant",
-            sender_email="david.sant@harperjames.co.uk",
-            domain="harperjames.co.uk",
-            received_time=base_time - timedelta(hours=24),
-            body_preview="I will send you the draft by Monday",
-            has_attachments=False,
-            attachment_names=[],
-            categories="",
-            folder_path="Sent Items",
-        ),
-        Email(
-            id="sent-003",
-            subject="Re: NDA query",
-            sender_name="David Sant",
-            sender_email="david.sant@harperjames.co.uk",
-            domain="harperjames.co.uk",
-            received_time=base_time - timedelta(hours=36),
-            body_preview="Thanks for your email. No further action needed.",
-            has_attachments=False,
-            attachment_names=[],
-            categories="",  # No commitment
-            folder_path="Sent Items",
-        ),
-        Email(
-            id="sent-004",
-            subject="Re: Inline comments",
-            sender_name="David Sant",
-            sender_email="david.sant@harperjames.co.uk",
-            domain="harperjames.co.uk",
-            received_time=base_time - timedelta(hours=48),
-            body_preview="I have added my comments inline below",
-            has_attachments=False,
-            attachment_names=[],
-            categories="",  # Inline indicator - needs manual review
-            folder_path="Sent Items",
-        ),
+        sent_row("sent-001", "Re: LA Service Agreement",
+                 "Hi Deven,\n\nI'll take a look through your LA service agreement tomorrow "
+                 "and get back to you.\n\nBest regards,\nDavid", 12,
+                 recipients_to=["deven@policyinpractice.co.uk"]),
+        sent_row("sent-002", "Re: Contract review", "I will send you the draft by Monday", 24),
+        sent_row("sent-003", "Re: NDA query", "Thanks for your email. No further action needed.", 36),
+        sent_row("sent-004", "Re: Inline comments", "I have added my comments inline below", 48),
     ]
 
 
-@pytest.fixture
-def already_scanned_email():
-    """Email that has already been scanned."""
-    return Email(
-        id="sent-005",
-        subject="Re: Already processed",
-        sender_name="David Sant",
-        sender_email="david.sant@harperjames.co.uk",
-        domain="harperjames.co.uk",
-        received_time=datetime.now() - timedelta(hours=6),
-        body_preview="I'll follow up on this tomorrow",
-        has_attachments=False,
-        attachment_names=[],
-        categories="effi:scanned",  # Already scanned
-        folder_path="Sent Items",
-    )
-
-
 @pytest.fixture
 def mock_outlook():
     """Create a mock OutlookClient."""
     mock = Mock()
-    mock.search_outlook = Mock(return_value=[])
-    mock.get_email_full = Mock(return_value={})
+    mock.iter_unscanned_sent = Mock(return_value=iter([]))
     mock.set_category = Mock(return_value=True)
     return mock
 
 
+class FakeMessage:
+    """Sent message counting the properties read from it."""
+
+    def __init__(self, index, scanned=False):
+        self.EntryID = f"sent-{index:03d}"
+        self.Subject = f"Re: Matter {index}"
+        self.ReceivedTime = datetime(2026, 3, 1, 12, 0) - timedelta(hours=index)
+        self.Categories = "effi:scanned" if scanned else ""
+        self.Recipients = Mock(Count=0)
+        self.reads = {"Body": 0, "HTMLBody": 0, "Attachments": 0}
+
+    @property
+    def Body(self):
+        self.reads["Body"] += 1
+        return f"I will send the draft for matter {self.EntryID}"
+
+    @property
+    def HTMLBody(self):
+        self.reads["HTMLBody"] += 1
+        return "<html></html>"
+
+    @property
+    def Attachments(self):
+        self.reads["Attachments"] += 1
+        return Mock(Count=0)
+
+
+class FakeSentItems(list):
+    """Newest-first Sent Items honouring the Keywords predicate like the store."""
+
+    def __init__(self, messages, reject_dasl=False):
+        super().__init__(messages)
+        self.reject_dasl = reject_dasl
+        self.filters = []
+
+    def Sort(self, column, descending):
+        pass
+
+    def Restrict(self, filter_str):
+        self.filters.append(filter_str)
+        if filter_str.startswith("@SQL="):
+            if self.reject_dasl:
+                raise Exception("Condition is not valid")
+            return [m for m in self if "effi:scanned" not in m.Categories]
+        return list(self)
+
+
+class FakeNamespace:
+    def __init__(self, items):
+        self.folder = Mock(Items=items)
+
+    def GetDefaultFolder(self, folder_id):
+        return self.folder
+
+
+def make_sent_client(messages, reject_dasl=False):
+    client = SearchClient()
+    client.address_cache = AddressCache()
+    client._namespace = FakeNamespace(FakeSentItems(messages, reject_dasl))
+    client._outlook = object()
+    return client
+
+
+def older_scanned_window(count=30, scanned=25):
+    """Messages newest first, the newest `scanned` already marked."""
+    return [FakeMessage(i, scanned=i < scanned) for i in range(count)]
+
+
+def patch_tools(client):
+    return patch('effi_mail.tools.client_search.search', client), \
+        patch('effi_mail.tools.client_search.retrieval', client), \
+        patch('effi_mail.tools.client_search.folders', client)
+
+
 # ============================================================================
 # Test: Tool Registration
 # ============================================================================
@@ -139,61 +161,23 @@ class TestScanForCommitments:
     """Tests for scan_for_commitments tool."""
     
     @pytest.mark.asyncio
-    async def test_returns_sent_emails_from_sent_items_folder(
-        self, mock_outlook, sent_emails_with_commitments
-    ):
-        """Should query Sent Items folder."""
-        mock_outlook.search_outlook = Mock(return_value=sent_emails_with_commitments)
-        
-        with patch('effi_mail.tools.client_search.search', mock_outlook), \
-             patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
-             patch('effi_mail.tools.client_search.folders', mock_outlook):
-            from effi_mail import call_tool
-            result = await call_tool("scan_for_commitments", {"days": 7})
-            
-            # Verify Sent Items folder was queried
-            mock_outlook.search_outlook.assert_called_once()
-            call_args = mock_outlook.search_outlook.call_args
-            assert call_args.kwargs.get('folder') == "Sent Items"
-    
-    @pytest.mark.asyncio
-    async def test_excludes_already_scanned_emails(
-        self, mock_outlook, sent_emails_with_commitments, already_scanned_email
-    ):
-        """Should exclude emails with effi:scanned category."""
-        # Include an already scanned email in the results
-        all_emails = sent_emails_with_commitments + [already_scanned_email]
-        mock_outlook.search_outlook = Mock(return_value=all_emails)
+    async def test_queries_unscanned_sent_items(self, mock_outlook, sent_emails_with_commitments):
+        """Should ask the store for Sent Items without effi:scanned."""
+        mock_outlook.iter_unscanned_sent = Mock(return_value=iter(sent_emails_with_commitments))
         
         with patch('effi_mail.tools.client_search.search', mock_outlook), \
              patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
              patch('effi_mail.tools.client_search.folders', mock_outlook):
             from effi_mail import call_tool
-            result = await call_tool("scan_for_commitments", {"days": 7})
+            await call_tool("scan_for_commitments", {"days": 7})
             
-            data = json.loads(result[0].text)
-            email_ids = [e["id"] for e in data["emails"]]
-            
-            # Already scanned email should be excluded
-            assert "sent-005" not in email_ids
-            # Unscanned emails should be included
-            assert "sent-001" in email_ids
+            mock_outlook.iter_unscanned_sent.assert_called_once()
+            assert mock_outlook.iter_unscanned_sent.call_args.args == ("effi:scanned",)
     
     @pytest.mark.asyncio
-    async def test_returns_full_body_content(
-        self, mock_outlook, sent_emails_with_commitments
-    ):
+    async def test_returns_full_body_content(self, mock_outlook, sent_emails_with_commitments):
         """Should return full email body, not just preview."""
-        mock_outlook.search_outlook = Mock(return_value=sent_emails_with_commitments[:1])
-        mock_outlook.get_email_full = Mock(return_value={
-            "id": "sent-001",
-            "subject": "Re: LA Service Agreement",
-            "sender_email": "david.sant@harperjames.co.uk",
-            "received_time": datetime.now().isoformat(),
-            "body": "Hi Deven,\n\nI'll take a look through your LA service agreement tomorrow and get back to you.\n\nBest regards,\nDavid",
-            "recipients_to": [{"name": "Deven", "email": "deven@policyinpractice.co.uk"}],
-            "attachments": [],
-        })
+        mock_outlook.iter_unscanned_sent = Mock(return_value=iter(sent_emails_with_commitments[:1]))
         
         with patch('effi_mail.tools.client_search.search', mock_outlook), \
              patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
@@ -207,21 +191,9 @@ class TestScanForCommitments:
             assert len(data["emails"][0]["body"]) > 50  # Full body is longer than preview
     
     @pytest.mark.asyncio
-    async def test_returns_recipient_information(
-        self, mock_outlook, sent_emails_with_commitments
-    ):
+    async def test_returns_recipient_information(self, mock_outlook, sent_emails_with_commitments):
         """Should include recipient info for commitment context."""
-        mock_outlook.search_outlook = Mock(return_value=sent_emails_with_commitments[:1])
-        mock_outlook.get_email_full = Mock(return_value={
-            "id": "sent-001",
-            "subject": "Re: LA Service Agreement",
-            "sender_email": "david.sant@harperjames.co.uk",
-            "received_time": datetime.now().isoformat(),
-            "body": "I'll take a look tomorrow",
-            "recipients_to": [{"name": "Deven", "email": "deven@policyinpractice.co.uk"}],
-            "recipients_cc": [],
-            "attachments": [],
-        })
+        mock_outlook.iter_unscanned_sent = Mock(return_value=iter(sent_emails_with_commitments[:1]))
         
         with patch('effi_mail.tools.client_search.search', mock_outlook), \
              patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
@@ -230,69 +202,42 @@ class TestScanForCommitments:
             result = await call_tool("scan_for_commitments", {"days": 7})
             
             data = json.loads(result[0].text)
-            assert "recipients_to" in data["emails"][0]
-            assert data["emails"][0]["recipients_to"][0]["email"] == "deven@policyinpractice.co.uk"
+            assert data["emails"][0]["recipients_to"] == ["deven@policyinpractice.co.uk"]
+            assert data["emails"][0]["recipients_cc"] == []
+            assert "sent_time" in data["emails"][0]
     
     @pytest.mark.asyncio
     async def test_respects_days_parameter(self, mock_outlook):
         """Should use days parameter for date filtering."""
-        mock_outlook.search_outlook = Mock(return_value=[])
-        
-        with patch('effi_mail.tools.client_search.search', mock_outlook), \
-             patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
-             patch('effi_mail.tools.client_search.folders', mock_outlook):
-            from effi_mail import call_tool
-            await call_tool("scan_for_commitments", {"days": 14})
-            
-            call_args = mock_outlook.search_outlook.call_args
-            assert call_args.kwargs.get('days') == 14
-    
-    @pytest.mark.asyncio
-    async def test_respects_limit_parameter(self, mock_outlook):
-        """Should use limit parameter."""
-        mock_outlook.search_outlook = Mock(return_value=[])
-        
         with patch('effi_mail.tools.client_search.search', mock_outlook), \
              patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
              patch('effi_mail.tools.client_search.folders', mock_outlook):
             from effi_mail import call_tool
-            await call_tool("scan_for_commitments", {"days": 7, "limit": 50})
+            await call_tool("scan_for_commitments", {"days": 30})
             
-            call_args = mock_outlook.search_outlook.call_args
-            # Implementation fetches limit*2 to account for filtered emails
-            assert call_args.kwargs.get('limit') == 100
+            assert mock_outlook.iter_unscanned_sent.call_args.kwargs.get('days') == 30
     
     @pytest.mark.asyncio
     async def test_default_parameters(self, mock_outlook):
         """Should use sensible defaults (14 days, 100 limit)."""
-        mock_outlook.search_outlook = Mock(return_value=[])
+        rows = [sent_row(f"sent-{i:03d}", "Re: x", "body", i) for i in range(150)]
+        mock_outlook.iter_unscanned_sent = Mock(return_value=iter(rows))
         
         with patch('effi_mail.tools.client_search.search', mock_outlook), \
              patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
              patch('effi_mail.tools.client_search.folders', mock_outlook):
             from effi_mail import call_tool
-            await call_tool("scan_for_commitments", {})
+            result = await call_tool("scan_for_commitments", {"force_inline": True})
             
-            call_args = mock_outlook.search_outlook.call_args
-            assert call_args.kwargs.get('days') == 14
-            # Implementation fetches limit*2 to account for filtered emails
-            assert call_args.kwargs.get('limit') == 200
+            data = json.loads(result[0].text)
+            assert mock_outlook.iter_unscanned_sent.call_args.kwargs.get('days') == 14
+            assert data["count"] == 100
+            assert data["results_truncated"] is True
     
     @pytest.mark.asyncio
-    async def test_returns_count_of_emails(
-        self, mock_outlook, sent_emails_with_commitments
-    ):
+    async def test_returns_count_of_emails(self, mock_outlook, sent_emails_with_commitments):
         """Should return count of emails found."""
-        mock_outlook.search_outlook = Mock(return_value=sent_emails_with_commitments)
-        mock_outlook.get_email_full = Mock(return_value={
-            "id": "test",
-            "subject": "Test",
-            "sender_email": "test@test.com",
-            "received_time": datetime.now().isoformat(),
-            "body": "Test body",
-            "recipients_to": [],
-            "attachments": [],
-        })
+        mock_outlook.iter_unscanned_sent = Mock(return_value=iter(sent_emails_with_commitments))
         
         with patch('effi_mail.tools.client_search.search', mock_outlook), \
              patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
@@ -301,8 +246,94 @@ class TestScanForCommitments:
             result = await call_tool("scan_for_commitments", {"days": 7})
             
             data = json.loads(result[0].text)
-            assert "count" in data
             assert data["count"] == 4  # 4 unscanned emails
+            assert data["results_truncated"] is False
+            assert "next_cursor" not in data
+
+
+# ============================================================================
+# Test: store-side filtering and paging
+# ============================================================================
+
+class TestUnscannedQuery:
+    """The "not scanned" test runs in the store and pages fill to the limit."""
+    
+    @pytest.mark.asyncio
+    async def test_fills_limit_when_window_mostly_scanned(self):
+        """25 of the newest 30 already scanned should still return 5 emails."""
+        messages = older_scanned_window()
+        client = make_sent_client(messages)
+        
+        search_patch, retrieval_patch, folders_patch = patch_tools(client)
+        with search_patch, retrieval_patch, folders_patch:
+            from effi_mail import call_tool
+            result = await call_tool("scan_for_commitments", {"days": 3650, "limit": 5})
+        
+        data = json.loads(result[0].text)
+        assert [e["id"] for e in data["emails"]] == [f"sent-{i:03d}" for i in range(25, 30)]
+        assert data["results_truncated"] is False
+        assert "NOT (\"urn:schemas-microsoft-com:office:office#Keywords\" = 'effi:scanned')" \
+            in client._namespace.folder.Items.filters[0]
+    
+    def test_reads_only_body_and_recipients_once(self):
+        """Each returned email should be read once, without HTML or attachments."""
+        messages = older_scanned_window(count=10, scanned=2)
+        client = make_sent_client(messages)
+        
+        rows = list(client.iter_unscanned_sent("effi:scanned", days=3650))
+        
+        assert len(rows) == 8
+        assert all(m.reads == {"Body": 0, "HTMLBody": 0, "Attachments": 0} for m in messages[:2])
+        assert all(m.reads == {"Body": 1, "HTMLBody": 0, "Attachments": 0} for m in messages[2:])
+    
+    def test_store_rejecting_predicate_falls_back(self):
+        """Without Keywords support, categories should be checked per message."""
+        messages = older_scanned_window(count=10, scanned=4)
+        client = make_sent_client(messages, reject_dasl=True)
+        
+        rows = list(client.iter_unscanned_sent("effi:scanned", days=3650))
+        
+        assert [r["id"] for r in rows] == [f"sent-{i:03d}" for i in range(4, 10)]
+        assert all(m.reads["Body"] == 0 for m in messages[:4])
+    
+    @pytest.mark.asyncio
+    async def test_paged_mode_covers_window_once(self):
+        """Following next_cursor should return every unscanned email exactly once."""
+        messages = older_scanned_window(count=23, scanned=3)
+        client = make_sent_client(messages)
+        seen, cursor = [], ""
+        
+        search_patch, retrieval_patch, folders_patch = patch_tools(client)
+        with search_patch, retrieval_patch, folders_patch:
+            from effi_mail import call_tool
+            while True:
+                result = await call_tool("scan_for_commitments",
+                                         {"days": 3650, "limit": 6, "cursor": cursor, "force_inline": True})
+                data = json.loads(result[0].text)
+                seen.extend(e["id"] for e in data["emails"])
+                # Marking a page as scanned must not shift the next one
+                for e in data["emails"]:
+                    next(m for m in messages if m.EntryID == e["id"]).Categories = "effi:scanned"
+                cursor = data.get("next_cursor")
+                if not cursor:
+                    break
+        
+        assert seen == [f"sent-{i:03d}" for i in range(3, 23)]
+    
+    @pytest.mark.asyncio
+    async def test_cursor_from_other_search_is_rejected(self, mock_outlook):
+        """A cursor issued for a different days window should be refused."""
+        messages = older_scanned_window(count=10, scanned=0)
+        client = make_sent_client(messages)
+        
+        search_patch, retrieval_patch, folders_patch = patch_tools(client)
+        with search_patch, retrieval_patch, folders_patch:
+            from effi_mail import call_tool
+            first = json.loads((await call_tool("scan_for_commitments", {"days": 3650, "limit": 3}))[0].text)
+            result = await call_tool("scan_for_commitments",
+                                     {"days": 30, "limit": 3, "cursor": first["next_cursor"]})
+        
+        assert "error" in json.loads(result[0].text)
 
 
 # ============================================================================
@@ -420,21 +451,9 @@ class TestIntegrationScenarios:
     """Test realistic usage scenarios."""
     
     @pytest.mark.asyncio
-    async def test_full_workflow_scan_then_mark(
-        self, mock_outlook, sent_emails_with_commitments
-    ):
+    async def test_full_workflow_scan_then_mark(self, mock_outlook, sent_emails_with_commitments):
         """Test the full workflow: scan, process, mark as scanned."""
-        # First scan returns unscanned emails
-        mock_outlook.search_outlook = Mock(return_value=sent_emails_with_commitments)
-        mock_outlook.get_email_full = Mock(return_value={
-            "id": "sent-001",
-            "subject": "Test",
-            "sender_email": "test@test.com",
-            "received_time": datetime.now().isoformat(),
-            "body": "I'll send the draft tomorrow",
-            "recipients_to": [{"name": "Test", "email": "test@example.com"}],
-            "attachments": [],
-        })
+        mock_outlook.iter_unscanned_sent = Mock(return_value=iter(sent_emails_with_commitments))
         mock_outlook.set_category = Mock(return_value=True)
         
         with patch('effi_mail.tools.client_search.search', mock_outlook), \
@@ -454,22 +473,19 @@ class TestIntegrationScenarios:
             assert mark_data["marked_count"] == len(email_ids)
     
     @pytest.mark.asyncio
-    async def test_rescan_excludes_previously_scanned(
-        self, mock_outlook, sent_emails_with_commitments, already_scanned_email
-    ):
+    async def test_rescan_excludes_previously_scanned(self):
         """Running scan again should exclude previously scanned emails."""
-        # Simulate second scan where some emails now have effi:scanned
-        all_emails = sent_emails_with_commitments + [already_scanned_email]
-        mock_outlook.search_outlook = Mock(return_value=all_emails)
+        messages = older_scanned_window(count=6, scanned=0)
+        client = make_sent_client(messages)
         
-        with patch('effi_mail.tools.client_search.search', mock_outlook), \
-             patch('effi_mail.tools.client_search.retrieval', mock_outlook), \
-             patch('effi_mail.tools.client_search.folders', mock_outlook):
+        search_patch, retrieval_patch, folders_patch = patch_tools(client)
+        with search_patch, retrieval_patch, folders_patch:
             from effi_mail import call_tool
             
-            result = await call_tool("scan_for_commitments", {"days": 7})
-            data = json.loads(result[0].text)
-            
-            # Already scanned email should not be in results
-            email_ids = [e["id"] for e in data["emails"]]
-            assert already_scanned_email.id not in email_ids
+            first = json.loads((await call_tool("scan_for_commitments", {"days": 3650}))[0].text)
+            messages[0].Categories = "effi:scanned"
+            second = json.loads((await call_tool("scan_for_commitments", {"days": 3650}))[0].text)
+        
+        assert first["count"] == 6
+        assert "sent-000" not in [e["id"] for e in second["emails"]]
+        assert second["count"] == 5
@@ -0,0 +1,146 @@
+"""Tests for server start-up cost.
+
+Importing effi_mail.main registers every tool schema but must not import
+outlook_client, pywin32 or the effi-work MCP client, nor construct the
+shared clients: those are LazySingletons in helpers, built on first use.
+The import-time budget is measured in a fresh interpreter with
+``python -X importtime``.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from effi_mail import helpers
+from effi_mail.helpers import LazySingleton, is_built, resolve
+
+
+# Modules that must only load when a tool first talks to Outlook or effi-work
+DEFERRED_MODULES = (
+    "outlook_client.base",
+    "outlook_client.connection",
+    "outlook_client.executor",
+    "pythoncom",
+    "win32com.client",
+    "effi_work_client",
+    "models",
+)
+
+# Self time (ms) allowed for effi-mail's own modules, excluding the FastMCP
+# tool registration in effi_mail.main itself (about 30ms on an idle
+# machine). Wall-clock, so a loaded CI runner can raise it with
+# EFFI_IMPORT_BUDGET_MS.
+OWN_IMPORT_BUDGET_MS = float(os.getenv("EFFI_IMPORT_BUDGET_MS", "100"))
+
+OWN_PREFIXES = ("effi_mail", "outlook_client", "domain_categories", "effi_work_client", "models")
+
+
+def import_main_with_importtime():
+    """Import effi_mail.main in a fresh interpreter; return (modules, self times in us)."""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    code = "import sys, effi_mail.main; print('\\n'.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, timeout=120,
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    self_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if not parts[0].strip().isdigit():
+            continue
+        self_times[parts[2].strip()] = int(parts[0])
+    return set(result.stdout.split()), self_times
+
+
+# ============================================================================
+# Fixtures
+# ============================================================================
+
+@pytest.fixture(scope="module")
+def startup():
+    return import_main_with_importtime()
+
+
+# ============================================================================
+# Tests: import budget
+# ============================================================================
+
+class TestImportBudget:
+    """Start-up imports only what registering the tools needs."""
+
+    def test_outlook_and_mcp_client_not_imported(self, startup):
+        """outlook_client, pywin32 and effi_work_client should stay unloaded."""
+        modules, _ = startup
+
+        assert [m for m in DEFERRED_MODULES if m in modules] == []
+
+    def test_own_modules_within_budget(self, startup):
+        """effi-mail's own import time (minus tool registration) stays under budget."""
+        _, self_times = startup
+        own = {
+            name: us for name, us in self_times.items()
+            if name.split(".")[0] in OWN_PREFIXES and name != "effi_mail.main"
+        }
+
+        assert sum(own.values()) / 1000 < OWN_IMPORT_BUDGET_MS, sorted(own.items(), key=lambda kv: -kv[1])[:5]
+
+    def test_every_tool_schema_registered(self):
+        """All tools should still be listed without building any client."""
+        from effi_mail import mcp
+        from effi_mail.tools import __all__ as tool_names
+
+        tools = asyncio.run(mcp.list_tools())
+
+        assert {t.name for t in tools} == set(tool_names)
+
+
+# ============================================================================
+# Tests: lazy singletons
+# ============================================================================
+
+class TestLazySingleton:
+    """Shared objects are built once, on first attribute use."""
+
+    def test_built_on_first_use_only(self):
+        """The factory should run once, when an attribute is first touched."""
+        calls = []
+
+        class Target:
+            value = 1
+
+        proxy = LazySingleton("target", lambda: calls.append(1) or Target())
+        assert not is_built(proxy)
+
+        assert proxy.value == 1
+        proxy.value = 2
+        assert resolve(proxy).value == 2
+        assert calls == [1]
+
+    def test_concurrent_first_use_builds_once(self):
+        """Threads racing on first use should share one instance."""
+        calls = []
+        proxy = LazySingleton("target", lambda: calls.append(1) or object())
+        seen = []
+        threads = [threading.Thread(target=lambda: seen.append(resolve(proxy))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert len({id(instance) for instance in seen}) == 1
+
+    def test_shared_clients_are_wired(self):
+        """Building a client should attach the shared connection and caches."""
+        search = resolve(helpers.search)
+
+        assert search._connection is resolve(helpers.connection)
+        assert search.query_cache is resolve(helpers.query_cache)
+        assert helpers.outlook is helpers.retrieval
@@ -0,0 +1,172 @@
+"""Tests for edited-quote detection across whole threads.
+
+ThreadQuoteIndex parses each body once into a new-content word set and a
+quoted-section word set, so file_thread_to_workspace compares every email
+with every later one by set intersection instead of re-running
+detect_quote_modification (which re-splits and re-scans both bodies) per
+pair. Benchmarks use synthetic 50-, 100- and 200-message threads where
+each reply quotes the whole chain, as Outlook does.
+"""
+
+import json
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from effi_mail.tools.workspace_filing import (
+    ThreadQuoteIndex,
+    detect_quote_modification,
+    file_thread_to_workspace,
+)
+
+
+THREAD_SIZES = (50, 100, 200)
+# Seconds allowed to check every email of a 200-message thread (pro rata for
+# shorter ones)
+INDEX_BUDGET = 2.0
+
+
+def new_content(k):
+    """Message text whose words are mostly unique to message k."""
+    terms = " ".join(f"clause{k}.{n}" for n in range(12))
+    return f"Hi all,\n\nOn the facility agreement we propose revising {terms}.\n\nThanks,\nSender {k}"
+
+
+def synthetic_thread(size, edited=None):
+    """Email dicts oldest first; each body quotes the whole previous body.
+
+    Args:
+        edited: (email, quoted by) indices; the reply quotes that email
+            with its wording replaced
+    """
+    start = datetime(2026, 2, 1, 9, 0)
+    emails = []
+    previous = ""
+    for k in range(size):
+        quoted = previous
+        if edited and k == edited[1]:
+            quoted = quoted.replace(new_content(edited[0]), "Entirely rewritten text, nothing like the original message.")
+        header = (
+            f"\n\n________________________________\nFrom: Sender {k - 1}\nSent: {start + timedelta(hours=k - 1)}\n"
+            f"To: Team\nSubject: RE: Facility agreement\n\n"
+        ) if k else ""
+        body = new_content(k) + header + quoted
+        emails.append({
+            "id": f"entry-{k:03d}",
+            "subject": "RE: Facility agreement",
+            "sender_name": f"Sender {k}",
+            "sender_email": f"sender{k}@client.com",
+            "received_time": (start + timedelta(hours=k)).isoformat(),
+            "body": body,
+            "recipients_to": ["team@client.com"],
+            "recipients_cc": [],
+            "internet_message_id": f"<msg-{k:03d}@client.com>",
+        })
+        previous = body
+    return emails
+
+
+def pairwise_first_edits(emails):
+    """First editing email per email, as the pairwise loop computed it."""
+    edits = []
+    for i, email in enumerate(emails):
+        found = None
+        for j in range(i + 1, len(emails)):
+            if detect_quote_modification(email["body"], emails[j]["body"], email["sender_name"]):
+                found = j
+                break
+        edits.append(found)
+    return edits
+
+
+def indexed_first_edits(emails):
+    index = ThreadQuoteIndex([e["body"] for e in emails])
+    return [index.first_edit(i) for i in range(len(emails))]
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+# ============================================================================
+# Tests: equivalence
+# ============================================================================
+
+class TestEquivalence:
+    """The index reaches the same decisions as pairwise detection."""
+
+    def test_unedited_thread_has_no_edits(self):
+        """A thread quoting every message verbatim should report no edits."""
+        emails = synthetic_thread(30)
+
+        assert indexed_first_edits(emails) == pairwise_first_edits(emails) == [None] * 30
+
+    def test_edit_found_at_same_email(self):
+        """An edited quote should be attributed to the same pair."""
+        emails = synthetic_thread(30, edited=(5, 12))
+
+        edits = indexed_first_edits(emails)
+
+        assert edits == pairwise_first_edits(emails)
+        assert edits[5] == 12
+
+    def test_short_and_unquoted_bodies(self):
+        """Short originals and bodies without quotes should never flag an edit."""
+        bodies = ["Short note", "No quote here at all, but long enough to compare with others." * 2, ""]
+        index = ThreadQuoteIndex(bodies)
+
+        assert [index.first_edit(i) for i in range(3)] == [None, None, None]
+
+
+# ============================================================================
+# Tests: benchmarks
+# ============================================================================
+
+class TestBenchmarks:
+    """Checking a whole thread is a single pass over its text."""
+
+    @pytest.mark.parametrize("size", THREAD_SIZES)
+    def test_index_within_budget(self, size):
+        """Every email of the thread should be checked well within budget."""
+        emails = synthetic_thread(size, edited=(size // 4, size // 2))
+
+        edits, elapsed = timed(indexed_first_edits, emails)
+
+        print(f"\n{size} messages: index {elapsed * 1000:.0f} ms")
+        assert edits[size // 4] == size // 2
+        assert elapsed < INDEX_BUDGET * size / max(THREAD_SIZES)
+
+    def test_faster_than_pairwise(self):
+        """At 50 messages the index should beat the pairwise loop tenfold."""
+        emails = synthetic_thread(50)
+
+        _, pairwise = timed(pairwise_first_edits, emails)
+        _, indexed = timed(indexed_first_edits, emails)
+
+        print(f"\n50 messages: pairwise {pairwise * 1000:.0f} ms, index {indexed * 1000:.0f} ms")
+        assert indexed * 10 < pairwise
+
+
+# ============================================================================
+# Tests: file_thread_to_workspace
+# ============================================================================
+
+class TestFileThread:
+    """Thread filing uses the index for edit detection."""
+
+    def test_long_thread_preserves_quotes_of_edited_email(self, tmp_path):
+        """Only the email whose quote was edited should keep its quotes."""
+        emails = synthetic_thread(100, edited=(40, 60))
+
+        with patch("effi_mail.tools.workspace_filing.get_thread_emails_for_filing",
+                   return_value=(emails, "CONV-1", None)):
+            result = json.loads(file_thread_to_workspace("entry-000", str(tmp_path)))
+
+        assert result["success"] is True
+        assert result["thread_info"]["filed_count"] == 100
+        assert [i for i, f in enumerate(result["filed"]) if f["quotes_preserved"]] == [40]
+        assert result["edit_detected"]["at_email_index"] == 40
@@ -302,7 +302,9 @@ class TestEmailRetrievalHandlers:
                 "include_attachments": True
             })
             
-            mock_outlook.get_email_full.assert_called_once_with("test-id")
+            mock_outlook.get_email_full.assert_called_once_with(
+                "test-id", include_body=True, max_body_length=None
+            )
     
     @pytest.mark.asyncio
     async def test_get_email_by_id_with_max_body_length(self, mock_outlook):
@@ -669,6 +669,7 @@ class TestDomainCategories:
             assert "client1.com" in clients
             assert "client2.com" in clients
             assert "newsletter.com" not in clients
+            assert get_domains_by_category("marketing", json_path=temp_path) == ["newsletter.com"]
         finally:
             temp_path.unlink()
 